@@ -0,0 +1,333 @@
+"""
+Benchmarks do pipeline de análise sobre cronogramas sintéticos.
+
+Mede o tempo (mediana e mínimo de várias repetições) e o pico de memória
+(tracemalloc, em uma execução à parte) de cada etapa: leitura do CSV,
+`transformar_dados`, cada regra de validação, `get_servicos_simultaneos`,
+`get_macrofluxo`, `format_tabela_list_dict`, a serialização da resposta e a
+análise completa. Os resultados podem ser gravados como baseline e comparados
+nas execuções seguintes; uma regressão acima da tolerância faz o comando sair
+com código 1.
+
+Executar a partir da raiz do repositório (as planilhas de base são lidas por
+caminho relativo, como no servidor):
+
+    python -m ccron.benchmarks.benchmark --linhas 1000,10000
+    python -m ccron.benchmarks.benchmark --linhas 1000,10000 --salvar-baseline
+    python -m ccron.benchmarks.benchmark --linhas 200000 --repeticoes 1 --casos "regra:*,transformar_dados"
+"""
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+from ccron.src.infrastructure.adapter.out.conversor_arquivo_csv import ConversorArquivoCsv
+from ccron.src.application.transform.transform_data import TransformData
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.application.service.backend_regras import criar_backend_regras
+from ccron.src.application.service.historico import json_valido
+from ccron.src.domain.service.conferidor import Conferidor
+from ccron.src.domain.service.motor_regras import REGRAS_LINHA
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+from ccron.src.domain.service.visoes_analise import VisoesAnalise
+
+from dataclasses import dataclass
+from datetime import datetime
+from fnmatch import fnmatch
+from functools import cached_property, partial
+from typing import Callable
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Diferenças abaixo destes valores são tratadas como ruído, qualquer que seja a proporção.
+_RUIDO_TEMPO_S = 0.005
+_RUIDO_MEMORIA_BYTES = 1024 * 1024
+
+
+class ContextoBenchmark:
+    """
+    Entradas compartilhadas pelos casos de um tamanho de cronograma.
+
+    Cada etapa é calculada uma única vez, na primeira vez em que um caso precisa
+    dela, com os mesmos componentes que o `AnaliseService` usa.
+    """
+    def __init__(self, linhas: int, semente: int, componentes: "ComponentesAnalise"):
+        self.linhas = linhas
+        self.semente = semente
+        self.componentes = componentes
+        self.hoje = datetime.today()
+
+    @cached_property
+    def csv(self) -> bytes:
+        return para_csv(GeradorCronograma(self.semente).gerar(self.linhas))
+
+    @cached_property
+    def dados(self) -> list[dict]:
+        return self.componentes.conversor.csv_de_memoria_para_lista_dict(self.csv)
+
+    @cached_property
+    def tratados(self) -> TabelaTarefas:
+        return TabelaTarefas.de_dicts(self.componentes.transform_data.transformar_dados(self.dados))
+
+    def visoes(self) -> VisoesAnalise:
+        """Visões novas a cada chamada, para que nenhum caso aproveite o cache de outro."""
+        return VisoesAnalise(self.tratados)
+
+    @cached_property
+    def servicos(self) -> tuple[list, list]:
+        visoes = self.visoes()
+        return self.componentes.conferidor.get_servicos_simultaneos(visoes.ativas, visoes=visoes)
+
+    @cached_property
+    def resultado(self) -> dict:
+        return self.componentes.analise_service.analisar_cronograma(self.dados)
+
+
+class ComponentesAnalise:
+    """Componentes do pipeline, criados uma vez (carregam as planilhas de base)."""
+    def __init__(self):
+        self.conversor = ConversorArquivoCsv()
+        self.transform_data = TransformData()
+        self.regras, self.motor_regras = criar_backend_regras()
+        self.conferidor = Conferidor()
+        self.analise_service = AnaliseService()
+
+
+@dataclass(frozen=True)
+class Caso:
+    """
+    Um benchmark.
+
+    Attributes:
+        nome: Identificador do caso (ex: "regra:atrasadas").
+        preparar: Recebe o contexto e retorna a função medida, já com as entradas
+                  calculadas. É chamada antes de cada repetição, fora da medição.
+    """
+    nome: str
+    preparar: Callable[[ContextoBenchmark], Callable[[], object]]
+
+
+def _caso_regra_linha(nome: str) -> Caso:
+    return Caso(f"regra:{nome}", lambda c: partial(c.componentes.motor_regras.avaliar, c.tratados, c.hoje, [nome]))
+
+
+def _preparar_agrupamentos(c: ContextoBenchmark) -> Callable[[], object]:
+    visoes = c.visoes()
+    return partial(c.componentes.regras.verificar_condicoes, c.tratados, visoes.arvore, visoes)
+
+
+def _preparar_modulo_asc(c: ContextoBenchmark) -> Callable[[], object]:
+    return partial(c.componentes.regras.verificar_modulo, c.tratados, c.visoes().arvore)
+
+
+def _preparar_servicos(c: ContextoBenchmark) -> Callable[[], object]:
+    visoes = c.visoes()
+    return partial(c.componentes.conferidor.get_servicos_simultaneos, visoes.ativas, visoes=visoes)
+
+
+def _preparar_tabelas(c: ContextoBenchmark) -> Callable[[], object]:
+    lista_overlap, lista_gap = c.servicos
+    return partial(c.componentes.conferidor.format_tabela_list_dict, lista_overlap, lista_gap, c.tratados,
+                   visoes=c.visoes())
+
+
+def _serializar(resultado: dict) -> bytes:
+    # O mesmo caminho da rota /ccron/analise/completa (`resposta_analise` do controller).
+    return JSONResponse(status_code=200, content=jsonable_encoder(json_valido(resultado))).body
+
+
+CASOS: list[Caso] = [
+    Caso("csv_decode", lambda c: partial(c.componentes.conversor.csv_de_memoria_para_lista_dict, c.csv)),
+    Caso("transformar_dados", lambda c: partial(c.componentes.transform_data.transformar_dados, c.dados)),
+    *(_caso_regra_linha(regra.nome) for regra in REGRAS_LINHA),
+    Caso("regras_linha", lambda c: partial(c.componentes.motor_regras.avaliar, c.tratados, c.hoje)),
+    Caso("regra:peso_sap", lambda c: partial(c.componentes.regras.validar_peso, c.tratados)),
+    Caso("regra:agrupamentos", _preparar_agrupamentos),
+    Caso("regra:modulo_asc", _preparar_modulo_asc),
+    Caso("regra:preenchimento", lambda c: partial(c.componentes.regras.verificar_preenchimento, c.tratados)),
+    Caso("servicos_simultaneos", _preparar_servicos),
+    Caso("macrofluxo", lambda c: partial(c.componentes.conferidor.get_macrofluxo, c.tratados)),
+    Caso("tabelas_overlap_gap", _preparar_tabelas),
+    Caso("serializacao", lambda c: partial(_serializar, c.resultado)),
+    Caso("analise_completa", lambda c: partial(c.componentes.analise_service.analisar_cronograma, c.dados)),
+]
+
+
+def medir(caso: Caso, contexto: ContextoBenchmark, repeticoes: int) -> dict:
+    """
+    Executa um caso `repeticoes` vezes e mais uma com o tracemalloc ligado.
+
+    O tempo não é medido na execução com tracemalloc, que deixa o código bem
+    mais lento; o pico de memória conta só o que é alocado pela função medida.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        funcao = caso.preparar(contexto)
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    funcao = caso.preparar(contexto)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "mediana_s": round(statistics.median(tempos), 6),
+        "min_s": round(min(tempos), 6),
+        "pico_bytes": pico,
+    }
+
+
+def comparar(atual: dict, base: dict | None, tolerancia_tempo: float, tolerancia_memoria: float) -> dict:
+    """
+    Compara uma medição com a do baseline.
+
+    Returns:
+        As razões atual/baseline de tempo e memória e a lista de regressões
+        ("tempo", "memoria") que passaram da tolerância.
+    """
+    if not base:
+        return {"razao_tempo": None, "razao_memoria": None, "regressoes": []}
+    regressoes = []
+    razao_tempo = atual["mediana_s"] / base["mediana_s"] if base["mediana_s"] else None
+    razao_memoria = atual["pico_bytes"] / base["pico_bytes"] if base["pico_bytes"] else None
+    if atual["mediana_s"] > base["mediana_s"] * (1 + tolerancia_tempo) \
+            and atual["mediana_s"] - base["mediana_s"] > _RUIDO_TEMPO_S:
+        regressoes.append("tempo")
+    if atual["pico_bytes"] > base["pico_bytes"] * (1 + tolerancia_memoria) \
+            and atual["pico_bytes"] - base["pico_bytes"] > _RUIDO_MEMORIA_BYTES:
+        regressoes.append("memoria")
+    return {
+        "razao_tempo": razao_tempo and round(razao_tempo, 3),
+        "razao_memoria": razao_memoria and round(razao_memoria, 3),
+        "regressoes": regressoes,
+    }
+
+
+def selecionar_casos(padroes: str | None) -> list[Caso]:
+    """Casos cujo nome casa com algum dos padrões (fnmatch, separados por vírgula)."""
+    if not padroes:
+        return list(CASOS)
+    padroes = [padrao.strip() for padrao in padroes.split(",") if padrao.strip()]
+    selecionados = [caso for caso in CASOS if any(fnmatch(caso.nome, padrao) for padrao in padroes)]
+    if not selecionados:
+        raise ValueError(f"Nenhum caso corresponde a {padroes}. Casos: {', '.join(caso.nome for caso in CASOS)}")
+    return selecionados
+
+
+def ler_baseline(caminho: str) -> dict:
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return {"casos": {}}
+
+
+def gravar_baseline(caminho: str, baseline: dict, medicoes: dict):
+    """Atualiza o baseline com as medições, mantendo os casos e tamanhos que não foram executados."""
+    baseline = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+            "gravado_em": datetime.now().isoformat(timespec="seconds"),
+        },
+        "casos": {**baseline.get("casos", {}), **medicoes},
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(baseline, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def _formatar_linha(chave: str, medicao: dict, comparacao: dict) -> str:
+    razao = lambda valor: f"{valor:>6.2f}x" if valor is not None else "      -"
+    situacao = "REGRESSÃO (" + ", ".join(comparacao["regressoes"]) + ")" if comparacao["regressoes"] else ""
+    return (f"{chave:<40} {medicao['mediana_s']:>10.4f} {medicao['min_s']:>10.4f} "
+            f"{medicao['pico_bytes'] / 1024 / 1024:>10.1f} {razao(comparacao['razao_tempo'])} "
+            f"{razao(comparacao['razao_memoria'])}  {situacao}")
+
+
+def executar(linhas: list[int], casos: list[Caso], repeticoes: int = 3, semente: int = 1,
+             baseline: dict | None = None, tolerancia_tempo: float = 0.25, tolerancia_memoria: float = 0.10,
+             saida=sys.stdout) -> tuple[dict, dict]:
+    """
+    Executa os casos para cada tamanho de cronograma, imprimindo uma linha por caso.
+
+    Returns:
+        As medições e as comparações com o baseline, por "caso@linhas".
+    """
+    baseline = baseline or {"casos": {}}
+    componentes = ComponentesAnalise()
+    medicoes, comparacoes = {}, {}
+    print(f"{'caso@linhas':<40} {'mediana_s':>10} {'min_s':>10} {'pico_MB':>10} {'tempo':>7} {'memória':>7}", file=saida)
+    for quantidade in linhas:
+        contexto = ContextoBenchmark(quantidade, semente, componentes)
+        for caso in casos:
+            chave = f"{caso.nome}@{quantidade}"
+            medicao = medir(caso, contexto, repeticoes)
+            medicao["linhas"] = len(contexto.dados)
+            comparacao = comparar(medicao, baseline["casos"].get(chave), tolerancia_tempo, tolerancia_memoria)
+            medicoes[chave], comparacoes[chave] = medicao, comparacao
+            print(_formatar_linha(chave, medicao, comparacao), file=saida, flush=True)
+    return medicoes, comparacoes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de análise de cronogramas.")
+    parser.add_argument("--linhas", default="1000,10000",
+                        help="Tamanhos dos cronogramas gerados, separados por vírgula (ex: 1000,10000,200000).")
+    parser.add_argument("--casos", help="Casos a executar, padrões separados por vírgula (ex: \"regra:*,macrofluxo\").")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições medidas de cada caso.")
+    parser.add_argument("--semente", type=int, default=1, help="Semente do gerador de cronogramas.")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="Arquivo de baseline para comparação.")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava as medições no arquivo de baseline.")
+    parser.add_argument("--tolerancia-tempo", type=float, default=0.25, help="Aumento de tempo aceito (0.25 = 25%%).")
+    parser.add_argument("--tolerancia-memoria", type=float, default=0.10, help="Aumento de memória aceito (0.10 = 10%%).")
+    parser.add_argument("--saida", help="Grava as medições e comparações neste arquivo JSON.")
+    parser.add_argument("--listar", action="store_true", help="Lista os casos disponíveis e sai.")
+    argumentos = parser.parse_args(argv)
+
+    if argumentos.listar:
+        print("\n".join(caso.nome for caso in CASOS))
+        return 0
+
+    linhas = [int(valor) for valor in argumentos.linhas.split(",") if valor.strip()]
+    try:
+        casos = selecionar_casos(argumentos.casos)
+    except ValueError as e:
+        parser.error(str(e))
+    baseline = ler_baseline(argumentos.baseline)
+    medicoes, comparacoes = executar(
+        linhas, casos, argumentos.repeticoes, argumentos.semente, baseline,
+        argumentos.tolerancia_tempo, argumentos.tolerancia_memoria)
+
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            json.dump({"medicoes": medicoes, "comparacoes": comparacoes}, arquivo, ensure_ascii=False, indent=2)
+    if argumentos.salvar_baseline:
+        gravar_baseline(argumentos.baseline, baseline, medicoes)
+        print(f"Baseline gravado em {argumentos.baseline}.")
+        return 0
+
+    regressoes = [chave for chave, comparacao in comparacoes.items() if comparacao["regressoes"]]
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões) acima da tolerância: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+"""
+Teste de carga HTTP da API, como implantada (gunicorn/uvicorn com vários workers).
+
+Sobe a aplicação localmente com a quantidade e a classe de workers escolhidas
+(ou usa um servidor já em execução, com --servidor externo), envia uma mistura
+de cronogramas sintéticos e gravados para /ccron/analise/completa com
+concorrência fixa ou taxa de chegada fixa e relata vazão, latências p50/p95/p99,
+erros e a memória (RSS) de cada worker.
+
+A sequência de envios depende só da semente e das cargas, e o relatório JSON
+guarda a configuração, o commit e a assinatura de cada carga, para que duas
+execuções (ex: de builds diferentes) possam ser comparadas com --comparar.
+
+Executar a partir da raiz do repositório:
+
+    python -m ccron.benchmarks.carga --workers 4 --concorrencia 8 --duracao 60 --saida carga.json
+    python -m ccron.benchmarks.carga --workers 2 --taxa 1.5 --duracao 120 --gravados "cronogramas/*.csv"
+    python -m ccron.benchmarks.carga --workers 4 --concorrencia 8 --duracao 60 --comparar carga.json
+"""
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable
+
+import requests
+
+APP = "ccron.src.infrastructure.adapter.web.ccron_web_controller:app"
+ROTA_ANALISE = "/ccron/analise/completa"
+CLASSE_WORKER_PADRAO = "uvicorn.workers.UvicornWorker"
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass(frozen=True)
+class Carga:
+    """Um cronograma enviado no teste, com o peso na mistura de envios."""
+    nome: str
+    conteudo: bytes
+    peso: float = 1.0
+
+    @property
+    def assinatura(self) -> str:
+        return hashlib.sha1(self.conteudo).hexdigest()
+
+
+@dataclass
+class Resultado:
+    """Uma requisição do teste. `inicio` é relativo ao início da fase medida."""
+    carga: str
+    inicio: float
+    latencia: float
+    status: int | None
+    erro: str | None = None
+
+    @property
+    def sucesso(self) -> bool:
+        return self.erro is None and self.status == 200
+
+
+def _peso(texto: str) -> tuple[str, float]:
+    # "valor:peso" -> (valor, peso); sem um peso numérico no fim, peso 1.
+    valor, separador, peso = texto.rpartition(":")
+    try:
+        return (valor, float(peso)) if separador else (texto, 1.0)
+    except ValueError:
+        return texto, 1.0
+
+
+def cargas_sinteticas(especificacao: str, semente: int = 1) -> list[Carga]:
+    """
+    Cronogramas do `GeradorCronograma`, ex: "1000:3,10000:1" (linhas:peso).
+    """
+    cargas = []
+    for item in filter(None, (parte.strip() for parte in especificacao.split(","))):
+        linhas, peso = _peso(item)
+        tarefas = GeradorCronograma(semente).gerar(int(linhas))
+        cargas.append(Carga(f"sintetico_{linhas}", para_csv(tarefas), peso))
+    return cargas
+
+
+def cargas_gravadas(padroes: list[str]) -> list[Carga]:
+    """
+    Relatórios exportados do MS Project, por padrão glob, ex: "cronogramas/*.csv"
+    ou "cronogramas/obra_grande.csv:2" (com peso).
+    """
+    cargas = []
+    for padrao in padroes:
+        padrao, peso = _peso(padrao)
+        arquivos = sorted(glob.glob(padrao))
+        if not arquivos:
+            raise ValueError(f"Nenhum arquivo encontrado em {padrao}")
+        for caminho in arquivos:
+            with open(caminho, "rb") as arquivo:
+                cargas.append(Carga(os.path.basename(caminho), arquivo.read(), peso))
+    return cargas
+
+
+def sequencia_cargas(cargas: list[Carga], semente: int):
+    """Sequência infinita e reproduzível de cargas, sorteadas pelos pesos."""
+    aleatorio = random.Random(semente)
+    pesos = [carga.peso for carga in cargas]
+    while True:
+        yield from aleatorio.choices(cargas, weights=pesos, k=256)
+
+
+def _porta_livre() -> int:
+    with socket.socket() as soquete:
+        soquete.bind(("127.0.0.1", 0))
+        return soquete.getsockname()[1]
+
+
+def _rss_bytes(pid: int) -> int | None:
+    """RSS de um processo, lido de /proc (Linux). None se indisponível."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _filhos(pid: int) -> list[int]:
+    filhos = []
+    for tarefa in glob.glob(f"/proc/{pid}/task/*/children"):
+        try:
+            with open(tarefa, encoding="ascii") as arquivo:
+                filhos.extend(int(filho) for filho in arquivo.read().split())
+        except (OSError, ValueError):
+            continue
+    return filhos
+
+
+def _linha_comando(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as arquivo:
+            return arquivo.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+class ServidorLocal:
+    """
+    Sobe a API em um processo separado, com gunicorn (como no Dockerfile) ou uvicorn.
+
+    Args:
+        servidor: "gunicorn" ou "uvicorn".
+        workers: Quantidade de workers.
+        classe: Classe de worker do gunicorn.
+        porta: Porta local. Padrão: uma porta livre.
+        diretorio: Diretório de trabalho do servidor (as planilhas de base são
+                   lidas por caminho relativo). Padrão: a raiz do repositório.
+        timeout_worker: Timeout de requisição dos workers do gunicorn, em segundos.
+    """
+    def __init__(self, servidor: str = "gunicorn", workers: int = 4, classe: str = CLASSE_WORKER_PADRAO,
+                 porta: int | None = None, diretorio: str | None = None, timeout_worker: int = 300):
+        self.servidor = servidor
+        self.workers = workers
+        self.classe = classe
+        self.porta = porta or _porta_livre()
+        self.diretorio = diretorio or RAIZ_REPOSITORIO
+        self.timeout_worker = timeout_worker
+        self.url = f"http://127.0.0.1:{self.porta}"
+        self.processo: subprocess.Popen | None = None
+        self._log = None
+
+    def comando(self) -> list[str]:
+        if self.servidor == "gunicorn":
+            return [sys.executable, "-m", "gunicorn", APP, "--workers", str(self.workers),
+                    "--worker-class", self.classe, "--bind", f"127.0.0.1:{self.porta}",
+                    "--timeout", str(self.timeout_worker)]
+        if self.servidor == "uvicorn":
+            return [sys.executable, "-m", "uvicorn", APP, "--workers", str(self.workers),
+                    "--host", "127.0.0.1", "--port", str(self.porta)]
+        raise ValueError(f"Servidor desconhecido: {self.servidor}. Opções: gunicorn, uvicorn")
+
+    def iniciar(self, espera: float = 180):
+        """Inicia o servidor e aguarda todos os workers e a primeira resposta da API."""
+        self._log = tempfile.NamedTemporaryFile(prefix="ccron_carga_", suffix=".log", delete=False)
+        ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [RAIZ_REPOSITORIO, os.getenv("PYTHONPATH")])))
+        self.processo = subprocess.Popen(self.comando(), cwd=self.diretorio, env=ambiente, stdout=self._log,
+                                         stderr=subprocess.STDOUT, start_new_session=True)
+        limite = time.monotonic() + espera
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                raise RuntimeError(f"O servidor encerrou com código {self.processo.returncode}.\n{self.log()}")
+            try:
+                pronto = requests.get(self.url + "/openapi.json", timeout=5).status_code == 200
+            except requests.RequestException:
+                pronto = False
+            if pronto and len(self.pids_workers()) >= self.workers:
+                return
+            time.sleep(0.5)
+        self.parar()
+        raise RuntimeError(f"O servidor não respondeu em {espera:.0f}s.\n{self.log()}")
+
+    def pids_workers(self) -> list[int]:
+        """PIDs dos workers: os processos filhos do mestre, exceto os auxiliares do multiprocessing."""
+        if self.processo is None:
+            return []
+        return [pid for pid in _filhos(self.processo.pid) if "resource_tracker" not in _linha_comando(pid)]
+
+    def log(self, linhas: int = 40) -> str:
+        if self._log is None:
+            return ""
+        with open(self._log.name, encoding="utf-8", errors="replace") as arquivo:
+            return "".join(arquivo.readlines()[-linhas:])
+
+    def parar(self):
+        if self.processo is None or self.processo.poll() is not None:
+            return
+        try:
+            os.killpg(self.processo.pid, signal.SIGTERM)
+            self.processo.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.processo.pid, signal.SIGKILL)
+            self.processo.wait()
+        except ProcessLookupError:
+            pass
+
+    def __enter__(self) -> "ServidorLocal":
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excecao):
+        self.parar()
+
+
+class MonitorMemoria:
+    """
+    Amostra periodicamente o RSS de cada worker, guardando o inicial, o pico e o
+    último valor. Workers reiniciados pelo gunicorn aparecem com um novo PID.
+
+    Args:
+        pids: Função que retorna os PIDs atuais dos workers.
+        intervalo: Intervalo entre as amostras, em segundos.
+    """
+    def __init__(self, pids: Callable[[], list[int]], intervalo: float = 0.5):
+        self.pids = pids
+        self.intervalo = intervalo
+        self.amostras: dict[int, dict] = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="carga-memoria", daemon=True)
+
+    def _amostrar(self):
+        for pid in self.pids():
+            rss = _rss_bytes(pid)
+            if rss is None:
+                continue
+            amostra = self.amostras.setdefault(pid, {"inicial": rss, "pico": rss, "final": rss})
+            amostra["pico"] = max(amostra["pico"], rss)
+            amostra["final"] = rss
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self._amostrar()
+
+    def iniciar(self):
+        self._amostrar()
+        self._thread.start()
+
+    def parar(self) -> list[dict]:
+        self._parar.set()
+        self._thread.join()
+        self._amostrar()
+        return [
+            {"pid": pid, **{chave: round(valor / 1024 / 1024, 1) for chave, valor in amostra.items()}}
+            for pid, amostra in sorted(self.amostras.items())
+        ]
+
+
+class GeradorCarga:
+    """
+    Envia as cargas para a API e registra o resultado de cada requisição.
+
+    Args:
+        url: Endereço base da API.
+        cargas: Cronogramas enviados, sorteados pelos pesos.
+        semente: Semente do sorteio das cargas.
+        parametros: Parâmetros de query da rota de análise (ex: {"somente_contagens": "true"}).
+        timeout: Timeout de cada requisição, em segundos.
+    """
+    def __init__(self, url: str, cargas: list[Carga], semente: int = 1, parametros: dict | None = None,
+                 timeout: float = 300):
+        self.url = url.rstrip("/") + ROTA_ANALISE
+        self.cargas = cargas
+        self.semente = semente
+        self.parametros = parametros or {}
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _sessao(self) -> requests.Session:
+        if not hasattr(self._local, "sessao"):
+            self._local.sessao = requests.Session()
+        return self._local.sessao
+
+    def _postar(self, carga: Carga) -> requests.Response:
+        return self._sessao().post(self.url, params=self.parametros, timeout=self.timeout,
+                                   files={"file": (f"{carga.nome}.csv", carga.conteudo, "text/csv")})
+
+    def enviar(self, carga: Carga, inicio_fase: float, agendado: float | None = None) -> Resultado:
+        """
+        Envia uma carga. Com `agendado`, a latência conta a partir do horário
+        planejado de envio, incluindo a espera por uma thread livre, para que a
+        fila do cliente não esconda a lentidão do servidor.
+        """
+        inicio = agendado if agendado is not None else time.perf_counter()
+        try:
+            resposta = self._postar(carga)
+            resposta.content
+            status, erro = resposta.status_code, None if resposta.status_code == 200 else f"HTTP {resposta.status_code}"
+        except requests.RequestException as e:
+            status, erro = None, type(e).__name__
+        return Resultado(carga.nome, inicio - inicio_fase, time.perf_counter() - inicio, status, erro)
+
+    def verificar(self):
+        """
+        Envia cada carga uma vez antes do teste.
+
+        Raises:
+            RuntimeError: Se alguma carga não receber HTTP 200; medir uma rota que
+                          só responde erros não diria nada sobre o desempenho.
+        """
+        for carga in self.cargas:
+            try:
+                resposta = self._postar(carga)
+            except requests.RequestException as e:
+                raise RuntimeError(f"A carga {carga.nome} falhou na verificação: {type(e).__name__}: {e}") from e
+            if resposta.status_code != 200:
+                raise RuntimeError(f"A carga {carga.nome} recebeu HTTP {resposta.status_code} na verificação: "
+                                   f"{resposta.text[:500]}")
+
+    def concorrencia_fixa(self, concorrencia: int, duracao: float | None = None,
+                          requisicoes: int | None = None) -> tuple[list[Resultado], float]:
+        """
+        Modelo fechado: `concorrencia` clientes, cada um enviando a próxima carga
+        assim que recebe a resposta, até `duracao` segundos ou `requisicoes` envios.
+        """
+        sequencia = sequencia_cargas(self.cargas, self.semente)
+        contador = itertools.count()
+        lock = threading.Lock()
+        resultados: list[Resultado] = []
+        inicio_fase = time.perf_counter()
+        limite = inicio_fase + duracao if duracao else None
+
+        def cliente():
+            while True:
+                with lock:
+                    if requisicoes is not None and next(contador) >= requisicoes:
+                        return
+                    carga = next(sequencia)
+                if limite is not None and time.perf_counter() >= limite:
+                    return
+                resultado = self.enviar(carga, inicio_fase)
+                with lock:
+                    resultados.append(resultado)
+
+        with ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix="carga-cliente") as clientes:
+            for _ in range(concorrencia):
+                clientes.submit(cliente)
+        return resultados, time.perf_counter() - inicio_fase
+
+    def taxa_fixa(self, taxa: float, duracao: float | None = None, requisicoes: int | None = None,
+                  poisson: bool = False, max_pendentes: int = 256) -> tuple[list[Resultado], float]:
+        """
+        Modelo aberto: as requisições chegam a `taxa` por segundo, em intervalos
+        constantes ou, com `poisson`, exponenciais (com a mesma semente), sem
+        esperar as respostas anteriores.
+        """
+        sequencia = sequencia_cargas(self.cargas, self.semente)
+        intervalos = random.Random(self.semente + 1)
+        total = requisicoes if requisicoes is not None else int(taxa * duracao)
+        inicio_fase = time.perf_counter()
+        futuros = []
+        with ThreadPoolExecutor(max_workers=max_pendentes, thread_name_prefix="carga-cliente") as clientes:
+            agendado = inicio_fase
+            for _ in range(total):
+                espera = agendado - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                futuros.append(clientes.submit(self.enviar, next(sequencia), inicio_fase, agendado))
+                agendado += intervalos.expovariate(taxa) if poisson else 1 / taxa
+        return [futuro.result() for futuro in futuros], time.perf_counter() - inicio_fase
+
+
+def _percentil(ordenados: list[float], percentual: float) -> float | None:
+    # Nearest-rank: o menor valor com pelo menos `percentual`% das amostras até ele.
+    if not ordenados:
+        return None
+    posicao = max(0, min(len(ordenados) - 1, -(-len(ordenados) * percentual // 100) - 1))
+    return ordenados[int(posicao)]
+
+
+def _latencias(resultados: list[Resultado]) -> dict:
+    ordenados = sorted(resultado.latencia for resultado in resultados if resultado.sucesso)
+    if not ordenados:
+        return {"media_s": None, "p50_s": None, "p95_s": None, "p99_s": None, "max_s": None}
+    return {
+        "media_s": round(sum(ordenados) / len(ordenados), 4),
+        "p50_s": round(_percentil(ordenados, 50), 4),
+        "p95_s": round(_percentil(ordenados, 95), 4),
+        "p99_s": round(_percentil(ordenados, 99), 4),
+        "max_s": round(ordenados[-1], 4),
+    }
+
+
+def resumir(resultados: list[Resultado], duracao: float) -> dict:
+    """Vazão, latências (das requisições bem-sucedidas), erros por tipo e detalhes por carga."""
+    sucesso = sum(resultado.sucesso for resultado in resultados)
+    erros: dict[str, int] = {}
+    for resultado in resultados:
+        if not resultado.sucesso:
+            erros[resultado.erro] = erros.get(resultado.erro, 0) + 1
+    por_carga = {}
+    for nome in sorted({resultado.carga for resultado in resultados}):
+        da_carga = [resultado for resultado in resultados if resultado.carga == nome]
+        por_carga[nome] = {"requisicoes": len(da_carga), "erros": sum(not r.sucesso for r in da_carga), **_latencias(da_carga)}
+    return {
+        "requisicoes": len(resultados),
+        "sucesso": sucesso,
+        "erros": erros,
+        "taxa_erros": round(1 - sucesso / len(resultados), 4) if resultados else None,
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(sucesso / duracao, 3) if duracao else None,
+        "latencia": _latencias(resultados),
+        "por_carga": por_carga,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ_REPOSITORIO, capture_output=True,
+                              text=True, timeout=10, check=True).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(atual: dict, anterior: dict) -> list[str]:
+    """Linhas com a variação de vazão e latências em relação a um relatório anterior."""
+    linhas = []
+    chaves = ("servidor", "workers", "classe", "modo", "concorrencia", "taxa", "poisson", "parametros", "semente")
+    diferencas = [chave for chave in chaves if atual["execucao"].get(chave) != anterior["execucao"].get(chave)]
+    if [c["assinatura"] for c in atual["execucao"]["cargas"]] != [c["assinatura"] for c in anterior["execucao"]["cargas"]]:
+        diferencas.append("cargas")
+    if diferencas:
+        linhas.append(f"Atenção: configuração diferente da execução anterior ({', '.join(diferencas)}).")
+
+    def variacao(nome: str, valor_atual, valor_anterior, unidade: str):
+        if valor_atual is None or valor_anterior is None:
+            return
+        percentual = f" ({(valor_atual / valor_anterior - 1) * 100:+.1f}%)" if valor_anterior else ""
+        linhas.append(f"{nome:<12} {valor_anterior:>10}{unidade} -> {valor_atual:>10}{unidade}{percentual}")
+
+    linhas.append(f"Comparação com {anterior['execucao'].get('commit')} ({anterior['execucao'].get('data')}):")
+    variacao("vazão", atual["resultado"]["vazao_rps"], anterior["resultado"]["vazao_rps"], " req/s")
+    for percentil in ("p50_s", "p95_s", "p99_s"):
+        variacao(percentil[:3], atual["resultado"]["latencia"][percentil], anterior["resultado"]["latencia"][percentil], " s")
+    variacao("taxa erros", atual["resultado"]["taxa_erros"], anterior["resultado"]["taxa_erros"], "")
+    return linhas
+
+
+def imprimir(relatorio: dict):
+    execucao, resultado = relatorio["execucao"], relatorio["resultado"]
+    print(f"{execucao['servidor']} com {execucao['workers']} workers, modo {execucao['modo']}, commit {execucao['commit']}")
+    print(f"Requisições: {resultado['requisicoes']} ({resultado['sucesso']} com sucesso) em {resultado['duracao_s']}s"
+          f" -> {resultado['vazao_rps']} req/s")
+    latencia = resultado["latencia"]
+    print(f"Latência: média {latencia['media_s']}s, p50 {latencia['p50_s']}s, p95 {latencia['p95_s']}s, "
+          f"p99 {latencia['p99_s']}s, máx {latencia['max_s']}s")
+    print(f"Erros: {resultado['erros'] or 'nenhum'} (taxa {resultado['taxa_erros']})")
+    for nome, carga in resultado["por_carga"].items():
+        print(f"  {nome:<30} {carga['requisicoes']:>6} req  p50 {carga['p50_s']}s  p95 {carga['p95_s']}s  "
+              f"p99 {carga['p99_s']}s  erros {carga['erros']}")
+    for worker in relatorio["memoria_workers"]:
+        print(f"  worker {worker['pid']:<8} RSS inicial {worker['inicial']} MB, pico {worker['pico']} MB, final {worker['final']} MB")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP de /ccron/analise/completa.")
+    parser.add_argument("--servidor", choices=("gunicorn", "uvicorn", "externo"), default="gunicorn",
+                        help="Como subir a API; \"externo\" usa o servidor de --url.")
+    parser.add_argument("--url", help="Endereço de um servidor já em execução (com --servidor externo).")
+    parser.add_argument("--workers", type=int, default=4, help="Workers do servidor local.")
+    parser.add_argument("--classe", default=CLASSE_WORKER_PADRAO, help="Classe de worker do gunicorn.")
+    parser.add_argument("--porta", type=int, help="Porta do servidor local. Padrão: uma porta livre.")
+    parser.add_argument("--diretorio", help="Diretório de trabalho do servidor local. Padrão: raiz do repositório.")
+    parser.add_argument("--sinteticos", default="1000:3,10000:1",
+                        help="Cronogramas sintéticos, linhas:peso separados por vírgula. Vazio para não usar.")
+    parser.add_argument("--gravados", action="append", default=[],
+                        help="Relatórios gravados (glob, com :peso opcional). Pode ser repetido.")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--concorrencia", type=int, help="Clientes simultâneos (modelo fechado). Padrão: 4.")
+    modo.add_argument("--taxa", type=float, help="Requisições por segundo (modelo aberto).")
+    parser.add_argument("--poisson", action="store_true", help="Com --taxa, intervalos exponenciais em vez de constantes.")
+    parser.add_argument("--duracao", type=float, help="Duração da fase medida, em segundos. Padrão: 60.")
+    parser.add_argument("--requisicoes", type=int, help="Total de requisições da fase medida (no lugar de --duracao).")
+    parser.add_argument("--aquecimento", type=int, help="Requisições antes da fase medida, não contadas. Padrão: 2 por worker.")
+    parser.add_argument("--parametros", default="", help="Query string da rota de análise, ex: \"somente_contagens=true\".")
+    parser.add_argument("--timeout", type=float, default=300, help="Timeout de cada requisição, em segundos.")
+    parser.add_argument("--semente", type=int, default=1, help="Semente das cargas sintéticas e do sorteio dos envios.")
+    parser.add_argument("--saida", help="Grava o relatório neste arquivo JSON.")
+    parser.add_argument("--comparar", help="Relatório JSON de uma execução anterior para comparação.")
+    argumentos = parser.parse_args(argv)
+
+    if argumentos.servidor == "externo" and not argumentos.url:
+        parser.error("--servidor externo exige --url.")
+    if argumentos.duracao is None and argumentos.requisicoes is None:
+        argumentos.duracao = 60
+    concorrencia = argumentos.concorrencia or (None if argumentos.taxa else 4)
+    parametros = dict(parte.split("=", 1) for parte in argumentos.parametros.split("&") if "=" in parte)
+
+    try:
+        cargas = cargas_sinteticas(argumentos.sinteticos, argumentos.semente) if argumentos.sinteticos else []
+        cargas += cargas_gravadas(argumentos.gravados)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    if not cargas:
+        parser.error("Nenhuma carga: informe --sinteticos e/ou --gravados.")
+
+    servidor = None
+    if argumentos.servidor != "externo":
+        servidor = ServidorLocal(argumentos.servidor, argumentos.workers, argumentos.classe, argumentos.porta,
+                                 argumentos.diretorio, int(argumentos.timeout))
+        print(f"Iniciando: {' '.join(servidor.comando())}")
+        servidor.iniciar()
+    url = servidor.url if servidor else argumentos.url
+
+    try:
+        gerador = GeradorCarga(url, cargas, argumentos.semente, parametros, argumentos.timeout)
+        print(f"Verificação: uma requisição por carga ({len(cargas)})")
+        try:
+            gerador.verificar()
+        except RuntimeError as e:
+            print(f"Teste interrompido: {e}", file=sys.stderr)
+            return 1
+        aquecimento = argumentos.aquecimento if argumentos.aquecimento is not None else 2 * argumentos.workers
+        if aquecimento:
+            print(f"Aquecimento: {aquecimento} requisições")
+            gerador.concorrencia_fixa(concorrencia or argumentos.workers, requisicoes=aquecimento)
+
+        monitor = MonitorMemoria(servidor.pids_workers if servidor else list)
+        monitor.iniciar()
+        if concorrencia:
+            print(f"Fase medida: concorrência {concorrencia}")
+            resultados, duracao = gerador.concorrencia_fixa(concorrencia, argumentos.duracao, argumentos.requisicoes)
+        else:
+            print(f"Fase medida: {argumentos.taxa} req/s{' (Poisson)' if argumentos.poisson else ''}")
+            resultados, duracao = gerador.taxa_fixa(argumentos.taxa, argumentos.duracao, argumentos.requisicoes,
+                                                    argumentos.poisson)
+        memoria = monitor.parar()
+    finally:
+        if servidor:
+            servidor.parar()
+
+    relatorio = {
+        "execucao": {
+            "commit": _commit(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "servidor": argumentos.servidor,
+            "workers": argumentos.workers if servidor else None,
+            "classe": argumentos.classe if argumentos.servidor == "gunicorn" else None,
+            "modo": "concorrencia" if concorrencia else "taxa",
+            "concorrencia": concorrencia,
+            "taxa": argumentos.taxa,
+            "poisson": argumentos.poisson,
+            "duracao_s": argumentos.duracao,
+            "requisicoes": argumentos.requisicoes,
+            "aquecimento": aquecimento,
+            "parametros": parametros,
+            "semente": argumentos.semente,
+            "cpus": os.cpu_count(),
+            "cargas": [{"nome": carga.nome, "bytes": len(carga.conteudo), "peso": carga.peso,
+                        "assinatura": carga.assinatura} for carga in cargas],
+        },
+        "resultado": resumir(resultados, duracao),
+        "memoria_workers": memoria,
+    }
+    imprimir(relatorio)
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as arquivo:
+            print("\n".join(comparar(relatorio, json.load(arquivo))))
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+from ccron.src.infrastructure.adapter.out.excel_data_adapter import ExcelDataAdapter
+
+from datetime import date, timedelta
+import csv
+import io
+import math
+import random
+
+# Colunas do relatório exportado do MS Project, na ordem do arquivo.
+COLUNAS = [
+    "Id", "Ativo", "Nome", "Duração", "Trabalho", "Início", "Término", "Início_real", "Término_real",
+    "Predecessoras", "Nível_da_estrutura_de_tópicos", "Número_da_estrutura_de_tópicos", "Resumo", "Tipo",
+    "Modo_da_Tarefa", "Tipo_de_restrição", "Nomes_dos_recursos", "Custo", "Peso", "SAP_Tarefa", "ID_Bloco",
+    "SAP_Elemento_PEP", "SAP_Diagrama_de_Rede", "Agrupamento", "MÓDULO_ASC",
+]
+
+CAMINHO_DE_PARA = r"ccron\src\infrastructure\bases\DexPara4d.xlsx"
+
+# Usados quando a planilha De-Para não pode ser lida.
+_SERVICOS_PADRAO = {
+    "asc": ["Pavimentação - 1a Etapa", "Muro de Frente - Estrutura", "Rede de Drenagem Pluvial", "Barracão - Construção"],
+    "infra": ["Fundação", "Blocos de Coroamento e Baldrames", "Lajão", "Fiada Zero e Impermeabilização",
+              "Instalações Lajão", "Aterro Compactado"],
+    "pavimento": ["Alvenaria / Parede de Concreto", "Estrutura Paredes Drywall", "Fechamento Paredes Drywall",
+                  "Pós-forma / Estucagem", "Fechamento de Conectores e Teste de Continuidade",
+                  "Esgoto e Pluvial - Distribuição e Prumadas"],
+}
+
+# Latências usadas nas predecessoras, no formato do MS Project em português.
+_LATENCIAS = ["", "", "", "+2 dias", "II+2 dias", "TI-1 dia", "+7 dias"]
+
+# Alterações que disparam as regras de validação: coluna -> valor.
+VIOLACOES = {
+    "Predecessoras": "",
+    "Tipo": "Duração fixa",
+    "Modo_da_Tarefa": "Agendada Manualmente",
+    "Tipo_de_restrição": "Não Iniciar Antes De",
+    "Nomes_dos_recursos": "Usuário Genérico",
+    "Custo": 0,
+    "Peso": 0,
+    "Trabalho": "7 hrs",
+    "Ativo": "Não",
+    "Nome": "ANDAM JUNTO",
+    "Duração": "25 dias",
+    "SAP_Tarefa": "",
+}
+
+
+def servicos_de_para(caminho: str = CAMINHO_DE_PARA) -> dict[str, list[str]]:
+    """
+    Serviços da planilha De-Para, separados pela codificação: "asc" (ASC.*),
+    "infra" (BXX.GER.*) e "pavimento" (BXX.PXX.*).
+
+    Se a planilha não puder ser lida, usa uma lista reduzida de serviços.
+    """
+    servicos = {"asc": [], "infra": [], "pavimento": []}
+    for linha in ExcelDataAdapter(file_path=caminho).read_data():
+        nome, codificacao = linha.get("Services"), str(linha.get("Codificação") or "")
+        if not nome:
+            continue
+        if codificacao.startswith("ASC."):
+            grupo = "asc"
+        elif codificacao.startswith("BXX.GER."):
+            grupo = "infra"
+        elif codificacao.startswith("BXX.PXX."):
+            grupo = "pavimento"
+        else:
+            continue
+        if nome not in servicos[grupo]:
+            servicos[grupo].append(nome)
+    if not all(servicos.values()):
+        return {grupo: list(nomes) for grupo, nomes in _SERVICOS_PADRAO.items()}
+    return servicos
+
+
+class GeradorCronograma:
+    """
+    Gera cronogramas sintéticos no layout do relatório do MS Project.
+
+    A estrutura segue a dos cronogramas reais: um bloco ASC com os serviços de
+    área comum por módulo e, em cada módulo, blocos com INFRA (serviços no nível
+    6) e SUPRA (serviços por pavimento, P01 a P30, no nível 7). Os serviços de
+    cada pavimento e os do INFRA são encadeados por predecessoras com latências,
+    os blocos são escalonados para que o mesmo serviço passe de um bloco ao
+    outro, com algumas sobreposições e hiatos, e uma fração das tarefas recebe
+    uma violação de regra (ver `VIOLACOES`). Tarefas que começam ou terminam
+    antes de hoje têm início e término reais, exceto algumas, que ficam atrasadas.
+
+    O tamanho é ajustado pela quantidade de blocos (e, sem `pavimentos`, pela de
+    pavimentos), de 1 mil a 200 mil linhas ou mais. A mesma semente e o mesmo
+    `inicio` geram sempre o mesmo cronograma.
+
+    Args:
+        semente: Semente do gerador aleatório.
+        servicos: Serviços por grupo (ver `servicos_de_para`). Padrão: os da planilha De-Para.
+        blocos_por_modulo: Blocos em cada módulo.
+        taxa_violacoes: Fração das tarefas com alguma violação de regra.
+        inicio: Data de início da obra. Padrão: 180 dias antes de hoje.
+    """
+    def __init__(self, semente: int = 1, servicos: dict[str, list[str]] | None = None,
+                 blocos_por_modulo: int = 4, taxa_violacoes: float = 0.05, inicio: date | None = None):
+        self.semente = semente
+        self.servicos = servicos or servicos_de_para()
+        self.blocos_por_modulo = blocos_por_modulo
+        self.taxa_violacoes = taxa_violacoes
+        self.inicio = inicio or date.today() - timedelta(days=180)
+        self._decorridos = (date.today() - self.inicio).days
+
+    @staticmethod
+    def pavimentos_para(linhas: int) -> int:
+        """Pavimentos por bloco usados para `linhas`: 4 nos cronogramas pequenos, até 30."""
+        return min(30, max(4, linhas // 6000 + 4))
+
+    def linhas_por_bloco(self, pavimentos: int) -> int:
+        return 5 + len(self.servicos["infra"]) + len(self.servicos["pavimento"]) * (pavimentos + 1)
+
+    def gerar(self, linhas: int = 1000, pavimentos: int | None = None) -> list[dict]:
+        """
+        Gera um cronograma com aproximadamente `linhas` tarefas (o último bloco
+        é sempre completo).
+
+        Args:
+            linhas: Quantidade aproximada de tarefas.
+            pavimentos: Pavimentos por bloco (1 a 30). Padrão: `pavimentos_para(linhas)`.
+
+        Returns:
+            As tarefas, com as colunas do relatório (ver `para_csv`).
+        """
+        pavimentos = pavimentos or self.pavimentos_para(linhas)
+        if not 1 <= pavimentos <= 30:
+            raise ValueError("O cronograma deve ter de 1 a 30 pavimentos por bloco.")
+        self._aleatorio = random.Random(self.semente)
+        self._tarefas: list[dict] = []
+
+        servicos_asc = self.servicos["asc"][:max(4, min(len(self.servicos["asc"]), linhas // 500))]
+        blocos = max(1, math.ceil((linhas - 2 * len(servicos_asc)) / self.linhas_por_bloco(pavimentos)))
+        modulos = math.ceil(blocos / self.blocos_por_modulo)
+
+        self._adicionar(1, "1", "OBRA BENCHMARK", resumo=True)
+        self._gerar_asc(servicos_asc, modulos)
+        bloco = 0
+        for modulo in range(1, modulos + 1):
+            self._adicionar(2, f"1.{modulo + 1}", f"MÓDULO {modulo:02d}", resumo=True)
+            for posicao in range(1, min(self.blocos_por_modulo, blocos - bloco) + 1):
+                bloco += 1
+                self._gerar_bloco(f"1.{modulo + 1}.{posicao}", modulo, bloco, pavimentos)
+
+        final = modulos + 2
+        self._adicionar(2, f"1.{final}", "Pré Projeto - PP", resumo=True, agrupamento="Pré Projeto")
+        self._adicionar(3, f"1.{final}.1", "Projeto Legal", duracao=5, agrupamento="Pré Projeto")
+        self._adicionar(3, f"1.{final}.2", "ITBI pagamento", duracao=1, agrupamento="Pré Projeto", Peso=0)
+        self._adicionar(2, f"1.{final + 1}", "HABITE-SE", duracao=1, agrupamento="Habite-se")
+        self._adicionar(2, f"1.{final + 2}", "MÃO DE OBRA RATEIO", duracao=1, agrupamento="Mão de obra rateio", Ativo="Não")
+        self._adicionar(2, f"1.{final + 3}", "Loja modelo", duracao=1)
+
+        self._aplicar_violacoes()
+        tarefas, self._tarefas = self._tarefas, []
+        return tarefas
+
+    def _gerar_asc(self, servicos: list[str], modulos: int):
+        self._adicionar(2, "1.1", "ASC", resumo=True)
+        self._adicionar(3, "1.1.1", "BLOCO ASC", resumo=True, agrupamento="Bloco ASC")
+        self._adicionar(4, "1.1.1.1", "DIAGRAMA ASC", resumo=True, agrupamento="Diagrama de rede")
+        self._adicionar(5, "1.1.1.1.1", "ASC GERAL", resumo=True, agrupamento="ASC")
+        anterior = None
+        pesos = self._pesos(modulos)
+        for indice, servico in enumerate(servicos, start=1):
+            numero = f"1.1.1.1.1.{indice}"
+            self._adicionar(6, numero, servico, resumo=True, agrupamento="Servico")
+            dia = self._aleatorio.randint(0, 200)
+            for modulo in range(1, modulos + 1):
+                duracao = self._aleatorio.randint(2, 30)
+                anterior = self._adicionar(
+                    7, f"{numero}.{modulo}", f"{servico} - Módulo {modulo}", duracao=duracao, dia=dia,
+                    predecessoras=self._vinculo(anterior), agrupamento="Pavimento", peso=pesos[modulo - 1],
+                    sap=f"ASC{indice:03d}", bloco="ASC", MÓDULO_ASC=str(modulo))
+                dia += duracao + self._aleatorio.choice([-3, 0, 0, 2, 10])
+
+    def _gerar_bloco(self, numero: str, modulo: int, bloco: int, pavimentos: int):
+        id_bloco = f"B{bloco:02d}"
+        sap = {"bloco": id_bloco, "pep": f"PEP.{modulo:02d}.{bloco:03d}", "diagrama": f"DR{modulo:02d}{bloco:03d}"}
+        self._adicionar(3, numero, f"BLOCO {bloco}", resumo=True, agrupamento="Bloco", **sap)
+        self._adicionar(4, f"{numero}.1", "ESTRUTURA", resumo=True, agrupamento="Diagrama de rede", **sap)
+
+        self._adicionar(5, f"{numero}.1.1", "INFRA", resumo=True, agrupamento="Bloco (Infra/Supra)", **sap)
+        # Cada bloco começa um ciclo de pavimentos depois do anterior.
+        dia = (bloco - 1) * pavimentos * 5 + self._aleatorio.randint(0, 5)
+        anterior = None
+        for indice, servico in enumerate(self.servicos["infra"], start=1):
+            duracao = self._aleatorio.randint(2, 10)
+            anterior = self._adicionar(
+                6, f"{numero}.1.1.{indice}", servico, duracao=duracao, dia=dia, predecessoras=self._vinculo(anterior),
+                agrupamento="Servico", peso=100, sap=f"{id_bloco}.INF{indice:02d}", **sap)
+            dia += duracao + self._aleatorio.choice([0, 0, 1, 8])
+
+        self._adicionar(5, f"{numero}.1.2", "SUPRA", resumo=True, agrupamento="Bloco (Infra/Supra)", **sap)
+        primeiros = {}
+        for indice, servico in enumerate(self.servicos["pavimento"], start=1):
+            numero_servico = f"{numero}.1.2.{indice}"
+            self._adicionar(6, numero_servico, servico, resumo=True, agrupamento="Servico", **sap)
+            # O primeiro pavimento de cada serviço começa depois do primeiro pavimento do serviço anterior.
+            anterior = primeiros.get(indice - 1, anterior)
+            data_servico = dia + indice * 3
+            pesos = self._pesos(pavimentos)
+            for pavimento in range(1, pavimentos + 1):
+                duracao = self._aleatorio.randint(3, 6)
+                anterior = self._adicionar(
+                    7, f"{numero_servico}.{pavimento}", f"P{pavimento:02d} - {servico}", duracao=duracao,
+                    dia=data_servico, predecessoras=self._vinculo(anterior), agrupamento="Pavimento",
+                    peso=pesos[pavimento - 1], sap=f"{id_bloco}.SUP{indice:02d}", **sap)
+                primeiros.setdefault(indice, anterior)
+                data_servico += duracao + self._aleatorio.choice([-2, 0, 0, 0, 1, 9])
+
+    def _adicionar(self, nivel: int, numero: str, nome: str, resumo: bool = False, duracao: int = 1, dia: int = 0,
+                   predecessoras: str = "", agrupamento: str = "", peso: float | None = None, sap: str = "",
+                   bloco: str = "", pep: str = "", diagrama: str = "", **colunas) -> int:
+        id_tarefa = len(self._tarefas) + 1
+        inicio = self.inicio + timedelta(days=dia)
+        termino = inicio + timedelta(days=max(duracao - 1, 0))
+        tarefa = {
+            "Id": id_tarefa,
+            "Ativo": "Sim",
+            "Nome": nome,
+            "Duração": f"{duracao} dias",
+            "Trabalho": f"{duracao * 8} hrs",
+            "Início": inicio.strftime("%d/%m/%Y"),
+            "Término": termino.strftime("%d/%m/%Y"),
+            "Início_real": "ND",
+            "Término_real": "ND",
+            "Predecessoras": predecessoras,
+            "Nível_da_estrutura_de_tópicos": nivel,
+            "Número_da_estrutura_de_tópicos": numero,
+            "Resumo": "Sim" if resumo else "Não",
+            "Tipo": "Trabalho fixo",
+            "Modo_da_Tarefa": "Agendada Automaticamente",
+            "Tipo_de_restrição": "O Mais Breve Possível",
+            "Nomes_dos_recursos": "" if resumo else self._aleatorio.choice(["Pedreiro", "Eletricista", "Encanador", "Pintor"]),
+            "Custo": 150.0 * duracao,
+            # Como os campos numéricos personalizados do MS Project: 0 quando não há peso, nunca vazio.
+            "Peso": 0 if resumo or peso is None else peso,
+            "SAP_Tarefa": sap,
+            "ID_Bloco": bloco,
+            "SAP_Elemento_PEP": pep,
+            "SAP_Diagrama_de_Rede": diagrama,
+            "Agrupamento": agrupamento,
+            "MÓDULO_ASC": "",
+        }
+        tarefa.update(colunas)
+        if not resumo and dia <= self._decorridos:
+            tarefa["Início_real"] = tarefa["Início"]
+            if dia + duracao <= self._decorridos and self._aleatorio.random() > 0.1:
+                tarefa["Término_real"] = tarefa["Término"]
+        self._tarefas.append(tarefa)
+        return id_tarefa
+
+    def _vinculo(self, anterior: int | None) -> str:
+        return f"{anterior}{self._aleatorio.choice(_LATENCIAS)}" if anterior else ""
+
+    @staticmethod
+    def _pesos(quantidade: int) -> list[float]:
+        # Pesos inteiros que somam 100, como nos cronogramas reais.
+        base, resto = divmod(100, quantidade)
+        return [base + (1 if indice < resto else 0) for indice in range(quantidade)]
+
+    def _aplicar_violacoes(self):
+        quantidade = max(1, int(len(self._tarefas) * self.taxa_violacoes))
+        colunas = list(VIOLACOES)
+        for tarefa in self._aleatorio.sample(self._tarefas, min(quantidade, len(self._tarefas))):
+            coluna = self._aleatorio.choice(colunas)
+            tarefa[coluna] = VIOLACOES[coluna]
+
+
+def para_csv(tarefas: list[dict], codificacao: str = "utf-8") -> bytes:
+    """Monta o relatório CSV (separado por ";") com as tarefas, como exportado do MS Project."""
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUNAS, delimiter=";", lineterminator="\n")
+    escritor.writeheader()
+    escritor.writerows(tarefas)
+    return buffer.getvalue().encode(codificacao)
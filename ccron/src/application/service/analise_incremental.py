@@ -0,0 +1,98 @@
+from ccron.src.application.transform.cache_transformacao import CacheTransformacao
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+
+@dataclass
+class SnapshotAnalise:
+    """
+    Estado guardado da última análise de um projeto, usado para reaproveitar
+    trabalho quando uma nova versão do cronograma é enviada.
+
+    Attributes:
+        hashes_por_id: Assinatura de cada linha bruta, indexada pelo `Id`.
+        transformacao: Cache dos Passos 1 e 3 da transformação.
+        data_referencia: Data usada nas regras que comparam com "hoje".
+        veredictos_linha: Para cada assinatura de linha transformada, as chaves
+                          de `dic_error` das regras por linha que ela viola.
+        resultados_servico: Para cada serviço, a assinatura do grupo de tarefas
+                            críticas e as sobreposições e gaps encontrados.
+        assinatura_estrutura: Assinatura ordenada de todas as linhas transformadas,
+                              que decide o reaproveitamento do macrofluxo.
+        resultados_peso: Para cada grupo do peso SAP (tópico pai, SAP_Tarefa,
+                         ID_Bloco), a assinatura das linhas e o grupo inválido
+                         encontrado (ou None).
+        resultados_subarvore: Para cada subárvore de módulo, a assinatura das
+                              linhas (com o contexto global das regras) e os Ids
+                              apontados em agrupamentos e em Módulo ASC.
+        pendencias_preenchimento: Para cada assinatura de linha transformada, os
+                                  tipos de preenchimento pendentes.
+        macrofluxo: Resultado do macrofluxo da análise anterior.
+    """
+    hashes_por_id: dict[Any, bytes] = field(default_factory=dict)
+    transformacao: CacheTransformacao = field(default_factory=CacheTransformacao)
+    data_referencia: date | None = None
+    veredictos_linha: dict[bytes, tuple[str, ...]] = field(default_factory=dict)
+    resultados_servico: dict[str, tuple[bytes, list, list]] = field(default_factory=dict)
+    assinatura_estrutura: bytes | None = None
+    resultados_peso: dict[tuple, tuple[bytes, dict | None]] = field(default_factory=dict)
+    resultados_subarvore: dict[tuple | None, tuple[bytes, tuple[list, list]]] = field(default_factory=dict)
+    pendencias_preenchimento: dict[bytes, tuple[str, ...]] = field(default_factory=dict)
+    macrofluxo: list | None = None
+
+
+class CacheAnalises:
+    """
+    Armazena em memória a última análise de cada projeto, com política LRU.
+
+    O número de projetos mantidos é limitado pela variável de ambiente
+    `CCRON_MAX_PROJETOS_CACHE` (padrão: 32).
+    """
+    def __init__(self, max_projetos: int | None = None):
+        self.max_projetos = max_projetos or int(os.getenv("CCRON_MAX_PROJETOS_CACHE", "32"))
+        self._snapshots: OrderedDict[str, SnapshotAnalise] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, project_id: str) -> SnapshotAnalise | None:
+        with self._lock:
+            snapshot = self._snapshots.get(project_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(project_id)
+            return snapshot
+
+    def guardar(self, project_id: str, snapshot: SnapshotAnalise):
+        with self._lock:
+            self._snapshots[project_id] = snapshot
+            self._snapshots.move_to_end(project_id)
+            while len(self._snapshots) > self.max_projetos:
+                self._snapshots.popitem(last=False)
+
+
+def comparar_versoes(hashes_anteriores: dict[Any, bytes], hashes_atuais: dict[Any, bytes]) -> dict[str, int]:
+    """
+    Compara duas versões de um cronograma pelo `Id` e pela assinatura de cada linha.
+
+    Returns:
+        A contagem de linhas novas, removidas, alteradas e inalteradas.
+    """
+    novas = alteradas = inalteradas = 0
+    for id_tarefa, assinatura in hashes_atuais.items():
+        anterior = hashes_anteriores.get(id_tarefa)
+        if anterior is None:
+            novas += 1
+        elif anterior != assinatura:
+            alteradas += 1
+        else:
+            inalteradas += 1
+    removidas = sum(1 for id_tarefa in hashes_anteriores if id_tarefa not in hashes_atuais)
+    return {
+        "linhas_novas": novas,
+        "linhas_removidas": removidas,
+        "linhas_alteradas": alteradas,
+        "linhas_inalteradas": inalteradas,
+    }
@@ -1,92 +1,611 @@
 from ccron.src.domain.ports.analise_service_interface import AnaliseServiceInterface
 from ccron.src.domain.ports.regras_validacao_interface import RegrasValidacaoInterface
-from ccron.src.domain.service.regras_validacao import RegrasValidacao
+from ccron.src.domain.ports.motor_regras_interface import MotorRegrasInterface
 from ccron.src.domain.ports.transform_data_interface import TransformDataInterface
 from ccron.src.application.transform.transform_data import TransformData
 from ccron.src.domain.ports.conferidor_interface import ConferidorInterface
 from ccron.src.domain.service.conferidor import Conferidor
+from ccron.src.domain.service.assinatura_linha import assinatura_linha
+from ccron.src.domain.service.visoes_analise import VisoesAnalise, eh_ativa
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+from ccron.src.application.service.analise_incremental import CacheAnalises, SnapshotAnalise, comparar_versoes
+from ccron.src.application.service.backend_regras import criar_backend_regras
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise, REGRAS_ESTRUTURA
+from ccron.src.application.service.perfilador import Perfilador, PerfiladorNulo
+from ccron.src.application.service.execucao_analise import ExecucaoAnalise
+from ccron.src.application.transform.cache_transformacao import CacheTransformacao
+from ccron.src.domain.service.motor_regras import REGRAS_LINHA, converter_data
+from ccron.src.domain.service.grafo_predecessoras import GrafoPredecessoras
+from ccron.src.domain.service.diff_cronogramas import VersaoCronograma, comparar_cronogramas
+from ccron.src.domain.service.calendario_trabalho import CALENDARIO_CORRIDO
+from ccron.src.domain.service.regras_validacao import (
+    TIPOS_PREENCHIMENTO, cortar_estrutura, pendencias_preenchimento, posicao_modulo_02, posicao_pre_projeto,
+)
 
+import hashlib
+from dataclasses import replace
 from datetime import datetime
 
 class AnaliseService(AnaliseServiceInterface):
     def __init__(self):
-        self.regras: RegrasValidacaoInterface = RegrasValidacao()
+        # Backend das regras ("python", "numpy" ou "conferir"), via CCRON_BACKEND_REGRAS.
+        self.regras: RegrasValidacaoInterface
+        self.motor_regras: MotorRegrasInterface
+        self.regras, self.motor_regras = criar_backend_regras()
         self.transform_data: TransformDataInterface = TransformData()
         self.conferidor: ConferidorInterface = Conferidor()
-        
+        self.cache_analises = CacheAnalises()
+        self._versao_referencia: str | None = None
+
+    def versao_referencia(self) -> str:
+        """
+        Versão das bases de referência carregadas (De-Para e EAP): um hash do
+        conteúdo lido das planilhas, que muda quando elas são atualizadas.
+        """
+        if self._versao_referencia is None:
+            conteudo = repr((self.transform_data.dePara4D, self.conferidor.dados_eap))
+            self._versao_referencia = hashlib.blake2b(conteudo.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+        return self._versao_referencia
+
     def filtrar_dados_ativos(self, dados: list[dict]) -> list[dict]:
-        return [tarefa for tarefa in dados if tarefa.get('Ativo', '').strip().lower() == 'sim']
-
-    def analisar_cronograma(self, dados: list[dict]) -> dict:
-        self.dados_tratados = self.transform_data.transformar_dados(dados)
-        self.dados_ativos = self.filtrar_dados_ativos(self.dados_tratados)
-
-
-        self.lista_overlap, self.lista_gap = (
-            self.conferidor.get_servicos_simultaneos(self.dados_ativos)
-        )
-        
-        self.dados_peso_SAP = self.regras.validar_peso(self.dados_tratados)
-        self.verificar_condicoes = self.regras.verificar_condicoes(self.dados_tratados)
-        self.verificar_modulo = self.regras.verificar_modulo(self.dados_tratados)
-        self.verificar_preenchimento = self.regras.verificar_preenchimento(self.dados_tratados)
-        self.dados_regras_validacao = self.relatorio_project(self.dados_tratados)
-        
-        self.overlap, self.tabela_overlap, self.tabela_gap, self.gap = self.conferidor.format_tabela_list_dict(
-            self.lista_overlap, self.lista_gap, self.dados_tratados)
-
-        self.macrofluxo = self.conferidor.get_macrofluxo(self.dados_tratados)
-        self.lista_coluna = self.lista_colunas()
-     
+        return [tarefa for tarefa in dados if eh_ativa(tarefa)]
+
+    def analisar_cronograma(self, dados: list[dict], project_id: str | None = None,
+                            opcoes: OpcoesAnalise | None = None, perfilador: Perfilador | None = None) -> dict:
+        """
+        Executa a análise completa de um cronograma.
+
+        Quando `project_id` é informado, a análise anterior do mesmo projeto é
+        reaproveitada: as linhas são comparadas pelo `Id` e pela assinatura do
+        conteúdo, e só as partes afetadas pela mudança são recalculadas. Isso vale
+        para a seleção completa (ver `OpcoesAnalise.calcula_tudo`): uma seleção
+        menor é calculada do zero, sem ler nem substituir a análise guardada.
+
+        Com `opcoes`, apenas as regras e seções selecionadas são calculadas; etapas
+        como o macrofluxo e as tabelas de sobreposição/gap são puladas quando sua
+        seção não é pedida.
+
+        O estado da análise fica em uma `ExecucaoAnalise` própria, de modo que o
+        serviço pode atender várias análises ao mesmo tempo.
+
+        Args:
+            dados: As linhas brutas do cronograma.
+            project_id: Identificador opcional do projeto para a análise incremental.
+            opcoes: Seleção de regras e seções. Por padrão, calcula tudo.
+            perfilador: Quando informado, mede cada etapa e regra e inclui o
+                        relatório na chave "perfil" do resultado.
+
+        Returns:
+            Um dicionário com os resultados da análise, uma chave por seção.
+
+        Raises:
+            PerfilEmAndamentoError: Se `perfilador` for informado com outro perfil
+                                    já em andamento no processo.
+        """
+        return self._executar_analise(dados, project_id, opcoes, perfilador)[0]
+
+    def _executar_analise(self, dados: list[dict], project_id: str | None, opcoes: OpcoesAnalise | None,
+                          perfilador: Perfilador | None) -> tuple[dict, ExecucaoAnalise]:
+        opcoes = opcoes or OpcoesAnalise()
+        execucao = ExecucaoAnalise(opcoes, datetime.today(), perfilador or PerfiladorNulo())
+        perfilador = execucao.perfilador
+        try:
+            if perfilador.ativo:
+                perfilador.iniciar()
+            resultado = self._analisar(execucao, dados, project_id)
+            if perfilador.ativo:
+                resultado["perfil"] = perfilador.finalizar()
+        finally:
+            # Uma análise que falha não pode deixar o cProfile/tracemalloc ligados.
+            perfilador.parar()
+        return resultado, execucao
+
+    def _analisar(self, execucao: ExecucaoAnalise, dados: list[dict], project_id: str | None) -> dict:
+        opcoes = execucao.opcoes
+        perfilador = execucao.perfilador
+        # O modo incremental recalcula tudo o que guarda no snapshot; com uma seleção
+        # menor, a análise é feita do zero e o snapshot do projeto fica como está.
+        incremental = bool(project_id) and opcoes.calcula_tudo
+        anterior = self.cache_analises.obter(project_id) if incremental else None
+        snapshot = None
+        if incremental:
+            snapshot = SnapshotAnalise(transformacao=CacheTransformacao(anterior.transformacao if anterior else None))
+
+        with perfilador.etapa("transformacao", linhas=len(dados)):
+            # As tarefas seguem pelo pipeline em formato colunar; os dicionários da
+            # transformação são descartados aqui e só voltam na resposta.
+            dados_tratados = TabelaTarefas.de_dicts(self.transform_data.transformar_dados(
+                dados, cache=snapshot.transformacao if snapshot else None))
+        # Projeções compartilhadas pelas etapas (ativas, críticas, índices por Id...).
+        with perfilador.etapa("filtrar_dados_ativos", linhas=len(dados_tratados)):
+            execucao.carregar_tarefas(dados_tratados)
+
+        resultados_linha = None
+        if snapshot is None:
+            if opcoes.precisa_servicos:
+                with perfilador.etapa("servicos_simultaneos", linhas=len(execucao.dados_ativos)):
+                    execucao.lista_overlap, execucao.lista_gap = (
+                        self.conferidor.get_servicos_simultaneos(
+                            execucao.dados_ativos, opcoes.gap_threshold, opcoes.calendario, opcoes.limites_servico,
+                            visoes=execucao.visoes)
+                    )
+            if opcoes.inclui_secao("dados_regras_validacao"):
+                with perfilador.etapa("regras_estrutura", linhas=len(dados_tratados)):
+                    self._executar_regras_estrutura(execucao)
+        else:
+            # No modo incremental tudo o que fica guardado no snapshot é recalculado
+            # (apenas onde mudou), para que a próxima análise possa reaproveitá-lo.
+            with perfilador.etapa("assinaturas", linhas=len(dados_tratados)):
+                assinaturas = {id(item): assinatura_linha(item) for item in dados_tratados}
+                execucao.reaproveitamento = self._preparar_reaproveitamento(dados, anterior, snapshot)
+            with perfilador.etapa("servicos_simultaneos", linhas=len(execucao.dados_ativos)):
+                execucao.lista_overlap, execucao.lista_gap = self._servicos_simultaneos_incremental(
+                    execucao, assinaturas, anterior, snapshot)
+            with perfilador.etapa("regras_estrutura", linhas=len(dados_tratados)):
+                self._regras_estrutura_incremental(execucao, assinaturas, anterior, snapshot)
+            with perfilador.etapa("regras_linha", linhas=len(dados_tratados)):
+                resultados_linha = self._regras_linha_incremental(execucao, assinaturas, anterior, snapshot)
+
+        resultado = {}
+        if opcoes.inclui_secao("dados_regras_validacao"):
+            with perfilador.etapa("relatorio_regras", linhas=len(dados_tratados)):
+                resultado["dados_regras_validacao"] = self.relatorio_project(execucao, resultados_linha)
+
+        # O macrofluxo resolve as predecessoras pelo índice das linhas no cronograma
+        # inteiro, então só é reaproveitado quando nenhuma linha mudou.
+        macrofluxo_valido = (snapshot is not None and anterior is not None and anterior.macrofluxo is not None
+                             and anterior.assinatura_estrutura == snapshot.assinatura_estrutura)
+        if opcoes.inclui_secao("macrofluxo"):
+            if macrofluxo_valido:
+                execucao.macrofluxo = anterior.macrofluxo
+                execucao.reaproveitamento["macrofluxo_reaproveitado"] = True
+            else:
+                with perfilador.etapa("macrofluxo", linhas=len(dados_tratados)):
+                    execucao.macrofluxo = self.conferidor.get_macrofluxo(dados_tratados)
+                if snapshot is not None:
+                    execucao.reaproveitamento["macrofluxo_reaproveitado"] = False
+            resultado["macrofluxo"] = execucao.macrofluxo
+        elif macrofluxo_valido:
+            # Mantém o macrofluxo da análise anterior, que continua válido.
+            execucao.macrofluxo = anterior.macrofluxo
+
+        if opcoes.inclui_secao("dados_ativos"):
+            resultado["dados_ativos"] = TabelaTarefas.para_dicts(execucao.dados_ativos)
+        if opcoes.inclui_secao("lista_overlap"):
+            resultado["lista_overlap"] = execucao.lista_overlap
+        if opcoes.inclui_secao("lista_gap"):
+            resultado["lista_gap"] = execucao.lista_gap
+
+        if opcoes.inclui_secao("tabela_overlap") or opcoes.inclui_secao("tabela_gap"):
+            with perfilador.etapa("tabelas_overlap_gap", linhas=len(execucao.lista_overlap) + len(execucao.lista_gap)):
+                _, tabela_overlap, tabela_gap, _ = self.conferidor.format_tabela_list_dict(
+                    execucao.lista_overlap, execucao.lista_gap, dados_tratados, visoes=execucao.visoes)
+            if opcoes.inclui_secao("tabela_overlap"):
+                resultado["tabela_overlap"] = tabela_overlap
+            if opcoes.inclui_secao("tabela_gap"):
+                resultado["tabela_gap"] = tabela_gap
+
+        if opcoes.inclui_secao("lista_colunas"):
+            resultado["lista_colunas"] = self.lista_colunas()
+
+        if opcoes.inclui_secao("rede"):
+            with perfilador.etapa("rede", linhas=len(execucao.dados_ativos)):
+                resultado["rede"] = GrafoPredecessoras(execucao.dados_ativos).analisar()
+
+        if snapshot is not None:
+            snapshot.macrofluxo = execucao.macrofluxo
+            self.cache_analises.guardar(project_id, snapshot)
+            resultado["reaproveitamento"] = execucao.reaproveitamento
+
+        return resultado
+
+    def simular_atrasos(self, dados: list[dict], atrasos: dict, opcoes: OpcoesAnalise | None = None) -> dict:
+        """
+        Simula o atraso de tarefas e propaga as novas datas pelos vínculos.
+
+        Apenas as tarefas a jusante das atrasadas são reprogramadas (ver
+        `GrafoPredecessoras.propagar_atrasos`). As sobreposições e os hiatos são
+        recalculados só nos serviços que tiveram tarefas movidas e comparados com
+        os atuais.
+
+        Args:
+            dados: As linhas brutas do cronograma.
+            atrasos: {Id da tarefa: dias de atraso}. Com `opcoes.calendario`, os
+                     dias (e as latências) são contados em dias úteis.
+            opcoes: Calendário e limites de hiato, como em `analisar_cronograma`.
+
+        Returns:
+            Um dicionário com as tarefas movidas e suas novas datas, os serviços e
+            pavimentos afetados, e as sobreposições e hiatos novos ou resolvidos.
+
+        Raises:
+            ValueError: Se um Id não existir entre as tarefas ativas ou o atraso
+                        não for um número inteiro de dias não negativo.
+        """
+        opcoes = opcoes or OpcoesAnalise()
+        calendario = opcoes.calendario or CALENDARIO_CORRIDO
+        visoes = VisoesAnalise(TabelaTarefas.de_dicts(self.transform_data.transformar_dados(dados)))
+        dados_ativos = visoes.ativas
+        grafo = GrafoPredecessoras(dados_ativos)
+
+        atrasos_por_posicao = {}
+        for id_tarefa, dias in atrasos.items():
+            posicao = grafo.posicao(id_tarefa)
+            if posicao is None:
+                raise ValueError(f"Tarefa ativa não encontrada: {id_tarefa}")
+            if not isinstance(dias, int) or isinstance(dias, bool) or dias < 0:
+                raise ValueError(f"Atraso inválido para a tarefa {id_tarefa}: {dias!r}. Informe dias inteiros >= 0.")
+            atrasos_por_posicao[posicao] = dias
+
+        ordinais = []
+        for tarefa in dados_ativos:
+            try:
+                ordinais.append((converter_data(tarefa.get("Início")).toordinal(),
+                                 converter_data(tarefa.get("Término")).toordinal()))
+            except (ValueError, TypeError):
+                ordinais.append(None)
+        com_data = [posicao for posicao, datas in enumerate(ordinais) if datas is not None]
+        inicios, terminos = [None] * len(ordinais), [None] * len(ordinais)
+        if com_data:
+            dias_inicio = calendario.para_dias_uteis([ordinais[posicao][0] for posicao in com_data])
+            dias_termino = calendario.para_dias_uteis([ordinais[posicao][1] for posicao in com_data])
+            for posicao, inicio, termino in zip(com_data, dias_inicio.tolist(), dias_termino.tolist()):
+                inicios[posicao], terminos[posicao] = inicio, termino
+
+        movidas, nao_propagadas = grafo.propagar_atrasos(atrasos_por_posicao, inicios, terminos)
+
+        posicoes_movidas = sorted(movidas)
+        novos_inicios = calendario.de_dias_uteis([movidas[posicao][0] for posicao in posicoes_movidas]).tolist()
+        novos_terminos = calendario.de_dias_uteis([movidas[posicao][1] for posicao in posicoes_movidas]).tolist()
+        simuladas = {}
+        tarefas_movidas = []
+        for posicao, novo_inicio, novo_termino in zip(posicoes_movidas, novos_inicios, novos_terminos):
+            tarefa = dados_ativos[posicao]
+            simulada = dict(tarefa, **{"Início": novo_inicio.strftime("%d/%m/%Y"), "Término": novo_termino.strftime("%d/%m/%Y")})
+            simuladas[id(tarefa)] = simulada
+            tarefas_movidas.append({
+                "Id": tarefa.get("Id"),
+                "Nome": tarefa.get("Nome"),
+                "Servicos": tarefa.get("Servicos"),
+                "ID_Pavimento": tarefa.get("ID_Pavimento"),
+                "Cod_Bloco": tarefa.get("Cod_Bloco"),
+                "Início": tarefa.get("Início"),
+                "Término": tarefa.get("Término"),
+                "Novo_Início": simulada["Início"],
+                "Novo_Término": simulada["Término"],
+                "Deslocamento": movidas[posicao][0] - inicios[posicao],
+            })
+
+        servicos_afetados = {simulada.get("Servicos") for simulada in simuladas.values() if simulada.get("Servicos")}
+        grupos = visoes.servicos_criticos
+        comparacao = {"novas_sobreposicoes": [], "sobreposicoes_resolvidas": [], "novos_gaps": [], "gaps_resolvidos": []}
+        for servico in sorted(servicos_afetados):
+            tarefas = grupos.get(servico)
+            if not tarefas:
+                continue
+            limite = opcoes.limites_servico.get(servico, opcoes.gap_threshold)
+            antes = self.conferidor.analisar_servico(tarefas, limite, opcoes.calendario)
+            depois = self.conferidor.analisar_servico(
+                [simuladas.get(id(tarefa), tarefa) for tarefa in tarefas], limite, opcoes.calendario)
+            overlap_antes, overlap_depois = ({tuple(par[:2]) for par in lista or ()} for lista in (antes[0], depois[0]))
+            gap_antes, gap_depois = ({tuple(gap[:3]) for gap in lista or ()} for lista in (antes[1], depois[1]))
+            comparacao["novas_sobreposicoes"] += [[servico, *par] for par in sorted(overlap_depois - overlap_antes)]
+            comparacao["sobreposicoes_resolvidas"] += [[servico, *par] for par in sorted(overlap_antes - overlap_depois)]
+            comparacao["novos_gaps"] += [[servico, *gap] for gap in sorted(gap_depois - gap_antes)]
+            comparacao["gaps_resolvidos"] += [[servico, *gap] for gap in sorted(gap_antes - gap_depois)]
+
         return {
-            "dados_regras_validacao": self.dados_regras_validacao,
-            "macrofluxo": self.macrofluxo,
-            "dados_ativos": self.dados_ativos,
-            "lista_overlap": self.lista_overlap,
-            "lista_gap": self.lista_gap,
-            "tabela_overlap": self.tabela_overlap,
-            "tabela_gap": self.tabela_gap,
-            "lista_colunas": self.lista_coluna
+            "tarefas_movidas": tarefas_movidas,
+            "servicos_afetados": sorted(servicos_afetados),
+            "pavimentos_afetados": sorted({str(t["ID_Pavimento"]) for t in tarefas_movidas if t["ID_Pavimento"]}),
+            **comparacao,
+            "nao_propagadas": [dados_ativos[posicao].get("Id") for posicao in nao_propagadas],
         }
-        
-    def relatorio_project(self, dados: list[dict]) -> list[dict]:
-        hoje = datetime.today()
-        
-        dic_error = {}
-        dic_error["ID tarefas sem predecessoras"] = self.regras.verificar_predecessoras(dados) #1
-        dic_error["ID tarefas inativas com predecessoras"] = self.regras.verificar_id_inativo_com_predecessoras(dados)#2
-        dic_error["ID tarefas atrasadas"] = self.regras.verificar_tarefas_atrasadas(dados, hoje)#3
-        dic_error["ID tarefas com início real no futuro"] = self.regras.verificar_inicio_real_futuro(dados, hoje)#4
-        dic_error["ID tarefas com término real no futuro"] = self.regras.verificar_termino_real_futuro(dados, hoje)#5
-        dic_error["ID tarefas com tipo de duração inválido"] = self.regras.verificar_tipo_de_tarefas(dados)#6
-        dic_error["ID tarefas com agendamento manual"] = self.regras.verificar_tarefas_com_agendamento_manual(dados)#7
-        dic_error["ID tarefas com restrição"] = self.regras.tarefas_com_restricao(dados)#8
-        dic_error["ID tarefas sem Recurso"] = self.regras.verificar_tarefas_com_duracao_e_sem_recurso(dados)#9
-        dic_error["ID tarefas com trabalho incorreto"] = self.regras.verificar_duracao_por_dia(dados)#10    
-        dic_error["ID tarefas inativas/resumo com recurso"] = self.regras.nao_deve_ter_recurso(dados)#11
-        dic_error["ID tarefas ativas com custo zero"] = self.regras.tarefas_ativas_com_custo_zero(dados)#12
-        dic_error["ID tarefas com duração zero"] = self.regras.tarefas_com_duracao_zero(dados)#13
-        dic_error["ID tarefas com nome em branco"] = self.regras.tarefas_com_nome_em_branco(dados)#14
-        dic_error["ID tarefas com usuario generico"] = self.regras.tarefas_com_recurso_usuario_generico(dados)#15
-        dic_error["ID tarefas com duração maior que 21 dias"] = self.regras.tarefas_com_duracao_maior_que_21_dias(dados)#16
-        dic_error["MO RATEIO, ANDAM JUNTO OU HABITE-SE estão ativas?"] = self.regras.verificar_tarefas_amp(dados)#17
-        dic_error["ID com Peso 0"] = self.regras.obter_ids_com_peso_zero(dados)#20
-
-        dic_error["Tarefas SAP com somatório de Peso diferente de 0"] = [item.get('SAP_Tarefa') for item in self.dados_peso_SAP]
-        dic_error["ID tarefas com Agrupamentos Inconsistentes"] = self.verificar_condicoes
-        dic_error["ID tarefas com Preenchimento Módulo ASC Inconsistentes"] = self.verificar_modulo
-        
-        for tipo in self.verificar_preenchimento:
-            dic_error[f"ID tarefas com Ponto de Atenção no Preenchimento {tipo[0]}"] = tipo[1]
-            
-        dic_error["ID tarefas com Hiato"] = self.lista_gap
-        dic_error["ID tarefas com Frente Simultânea"] = self.lista_overlap
-        
+
+    def versao_cronograma(self, dados: list[dict], opcoes: OpcoesAnalise | None = None) -> VersaoCronograma:
+        """
+        Prepara uma versão do cronograma para `comparar_cronogramas`: todas as
+        tarefas transformadas e o relatório de regras.
+
+        Args:
+            dados: As linhas brutas do cronograma.
+            opcoes: Regras e configuração de hiatos, como em `analisar_cronograma`.
+                    As seções pedidas são ignoradas.
+        """
+        opcoes = replace(opcoes or OpcoesAnalise(), secoes=frozenset({"dados_regras_validacao"}),
+                         somente_contagens=False)
+        resultado, execucao = self._executar_analise(dados, None, opcoes, None)
+        return VersaoCronograma(TabelaTarefas.para_dicts(execucao.dados_tratados), resultado["dados_regras_validacao"])
+
+    def comparar_cronogramas(self, anterior: VersaoCronograma, atual: VersaoCronograma) -> dict:
+        """Compara duas versões do cronograma (ver `diff_cronogramas.comparar_cronogramas`)."""
+        return comparar_cronogramas(anterior, atual)
+
+    def _executar_regras_estrutura(self, execucao: ExecucaoAnalise, opcoes: OpcoesAnalise | None = None):
+        opcoes = opcoes or execucao.opcoes
+        perfilador = execucao.perfilador
+        tarefas = execucao.dados_tratados
+        linhas = len(tarefas)
+        if opcoes.inclui_regra("peso_sap"):
+            with perfilador.regra("peso_sap", linhas):
+                execucao.dados_peso_SAP = self.regras.validar_peso(tarefas)
+        if opcoes.inclui_regra("agrupamentos") or opcoes.inclui_regra("modulo_asc"):
+            # A árvore de tópicos é montada uma única vez e compartilhada pelas regras hierárquicas.
+            with perfilador.etapa("arvore_estrutura", linhas):
+                arvore = execucao.visoes.arvore
+            if opcoes.inclui_regra("agrupamentos"):
+                with perfilador.regra("agrupamentos", linhas):
+                    execucao.verificar_condicoes = self.regras.verificar_condicoes(tarefas, arvore, execucao.visoes)
+            if opcoes.inclui_regra("modulo_asc"):
+                with perfilador.regra("modulo_asc", linhas):
+                    execucao.verificar_modulo = self.regras.verificar_modulo(tarefas, arvore)
+        if opcoes.inclui_regra("preenchimento"):
+            with perfilador.regra("preenchimento", linhas):
+                if opcoes.somente_contagens:
+                    execucao.verificar_preenchimento = self.regras.contar_preenchimento(tarefas)
+                else:
+                    execucao.verificar_preenchimento = self.regras.verificar_preenchimento(tarefas)
+
+    def _preparar_reaproveitamento(self, dados: list[dict], anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> dict:
+        snapshot.hashes_por_id = {item.get("Id"): assinatura_linha(item) for item in dados}
+        reaproveitamento = {"analise_anterior": anterior is not None}
+        reaproveitamento.update(comparar_versoes(anterior.hashes_por_id if anterior else {}, snapshot.hashes_por_id))
+        reaproveitamento["transformacao"] = snapshot.transformacao.estatisticas
+        return reaproveitamento
+
+    @staticmethod
+    def _assinatura_grupo(assinaturas: dict, itens, prefixo: bytes = b"") -> bytes:
+        digest = hashlib.blake2b(prefixo, digest_size=16)
+        for item in itens:
+            digest.update(assinaturas[id(item)])
+        return digest.digest()
+
+    def _servicos_simultaneos_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                                          anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> tuple[list, list]:
+        """
+        Recalcula sobreposições e gaps apenas para os serviços cujo grupo de tarefas
+        críticas mudou desde a análise anterior.
+        """
+        opcoes = execucao.opcoes
+        grupos = execucao.visoes.servicos_criticos
+
+        resultados_anteriores = anterior.resultados_servico if anterior else {}
+        lista_overlap, lista_long_gaps = [], []
+        reaproveitados = recalculados = 0
+
+        for servico, tarefas in grupos.items():
+            gap_threshold = opcoes.limites_servico.get(servico, opcoes.gap_threshold)
+            configuracao = repr((gap_threshold, opcoes.calendario.chave if opcoes.calendario else None)).encode()
+            assinatura_grupo = self._assinatura_grupo(assinaturas, tarefas, configuracao)
+
+            cache = resultados_anteriores.get(servico)
+            if cache is not None and cache[0] == assinatura_grupo:
+                overlap, long_gaps = cache[1], cache[2]
+                reaproveitados += 1
+            else:
+                overlap, long_gaps = self.conferidor.analisar_servico(tarefas, gap_threshold, opcoes.calendario)
+                overlap = [[item[0], item[1]] for item in (overlap or [])]
+                long_gaps = long_gaps or []
+                recalculados += 1
+
+            snapshot.resultados_servico[servico] = (assinatura_grupo, overlap, long_gaps)
+            lista_overlap.extend(overlap)
+            lista_long_gaps.extend(long_gaps)
+
+        execucao.reaproveitamento["servicos"] = {"reaproveitados": reaproveitados, "recalculados": recalculados}
+        return lista_overlap, lista_long_gaps
+
+    def _regras_estrutura_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                                      anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise):
+        """
+        Reaproveita as regras que dependem de várias linhas, cada uma pela sua
+        unidade de dependência:
+
+        - peso SAP: por grupo (tópico pai, SAP_Tarefa, ID_Bloco);
+        - agrupamentos e Módulo ASC: por subárvore de módulo (os dois primeiros
+          níveis da estrutura de tópicos), enquanto o contexto global que essas
+          regras usam (o tópico do Pré-Projeto e a existência de um "MÓDULO 02"
+          ativo) não mudar;
+        - preenchimento: por linha.
+
+        Só as unidades cujas linhas mudaram são reavaliadas.
+        """
+        tarefas = execucao.dados_tratados
+        snapshot.assinatura_estrutura = self._assinatura_grupo(assinaturas, tarefas)
+        execucao.reaproveitamento["estrutura"] = {
+            "grupos_peso": self._peso_incremental(execucao, assinaturas, anterior, snapshot),
+            "subarvores": self._subarvores_incremental(execucao, assinaturas, anterior, snapshot),
+            "linhas_preenchimento": self._preenchimento_incremental(execucao, assinaturas, anterior, snapshot),
+        }
+
+    def _peso_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                          anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> dict:
+        grupos: dict[tuple, list] = {}
+        for item in execucao.dados_tratados:
+            chave = (cortar_estrutura(item.get("Número_da_estrutura_de_tópicos")), item.get('SAP_Tarefa'), item.get('ID_Bloco'))
+            if all(chave):
+                grupos.setdefault(chave, []).append(item)
+
+        anteriores = anterior.resultados_peso if anterior else {}
+        assinaturas_grupo = {chave: self._assinatura_grupo(assinaturas, itens) for chave, itens in grupos.items()}
+        alterados = {chave for chave, assinatura in assinaturas_grupo.items()
+                     if chave not in anteriores or anteriores[chave][0] != assinatura}
+
+        recalculados = {}
+        if alterados:
+            # Os grupos alterados são validados juntos; cada grupo só depende das próprias linhas.
+            linhas = [item for chave in grupos if chave in alterados for item in grupos[chave]]
+            for invalido in self.regras.validar_peso(linhas):
+                recalculados[(invalido["Aux"], invalido["SAP_Tarefa"], invalido["ID_Bloco"])] = invalido
+
+        execucao.dados_peso_SAP = []
+        for chave, assinatura in assinaturas_grupo.items():
+            invalido = recalculados.get(chave) if chave in alterados else anteriores[chave][1]
+            snapshot.resultados_peso[chave] = (assinatura, invalido)
+            if invalido is not None:
+                execucao.dados_peso_SAP.append(invalido)
+        return {"reaproveitados": len(grupos) - len(alterados), "recalculados": len(alterados)}
+
+    def _subarvores_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                                anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> dict:
+        tarefas = execucao.dados_tratados
+        arvore = execucao.visoes.arvore
+        posicao_pp = posicao_pre_projeto(execucao.visoes.nomes_normalizados)
+        posicao_modulo = posicao_modulo_02(tarefas)
+        contexto = repr((arvore.chaves_por_posicao[posicao_pp] if posicao_pp is not None else None,
+                         posicao_modulo is not None)).encode()
+
+        subarvores: dict[tuple | None, list[int]] = {}
+        for posicao, chave in enumerate(arvore.chaves_por_posicao):
+            subarvores.setdefault(chave[:2] if chave else None, []).append(posicao)
+
+        anteriores = anterior.resultados_subarvore if anterior else {}
+        assinaturas_subarvore = {
+            subarvore: self._assinatura_grupo(assinaturas, (tarefas[p] for p in posicoes), contexto)
+            for subarvore, posicoes in subarvores.items()
+        }
+        alteradas = {subarvore for subarvore, assinatura in assinaturas_subarvore.items()
+                     if subarvore not in anteriores or anteriores[subarvore][0] != assinatura}
+
+        ids_condicoes, ids_modulo = set(), set()
+        if alteradas:
+            # As regras são avaliadas só sobre as subárvores alteradas, mais as linhas
+            # que definem o contexto global, para que o resultado de cada linha seja
+            # o mesmo da avaliação sobre o cronograma inteiro.
+            posicoes = {p for subarvore in alteradas for p in subarvores[subarvore]}
+            posicoes.update(p for p in (posicao_pp, posicao_modulo) if p is not None)
+            parcial = [tarefas[p] for p in sorted(posicoes)]
+            ids_condicoes = set(self.regras.verificar_condicoes(parcial))
+            ids_modulo = set(self.regras.verificar_modulo(parcial))
+
+        condicoes, execucao.verificar_modulo = set(), []
+        for subarvore, assinatura in assinaturas_subarvore.items():
+            if subarvore in alteradas:
+                ids = [tarefas[p].get("Id") for p in subarvores[subarvore]]
+                resultado = ([i for i in ids if i in ids_condicoes], [i for i in ids if i in ids_modulo])
+            else:
+                resultado = anteriores[subarvore][1]
+            snapshot.resultados_subarvore[subarvore] = (assinatura, resultado)
+            condicoes.update(resultado[0])
+            execucao.verificar_modulo.extend(resultado[1])
+        execucao.verificar_condicoes = list(condicoes)
+        return {"reaproveitadas": len(subarvores) - len(alteradas), "recalculadas": len(alteradas)}
+
+    def _preenchimento_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                                   anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> dict:
+        anteriores = anterior.pendencias_preenchimento if anterior else {}
+        somente_contagens = execucao.opcoes.somente_contagens
+        ids_por_tipo = {tipo: 0 if somente_contagens else [] for tipo in TIPOS_PREENCHIMENTO}
+        reaproveitadas = recalculadas = 0
+        for item in execucao.dados_tratados:
+            assinatura = assinaturas[id(item)]
+            pendencias = anteriores.get(assinatura)
+            if pendencias is None:
+                pendencias = pendencias_preenchimento(item)
+                recalculadas += 1
+            else:
+                reaproveitadas += 1
+            snapshot.pendencias_preenchimento[assinatura] = pendencias
+            for tipo in pendencias:
+                if somente_contagens:
+                    ids_por_tipo[tipo] += 1
+                else:
+                    ids_por_tipo[tipo].append(item["Id"])
+        execucao.verificar_preenchimento = [[tipo, ids_por_tipo[tipo]] for tipo in TIPOS_PREENCHIMENTO]
+        return {"reaproveitadas": reaproveitadas, "recalculadas": recalculadas}
+
+    def _regras_linha_incremental(self, execucao: ExecucaoAnalise, assinaturas: dict,
+                                  anterior: SnapshotAnalise | None, snapshot: SnapshotAnalise) -> dict[str, list | int]:
+        """
+        Avalia as regras por linha apenas para as linhas transformadas que mudaram,
+        reaproveitando o veredito das demais. Os vereditos só valem para o mesmo dia,
+        pois parte das regras compara datas com "hoje". Com `somente_contagens`,
+        retorna a quantidade de tarefas por regra no lugar dos IDs.
+        """
+        hoje = execucao.hoje
+        somente_contagens = execucao.opcoes.somente_contagens
+        if somente_contagens:
+            resultados = self.motor_regras.contar([], hoje)
+        else:
+            resultados = self.motor_regras.avaliar([], hoje)
+        snapshot.data_referencia = hoje.date()
+
+        veredictos_anteriores = {}
+        if anterior is not None and anterior.data_referencia == snapshot.data_referencia:
+            veredictos_anteriores = anterior.veredictos_linha
+
+        reaproveitadas = recalculadas = 0
+        for item in execucao.dados_tratados:
+            assinatura = assinaturas[id(item)]
+            veredicto = veredictos_anteriores.get(assinatura)
+            if veredicto is None:
+                veredicto = self.motor_regras.avaliar_linha(item, hoje)
+                recalculadas += 1
+            else:
+                reaproveitadas += 1
+            snapshot.veredictos_linha[assinatura] = veredicto
+            for chave in veredicto:
+                if somente_contagens:
+                    resultados[chave] += 1
+                else:
+                    resultados[chave].append(item.get("Id"))
+
+        execucao.reaproveitamento["regras_linha"] = {"reaproveitadas": reaproveitadas, "recalculadas": recalculadas}
+        return resultados
+
+    def relatorio_project(self, execucao: ExecucaoAnalise, resultados_linha: dict[str, list | int] | None = None) -> dict:
+        dados = execucao.dados_tratados
+        hoje = execucao.hoje
+        opcoes = execucao.opcoes
+        perfilador = execucao.perfilador
+        regras_linha = opcoes.regras_linha()
+
+        # Regras #1 a #17 e #20: avaliadas em uma única passada pelo motor de regras por linha.
+        if resultados_linha is not None:
+            chaves = {regra.chave for regra in REGRAS_LINHA if opcoes.inclui_regra(regra.nome)}
+            dic_error = {chave: ids for chave, ids in resultados_linha.items() if chave in chaves}
+        elif perfilador.ativo:
+            # Com perfil, cada regra é executada separadamente para medir seu custo.
+            # O resultado é o mesmo da passada única, pois as regras são independentes.
+            avaliar = self.motor_regras.contar if opcoes.somente_contagens else self.motor_regras.avaliar
+            dic_error = {}
+            for regra in REGRAS_LINHA:
+                if opcoes.inclui_regra(regra.nome):
+                    with perfilador.regra(regra.nome, len(dados)):
+                        dic_error.update(avaliar(dados, hoje, [regra.nome]))
+        elif opcoes.somente_contagens:
+            dic_error = self.motor_regras.contar(dados, hoje, regras_linha)
+        else:
+            dic_error = self.motor_regras.avaliar(dados, hoje, regras_linha)
+
+        if opcoes.inclui_regra("peso_sap"):
+            if opcoes.somente_contagens:
+                dic_error[REGRAS_ESTRUTURA["peso_sap"]] = len(execucao.dados_peso_SAP)
+            else:
+                dic_error[REGRAS_ESTRUTURA["peso_sap"]] = [item.get('SAP_Tarefa') for item in execucao.dados_peso_SAP]
+        if opcoes.inclui_regra("agrupamentos"):
+            dic_error[REGRAS_ESTRUTURA["agrupamentos"]] = execucao.verificar_condicoes
+        if opcoes.inclui_regra("modulo_asc"):
+            dic_error[REGRAS_ESTRUTURA["modulo_asc"]] = execucao.verificar_modulo
+
+        if opcoes.inclui_regra("preenchimento"):
+            for tipo in execucao.verificar_preenchimento:
+                dic_error[f"{REGRAS_ESTRUTURA['preenchimento']} {tipo[0]}"] = tipo[1]
+
+        if opcoes.inclui_regra("hiato"):
+            dic_error[REGRAS_ESTRUTURA["hiato"]] = execucao.lista_gap
+        if opcoes.inclui_regra("frente_simultanea"):
+            dic_error[REGRAS_ESTRUTURA["frente_simultanea"]] = execucao.lista_overlap
+
         #dic_error["ID tarefas com latência maior que 5d"] = self.regras.tarefas_com_latencia(dados)#18
-        #dic_error["ID tarefas com nível superior a 7"] = self.regras.tarefas_com_nivel_maior_que_7(dados)#19 
-        
+        #dic_error["ID tarefas com nível superior a 7"] = self.regras.tarefas_com_nivel_maior_que_7(dados)#19
+
+        if opcoes.somente_contagens:
+            # As regras por linha e o preenchimento já vêm contados. Agrupamentos, MÓDULO_ASC,
+            # hiatos e sobreposições deduplicam Ids/pares, então a contagem é o tamanho da lista.
+            return {chave: valor if isinstance(valor, int) else len(valor) for chave, valor in dic_error.items()}
         return dic_error
-        
+
     def lista_colunas(self):
         return [
             ["Id", "Nome", "Predecessoras", "Ativo"],#1
@@ -111,7 +630,7 @@ class AnaliseService(AnaliseServiceInterface):
             ["Id", "Nome", "Peso"], #20
 
         ]
-            
-            
-        
-        
\ No newline at end of file
+
+
+
+
@@ -0,0 +1,77 @@
+from ccron.src.domain.ports.motor_regras_interface import MotorRegrasInterface
+from ccron.src.domain.ports.regras_validacao_interface import RegrasValidacaoInterface
+from ccron.src.domain.service.motor_regras import MotorRegras
+from ccron.src.domain.service.motor_regras_paralelo import MotorRegrasParalelo
+from ccron.src.domain.service.regras_validacao import RegrasValidacao
+
+from datetime import datetime
+from typing import Iterable
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+BACKENDS_REGRAS = ("python", "numpy", "conferir", "paralelo")
+
+
+class MotorRegrasConferencia(MotorRegrasInterface):
+    """
+    Executa o motor por linha e o vetorizado e compara os resultados.
+
+    Retorna sempre o resultado do motor por linha, que é a referência, e registra
+    as regras em que os dois divergem. Serve para validar o backend NumPy em
+    cronogramas reais antes de ativá-lo.
+    """
+    def __init__(self, referencia: MotorRegrasInterface, candidato: MotorRegrasInterface):
+        self.referencia = referencia
+        self.candidato = candidato
+        self.divergencias: list[str] = []
+
+    def _registrar(self, esperado: dict, obtido: dict):
+        self.divergencias = [chave for chave in esperado if esperado[chave] != obtido.get(chave)]
+        for chave in self.divergencias:
+            logger.warning("Divergência no backend de regras em '%s': esperado %.200r, obtido %.200r",
+                           chave, esperado[chave], obtido.get(chave))
+
+    def avaliar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, list]:
+        regras = list(regras) if regras is not None else None
+        esperado = self.referencia.avaliar(dados, hoje, regras)
+        self._registrar(esperado, self.candidato.avaliar(dados, hoje, regras))
+        return esperado
+
+    def contar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, int]:
+        regras = list(regras) if regras is not None else None
+        esperado = self.referencia.contar(dados, hoje, regras)
+        self._registrar(esperado, self.candidato.contar(dados, hoje, regras))
+        return esperado
+
+    def avaliar_linha(self, item: dict, hoje: datetime) -> tuple[str, ...]:
+        return self.referencia.avaliar_linha(item, hoje)
+
+
+def criar_backend_regras(backend: str | None = None) -> tuple[RegrasValidacaoInterface, MotorRegrasInterface]:
+    """
+    Cria as regras de validação e o motor de regras por linha do backend escolhido.
+
+    Args:
+        backend: "python" (padrão), "numpy", "conferir" ou "paralelo". Quando
+                 omitido, é lido da variável de ambiente CCRON_BACKEND_REGRAS.
+
+    Returns:
+        A tupla (regras de validação, motor de regras por linha).
+    """
+    backend = (backend or os.getenv("CCRON_BACKEND_REGRAS", "python")).strip().lower()
+    if backend not in BACKENDS_REGRAS:
+        raise ValueError(f"Backend de regras desconhecido: {backend}. Opções: {', '.join(BACKENDS_REGRAS)}")
+
+    if backend == "python":
+        return RegrasValidacao(), MotorRegras()
+    if backend == "paralelo":
+        return RegrasValidacao(), MotorRegrasParalelo()
+
+    # Importado sob demanda para que o backend padrão não dependa do NumPy.
+    from ccron.src.domain.service.motor_regras_numpy import MotorRegrasNumpy, RegrasValidacaoNumpy
+
+    if backend == "numpy":
+        return RegrasValidacaoNumpy(), MotorRegrasNumpy()
+    return RegrasValidacao(), MotorRegrasConferencia(MotorRegras(), MotorRegrasNumpy())
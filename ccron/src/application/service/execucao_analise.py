@@ -0,0 +1,54 @@
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+from ccron.src.application.service.perfilador import Perfilador, PerfiladorNulo
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+from ccron.src.domain.service.visoes_analise import VisoesAnalise
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class ExecucaoAnalise:
+    """
+    Estado de uma única análise de cronograma.
+
+    O `AnaliseService` é compartilhado por todas as requisições; tudo o que é
+    produzido durante uma análise fica aqui, e não no serviço, para que análises
+    simultâneas não leiam os dados umas das outras.
+
+    Attributes:
+        opcoes: Regras e seções pedidas.
+        hoje: Data de referência das regras que comparam com "hoje".
+        perfilador: Perfilador da análise (ou o nulo, sem custo).
+        dados_tratados: As tarefas transformadas, em formato colunar.
+        visoes: Projeções de `dados_tratados` compartilhadas pelas etapas.
+        dados_ativos: As tarefas ativas.
+        lista_overlap: Sobreposições encontradas por serviço.
+        lista_gap: Hiatos encontrados por serviço.
+        dados_peso_SAP: Grupos com somatório de peso inválido.
+        verificar_condicoes: Ids com agrupamentos inconsistentes.
+        verificar_modulo: Ids com MÓDULO_ASC não preenchido.
+        verificar_preenchimento: Pares [tipo, Ids] dos campos não preenchidos.
+        macrofluxo: Erros do macrofluxo, quando calculado ou reaproveitado.
+        reaproveitamento: Resumo do trabalho reaproveitado (modo incremental).
+    """
+    opcoes: OpcoesAnalise
+    hoje: datetime
+    perfilador: Perfilador | PerfiladorNulo = field(default_factory=PerfiladorNulo)
+    dados_tratados: TabelaTarefas | None = None
+    visoes: VisoesAnalise | None = None
+    dados_ativos: list[dict] = field(default_factory=list)
+    lista_overlap: list = field(default_factory=list)
+    lista_gap: list = field(default_factory=list)
+    dados_peso_SAP: list = field(default_factory=list)
+    verificar_condicoes: list = field(default_factory=list)
+    verificar_modulo: list = field(default_factory=list)
+    verificar_preenchimento: list = field(default_factory=list)
+    macrofluxo: list | None = None
+    reaproveitamento: dict = field(default_factory=dict)
+
+    def carregar_tarefas(self, dados_tratados: TabelaTarefas):
+        """Define as tarefas transformadas e as visões derivadas delas."""
+        self.dados_tratados = dados_tratados
+        self.visoes = VisoesAnalise(dados_tratados)
+        self.dados_ativos = self.visoes.ativas
@@ -0,0 +1,225 @@
+from ccron.src.application.service.opcoes_analise import REGRAS_ESTRUTURA
+from ccron.src.domain.ports.historico_analises_interface import HistoricoAnalisesInterface
+from ccron.src.domain.service.motor_regras import REGRAS_LINHA
+
+from collections import Counter
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# Totais do resumo comparados entre análises e acompanhados na tendência.
+TOTAIS_HISTORICO = ("tarefas_ativas", "total_apontamentos", "sobreposicoes", "gaps", "total_erros_macrofluxo")
+
+# Nome curto da regra -> chave no relatório.
+_CHAVES_REGRAS = {regra.nome: regra.chave for regra in REGRAS_LINHA} | REGRAS_ESTRUTURA
+
+# Regras com uma chave por tipo no relatório ("<chave> <tipo>"): filtradas pelo prefixo.
+_REGRAS_POR_TIPO = ("preenchimento",)
+
+
+def resumir_analise(resultado: dict) -> dict:
+    """
+    Resumo compacto de uma análise: quantidade de tarefas por regra, totais de
+    sobreposições e hiatos e erros do macrofluxo por tipo.
+
+    Os totais das seções que não fazem parte do resultado (análise com `secoes`)
+    ficam None, para não serem confundidos com zero.
+    """
+    regras = {
+        regra: valor if isinstance(valor, int) else len(valor)
+        for regra, valor in (resultado.get("dados_regras_validacao") or {}).items()
+    }
+    macrofluxo = Counter(erro.get("TipoErro") for erro in resultado.get("macrofluxo") or [])
+    tem_macrofluxo = "macrofluxo" in resultado
+    return {
+        "tarefas_ativas": len(resultado["dados_ativos"]) if "dados_ativos" in resultado else None,
+        "regras": regras,
+        "total_apontamentos": sum(regras.values()),
+        "sobreposicoes": len(resultado["lista_overlap"]) if "lista_overlap" in resultado else None,
+        "gaps": len(resultado["lista_gap"]) if "lista_gap" in resultado else None,
+        "erros_macrofluxo": dict(macrofluxo) if tem_macrofluxo else None,
+        "total_erros_macrofluxo": sum(macrofluxo.values()) if tem_macrofluxo else None,
+    }
+
+
+def json_valido(valor):
+    """Troca NaN/infinito (ex: `Peso` vazio) por None, para que o conteúdo seja JSON válido."""
+    if isinstance(valor, float):
+        return valor if math.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {chave: json_valido(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [json_valido(item) for item in valor]
+    return valor
+
+
+def _variacao(anterior, atual):
+    if anterior is None or atual is None:
+        return None
+    return atual - anterior
+
+
+def _comparar_contagens(anteriores: dict, atuais: dict) -> dict:
+    return {
+        chave: {"de": anteriores.get(chave), "para": atuais.get(chave),
+                "variacao": _variacao(anteriores.get(chave, 0), atuais.get(chave, 0))}
+        for chave in dict.fromkeys([*anteriores, *atuais])
+    }
+
+
+class HistoricoService:
+    """
+    Histórico das análises por projeto: registra o resumo de cada análise feita
+    com `project_id` e responde tendências e comparações só com os resumos
+    guardados, sem refazer análises.
+
+    Args:
+        historico: Onde os resumos são guardados.
+        versao_referencia: Versão das bases de referência (De-Para e EAP) usadas
+                           pelo serviço de análise.
+        ativo: Registra as análises. Padrão: CCRON_HISTORICO diferente de "0".
+        guardar_resultados: Guarda também o resultado completo, comprimido.
+                            Padrão: CCRON_HISTORICO_RESULTADOS igual a "1".
+    """
+    def __init__(self, historico: HistoricoAnalisesInterface, versao_referencia: str | None = None,
+                 ativo: bool | None = None, guardar_resultados: bool | None = None):
+        self.historico = historico
+        self.versao_referencia = versao_referencia
+        self.ativo = ativo if ativo is not None else os.getenv("CCRON_HISTORICO", "1") != "0"
+        self.guardar_resultados = (guardar_resultados if guardar_resultados is not None
+                                   else os.getenv("CCRON_HISTORICO_RESULTADOS", "0") == "1")
+
+    def registrar(self, project_id: str, resultado: dict, origem: str, referencia: str | None = None) -> int | None:
+        """
+        Registra o resumo de uma análise. Falhas ao gravar são apenas registradas
+        no log, para não derrubar a análise.
+
+        Returns:
+            O `analise_id` do registro, ou None se nada foi registrado (histórico
+            desativado, análise sem o relatório de regras ou erro ao gravar).
+        """
+        if not self.ativo or "dados_regras_validacao" not in resultado:
+            return None
+        try:
+            return self.historico.registrar(
+                project_id, resumir_analise(resultado), origem, self.versao_referencia, referencia,
+                json_valido(resultado) if self.guardar_resultados else None)
+        except Exception as e:
+            logger.error("Erro ao registrar a análise do projeto %s no histórico: %s", project_id, e, exc_info=True)
+            return None
+
+    def listar(self, project_id: str, desde: str | None = None, ate: str | None = None,
+               limite: int | None = None) -> list[dict]:
+        return self.historico.listar(project_id, desde, ate, limite)
+
+    @staticmethod
+    def _chaves_regras(regras: str | None) -> tuple[frozenset[str], tuple[str, ...]] | None:
+        """Chaves exatas das regras pedidas e os prefixos das que têm uma chave por tipo."""
+        if not regras:
+            return None
+        exatas, prefixos = set(), []
+        for nome in (nome.strip() for nome in regras.split(",")):
+            if not nome:
+                continue
+            if nome not in _CHAVES_REGRAS:
+                raise ValueError(f"Regra desconhecida: {nome}. Válidas: {', '.join(_CHAVES_REGRAS)}.")
+            if nome in _REGRAS_POR_TIPO:
+                prefixos.append(f"{_CHAVES_REGRAS[nome]} ")
+            else:
+                exatas.add(_CHAVES_REGRAS[nome])
+        return frozenset(exatas), tuple(prefixos)
+
+    def tendencia(self, project_id: str, regras: str | None = None, desde: str | None = None,
+                  ate: str | None = None, limite: int | None = 100) -> dict:
+        """
+        Evolução dos totais e da quantidade de tarefas por regra ao longo das
+        análises do projeto.
+
+        Args:
+            project_id: Projeto consultado.
+            regras: Regras a incluir, pelos nomes curtos e separadas por vírgula
+                    (ex: "atrasadas,hiato"). Padrão: todas.
+            desde: Data/hora ISO inicial.
+            ate: Data/hora ISO final.
+            limite: Quantidade máxima de análises (as mais recentes).
+
+        Returns:
+            Os pontos da série, em ordem cronológica, a variação entre o primeiro
+            e o último ponto e as versões das bases de referência encontradas.
+
+        Raises:
+            ValueError: Se uma regra não existir.
+        """
+        chaves = self._chaves_regras(regras)
+        pontos = self.historico.listar(project_id, desde, ate, limite)
+        contagens = self.historico.contagens(project_id, pontos[0]["analise_id"], pontos[-1]["analise_id"]) if pontos else {}
+        for ponto in pontos:
+            por_regra = contagens.get(ponto["analise_id"], {})
+            if chaves is not None:
+                exatas, prefixos = chaves
+                por_regra = {regra: quantidade for regra, quantidade in por_regra.items()
+                             if regra in exatas or regra.startswith(prefixos)}
+            ponto["regras"] = por_regra
+
+        variacao = None
+        if pontos:
+            primeiro, ultimo = pontos[0], pontos[-1]
+            variacao = {total: _variacao(primeiro[total], ultimo[total]) for total in TOTAIS_HISTORICO}
+            variacao["regras"] = {regra: dados["variacao"] for regra, dados in
+                                  _comparar_contagens(primeiro["regras"], ultimo["regras"]).items()}
+        return {
+            "project_id": project_id,
+            "analises": len(pontos),
+            "versoes_referencia": list(dict.fromkeys(ponto["versao_referencia"] for ponto in pontos)),
+            "variacao": variacao,
+            "pontos": pontos,
+        }
+
+    def comparar(self, project_id: str, de: int | None = None, para: int | None = None) -> dict | None:
+        """
+        Compara duas análises guardadas do projeto: totais, quantidade por regra
+        e erros do macrofluxo por tipo.
+
+        Args:
+            de: `analise_id` de referência. Padrão: a análise anterior a `para`.
+            para: `analise_id` comparado. Padrão: a análise mais recente.
+
+        Returns:
+            A comparação, ou None se o projeto não tiver as análises pedidas.
+        """
+        if para is None:
+            recentes = self.historico.listar(project_id, limite=2)
+            if len(recentes) < (1 if de is not None else 2):
+                return None
+            para = recentes[-1]["analise_id"]
+            if de is None:
+                de = recentes[0]["analise_id"]
+        analise_para = self.historico.analise(project_id, para)
+        if analise_para is None:
+            return None
+        if de is None:
+            anteriores = self.historico.listar(project_id, ate=analise_para["analisado_em"], limite=1, antes_de=para)
+            if not anteriores:
+                return None
+            de = anteriores[-1]["analise_id"]
+        analise_de = self.historico.analise(project_id, de)
+        if analise_de is None:
+            return None
+        regras_de, regras_para = analise_de.pop("regras"), analise_para.pop("regras")
+        return {
+            "project_id": project_id,
+            "de": analise_de,
+            "para": analise_para,
+            "mesma_referencia": analise_de["versao_referencia"] == analise_para["versao_referencia"],
+            "totais": {total: {"de": analise_de[total], "para": analise_para[total],
+                               "variacao": _variacao(analise_de[total], analise_para[total])}
+                       for total in TOTAIS_HISTORICO},
+            "regras": _comparar_contagens(regras_de, regras_para),
+            "erros_macrofluxo": _comparar_contagens(analise_de["erros_macrofluxo"] or {},
+                                                    analise_para["erros_macrofluxo"] or {}),
+        }
+
+    def resultado(self, project_id: str, analise_id: int) -> dict | None:
+        return self.historico.resultado(project_id, analise_id)
@@ -0,0 +1,131 @@
+from ccron.src.domain.service.motor_regras import REGRAS_LINHA
+from ccron.src.domain.service.calendario_trabalho import CalendarioTrabalho
+
+from dataclasses import dataclass, field
+
+# Seções da resposta de `analisar_cronograma`, na ordem em que são retornadas.
+SECOES = (
+    "dados_regras_validacao",
+    "macrofluxo",
+    "dados_ativos",
+    "lista_overlap",
+    "lista_gap",
+    "tabela_overlap",
+    "tabela_gap",
+    "lista_colunas",
+    "rede",
+)
+
+# Seções calculadas apenas quando pedidas explicitamente em `secoes`.
+SECOES_OPCIONAIS = ("rede",)
+
+# Regras que dependem de várias linhas, com a chave usada no relatório.
+# "preenchimento" gera uma chave por tipo de preenchimento verificado.
+REGRAS_ESTRUTURA = {
+    "peso_sap": "Tarefas SAP com somatório de Peso diferente de 0",
+    "agrupamentos": "ID tarefas com Agrupamentos Inconsistentes",
+    "modulo_asc": "ID tarefas com Preenchimento Módulo ASC Inconsistentes",
+    "preenchimento": "ID tarefas com Ponto de Atenção no Preenchimento",
+    "hiato": "ID tarefas com Hiato",
+    "frente_simultanea": "ID tarefas com Frente Simultânea",
+}
+
+REGRAS_LINHA_NOMES = tuple(regra.nome for regra in REGRAS_LINHA)
+REGRAS = REGRAS_LINHA_NOMES + tuple(REGRAS_ESTRUTURA)
+
+
+@dataclass(frozen=True)
+class OpcoesAnalise:
+    """
+    Seleção do que uma análise deve calcular.
+
+    Attributes:
+        regras: Nomes das regras a executar (ver `REGRAS`). None executa todas.
+        secoes: Seções da resposta a montar (ver `SECOES`). None monta todas, exceto
+                as de `SECOES_OPCIONAIS`, ou só "dados_regras_validacao" no modo
+                de contagens.
+        somente_contagens: Se True, o relatório de regras traz a quantidade de
+                           tarefas por regra em vez das listas de IDs.
+        calendario: Calendário de trabalho para medir hiatos. None usa dias corridos.
+        gap_threshold: Dias de hiato a partir dos quais um hiato é apontado.
+        limites_servico: Limite de hiato específico por serviço.
+    """
+    regras: frozenset[str] | None = None
+    secoes: frozenset[str] | None = None
+    somente_contagens: bool = False
+    calendario: CalendarioTrabalho | None = None
+    gap_threshold: int = 5
+    limites_servico: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for nome, validos, rotulo in ((self.regras, REGRAS, "Regra"), (self.secoes, SECOES, "Seção")):
+            desconhecidos = sorted(set(nome or ()) - set(validos))
+            if desconhecidos:
+                raise ValueError(f"{rotulo} desconhecida: {', '.join(desconhecidos)}. Opções: {', '.join(validos)}")
+
+    @classmethod
+    def de_parametros(cls, regras: str | None = None, secoes: str | None = None,
+                      somente_contagens: bool = False, hiato: dict | None = None) -> "OpcoesAnalise":
+        """
+        Monta as opções a partir de parâmetros de requisição separados por vírgula.
+
+        Args:
+            regras: Ex: "atrasadas,peso_zero,hiato".
+            secoes: Ex: "dados_regras_validacao,tabela_gap".
+            somente_contagens: Retornar apenas as contagens por regra.
+            hiato: Configuração do cálculo de hiatos, ex:
+                   {"dias_uteis": "1111100", "feriados": ["25/12/2025"],
+                    "gap_threshold": 5, "limites_servico": {"ALVENARIA": 10}}.
+        """
+        def separar(valor: str | None) -> frozenset[str] | None:
+            if valor is None or not valor.strip():
+                return None
+            return frozenset(parte.strip() for parte in valor.split(",") if parte.strip())
+
+        hiato = hiato or {}
+        if not isinstance(hiato, dict):
+            raise ValueError("A configuração de hiato deve ser um objeto JSON.")
+        calendario = None
+        if "dias_uteis" in hiato or "feriados" in hiato:
+            calendario = CalendarioTrabalho.de_dict(hiato)
+        limites_servico = hiato.get("limites_servico") or {}
+        if not isinstance(limites_servico, dict):
+            raise ValueError("'limites_servico' deve ser um objeto {serviço: limite em dias}.")
+        limites_servico = {str(servico): int(limite) for servico, limite in limites_servico.items()}
+
+        return cls(regras=separar(regras), secoes=separar(secoes), somente_contagens=somente_contagens,
+                   calendario=calendario, gap_threshold=int(hiato.get("gap_threshold", 5)),
+                   limites_servico=limites_servico)
+
+    def inclui_regra(self, nome: str) -> bool:
+        return self.regras is None or nome in self.regras
+
+    def inclui_secao(self, secao: str) -> bool:
+        if self.secoes is None:
+            if secao in SECOES_OPCIONAIS:
+                return False
+            return not self.somente_contagens or secao == "dados_regras_validacao"
+        return secao in self.secoes
+
+    def regras_linha(self) -> list[str] | None:
+        """Nomes das regras por linha selecionadas, ou None para todas."""
+        if self.regras is None:
+            return None
+        return [nome for nome in REGRAS_LINHA_NOMES if nome in self.regras]
+
+    @property
+    def calcula_tudo(self) -> bool:
+        """
+        Indica se a seleção calcula tudo o que a análise incremental guarda: todas
+        as regras, com as listas de IDs.
+        """
+        return self.regras is None and not self.somente_contagens and self.inclui_secao("dados_regras_validacao")
+
+    @property
+    def precisa_servicos(self) -> bool:
+        """Indica se as sobreposições e gaps por serviço precisam ser calculados."""
+        return (
+            (self.inclui_secao("dados_regras_validacao")
+             and (self.inclui_regra("hiato") or self.inclui_regra("frente_simultanea")))
+            or any(self.inclui_secao(secao) for secao in ("lista_overlap", "lista_gap", "tabela_overlap", "tabela_gap"))
+        )
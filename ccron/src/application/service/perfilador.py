@@ -0,0 +1,162 @@
+from contextlib import contextmanager
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+
+# O cProfile e o tracemalloc são globais ao processo: no Python 3.12+ o
+# cProfile usa o `sys.monitoring`, que aceita um único perfilador ativo e mede
+# todas as threads. Por isso só um perfil de execução roda por vez.
+_lock_perfil = threading.Lock()
+
+
+class PerfilEmAndamentoError(RuntimeError):
+    """Já há um perfil de execução ativo no processo."""
+
+
+class Perfilador:
+    """
+    Coleta o perfil de execução de uma análise.
+
+    Mede tempo de parede e de CPU por etapa do pipeline e por regra, a
+    quantidade de linhas que entra em cada uma, as funções mais custosas segundo
+    o cProfile e o pico de memória com os principais pontos de alocação
+    (tracemalloc).
+
+    Uso:
+        perfilador = Perfilador()
+        perfilador.iniciar()
+        with perfilador.etapa("transformacao", linhas=len(dados)):
+            ...
+        relatorio = perfilador.finalizar()
+
+    Se a análise falhar antes de `finalizar`, `parar` encerra a coleta sem
+    montar o relatório. Só um perfil roda por vez; o pico de memória (e, no
+    Python 3.12+, o cProfile) cobre o processo inteiro no período, inclusive
+    análises sem perfil em outras threads.
+    """
+    ativo = True
+
+    def __init__(self, top_funcoes: int = 25, top_alocacoes: int = 15):
+        self.top_funcoes = top_funcoes
+        self.top_alocacoes = top_alocacoes
+        self.etapas: list[dict] = []
+        self.regras: list[dict] = []
+        self._profiler = cProfile.Profile()
+        self._coletando = False
+        self._iniciou_tracemalloc = False
+
+    def iniciar(self):
+        """
+        Liga o cProfile e o tracemalloc.
+
+        Raises:
+            PerfilEmAndamentoError: Se outro perfil (desta ou de outra ferramenta)
+                                    já estiver ativo no processo.
+        """
+        if not _lock_perfil.acquire(blocking=False):
+            raise PerfilEmAndamentoError("Já há um perfil de execução em andamento. Tente novamente em instantes.")
+        self._iniciou_tracemalloc = not tracemalloc.is_tracing()
+        if self._iniciou_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._inicio = (time.perf_counter(), time.process_time())
+        try:
+            self._profiler.enable()
+        except ValueError as e:
+            # Python 3.12+: outra ferramenta (ex: um depurador) ocupa o sys.monitoring.
+            self._liberar()
+            raise PerfilEmAndamentoError(f"Outro perfilador está ativo no processo: {e}") from e
+        except BaseException:
+            self._liberar()
+            raise
+        self._coletando = True
+
+    def _liberar(self):
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+        _lock_perfil.release()
+
+    def parar(self):
+        """Encerra a coleta, se ainda estiver ativa. Pode ser chamado mais de uma vez."""
+        if not self._coletando:
+            return
+        self._profiler.disable()
+        self._coletando = False
+        self._liberar()
+
+    @contextmanager
+    def _medir(self, destino: list[dict], chave: str, nome: str, linhas: int | None):
+        inicio_parede, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            destino.append({
+                chave: nome,
+                "linhas": linhas,
+                "parede_s": round(time.perf_counter() - inicio_parede, 6),
+                "cpu_s": round(time.process_time() - inicio_cpu, 6),
+            })
+
+    def etapa(self, nome: str, linhas: int | None = None):
+        """Mede uma etapa do pipeline (ex: transformação, Conferidor)."""
+        return self._medir(self.etapas, "etapa", nome, linhas)
+
+    def regra(self, nome: str, linhas: int | None = None):
+        """Mede uma regra de validação."""
+        return self._medir(self.regras, "regra", nome, linhas)
+
+    def finalizar(self) -> dict:
+        """Encerra a coleta e retorna o relatório."""
+        self._profiler.disable()
+        parede = time.perf_counter() - self._inicio[0]
+        cpu = time.process_time() - self._inicio[1]
+
+        _, pico = tracemalloc.get_traced_memory()
+        alocacoes = tracemalloc.take_snapshot().statistics("lineno")[:self.top_alocacoes]
+        self.parar()
+
+        estatisticas = pstats.Stats(self._profiler)
+        funcoes = sorted(estatisticas.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_funcoes]
+
+        return {
+            "total": {"parede_s": round(parede, 6), "cpu_s": round(cpu, 6)},
+            "etapas": self.etapas,
+            "regras": self.regras,
+            "cprofile": [
+                {
+                    "funcao": f"{arquivo}:{linha}({nome})",
+                    "chamadas": chamadas,
+                    "tempo_proprio_s": round(tempo_proprio, 6),
+                    "tempo_acumulado_s": round(tempo_acumulado, 6),
+                }
+                for (arquivo, linha, nome), (_, chamadas, tempo_proprio, tempo_acumulado, _) in funcoes
+            ],
+            "memoria": {
+                "pico_bytes": pico,
+                "principais_alocacoes": [
+                    {"local": str(estatistica.traceback[0]), "bytes": estatistica.size, "blocos": estatistica.count}
+                    for estatistica in alocacoes
+                ],
+            },
+        }
+
+
+class PerfiladorNulo:
+    """Perfilador que não mede nada, usado quando o perfil não foi pedido."""
+    ativo = False
+
+    @contextmanager
+    def _nada(self):
+        yield
+
+    def etapa(self, nome: str, linhas: int | None = None):
+        return self._nada()
+
+    def regra(self, nome: str, linhas: int | None = None):
+        return self._nada()
+
+    def parar(self):
+        pass
@@ -0,0 +1,228 @@
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.application.service.historico import HistoricoService, json_valido, resumir_analise
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+from ccron.src.domain.ports.integracao_project_adapter import IntegracaoProjectAdapterInterface
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_servico_processo: AnaliseService | None = None
+
+
+def _analisar_projeto(project_id: str, dados: list[dict], opcoes: OpcoesAnalise) -> dict:
+    """Executada no processo filho: analisa um projeto com o serviço do processo."""
+    global _servico_processo
+    if _servico_processo is None:
+        _servico_processo = AnaliseService()
+    return _servico_processo.analisar_cronograma(dados, project_id=project_id, opcoes=opcoes)
+
+
+class RegistroPortfolio:
+    """
+    Guarda as execuções de portfólio em disco, para que qualquer worker do
+    servidor consulte o andamento e os resultados.
+
+    Cada execução tem um diretório com `resumo.json` (estado e resumo por
+    projeto, reescrito a cada projeto concluído) e um arquivo com o resultado
+    completo de cada projeto. Só as `max_execucoes` mais recentes são mantidas.
+
+    Args:
+        diretorio: Padrão: CCRON_PORTFOLIO_DIR ou "ccron_portfolio" no diretório temporário.
+        max_execucoes: Padrão: CCRON_MAX_EXECUCOES_PORTFOLIO ou 10.
+    """
+    def __init__(self, diretorio: str | None = None, max_execucoes: int | None = None):
+        self.diretorio = diretorio or os.getenv("CCRON_PORTFOLIO_DIR") or os.path.join(tempfile.gettempdir(), "ccron_portfolio")
+        self.max_execucoes = max_execucoes or int(os.getenv("CCRON_MAX_EXECUCOES_PORTFOLIO", "10"))
+        self._lock = threading.Lock()
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    @staticmethod
+    def _valido(execucao_id: str) -> bool:
+        return len(execucao_id) == 32 and all(c in "0123456789abcdef" for c in execucao_id)
+
+    @staticmethod
+    def _arquivo_projeto(project_id: str) -> str:
+        return hashlib.sha1(project_id.encode("utf-8")).hexdigest() + ".json"
+
+    def _gravar(self, caminho: str, conteudo: dict):
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(json_valido(conteudo), arquivo, ensure_ascii=False, default=str)
+        os.replace(temporario, caminho)
+
+    def _ler(self, caminho: str) -> dict | None:
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except FileNotFoundError:
+            return None
+
+    def criar(self, project_ids: list[str]) -> dict:
+        execucao_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.diretorio, execucao_id))
+        resumo = {
+            "execucao_id": execucao_id,
+            "estado": "executando",
+            "iniciado_em": datetime.now().isoformat(timespec="seconds"),
+            "concluido_em": None,
+            "total_projetos": len(project_ids),
+            "concluidos": 0,
+            "com_erro": 0,
+            "projetos": {project_id: {"estado": "pendente"} for project_id in project_ids},
+        }
+        self.salvar_resumo(resumo)
+        self._podar()
+        return resumo
+
+    def salvar_resumo(self, resumo: dict):
+        with self._lock:
+            self._gravar(os.path.join(self.diretorio, resumo["execucao_id"], "resumo.json"), resumo)
+
+    def salvar_resultado(self, execucao_id: str, project_id: str, resultado: dict):
+        self._gravar(os.path.join(self.diretorio, execucao_id, self._arquivo_projeto(project_id)), resultado)
+
+    def resumo(self, execucao_id: str) -> dict | None:
+        if not self._valido(execucao_id):
+            return None
+        return self._ler(os.path.join(self.diretorio, execucao_id, "resumo.json"))
+
+    def resultado(self, execucao_id: str, project_id: str) -> dict | None:
+        if not self._valido(execucao_id):
+            return None
+        return self._ler(os.path.join(self.diretorio, execucao_id, self._arquivo_projeto(project_id)))
+
+    def _podar(self):
+        execucoes = [entrada for entrada in os.scandir(self.diretorio) if entrada.is_dir() and self._valido(entrada.name)]
+        if len(execucoes) <= self.max_execucoes:
+            return
+        execucoes.sort(key=lambda entrada: entrada.stat().st_mtime)
+        for entrada in execucoes[:len(execucoes) - self.max_execucoes]:
+            shutil.rmtree(entrada.path, ignore_errors=True)
+
+
+class PortfolioService:
+    """
+    Analisa vários projetos do Project Server em uma execução, com um resumo por projeto.
+
+    As tarefas são buscadas em paralelo, com no máximo `max_paralelo` projetos
+    consultados ao mesmo tempo (o cliente OData compartilhado ainda limita as
+    conexões e respeita o Retry-After do SharePoint). Cada projeto segue para a
+    análise assim que suas tarefas chegam, em um pool de processos ("spawn",
+    como nas regras paralelas); com um processo só, a análise roda na própria
+    thread da execução, com um `AnaliseService` exclusivo.
+
+    Args:
+        projetos: Adapter que fornece as tarefas de cada projeto.
+        registro: Onde o andamento e os resultados são guardados.
+        processos: Processos de análise. Padrão: CCRON_PROCESSOS_PORTFOLIO ou a quantidade de CPUs.
+        max_paralelo: Projetos buscados ao mesmo tempo. Padrão: CCRON_PORTFOLIO_PARALELO ou 4.
+        historico: Quando informado, cada projeto concluído entra no histórico de análises.
+        max_projetos: Projetos aceitos em uma execução. Padrão: CCRON_PORTFOLIO_MAX_PROJETOS ou 200.
+    """
+    def __init__(self, projetos: IntegracaoProjectAdapterInterface, registro: RegistroPortfolio | None = None,
+                 processos: int | None = None, max_paralelo: int | None = None,
+                 historico: HistoricoService | None = None, max_projetos: int | None = None):
+        self.projetos = projetos
+        self.registro = registro or RegistroPortfolio()
+        self.historico = historico
+        self.processos = processos or int(os.getenv("CCRON_PROCESSOS_PORTFOLIO", "0")) or os.cpu_count() or 1
+        self.max_paralelo = max_paralelo or int(os.getenv("CCRON_PORTFOLIO_PARALELO", "4"))
+        self.max_projetos = max_projetos or int(os.getenv("CCRON_PORTFOLIO_MAX_PROJETOS", "200"))
+        self._pool: ProcessPoolExecutor | None = None
+        self._servico_local: AnaliseService | None = None
+        self._lock = threading.Lock()
+        self._lock_local = threading.Lock()
+
+    def iniciar(self, project_ids: list[str], opcoes: OpcoesAnalise | None = None) -> dict:
+        """
+        Registra a execução e a processa em segundo plano.
+
+        Returns:
+            O resumo inicial, com o `execucao_id` para acompanhar o andamento.
+
+        Raises:
+            ValueError: Se a lista passar de `max_projetos` projetos.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if len(project_ids) > self.max_projetos:
+            raise ValueError(f"No máximo {self.max_projetos} projetos por execução; foram informados {len(project_ids)}.")
+        resumo = self.registro.criar(project_ids)
+        threading.Thread(target=self.executar, args=(resumo, project_ids, opcoes),
+                         name=f"portfolio-{resumo['execucao_id'][:8]}", daemon=True).start()
+        return self.registro.resumo(resumo["execucao_id"])
+
+    def executar(self, resumo: dict, project_ids: list[str], opcoes: OpcoesAnalise | None = None) -> dict:
+        """Busca e analisa os projetos, atualizando o registro a cada projeto concluído."""
+        opcoes = opcoes or OpcoesAnalise()
+        with ThreadPoolExecutor(max_workers=self.max_paralelo, thread_name_prefix="portfolio-busca") as buscas:
+            futuros = {buscas.submit(self._buscar_e_analisar, project_id, opcoes): project_id for project_id in project_ids}
+            for futuro in as_completed(futuros):
+                project_id = futuros[futuro]
+                try:
+                    resultado, tempo = futuro.result()
+                    self.registro.salvar_resultado(resumo["execucao_id"], project_id, resultado)
+                    if self.historico is not None:
+                        self.historico.registrar(project_id, resultado, "portfolio", referencia=resumo["execucao_id"])
+                    estado = {"estado": "concluido", "tempo": round(tempo, 3), "resumo": resumir_analise(resultado)}
+                    resumo["concluidos"] += 1
+                except Exception as e:
+                    logger.error("Erro ao analisar o projeto %s no portfólio: %s", project_id, e)
+                    estado = {"estado": "erro", "erro": str(e)}
+                    resumo["com_erro"] += 1
+                resumo["projetos"][project_id] = estado
+                self.registro.salvar_resumo(resumo)
+
+        resumo["estado"] = "concluido"
+        resumo["concluido_em"] = datetime.now().isoformat(timespec="seconds")
+        self.registro.salvar_resumo(resumo)
+        return resumo
+
+    def _buscar_e_analisar(self, project_id: str, opcoes: OpcoesAnalise) -> tuple[dict, float]:
+        dados = self.projetos.pegar_tarefas_para_analise(project_id)
+        if not dados:
+            raise ValueError("Nenhuma tarefa encontrada para o projeto.")
+        inicio = time.perf_counter()
+        return self._analisar(project_id, dados, opcoes), time.perf_counter() - inicio
+
+    def _analisar(self, project_id: str, dados: list[dict], opcoes: OpcoesAnalise) -> dict:
+        if self.processos >= 2:
+            try:
+                return self._obter_pool().submit(_analisar_projeto, project_id, dados, opcoes).result()
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                # Dados ou opções que não podem ir para o processo filho: o pool continua válido.
+                logger.warning("Projeto %s não pôde ser enviado ao pool do portfólio, analisando no processo principal: %s", project_id, e)
+            except BrokenProcessPool as e:
+                logger.error("Erro no pool de processos do portfólio, analisando no processo principal: %s", e)
+                self._descartar_pool()
+        with self._lock_local:
+            if self._servico_local is None:
+                self._servico_local = AnaliseService()
+            return self._servico_local.analisar_cronograma(dados, project_id=project_id, opcoes=opcoes)
+
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn" evita herdar threads e sockets do servidor web no fork.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processos, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _descartar_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
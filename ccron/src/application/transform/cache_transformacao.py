@@ -0,0 +1,68 @@
+class CacheTransformacao:
+    """
+    Guarda resultados parciais da transformação de um cronograma para reaproveitá-los
+    na próxima versão do mesmo projeto.
+
+    O Passo 1 (limpeza e extração linha a linha) é indexado pela assinatura da linha
+    bruta. O Passo 3 (campos que dependem da hierarquia já propagada) é indexado pela
+    assinatura da linha após o 'ffill', de modo que só as linhas cujo contexto
+    hierárquico mudou são recalculadas.
+
+    Cada análise usa um cache próprio, criado a partir do da análise anterior:
+    os dicionários herdados só são lidos, e as entradas da execução corrente vão
+    para dicionários novos. Assim, duas análises simultâneas do mesmo projeto não
+    alteram o mesmo cache.
+
+    Args:
+        anterior: Cache da última transformação do mesmo projeto.
+    """
+    def __init__(self, anterior: "CacheTransformacao | None" = None):
+        self.passo1: dict[bytes, dict | None] = anterior.passo1 if anterior is not None else {}
+        self.passo3: dict[bytes, dict] = anterior.passo3 if anterior is not None else {}
+        self.estatisticas = self._estatisticas_vazias()
+
+    @staticmethod
+    def _estatisticas_vazias() -> dict:
+        return {
+            "passo1": {"reaproveitadas": 0, "recalculadas": 0},
+            "passo3": {"reaproveitadas": 0, "recalculadas": 0},
+        }
+
+    def iniciar_execucao(self):
+        """Zera os contadores e prepara os dicionários da execução corrente."""
+        self.estatisticas = self._estatisticas_vazias()
+        self._novo_passo1: dict[bytes, dict | None] = {}
+        self._novo_passo3: dict[bytes, dict] = {}
+
+    def finalizar_execucao(self):
+        """
+        Mantém apenas as entradas usadas na execução corrente, evitando que o cache
+        cresça indefinidamente com linhas de versões antigas.
+        """
+        self.passo1, self.passo3 = self._novo_passo1, self._novo_passo3
+        del self._novo_passo1, self._novo_passo3
+
+    def obter_passo1(self, chave: bytes) -> tuple[bool, dict | None]:
+        """Retorna (encontrado, item processado). O item é None para linhas descartadas."""
+        if chave in self.passo1:
+            self.estatisticas["passo1"]["reaproveitadas"] += 1
+            valor = self.passo1[chave]
+            self._novo_passo1[chave] = valor
+            return True, valor
+        self.estatisticas["passo1"]["recalculadas"] += 1
+        return False, None
+
+    def guardar_passo1(self, chave: bytes, valor: dict | None):
+        self._novo_passo1[chave] = valor
+
+    def obter_passo3(self, chave: bytes) -> dict | None:
+        valor = self.passo3.get(chave)
+        if valor is None:
+            self.estatisticas["passo3"]["recalculadas"] += 1
+            return None
+        self.estatisticas["passo3"]["reaproveitadas"] += 1
+        self._novo_passo3[chave] = valor
+        return valor
+
+    def guardar_passo3(self, chave: bytes, valor: dict):
+        self._novo_passo3[chave] = valor
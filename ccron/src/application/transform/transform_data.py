@@ -1,6 +1,8 @@
 from ccron.src.infrastructure.adapter.out.excel_data_adapter import ExcelDataAdapter
 from ccron.src.domain.ports.excel_data_adapter_interface import ExcelDataAdapterInterface
 from ccron.src.domain.ports.transform_data_interface import TransformDataInterface
+from ccron.src.domain.service.assinatura_linha import assinatura_linha
+from ccron.src.application.transform.cache_transformacao import CacheTransformacao
 
 import re
 from datetime import datetime
@@ -15,6 +17,8 @@ class TransformData(TransformDataInterface):
     limpeza de dados, geração de IDs hierárquicos, classificação de serviços e
     enriquecimento a partir de uma fonte de dados externa (planilha "De-Para").
     """
+    CAMPOS_PASSO3 = ("ID_", "Tipo_Servico", "Codificação", "Id_Codificacao")
+
     def __init__(self):
         """
         Inicializa o serviço de transformação, pré-carregando os dados de mapeamento.
@@ -289,7 +293,99 @@ class TransformData(TransformDataInterface):
 
         return item
 
-    def transformar_dados(self, dados: list[dict]) -> list[dict]:
+    def _processar_linha(self, item: dict) -> dict | None:
+        """
+        Executa o Passo 1 da transformação para uma única linha.
+
+        Limpa os dados e extrai os campos primários que dependem apenas da
+        própria linha. Informações hierárquicas como 'Cod_Bloco' ainda não são
+        propagadas.
+
+        Args:
+            item: O dicionário bruto da atividade.
+
+        Returns:
+            Uma cópia processada do item, ou None se a linha deve ser descartada.
+        """
+        item_processado = item.copy()
+        nome = str(item_processado.get("Nome", "")).strip()
+
+        if not nome:
+            return None
+
+        nome_lower = nome.lower()
+
+        if nome_lower == "nan" or 'loja' in nome_lower.split():
+            return None
+
+        item_processado["Nome"] = nome
+        item_processado["Predecessoras"] = str(item_processado.get("Predecessoras", "")).strip()
+
+        for col in ["Início", "Término", "Início_real", "Término_real"]:
+            item_processado[col] = self.convert_to_datetime_string(item_processado.get(col))
+
+        num_estrutura = item_processado.get("Número_da_estrutura_de_tópicos")
+        modulo_asc = item_processado.get("MÓDULO_ASC")
+        item_processado["ID_Modulo"] = self.get_modulo(num_estrutura, modulo_asc)
+
+        nivel = item_processado.get("Nível_da_estrutura_de_tópicos")
+        item_processado["Cod_Bloco"] = self.get_bloco(nome, nivel)
+
+        # Regra de negócio: Reseta o Cod_Bloco em linhas de resumo de Módulo
+        if "MÓDULO" in nome.upper():
+            item_processado['Cod_Bloco'] = None
+
+        item_processado["ID_Pavimento"] = self.get_pavimento(nome)
+        item_processado["Servicos"] = self.transform_service(nome)
+        item_processado['ÉInfra'] = self.get_infra(nome, nivel)
+
+        if nivel is not None:
+            for i in range(1, 8): item_processado[f"Nível_{i}"] = None
+            for i in range(int(nivel), 8):
+                item_processado[f"Nível_{i}"] = item_processado.get("Servicos")
+
+        item_processado["Duração"] = self.extrai_valor(item_processado.get("Duração"), r'(.+)d|dia')
+        item_processado["Trabalho"] = self.extrai_valor(item_processado.get("Trabalho"), r'(.+)h')
+        item_processado["Peso"] = self.extrai_valor(item_processado.get("Peso"), None)
+
+        return item_processado
+
+    def _calcular_campos_finais(self, item: dict):
+        """
+        Executa o Passo 3 da transformação para uma única linha (in-place).
+
+        Calcula os campos que dependem do contexto hierárquico já propagado no
+        Passo 2 e enriquece o item com a codificação do "De-Para".
+
+        Args:
+            item: O dicionário da atividade, já com 'ffill' aplicado.
+        """
+        id_modulo = item.get("ID_Modulo")
+        cod_bloco = item.get("Cod_Bloco")
+        id_pavimento = item.get("ID_Pavimento")
+
+        # Gera IDs e classificações que dependem dos dados preenchidos no Passo 2
+        item["ID_"] = self.get_id_geral(id_pavimento, cod_bloco, id_modulo)
+        item["Tipo_Servico"] = self.get_tipoServico(cod_bloco, id_pavimento)
+
+        # Enriquece o item com a codificação externa do "De-Para"
+        item = self._merge_de_para(item)
+
+        # Aplica as lógicas finais para gerar o ID de codificação definitivo
+        codificacao = item.get("Codificação")
+        item["Id_Codificacao"] = self.get_id_codificacao(item.get("ID_"), codificacao)
+
+        if item.get("Tipo_Servico") == "ASC":
+            item["Id_Codificacao"] = codificacao
+
+        # Regra de negócio específica para serviços de infraestrutura
+        if (item.get("ÉInfra") is True and
+            item.get("Nível_da_estrutura_de_tópicos") == 6 and
+            codificacao is not None and isinstance(codificacao, str) and
+            isinstance(cod_bloco, str)):
+            item["Id_Codificacao"] = codificacao.replace("XX", cod_bloco.replace(".", ""))
+
+    def transformar_dados(self, dados: list[dict], cache: CacheTransformacao | None = None) -> list[dict]:
         """
         Orquestra o pipeline completo de transformação dos dados do cronograma.
 
@@ -297,64 +393,42 @@ class TransformData(TransformDataInterface):
         entre os campos calculados sejam resolvidas corretamente (ex: o ID Geral
         depende do Cod_Bloco, que primeiro precisa ser preenchido com 'ffill').
 
+        Quando um `cache` é informado, os Passos 1 e 3 são reaproveitados para as
+        linhas cujo conteúdo (e, no Passo 3, cujo contexto hierárquico) não mudou
+        desde a última versão do cronograma.
+
         Args:
             dados: Uma lista de dicionários representando os dados brutos do cronograma.
+            cache: Cache opcional da transformação anterior do mesmo projeto.
 
         Returns:
             Uma lista de dicionários com os dados transformados e enriquecidos.
         """
         dados_finais = []
-        
+        if cache is not None:
+            cache.iniciar_execucao()
+
         # --- PASSO 1: Processamento inicial e extração de dados brutos, linha a linha. ---
-        # Nesta etapa, os dados são limpos e os campos primários são extraídos.
-        # Informações hierárquicas como 'Cod_Bloco' ainda não são propagadas.
         for item in dados:
-            item_processado = item.copy()
-            nome = str(item_processado.get("Nome", "")).strip()
-            
-            if not nome:
-                continue
-            
-            nome_lower = nome.lower()
-            
-            if nome_lower == "nan" or 'loja' in nome_lower.split():
-                continue
-            
-            item_processado["Nome"] = nome
-            item_processado["Predecessoras"] = str(item_processado.get("Predecessoras", "")).strip()
-
-            for col in ["Início", "Término", "Início_real", "Término_real"]:
-                item_processado[col] = self.convert_to_datetime_string(item_processado.get(col))
-            
-            num_estrutura = item_processado.get("Número_da_estrutura_de_tópicos")
-            modulo_asc = item_processado.get("MÓDULO_ASC")
-            item_processado["ID_Modulo"] = self.get_modulo(num_estrutura, modulo_asc)
+            if cache is None:
+                item_processado = self._processar_linha(item)
+            else:
+                chave = assinatura_linha(item)
+                encontrado, item_processado = cache.obter_passo1(chave)
+                if not encontrado:
+                    item_processado = self._processar_linha(item)
+                    cache.guardar_passo1(chave, item_processado and item_processado.copy())
+                elif item_processado is not None:
+                    item_processado = item_processado.copy()
 
-            nivel = item_processado.get("Nível_da_estrutura_de_tópicos")
-            item_processado["Cod_Bloco"] = self.get_bloco(nome, nivel)
-            
-            # Regra de negócio: Reseta o Cod_Bloco em linhas de resumo de Módulo
-            if "MÓDULO" in nome.upper():
-                item_processado['Cod_Bloco'] = None
-
-            item_processado["ID_Pavimento"] = self.get_pavimento(nome)
-            item_processado["Servicos"] = self.transform_service(nome)
-            item_processado['ÉInfra'] = self.get_infra(nome, nivel)
-
-            if nivel is not None:
-                for i in range(1, 8): item_processado[f"Nível_{i}"] = None
-                for i in range(int(nivel), 8):
-                    item_processado[f"Nível_{i}"] = item_processado.get("Servicos")
-            
-            item_processado["Duração"] = self.extrai_valor(item_processado.get("Duração"), r'(.+)d|dia')
-            item_processado["Trabalho"] = self.extrai_valor(item_processado.get("Trabalho"), r'(.+)h')
-            item_processado["Peso"] = self.extrai_valor(item_processado.get("Peso"), None)
-            
-            dados_finais.append(item_processado)
+            if item_processado is not None:
+                dados_finais.append(item_processado)
 
         # --- PASSO 2: Propagação de dados hierárquicos (ffill). ---
         # Com os dados iniciais extraídos, agora propagamos o contexto (bloco, infra)
         # para as atividades filhas que herdam essas características.
+        # A propagação segue a ordem das linhas, e não a árvore de tópicos: uma linha
+        # fora de qualquer bloco (ex: Pré-Projeto) herda o último bloco visto.
         self._apply_ffill_logic(dados_finais, 'Cod_Bloco')
         self._apply_ffill_logic(dados_finais, 'ÉInfra')
         
@@ -367,29 +441,20 @@ class TransformData(TransformDataInterface):
         # Com a estrutura de dados completa e preenchida, realizamos os cálculos
         # que dependem do contexto hierárquico.
         for item in dados_finais:
-            id_modulo = item.get("ID_Modulo")
-            cod_bloco = item.get("Cod_Bloco")
-            id_pavimento = item.get("ID_Pavimento")
-            
-            # Gera IDs e classificações que dependem dos dados preenchidos no Passo 2
-            item["ID_"] = self.get_id_geral(id_pavimento, cod_bloco, id_modulo)
-            item["Tipo_Servico"] = self.get_tipoServico(cod_bloco, id_pavimento)
+            if cache is None:
+                self._calcular_campos_finais(item)
+                continue
+
+            chave = assinatura_linha(item)
+            campos = cache.obter_passo3(chave)
+            if campos is None:
+                self._calcular_campos_finais(item)
+                campos = {c: item[c] for c in self.CAMPOS_PASSO3 if c in item}
+                cache.guardar_passo3(chave, campos)
+            else:
+                item.update(campos)
 
-            # Enriquece o item com a codificação externa do "De-Para"
-            item = self._merge_de_para(item)
+        if cache is not None:
+            cache.finalizar_execucao()
 
-            # Aplica as lógicas finais para gerar o ID de codificação definitivo
-            codificacao = item.get("Codificação")
-            item["Id_Codificacao"] = self.get_id_codificacao(item.get("ID_"), codificacao)
-            
-            if item.get("Tipo_Servico") == "ASC":
-                item["Id_Codificacao"] = codificacao
-            
-            # Regra de negócio específica para serviços de infraestrutura
-            if (item.get("ÉInfra") is True and 
-                item.get("Nível_da_estrutura_de_tópicos") == 6 and
-                codificacao is not None and isinstance(codificacao, str) and
-                isinstance(cod_bloco, str)):
-                item["Id_Codificacao"] = codificacao.replace("XX", cod_bloco.replace(".", ""))
-
-        return dados_finais
\ No newline at end of file
+        return dados_finais
@@ -2,5 +2,22 @@ from abc import ABC, abstractmethod
 
 class AnaliseServiceInterface(ABC):
     @abstractmethod
-    def analisar_cronograma(self, dados: list[dict]) -> dict:
-        pass
\ No newline at end of file
+    def analisar_cronograma(self, dados: list[dict], project_id: str | None = None, opcoes=None,
+                            perfilador=None) -> dict:
+        pass
+
+    @abstractmethod
+    def simular_atrasos(self, dados: list[dict], atrasos: dict, opcoes=None) -> dict:
+        pass
+
+    @abstractmethod
+    def versao_cronograma(self, dados: list[dict], opcoes=None):
+        pass
+
+    @abstractmethod
+    def comparar_cronogramas(self, anterior, atual) -> dict:
+        pass
+
+    @abstractmethod
+    def versao_referencia(self) -> str:
+        pass
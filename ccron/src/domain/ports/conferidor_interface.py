@@ -6,6 +6,27 @@ class ConferidorInterface(ABC):
     def get_servicos_simultaneos(dados: list[dict]) -> list:        
         pass
     
+    @abstractmethod
+    def filtrar_tarefas_criticas(self, dados: list[dict]) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def agrupar_por_servico(self, dados: list[dict]) -> dict[str, list[dict]]:
+        pass
+
+    @abstractmethod
+    def analisar_servico(self, tarefas: list[dict], gap_threshold: int = 5,
+                         calendario=None) -> tuple[list | bool, list | bool]:
+        pass
+
+    @abstractmethod
+    def encontrar_sobreposicoes(self, dados: list[dict], service: str) -> list | bool:
+        pass
+
+    @abstractmethod
+    def encontrar_gaps(self, dados: list[dict], service: str, gap_threshold: int, calendario=None) -> list | bool:
+        pass
+
     @abstractmethod
     def get_macrofluxo(self, dados: list[dict]) -> list:
         pass
@@ -14,6 +35,7 @@ class ConferidorInterface(ABC):
     def format_tabela_list_dict(self,
         lista_overlap: List[list], 
         lista_long_gaps: List[list], 
-        dados_projeto: List[Dict]
+        dados_projeto: List[Dict],
+        visoes=None
     ) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
         pass
\ No newline at end of file
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+
+class HistoricoAnalisesInterface(ABC):
+    @abstractmethod
+    def registrar(self, project_id: str, resumo: dict, origem: str, versao_referencia: str | None = None,
+                  referencia: str | None = None, resultado: dict | None = None) -> int:
+        pass
+
+    @abstractmethod
+    def listar(self, project_id: str, desde: str | None = None, ate: str | None = None,
+               limite: int | None = None, antes_de: int | None = None) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def contagens(self, project_id: str, primeira: int, ultima: int) -> dict[int, dict[str, int]]:
+        pass
+
+    @abstractmethod
+    def analise(self, project_id: str, analise_id: int) -> dict | None:
+        pass
+
+    @abstractmethod
+    def resultado(self, project_id: str, analise_id: int) -> dict | None:
+        pass
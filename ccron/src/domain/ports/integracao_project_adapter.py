@@ -11,4 +11,12 @@ class IntegracaoProjectAdapterInterface(ABC):
 
     @abstractmethod
     def pegar_tarefas_project_data(self, project_id: str):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def pegar_tarefas_para_analise(self, project_id: str) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def sincronizar_projeto(self, project_id: str) -> dict:
+        pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterable
+
+class MotorRegrasInterface(ABC):
+    @abstractmethod
+    def avaliar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, list]:
+        pass
+
+    @abstractmethod
+    def contar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, int]:
+        pass
+
+    @abstractmethod
+    def avaliar_linha(self, item: dict, hoje: datetime) -> tuple[str, ...]:
+        pass
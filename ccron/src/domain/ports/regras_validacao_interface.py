@@ -87,13 +87,17 @@ class RegrasValidacaoInterface(ABC):
         pass
     
     @abstractmethod
-    def verificar_condicoes(self, tasks: list[dict]) -> list:
+    def verificar_condicoes(self, tasks: list[dict], arvore=None, visoes=None) -> list:
         pass
     
     @abstractmethod
-    def verificar_modulo(self, tasks: list[dict]) -> list:
+    def verificar_modulo(self, tasks: list[dict], arvore=None) -> list:
         pass
     
     @abstractmethod
     def verificar_preenchimento(self, tasks: list[dict]) -> list:
+        pass
+    
+    @abstractmethod
+    def contar_preenchimento(self, tasks: list[dict]) -> list:
         pass
\ No newline at end of file
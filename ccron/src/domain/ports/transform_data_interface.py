@@ -2,5 +2,5 @@ from abc import ABC, abstractmethod
 
 class TransformDataInterface(ABC):
     @abstractmethod
-    def transformar_dados(self, dados: list[dict]) -> list[dict]:
+    def transformar_dados(self, dados: list[dict], cache=None) -> list[dict]:
         pass
\ No newline at end of file
@@ -0,0 +1,126 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Iterable
+
+COLUNA_ESTRUTURA = "Número_da_estrutura_de_tópicos"
+
+
+class ArvoreEstrutura:
+    """
+    Índice da estrutura de tópicos (EDT) de um cronograma.
+
+    Os números de estrutura ("1.2.3") são convertidos uma única vez em tuplas de
+    inteiros e ordenados. Como toda a subárvore de um tópico ocupa um intervalo
+    contíguo nessa ordenação, consultas por prefixo, filhos e subárvore são feitas
+    com busca binária, em O(log n + tamanho da subárvore), sem varrer a lista de
+    tarefas nem repetir o `split` das strings.
+
+    As consultas retornam as tarefas (ou suas posições na lista original) sempre
+    na ordem em que aparecem no cronograma.
+    """
+    def __init__(self, tarefas: list[dict]):
+        self.tarefas = tarefas
+        self.chaves_por_posicao: list[tuple[int, ...] | None] = []
+
+        itens = []
+        for posicao, tarefa in enumerate(tarefas):
+            chave = self.converter_numero(tarefa.get(COLUNA_ESTRUTURA))
+            self.chaves_por_posicao.append(chave)
+            if chave is not None:
+                itens.append((chave, posicao))
+        itens.sort()
+
+        self._chaves = [chave for chave, _ in itens]
+        self._posicoes = [posicao for _, posicao in itens]
+        self._filhos: dict[tuple[int, ...], list[int]] | None = None
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def converter_numero(numero) -> tuple[int, ...] | None:
+        """
+        Converte um número de estrutura de tópicos em uma tupla de inteiros.
+
+        Args:
+            numero: O valor da coluna (ex: "1.2.3").
+
+        Returns:
+            A tupla (ex: (1, 2, 3)) ou None se o valor não for um número de
+            estrutura válido.
+        """
+        if numero is None:
+            return None
+        partes = str(numero).strip().split(".")
+        if not all(parte.isdecimal() for parte in partes):
+            return None
+        return tuple(int(parte) for parte in partes)
+
+    def _intervalo(self, prefixo: tuple[int, ...], incluir_raiz: bool) -> tuple[int, int]:
+        inicio = bisect_left(self._chaves, prefixo) if incluir_raiz else bisect_right(self._chaves, prefixo)
+        fim = bisect_left(self._chaves, prefixo[:-1] + (prefixo[-1] + 1,))
+        return inicio, max(inicio, fim)
+
+    def posicoes_subarvore(self, prefixo: tuple[int, ...] | str, incluir_raiz: bool = True) -> list[int]:
+        """
+        Retorna as posições (na lista original) das tarefas da subárvore de um tópico.
+
+        Args:
+            prefixo: O tópico raiz, como tupla ou string ("1.1.1").
+            incluir_raiz: Se False, retorna apenas os descendentes do tópico.
+        """
+        if isinstance(prefixo, str):
+            prefixo = self.converter_numero(prefixo)
+        if not prefixo:
+            return []
+        inicio, fim = self._intervalo(prefixo, incluir_raiz)
+        return sorted(self._posicoes[inicio:fim])
+
+    def subarvore(self, prefixo: tuple[int, ...] | str, incluir_raiz: bool = True) -> list[dict]:
+        """Retorna as tarefas da subárvore de um tópico, na ordem do cronograma."""
+        return [self.tarefas[posicao] for posicao in self.posicoes_subarvore(prefixo, incluir_raiz)]
+
+    def buscar(self, numero: tuple[int, ...] | str) -> dict | None:
+        """Retorna a primeira tarefa com o número de estrutura informado."""
+        chave = self.converter_numero(numero) if isinstance(numero, str) else numero
+        if not chave:
+            return None
+        indice = bisect_left(self._chaves, chave)
+        if indice < len(self._chaves) and self._chaves[indice] == chave:
+            return self.tarefas[self._posicoes[indice]]
+        return None
+
+    def pai(self, numero: tuple[int, ...] | str) -> dict | None:
+        """Retorna a tarefa-resumo imediatamente acima do tópico informado."""
+        chave = self.converter_numero(numero) if isinstance(numero, str) else numero
+        if not chave or len(chave) < 2:
+            return None
+        return self.buscar(chave[:-1])
+
+    def filhos(self, numero: tuple[int, ...] | str) -> list[dict]:
+        """Retorna as tarefas no nível imediatamente abaixo do tópico informado."""
+        chave = self.converter_numero(numero) if isinstance(numero, str) else numero
+        if not chave:
+            return []
+        if self._filhos is None:
+            self._filhos = {}
+            for chave_filho, posicao in zip(self._chaves, self._posicoes):
+                self._filhos.setdefault(chave_filho[:-1], []).append(posicao)
+        return [self.tarefas[posicao] for posicao in sorted(self._filhos.get(chave, []))]
+
+    def posicoes_nas_subarvores(self, subarvores: Iterable[tuple[tuple[int, ...], bool]]) -> set[int]:
+        """
+        Retorna o conjunto de posições cobertas pelas subárvores informadas.
+
+        Args:
+            subarvores: Pares (prefixo, incluir_raiz) das subárvores.
+
+        Returns:
+            As posições das tarefas que pertencem a alguma das subárvores, para
+            que o chamador possa tomar o complemento em uma única varredura.
+        """
+        cobertas = set()
+        for prefixo, incluir_raiz in subarvores:
+            if not prefixo:
+                continue
+            inicio, fim = self._intervalo(prefixo, incluir_raiz)
+            cobertas.update(self._posicoes[inicio:fim])
+        return cobertas
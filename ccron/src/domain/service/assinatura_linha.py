@@ -0,0 +1,25 @@
+import hashlib
+from typing import Iterable
+
+
+def assinatura_linha(linha: dict, colunas: Iterable[str] | None = None) -> bytes:
+    """
+    Calcula a impressão digital (hash) do conteúdo de uma linha do cronograma.
+
+    A assinatura é estável entre execuções do processo (não depende do `hash()`
+    randomizado do Python) e trata valores `NaN` de forma determinística, o que
+    permite comparar versões diferentes do mesmo cronograma linha a linha.
+
+    Args:
+        linha: O dicionário da tarefa.
+        colunas: Colunas a considerar. Se omitido, todas as colunas da linha
+                 entram na assinatura, na ordem em que aparecem.
+
+    Returns:
+        Os bytes do hash BLAKE2b (16 bytes) da linha.
+    """
+    if colunas is None:
+        conteudo = repr(tuple(linha.items()))
+    else:
+        conteudo = repr(tuple((coluna, linha.get(coluna)) for coluna in colunas))
+    return hashlib.blake2b(conteudo.encode("utf-8", "surrogatepass"), digest_size=16).digest()
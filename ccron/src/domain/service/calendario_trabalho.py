@@ -0,0 +1,85 @@
+from ccron.src.domain.service.motor_regras import converter_data
+
+from typing import Iterable
+
+import numpy as np
+
+# Ordinal (datetime.toordinal) de 1970-01-01, a origem do datetime64.
+_ORDINAL_EPOCA = 719163
+
+
+class CalendarioTrabalho:
+    """
+    Calendário de dias úteis usado para medir hiatos entre tarefas.
+
+    Envolve um `np.busdaycalendar`, de modo que a contagem de dias úteis é feita
+    de forma vetorizada sobre arrays de datas com `np.busday_count`.
+
+    Args:
+        dias_uteis: Máscara de segunda a domingo (ex: "1111100" para segunda a sexta).
+                    O padrão "1111111" conta dias corridos, como o cálculo original.
+        feriados: Datas não úteis, em "dd/mm/aaaa" ou "aaaa-mm-dd".
+    """
+    def __init__(self, dias_uteis: str = "1111111", feriados: Iterable[str] = ()):
+        self.dias_uteis = dias_uteis
+        self.feriados = tuple(sorted(self._converter_feriado(feriado) for feriado in feriados))
+        self._calendario = np.busdaycalendar(
+            weekmask=dias_uteis, holidays=np.array(self.feriados, dtype="datetime64[D]"))
+        self._origem = np.busday_offset(np.datetime64("1970-01-01"), 0, roll="forward", busdaycal=self._calendario)
+
+    def __reduce__(self):
+        # O np.busdaycalendar não é serializável: o calendário é remontado a partir
+        # da máscara e dos feriados (ex: ao ir para o pool de processos do portfólio).
+        return (type(self), (self.dias_uteis, self.feriados))
+
+    @staticmethod
+    def _converter_feriado(feriado: str) -> str:
+        try:
+            return converter_data(feriado).strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            return str(np.datetime64(feriado, "D"))
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "CalendarioTrabalho":
+        """Monta o calendário a partir de {"dias_uteis": "1111100", "feriados": [...]}."""
+        return cls(dias_uteis=dados.get("dias_uteis", "1111111"), feriados=dados.get("feriados", ()))
+
+    @property
+    def chave(self) -> tuple:
+        """Identifica o calendário, para compor assinaturas de cache."""
+        return (self.dias_uteis, self.feriados)
+
+    @staticmethod
+    def ordinais_para_datas(ordinais) -> np.ndarray:
+        """Converte ordinais de `date.toordinal()` em um array datetime64[D]."""
+        return (np.asarray(ordinais, dtype=np.int64) - _ORDINAL_EPOCA).astype("datetime64[D]")
+
+    def para_dias_uteis(self, ordinais) -> np.ndarray:
+        """
+        Numera as datas em dias úteis, para somar atrasos e latências com inteiros.
+
+        Datas em dias não úteis contam como o próximo dia útil.
+        """
+        datas = np.busday_offset(self.ordinais_para_datas(ordinais), 0, roll="forward", busdaycal=self._calendario)
+        return np.busday_count(self._origem, datas, busdaycal=self._calendario)
+
+    def de_dias_uteis(self, dias) -> np.ndarray:
+        """Inverso de `para_dias_uteis`: converte a numeração em datas (datetime64[D])."""
+        return np.busday_offset(self._origem, np.asarray(dias, dtype=np.int64), busdaycal=self._calendario)
+
+    def dias_entre(self, terminos: np.ndarray, inicios: np.ndarray) -> np.ndarray:
+        """
+        Conta os dias úteis estritamente entre cada término e o início seguinte.
+
+        Args:
+            terminos: Datas de término (datetime64[D]).
+            inicios: Datas de início correspondentes (datetime64[D]).
+
+        Returns:
+            Array de inteiros, com zero quando o início não é posterior ao término.
+        """
+        dias = np.busday_count(terminos + np.timedelta64(1, "D"), inicios, busdaycal=self._calendario)
+        return np.maximum(dias, 0)
+
+
+CALENDARIO_CORRIDO = CalendarioTrabalho()
@@ -0,0 +1,76 @@
+from typing import Iterable
+
+
+class CasadorPalavras:
+    """
+    Autômato de Aho-Corasick para procurar várias palavras-chave de uma vez.
+
+    A busca ignora maiúsculas e minúsculas (`str.lower`), mas distingue acentos.
+    As palavras são compiladas em um único autômato, de modo que cada nome é
+    percorrido uma vez, qualquer que seja a quantidade de palavras. O resultado é guardado por nome distinto, já que os
+    cronogramas repetem muito os mesmos nomes de tarefa.
+
+    Args:
+        palavras: As palavras-chave a procurar.
+        max_cache: Quantidade máxima de nomes guardados no cache.
+    """
+    def __init__(self, palavras: Iterable[str], max_cache: int = 65536):
+        self.palavras = tuple(palavras)
+        self.max_cache = max_cache
+        self._cache: dict[str, frozenset[str]] = {}
+
+        # Cada estado é um dicionário de transições; as saídas guardam os índices das palavras.
+        self._transicoes: list[dict[str, int]] = [{}]
+        self._saidas: list[list[int]] = [[]]
+        for indice, palavra in enumerate(self.palavras):
+            normalizada = palavra.lower()
+            estado = 0
+            for caractere in normalizada:
+                proximo = self._transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(self._transicoes)
+                    self._transicoes[estado][caractere] = proximo
+                    self._transicoes.append({})
+                    self._saidas.append([])
+                estado = proximo
+            if normalizada:
+                self._saidas[estado].append(indice)
+
+        self._falhas = [0] * len(self._transicoes)
+        fila = list(self._transicoes[0].values())
+        for estado in fila:
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falhas[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falhas[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falhas[proximo]]
+
+    def _varrer(self, texto: str) -> frozenset[str]:
+        encontradas = set()
+        transicoes, falhas, saidas = self._transicoes, self._falhas, self._saidas
+        estado = 0
+        for caractere in texto:
+            while estado and caractere not in transicoes[estado]:
+                estado = falhas[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            for indice in saidas[estado]:
+                encontradas.add(self.palavras[indice])
+        return frozenset(encontradas)
+
+    def encontrar(self, texto) -> frozenset[str]:
+        """Retorna as palavras-chave (na forma original) presentes no texto."""
+        chave = str(texto)
+        encontradas = self._cache.get(chave)
+        if encontradas is None:
+            encontradas = self._varrer(chave.lower())
+            if len(self._cache) >= self.max_cache:
+                self._cache.clear()
+            self._cache[chave] = encontradas
+        return encontradas
+
+    def contem_alguma(self, texto) -> bool:
+        """Indica se o texto contém pelo menos uma das palavras-chave."""
+        return bool(self.encontrar(texto))
@@ -1,11 +1,16 @@
 from ccron.src.domain.ports.conferidor_interface import ConferidorInterface
 from ccron.src.domain.ports.excel_binary_data_adapter_interface import ExcelDataAdapterInterface
 from ccron.src.infrastructure.adapter.out.excel_binary_data_adapter import ExcelDataAdapter
+from ccron.src.domain.service.motor_regras import converter_data
+from ccron.src.domain.service.calendario_trabalho import CalendarioTrabalho, CALENDARIO_CORRIDO
+from ccron.src.domain.service.grafo_predecessoras import interpretar_predecessoras
+from ccron.src.domain.service.visoes_analise import VisoesAnalise, eh_tarefa_critica
 
-import re
+import heapq
 import datetime
 from typing import Optional, List, Dict, Tuple
-from itertools import combinations
+
+import numpy as np
 
 class Conferidor(ConferidorInterface):
     """
@@ -16,18 +21,28 @@ class Conferidor(ConferidorInterface):
     def __init__(self):
         self.excel_data_adapter: ExcelDataAdapterInterface = ExcelDataAdapter()
         self.dados_eap = self._puxar_eap_list_dict()
+        self.indice_eap = self._indexar_eap(self.dados_eap)
 
-    def get_servicos_simultaneos(self, dados: list[dict], gap_threshold: int = 5) -> tuple[list, list]:
+    def get_servicos_simultaneos(self, dados: list[dict], gap_threshold: int = 5,
+                                 calendario: CalendarioTrabalho | None = None,
+                                 limites_servico: dict[str, int] | None = None,
+                                 visoes: VisoesAnalise | None = None) -> tuple[list, list]:
         """
         Orquestra a análise completa do cronograma para encontrar sobreposições e gaps.
 
-        A função primeiro aplica um filtro para selecionar apenas as tarefas relevantes
-        e depois itera sobre todos os serviços únicos para executar as verificações.
+        A função primeiro aplica um filtro para selecionar apenas as tarefas relevantes,
+        agrupa-as por serviço em uma única passada e executa as verificações em cada grupo.
 
         Args:
             dados: A lista completa de dicionários com os dados do cronograma.
             gap_threshold: O número de dias para considerar um hiato como "longo".
                            O padrão é 5.
+            calendario: Calendário de trabalho usado para contar os dias de hiato.
+                        Por padrão, dias corridos.
+            limites_servico: Limite de hiato específico por serviço, no lugar de
+                             `gap_threshold`.
+            visoes: Visões da análise em andamento; quando informadas, os grupos
+                    de tarefas críticas por serviço vêm delas.
 
         Returns:
             Uma tupla contendo duas listas:
@@ -35,108 +50,180 @@ class Conferidor(ConferidorInterface):
             - A segunda com os detalhes dos gaps encontrados.
         """
         lista_overlap, lista_long_gaps = [], []
-        
-        # Extrai os serviços únicos do conjunto de dados completo.
-        servicos_unicos = set(item.get('Servicos') for item in dados if item.get('Servicos'))
 
         # Aplica um filtro de negócio para focar a análise apenas nas tarefas críticas.
-        dados_filtrados = [
-            item for item in dados
-            if (
-                (item.get("ÉInfra") and item.get("Nível_da_estrutura_de_tópicos") == 6) or
-                (item.get("Tipo_Servico") == "SUPRA") or
-                (item.get("Tipo_Servico") == "ASC" and item.get("Nível_da_estrutura_de_tópicos") == 7)
-            )
-        ]
+        if visoes is not None:
+            grupos = visoes.servicos_criticos
+        else:
+            grupos = self.agrupar_por_servico(self.filtrar_tarefas_criticas(dados))
 
-        # Itera sobre cada serviço para realizar as verificações.
-        for servico in servicos_unicos:
-            overlap = self.encontrar_sobreposicoes(dados_filtrados, servico)
-            long_gaps = self.encontrar_gaps(dados_filtrados, servico, gap_threshold)
+        limites_servico = limites_servico or {}
+        for servico, tarefas in grupos.items():
+            overlap, long_gaps = self.analisar_servico(
+                tarefas, limites_servico.get(servico, gap_threshold), calendario)
 
             # Agrega os resultados, mantendo a lógica de extração original.
             if overlap:
                 for item in overlap:
-                    lista_overlap.append([item[0], item[1]]) 
-                
+                    lista_overlap.append([item[0], item[1]])
+
             if long_gaps:
                 lista_long_gaps.extend(long_gaps)
-                    
+
         return lista_overlap, lista_long_gaps
-    
-    def encontrar_sobreposicoes(self, dados: list[dict], service: str) -> list | bool:
+
+    def agrupar_por_servico(self, dados: list[dict]) -> dict[str, list[dict]]:
         """
-        Identifica e agrupa todas as ocorrências de um serviço que possuem datas sobrepostas.
-        (Documentação completa omitida para brevidade, usar a da resposta anterior)
+        Agrupa as tarefas pelo campo 'Servicos', na ordem em que cada serviço aparece.
+        Tarefas sem serviço são ignoradas.
         """
-        service_list = [item for item in dados if item.get('Servicos') == service]
-        
-        if len(service_list) < 2:
-            return False
-            
-        pares = combinations(service_list, 2)
-        overlaps_set = set()
-        
-        for p1, p2 in pares:
-            id1, id2 = p1.get('Id'), p2.get('Id')
+        grupos: dict[str, list[dict]] = {}
+        for item in dados:
+            servico = item.get('Servicos')
+            if servico:
+                grupos.setdefault(servico, []).append(item)
+        return grupos
+
+    def filtrar_tarefas_criticas(self, dados: list[dict]) -> list[dict]:
+        """
+        Seleciona as tarefas críticas para a análise de sobreposições e gaps.
+
+        São consideradas críticas as tarefas de infraestrutura no nível 6, as
+        tarefas SUPRA e as tarefas ASC no nível 7.
+        """
+        return [item for item in dados if eh_tarefa_critica(item)]
+
+    @staticmethod
+    def _intervalos(tarefas: list[dict]) -> list[tuple[int, int, int]]:
+        """
+        Converte as datas das tarefas em ordinais (dias), uma única vez por tarefa.
+
+        Returns:
+            Tuplas (início, término, posição na lista) das tarefas com as duas datas
+            válidas, na ordem original. Tarefas com data inválida são ignoradas.
+        """
+        intervalos = []
+        for posicao, tarefa in enumerate(tarefas):
             try:
-                inicio1 = datetime.datetime.strptime(p1.get('Início'), '%d/%m/%Y')
-                termino1 = datetime.datetime.strptime(p1.get('Término'), '%d/%m/%Y')
-                inicio2 = datetime.datetime.strptime(p2.get('Início'), '%d/%m/%Y')
-                termino2 = datetime.datetime.strptime(p2.get('Término'), '%d/%m/%Y')
+                inicio = converter_data(tarefa.get('Início')).toordinal()
+                termino = converter_data(tarefa.get('Término')).toordinal()
             except (ValueError, TypeError):
                 continue
-            
-            if (inicio1 < termino2) and (inicio2 < termino1):
-                overlaps_set.add(tuple(sorted([id1, id2])))
-        
+            intervalos.append((inicio, termino, posicao))
+        return intervalos
+
+    @staticmethod
+    def _sobreposicoes(tarefas: list[dict], intervalos: list[tuple[int, int, int]]) -> list | bool:
+        """
+        Encontra os pares de tarefas com datas sobrepostas por varredura (sweep line).
+
+        As tarefas são percorridas em ordem de início, mantendo em um heap as que
+        ainda estão "abertas" (término maior que o início atual). Cada tarefa só é
+        comparada com as abertas, em O(k log k + sobreposições).
+        """
+        abertas: list[tuple[int, int, int]] = []
+        overlaps_set = set()
+
+        for inicio, termino, posicao in sorted(intervalos):
+            # Ninguém que terminou até o início atual pode sobrepor esta ou as próximas tarefas.
+            while abertas and abertas[0][0] <= inicio:
+                heapq.heappop(abertas)
+            id_atual = tarefas[posicao].get('Id')
+            for _, inicio_aberta, posicao_aberta in abertas:
+                if inicio_aberta < termino:
+                    overlaps_set.add(tuple(sorted([tarefas[posicao_aberta].get('Id'), id_atual])))
+            heapq.heappush(abertas, (termino, inicio, posicao))
+
         if overlaps_set:
             total_overlaps = len(overlaps_set)
-            return [[o[0], o[1], total_overlaps] for o in overlaps_set]
-        
+            return [[o[0], o[1], total_overlaps] for o in sorted(overlaps_set)]
+
         return False
 
-    def encontrar_gaps(self, dados: list[dict], service: str, gap_threshold: int) -> list | bool:
+    @staticmethod
+    def _gaps(tarefas: list[dict], intervalos: list[tuple[int, int, int]], gap_threshold: int,
+              calendario: CalendarioTrabalho | None = None) -> list | bool:
         """
-        Encontra e mede os hiatos (gaps) entre tarefas consecutivas de um mesmo serviço.
-        (Documentação completa omitida para brevidade, usar a da resposta anterior)
+        Mede os hiatos entre tarefas consecutivas, ordenadas pelo término.
+
+        O hiato é a quantidade de dias úteis do calendário estritamente entre o
+        término de uma tarefa e o início da seguinte, calculada de uma vez para
+        todos os pares do serviço.
         """
-        service_tasks_raw = [item for item in dados if item.get('Servicos') == service]
+        # Ordenação estável: tarefas com o mesmo término mantêm a ordem original.
+        ordenados = sorted(intervalos, key=lambda intervalo: intervalo[1])
 
-        service_tasks_parsed = []
-        for task in service_tasks_raw:
-            try:
-                task['inicio_dt'] = datetime.datetime.strptime(task.get('Início'), '%d/%m/%Y')
-                task['termino_dt'] = datetime.datetime.strptime(task.get('Término'), '%d/%m/%Y')
-                service_tasks_parsed.append(task)
-            except (ValueError, TypeError):
-                continue
+        if len(ordenados) < 2:
+            return False
 
-        service_tasks = sorted(service_tasks_parsed, key=lambda x: x['termino_dt'])
+        calendario = calendario or CALENDARIO_CORRIDO
+        inicios = calendario.ordinais_para_datas([intervalo[0] for intervalo in ordenados])
+        terminos = calendario.ordinais_para_datas([intervalo[1] for intervalo in ordenados])
+        gaps = calendario.dias_entre(terminos[:-1], inicios[1:])
 
-        if len(service_tasks) < 2:
+        indices = np.flatnonzero(gaps > gap_threshold)
+        if not indices.size:
             return False
 
-        long_gaps = []
-        total_gap_acumulado = 0
+        acumulados = np.cumsum(gaps[indices])
+        return [
+            [
+                tarefas[ordenados[indice][2]].get('Id'),
+                tarefas[ordenados[indice + 1][2]].get('Id'),
+                int(gaps[indice]),
+                int(acumulado),
+            ]
+            for indice, acumulado in zip(indices.tolist(), acumulados)
+        ]
+
+    def analisar_servico(self, tarefas: list[dict], gap_threshold: int = 5,
+                         calendario: CalendarioTrabalho | None = None) -> tuple[list | bool, list | bool]:
+        """
+        Encontra sobreposições e gaps entre as tarefas de um único serviço.
 
-        for i in range(len(service_tasks) - 1):
-            current_task = service_tasks[i]
-            next_task = service_tasks[i + 1]
-            
-            gap_days = (next_task['inicio_dt'] - current_task['termino_dt']).days - 1
-            gap_days = max(0, gap_days)
-
-            if gap_days > gap_threshold:
-                total_gap_acumulado += gap_days
-                long_gaps.append([
-                    current_task.get('Id'), 
-                    next_task.get('Id'), 
-                    gap_days,
-                    total_gap_acumulado
-                ])
-
-        return long_gaps if long_gaps else False
+        As datas são convertidas uma vez e reaproveitadas pelas duas verificações.
+
+        Args:
+            tarefas: As tarefas do serviço (já agrupadas).
+            gap_threshold: O número de dias para considerar um hiato como "longo".
+            calendario: Calendário de trabalho para contar os dias de hiato.
+
+        Returns:
+            A tupla (sobreposições, gaps), com os mesmos formatos de
+            `encontrar_sobreposicoes` e `encontrar_gaps`.
+        """
+        intervalos = self._intervalos(tarefas)
+        overlap = self._sobreposicoes(tarefas, intervalos) if len(tarefas) >= 2 else False
+        return overlap, self._gaps(tarefas, intervalos, gap_threshold, calendario)
+
+    def encontrar_sobreposicoes(self, dados: list[dict], service: str) -> list | bool:
+        """
+        Identifica e agrupa todas as ocorrências de um serviço que possuem datas sobrepostas.
+
+        Duas tarefas se sobrepõem quando cada uma começa antes do término da outra.
+
+        Returns:
+            Uma lista [id1, id2, total de pares do serviço] por par sobreposto, ou
+            False se não houver sobreposição.
+        """
+        service_list = [item for item in dados if item.get('Servicos') == service]
+
+        if len(service_list) < 2:
+            return False
+
+        return self._sobreposicoes(service_list, self._intervalos(service_list))
+
+    def encontrar_gaps(self, dados: list[dict], service: str, gap_threshold: int,
+                       calendario: CalendarioTrabalho | None = None) -> list | bool:
+        """
+        Encontra e mede os hiatos (gaps) entre tarefas consecutivas de um mesmo serviço.
+
+        Returns:
+            Uma lista [id atual, id seguinte, dias de hiato, hiato acumulado] por
+            hiato maior que `gap_threshold`, ou False se não houver.
+        """
+        service_tasks = [item for item in dados if item.get('Servicos') == service]
+        return self._gaps(service_tasks, self._intervalos(service_tasks), gap_threshold, calendario)
     
     def get_macrofluxo(self, dados_baseline: List[Dict]) -> List[Dict]:
         baseline_processada, mapa_indice_servico = self._preparar_baseline(dados_baseline)
@@ -159,29 +246,13 @@ class Conferidor(ConferidorInterface):
 
         for r in dados_p1_final:
             n = r.get('Servicos')
-            ep_raw = [item for item in self.dados_eap if item.get('Servicos') == n]
-            l_pre_eap = list(set(item.get('Pred') for item in ep_raw if item.get('Pred')))
-            l_t_eap = list(set(item.get('Tipo') for item in ep_raw if item.get('Tipo')))
-            
-            l_tipo_eap, l_off_eap = [], []
-            for ll in l_t_eap:
-                try:
-                    lx = ll.split("+"); l0 = lx[0]; l11 = lx[1]
-                    if l11.endswith("d"): l11 = l11[:-1]
-                    l1 = int(l11); l_tipo_eap.append(l0); l_off_eap.append(l1)
-                except:
-                    try:
-                        lx = ll.split("-"); l0 = lx[0]; l11 = lx[1]
-                        if l11.endswith("d"): l11 = l11[:-1]
-                        l1 = int(l11); l_tipo_eap.append(l0); l_off_eap.append(-l1) 
-                    except:
-                        l_tipo_eap.append(ll); l_off_eap.append(0)
+            # Cópia por linha: o dicionário vai para a resposta junto de cada erro.
+            dic_pred_eap = dict(self.indice_eap.get(n, {}))
 
             l_pre_bas = r.get('predeServ', [])
             l_tipo_bas = r.get('tipo', [])
             l_off_bas = r.get('offset', [])
 
-            dic_pred_eap = {pre: (tip, off) for pre, tip, off in zip(l_pre_eap, l_tipo_eap, l_off_eap)}
             dic_pred_bas = {pre: (tip, off) for pre, tip, off in zip(l_pre_bas, l_tipo_bas, l_off_bas)}
             
             t1, t2, tt, teste_red = False, False, False, False
@@ -216,7 +287,7 @@ class Conferidor(ConferidorInterface):
                     dic_erro["PredecessoraEAP"].append(dic_pred_eap); dic_erro["PredecessoraBAS"].append(dic_pred_bas)
 
             for pre in l_pre_bas:
-                if pre != "Não Encontrado" and pre not in l_pre_eap and not teste_red:
+                if pre != "Não Encontrado" and pre not in dic_pred_eap and not teste_red:
                     dic_erro["Id"].append(r.get("index")); dic_erro["Servicos"].append(n)
                     dic_erro["Descrição"].append(f"Predecessora {pre} adicionada ao Serviço {n}")
                     dic_erro["TipoErro"].append("Adição")
@@ -232,7 +303,8 @@ class Conferidor(ConferidorInterface):
     def format_tabela_list_dict(self,
         lista_overlap: List[list], 
         lista_long_gaps: List[list], 
-        dados_projeto: List[Dict]
+        dados_projeto: List[Dict],
+        visoes: VisoesAnalise | None = None
     ) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
         """
         Formata os resultados de sobreposições e gaps em tabelas detalhadas e resumidas.
@@ -242,6 +314,7 @@ class Conferidor(ConferidorInterface):
             lista_overlap: Lista de pares de IDs com sobreposição. Ex: [[id1, id2], ...]
             lista_long_gaps: Lista com detalhes dos gaps. Ex: [[id1, id2, gap, total], ...]
             dados_projeto: A lista completa de todas as tarefas (dicionários).
+            visoes: Visões de `dados_projeto` já calculadas na análise (índices por Id).
 
         Returns:
             Uma tupla com quatro listas de dicionários:
@@ -253,7 +326,18 @@ class Conferidor(ConferidorInterface):
         detalhes_overlap, tabela_overlap = [], []
         detalhes_gap, tabela_gap = [], []
 
-        mapa_ids_projeto = {item['Id']: item for item in dados_projeto}
+        visoes = visoes or VisoesAnalise(dados_projeto)
+        mapa_ids_projeto = visoes.por_id
+
+        # Uma tarefa aparece em muitos pares; seus campos são lidos uma única vez.
+        campos_por_tarefa: Dict[int, tuple] = {}
+
+        def campos(task) -> tuple:
+            valores = campos_por_tarefa.get(id(task))
+            if valores is None:
+                valores = campos_por_tarefa[id(task)] = (
+                    task.get('ID_'), task.get("Servicos"), task.get("Id"), task.get("Início"), task.get("Término"))
+            return valores
 
         if lista_overlap:
             for id1, id2 in lista_overlap:
@@ -263,28 +347,22 @@ class Conferidor(ConferidorInterface):
                 if task1 and task2:
                     detalhes_overlap.append(task1)
                     detalhes_overlap.append(task2)
-                    
+
+                    id_1, servicos, id1_tarefa, inicio_1, termino_1 = campos(task1)
+                    id_2, _, id2_tarefa, inicio_2, termino_2 = campos(task2)
                     tabela_overlap.append({
-                        "Sobreposição Entre": f"{task1.get('ID_')} e {task2.get('ID_')}",
-                        "Servicos": task1.get("Servicos"),
-                        "Id_1": task1.get("Id"),
-                        "Id_2": task2.get("Id"),
-                        "Início_1": task1.get("Início"),
-                        "Término_1": task1.get("Término"),
-                        "Início_2": task2.get("Início"),
-                        "Término_2": task2.get("Término")
+                        "Sobreposição Entre": f"{id_1} e {id_2}",
+                        "Servicos": servicos,
+                        "Id_1": id1_tarefa,
+                        "Id_2": id2_tarefa,
+                        "Início_1": inicio_1,
+                        "Término_1": termino_1,
+                        "Início_2": inicio_2,
+                        "Término_2": termino_2
                     })
 
         if lista_long_gaps:
-            dados_filtrados = [
-                item for item in dados_projeto
-                if (
-                    (item.get("ÉInfra") and item.get("Nível_da_estrutura_de_tópicos") == 6) or
-                    (item.get("Tipo_Servico") == "SUPRA") or
-                    (item.get("Tipo_Servico") == "ASC" and item.get("Nível_da_estrutura_de_tópicos") == 7)
-                )
-            ]
-            mapa_ids_filtrado = {item['Id']: item for item in dados_filtrados}
+            mapa_ids_filtrado = visoes.criticas_por_id
 
             for id1, id2, gap, total in lista_long_gaps:
                 task1 = mapa_ids_filtrado.get(id1)
@@ -333,6 +411,42 @@ class Conferidor(ConferidorInterface):
         lista_d2 = [{"Servicos": item["Servicos"], "Pred": item["Pred2"], "Tipo": item["Tipo #2"]} for item in dados_processados if item.get("Pred2") is not None and item.get("Tipo #2") is not None]
         return lista_d1 + lista_d2
 
+    @staticmethod
+    def _converter_tipo_vinculo(tipo: str) -> Tuple[str, int]:
+        """
+        Separa o tipo de vínculo e a latência de um texto da EAP.
+
+        Ex: "TI+5d" -> ("TI", 5), "II-2d" -> ("II", -2), "TI" -> ("TI", 0).
+        """
+        if not isinstance(tipo, str):
+            return tipo, 0
+        for sinal, fator in (("+", 1), ("-", -1)):
+            partes = tipo.split(sinal)
+            if len(partes) < 2:
+                continue
+            latencia = partes[1][:-1] if partes[1].endswith("d") else partes[1]
+            try:
+                return partes[0], fator * int(latencia)
+            except ValueError:
+                continue
+        return tipo, 0
+
+    @staticmethod
+    def _indexar_eap(dados_eap: List[Dict]) -> Dict[str, Dict[str, Tuple[str, int]]]:
+        """
+        Compila a EAP em {serviço: {predecessora esperada: (tipo de vínculo, latência)}}.
+
+        Cada predecessora fica com o tipo da própria linha da EAP; se a mesma
+        predecessora aparece mais de uma vez para o serviço, vale a primeira.
+        """
+        indice: Dict[str, Dict[str, Tuple[str, int]]] = {}
+        for item in dados_eap:
+            pred = item.get('Pred')
+            if not pred:
+                continue
+            indice.setdefault(item.get('Servicos'), {}).setdefault(pred, Conferidor._converter_tipo_vinculo(item.get('Tipo')))
+        return indice
+
     def _preparar_baseline(self, dados_crus: List[Dict]) -> Tuple[List[Dict], Dict[int, str]]:
         baseline_processada = []
         for i, item in enumerate(dados_crus):
@@ -357,16 +471,11 @@ class Conferidor(ConferidorInterface):
         return list(primeiras_ocorrencias.values())
 
     def _separar_pred_literal(self, item: dict):
-        base = item.get("Predecessoras")
-        if base and isinstance(base, str):
-            lista_pred_str = [s.strip() for s in base.split(';')]
-            indice, tipo, offset = [], [], []
-            for b in lista_pred_str:
-                match = re.match(r'(?P<indice>\d+)(?P<tipo>[A-Z]+)?(?P<offset>[+-]?\d+)?d?', b, re.IGNORECASE)
-                indice.append(int(match.group("indice")) if match else 0)
-                tipo.append(match.group("tipo").upper() if match and match.group("tipo") else "TI")
-                offset.append(int(match.group("offset")) if match and match.group("offset") else 0)
-            item["indice"], item["tipo"], item["offset"] = indice, tipo, offset
+        vinculos = interpretar_predecessoras(item.get("Predecessoras"))
+        if vinculos:
+            item["indice"] = [vinculo.id_predecessora for vinculo in vinculos]
+            item["tipo"] = [vinculo.tipo for vinculo in vinculos]
+            item["offset"] = [int(v.latencia) if float(v.latencia).is_integer() else v.latencia for v in vinculos]
         else:
             item["indice"], item["tipo"], item["offset"] = [0], ["TI"], [0]
 
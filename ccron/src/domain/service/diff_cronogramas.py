@@ -0,0 +1,297 @@
+from ccron.src.domain.service.assinatura_linha import assinatura_linha
+from ccron.src.domain.service.grafo_predecessoras import interpretar_predecessoras
+from ccron.src.domain.service.visoes_analise import eh_ativa
+
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime
+import math
+
+# Colunas comparadas entre as versões, agrupadas pela categoria da mudança.
+# O `Id` e o número de tópicos mudam a cada renumeração e não entram na comparação;
+# as predecessoras são comparadas já traduzidas para os Ids da versão atual.
+CATEGORIAS_DIFF = {
+    "datas": ("Início", "Término", "Início_real", "Término_real"),
+    "duracao": ("Duração", "Trabalho"),
+    "recursos": ("Nomes_dos_recursos",),
+    "predecessoras": ("Predecessoras",),
+    "outros": (
+        "Nome", "Ativo", "Resumo", "Tipo", "Modo_da_Tarefa", "Tipo_de_restrição", "Custo", "Peso",
+        "Nível_da_estrutura_de_tópicos", "SAP_Tarefa", "ID_Bloco", "SAP_Elemento_PEP",
+        "SAP_Diagrama_de_Rede", "Agrupamento", "MÓDULO_ASC",
+    ),
+}
+COLUNAS_DIFF = tuple(coluna for colunas in CATEGORIAS_DIFF.values() for coluna in colunas)
+_CATEGORIA_COLUNA = {coluna: categoria for categoria, colunas in CATEGORIAS_DIFF.items() for coluna in colunas}
+
+# Colunas que identificam a tarefa nas listas de novas, removidas e alteradas.
+_IDENTIFICACAO = ("Id", "Nome", "ID_", "Servicos")
+
+
+@dataclass
+class VersaoCronograma:
+    """
+    Uma versão do cronograma para comparação.
+
+    Attributes:
+        tarefas: As tarefas transformadas (com `ID_` e `Servicos`).
+        regras: O relatório de regras da versão (`dados_regras_validacao`), com as
+                listas de apontamentos. None não compara as regras.
+        somente_ativas: True quando `tarefas` traz apenas as tarefas ativas, como
+                        nas análises guardadas (`dados_ativos`).
+    """
+    tarefas: list[dict]
+    regras: dict | None = None
+    somente_ativas: bool = False
+
+    @classmethod
+    def de_resultado(cls, resultado: dict) -> "VersaoCronograma":
+        """Versão a partir do resultado guardado de uma análise completa."""
+        return cls(resultado.get("dados_ativos") or [], resultado.get("dados_regras_validacao"), somente_ativas=True)
+
+
+def _normalizar(valor):
+    # NaN (análise recém calculada) e None (resultado guardado em JSON) são o mesmo vazio.
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return None
+    return valor
+
+
+def _chave_natural(tarefa: dict) -> tuple:
+    return _normalizar(tarefa.get("ID_")), _normalizar(tarefa.get("Servicos"))
+
+
+def _parear(anterior: list[dict], atual: list[dict]) -> tuple[list[tuple[int, int, str]], list[int], list[int]]:
+    """
+    Junta as tarefas das duas versões por índices de hash.
+
+    Primeiro pelo `Id`, quando a tarefa com o mesmo `Id` tem também a mesma chave
+    (`ID_`, `Servicos`) e o mesmo nome; depois, para as que sobraram (tarefas
+    renumeradas ou renomeadas), pela chave `ID_` + `Servicos`, na ordem do
+    cronograma quando a chave se repete.
+
+    Returns:
+        Os pares (posição anterior, posição atual, "id" ou "chave") e as posições
+        sem par nas versões anterior e atual.
+    """
+    por_id = {}
+    for posicao, tarefa in enumerate(anterior):
+        por_id.setdefault(tarefa.get("Id"), posicao)
+
+    pares, pareadas_anterior, sem_par_atual = [], set(), []
+    for posicao, tarefa in enumerate(atual):
+        posicao_anterior = por_id.get(tarefa.get("Id"))
+        if posicao_anterior is not None and posicao_anterior not in pareadas_anterior:
+            candidata = anterior[posicao_anterior]
+            if (_chave_natural(candidata) == _chave_natural(tarefa)
+                    and _normalizar(candidata.get("Nome")) == _normalizar(tarefa.get("Nome"))):
+                pares.append((posicao_anterior, posicao, "id"))
+                pareadas_anterior.add(posicao_anterior)
+                continue
+        sem_par_atual.append(posicao)
+
+    por_chave = defaultdict(deque)
+    for posicao, tarefa in enumerate(anterior):
+        if posicao not in pareadas_anterior:
+            por_chave[_chave_natural(tarefa)].append(posicao)
+
+    novas = []
+    for posicao in sem_par_atual:
+        fila = por_chave.get(_chave_natural(atual[posicao]))
+        if fila:
+            posicao_anterior = fila.popleft()
+            pares.append((posicao_anterior, posicao, "chave"))
+            pareadas_anterior.add(posicao_anterior)
+        else:
+            novas.append(posicao)
+
+    removidas = [posicao for posicao in range(len(anterior)) if posicao not in pareadas_anterior]
+    return pares, removidas, novas
+
+
+def _vinculos(texto, traducao: dict | None = None) -> frozenset:
+    """Vínculos da coluna `Predecessoras`, com os Ids traduzidos para a versão atual."""
+    vinculos = set()
+    for vinculo in interpretar_predecessoras(texto if isinstance(texto, str) else None):
+        id_predecessora = vinculo.id_predecessora
+        if traducao is not None:
+            # Ids fora da comparação (ex: tarefas inativas de uma análise guardada) ficam como estão.
+            id_predecessora = traducao.get(id_predecessora, id_predecessora)
+        vinculos.add((id_predecessora, vinculo.tipo, vinculo.latencia, vinculo.percentual))
+    return frozenset(vinculos)
+
+
+def _conteudo(tarefa: dict, vinculos: frozenset) -> dict:
+    # `valor == valor` só é falso para NaN: o mesmo que `_normalizar`, sem a chamada por célula.
+    conteudo = {coluna: valor if (valor := tarefa.get(coluna)) == valor else None for coluna in COLUNAS_DIFF}
+    conteudo["Predecessoras"] = tuple(sorted(vinculos, key=repr))
+    return conteudo
+
+
+def _data(valor) -> datetime | None:
+    if isinstance(valor, datetime):
+        return valor
+    try:
+        return datetime.strptime(str(valor).strip()[:10], "%d/%m/%Y")
+    except (TypeError, ValueError):
+        return None
+
+
+def _deslocamento(anterior, atual) -> int | None:
+    """Dias entre a data anterior e a atual (positivo quando a data foi adiada)."""
+    data_anterior, data_atual = _data(anterior), _data(atual)
+    if data_anterior is None or data_atual is None:
+        return None
+    return (data_atual - data_anterior).days
+
+
+def _identificacao(tarefa: dict) -> dict:
+    return {coluna: _normalizar(tarefa.get(coluna)) for coluna in _IDENTIFICACAO}
+
+
+def _comparar_par(tarefa_anterior: dict, tarefa_atual: dict, conteudo_anterior: dict,
+                  conteudo_atual: dict, vinculos_anterior: frozenset, vinculos_atual: frozenset) -> dict:
+    """Compara campo a campo um par de tarefas com assinaturas diferentes."""
+    campos, categorias = {}, []
+    for coluna in COLUNAS_DIFF:
+        if conteudo_anterior[coluna] == conteudo_atual[coluna]:
+            continue
+        if coluna == "Predecessoras":
+            campos[coluna] = {
+                "anterior": _normalizar(tarefa_anterior.get(coluna)),
+                "atual": _normalizar(tarefa_atual.get(coluna)),
+                "vinculos_incluidos": len(vinculos_atual - vinculos_anterior),
+                "vinculos_removidos": len(vinculos_anterior - vinculos_atual),
+            }
+        else:
+            campos[coluna] = {"anterior": conteudo_anterior[coluna], "atual": conteudo_atual[coluna]}
+            if coluna in CATEGORIAS_DIFF["datas"]:
+                campos[coluna]["dias"] = _deslocamento(conteudo_anterior[coluna], conteudo_atual[coluna])
+        categoria = _CATEGORIA_COLUNA[coluna]
+        if categoria not in categorias:
+            categorias.append(categoria)
+
+    alteracao = _identificacao(tarefa_atual)
+    alteracao["Id_anterior"] = _normalizar(tarefa_anterior.get("Id"))
+    alteracao["categorias"] = categorias
+    alteracao["campos"] = campos
+    return alteracao
+
+
+def _chave_apontamento(item, traducao: dict | None):
+    """
+    Chave de um apontamento de regra, com os Ids na numeração da versão atual.
+
+    Os apontamentos são Ids de tarefas ou, no hiato e na frente simultânea, listas
+    que começam pelo par de Ids ([id1, id2, ...]). Os demais valores (ex: o
+    SAP_Tarefa do somatório de peso) são comparados como estão.
+    """
+    def traduzir(valor):
+        if traducao is None or isinstance(valor, str):
+            return valor
+        return traducao.get(valor, valor)
+
+    if isinstance(item, (list, tuple)):
+        return tuple(traduzir(valor) for valor in item[:2])
+    return traduzir(item)
+
+
+def _comparar_regras(regras_anterior: dict, regras_atual: dict, traducao: dict) -> dict:
+    """Apontamentos novos e resolvidos por regra (só as regras com mudança)."""
+    violacoes = {}
+    for regra in dict.fromkeys([*regras_anterior, *regras_atual]):
+        itens_anterior = regras_anterior.get(regra) or []
+        itens_atual = regras_atual.get(regra) or []
+        if not isinstance(itens_anterior, list) or not isinstance(itens_atual, list):
+            # Relatório de contagens: sem as listas, não há o que comparar.
+            continue
+        chaves_anterior = {_chave_apontamento(item, traducao) for item in itens_anterior}
+        chaves_atual = {_chave_apontamento(item, None) for item in itens_atual}
+        novas = [item for item in itens_atual if _chave_apontamento(item, None) not in chaves_anterior]
+        resolvidas = [item for item in itens_anterior if _chave_apontamento(item, traducao) not in chaves_atual]
+        if novas or resolvidas:
+            violacoes[regra] = {"novas": novas, "resolvidas": resolvidas}
+    return violacoes
+
+
+def comparar_cronogramas(anterior: VersaoCronograma, atual: VersaoCronograma) -> dict:
+    """
+    Compara duas versões do mesmo cronograma.
+
+    As tarefas são juntadas por índices de hash (ver `_parear`), em tempo linear.
+    De cada par é calculada a assinatura das colunas de `COLUNAS_DIFF`, com as
+    predecessoras já na numeração da versão atual; só os pares com assinaturas
+    diferentes são comparados campo a campo. Assim, uma renumeração do
+    cronograma não aparece como alteração das tarefas.
+
+    Quando uma das versões traz apenas as tarefas ativas, as inativas da outra
+    também ficam de fora, para que não apareçam como incluídas ou excluídas.
+
+    Args:
+        anterior: A versão de referência.
+        atual: A versão nova.
+
+    Returns:
+        Um dicionário com o resumo, as tarefas novas, removidas e alteradas (com
+        as categorias e os campos alterados, e o deslocamento das datas em dias)
+        e os apontamentos de regras novos e resolvidos.
+    """
+    tarefas_anterior, tarefas_atual = anterior.tarefas, atual.tarefas
+    if anterior.somente_ativas != atual.somente_ativas:
+        tarefas_anterior = [tarefa for tarefa in tarefas_anterior if eh_ativa(tarefa)]
+        tarefas_atual = [tarefa for tarefa in tarefas_atual if eh_ativa(tarefa)]
+
+    pares, removidas, novas = _parear(tarefas_anterior, tarefas_atual)
+    traducao = {tarefas_anterior[posicao_anterior].get("Id"): tarefas_atual[posicao].get("Id")
+                for posicao_anterior, posicao, _ in pares}
+    # Tarefa removida: não corresponde a nenhuma tarefa da versão atual.
+    for posicao in removidas:
+        id_removida = tarefas_anterior[posicao].get("Id")
+        traducao.setdefault(id_removida, ("removida", id_removida))
+
+    alteradas, por_categoria = [], dict.fromkeys(CATEGORIAS_DIFF, 0)
+    renumeradas = pareadas_por_chave = 0
+    for posicao_anterior, posicao, criterio in pares:
+        tarefa_anterior, tarefa_atual = tarefas_anterior[posicao_anterior], tarefas_atual[posicao]
+        pareadas_por_chave += criterio == "chave"
+        renumeradas += tarefa_anterior.get("Id") != tarefa_atual.get("Id")
+
+        vinculos_anterior = _vinculos(tarefa_anterior.get("Predecessoras"), traducao)
+        vinculos_atual = _vinculos(tarefa_atual.get("Predecessoras"))
+        conteudo_anterior = _conteudo(tarefa_anterior, vinculos_anterior)
+        conteudo_atual = _conteudo(tarefa_atual, vinculos_atual)
+        if assinatura_linha(conteudo_anterior) == assinatura_linha(conteudo_atual):
+            continue
+
+        alteracao = _comparar_par(tarefa_anterior, tarefa_atual, conteudo_anterior, conteudo_atual,
+                                  vinculos_anterior, vinculos_atual)
+        for categoria in alteracao["categorias"]:
+            por_categoria[categoria] += 1
+        alteradas.append(alteracao)
+
+    violacoes = None
+    if anterior.regras is not None and atual.regras is not None:
+        violacoes = _comparar_regras(anterior.regras, atual.regras, traducao)
+
+    resumo = {
+        "tarefas_anterior": len(tarefas_anterior),
+        "tarefas_atual": len(tarefas_atual),
+        "novas": len(novas),
+        "removidas": len(removidas),
+        "alteradas": len(alteradas),
+        "inalteradas": len(pares) - len(alteradas),
+        "pareadas_por_chave": pareadas_por_chave,
+        "renumeradas": renumeradas,
+        "alteradas_por_categoria": por_categoria,
+    }
+    if violacoes is not None:
+        resumo["violacoes_novas"] = sum(len(regra["novas"]) for regra in violacoes.values())
+        resumo["violacoes_resolvidas"] = sum(len(regra["resolvidas"]) for regra in violacoes.values())
+
+    return {
+        "resumo": resumo,
+        "novas": [_identificacao(tarefas_atual[posicao]) for posicao in novas],
+        "removidas": [_identificacao(tarefas_anterior[posicao]) for posicao in removidas],
+        "alteradas": alteradas,
+        "violacoes": violacoes,
+    }
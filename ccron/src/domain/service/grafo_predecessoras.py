@@ -0,0 +1,436 @@
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+import math
+import re
+
+# Tipos de vínculo do MS Project em português; os equivalentes em inglês são convertidos.
+TIPOS_VINCULO = ("TI", "II", "TT", "IT")
+_TIPOS_EQUIVALENTES = {"TI": "TI", "II": "II", "TT": "TT", "IT": "IT", "FS": "TI", "SS": "II", "FF": "TT", "SF": "IT"}
+_CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_VINCULO)}
+TI, II, TT, IT = range(4)
+
+# Latência convertida em dias de trabalho (8h por dia, 5 dias por semana, 20 por mês).
+# As unidades em inglês aparecem nos dados lidos do ProjectData ([en-US]).
+_UNIDADES_LATENCIA = {
+    "": 1.0, "d": 1.0, "dia": 1.0, "dias": 1.0, "ed": 1.0, "edia": 1.0, "edias": 1.0,
+    "day": 1.0, "days": 1.0, "eday": 1.0, "edays": 1.0,
+    "h": 1 / 8, "hr": 1 / 8, "hrs": 1 / 8, "hora": 1 / 8, "horas": 1 / 8, "eh": 1 / 8,
+    "hour": 1 / 8, "hours": 1 / 8,
+    "min": 1 / 480, "mins": 1 / 480, "minuto": 1 / 480, "minutos": 1 / 480,
+    "s": 5.0, "sem": 5.0, "semana": 5.0, "semanas": 5.0, "w": 5.0, "wk": 5.0,
+    "wks": 5.0, "week": 5.0, "weeks": 5.0,
+    "ms": 20.0, "mes": 20.0, "mês": 20.0, "meses": 20.0, "mo": 20.0,
+    "mon": 20.0, "mons": 20.0, "month": 20.0, "months": 20.0,
+}
+
+_PADRAO_VINCULO = re.compile(
+    r"\s*(?P<id>\d+)\s*(?P<tipo>[A-Za-z]+)?\s*"
+    r"(?:(?P<sinal>[+-])\s*(?P<valor>\d+(?:[.,]\d+)?)\s*(?P<unidade>[^\s\d.]*))?"
+)
+
+
+class Vinculo(NamedTuple):
+    """
+    Um vínculo de predecessora já interpretado.
+
+    `latencia` está em dias, exceto quando `percentual` é True: nesse caso é um
+    percentual da duração da predecessora (ex: "5TI+50%"). Trechos com tipo ou
+    unidade desconhecidos vêm com `valido=False`.
+    """
+    id_predecessora: int
+    tipo: str
+    latencia: float
+    percentual: bool
+    texto: str
+    valido: bool = True
+
+
+@lru_cache(maxsize=65536)
+def interpretar_predecessoras(texto) -> tuple[Vinculo, ...]:
+    """
+    Interpreta o conteúdo da coluna `Predecessoras` (ex: "12;15TI+2 dias;20II-1d").
+
+    O resultado é guardado por texto distinto, já que os cronogramas repetem muito
+    os mesmos vínculos.
+
+    Returns:
+        Os vínculos, na ordem do texto. Trechos que não começam por um número
+        ou com tipo/unidade desconhecidos vêm com `valido=False`.
+    """
+    if not texto or not isinstance(texto, str) or texto.strip().lower() == "nan":
+        return ()
+    vinculos = []
+    for trecho in texto.split(";"):
+        trecho = trecho.strip()
+        if not trecho:
+            continue
+        if trecho.isdigit():
+            vinculos.append(Vinculo(int(trecho), "TI", 0.0, False, trecho))
+            continue
+        encontrado = _PADRAO_VINCULO.match(trecho)
+        if not encontrado:
+            vinculos.append(Vinculo(0, "TI", 0.0, False, trecho, False))
+            continue
+
+        valido = encontrado.end() == len(trecho)
+        tipo_texto = (encontrado.group("tipo") or "TI").upper()
+        tipo = _TIPOS_EQUIVALENTES.get(tipo_texto)
+        if tipo is None:
+            tipo, valido = tipo_texto, False
+
+        latencia, percentual = 0.0, False
+        if encontrado.group("valor"):
+            valor = float(encontrado.group("valor").replace(",", "."))
+            if encontrado.group("sinal") == "-":
+                valor = -valor
+            unidade = encontrado.group("unidade").lower().rstrip("?")
+            if unidade == "%":
+                latencia, percentual = valor, True
+            elif unidade in _UNIDADES_LATENCIA:
+                latencia = valor * _UNIDADES_LATENCIA[unidade]
+            else:
+                latencia, valido = valor, False
+
+        vinculos.append(Vinculo(int(encontrado.group("id")), tipo, latencia, percentual, trecho, valido))
+    return tuple(vinculos)
+
+
+def _converter_id(valor):
+    """O `Id` pode vir como texto ("12" ou "12.0") dependendo da origem dos dados."""
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return valor
+
+
+def _duracao_em_dias(valor) -> float:
+    try:
+        duracao = float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+    return duracao if math.isfinite(duracao) and duracao > 0 else 0.0
+
+
+class GrafoPredecessoras:
+    """
+    Rede de dependências do cronograma, montada a partir da coluna `Predecessoras`.
+
+    Os vínculos são interpretados uma única vez e guardados em formato compacto
+    (CSR): para a tarefa na posição `i`, seus sucessores estão em
+    `sucessores[inicio_sucessores[i]:inicio_sucessores[i + 1]]`, com o tipo e a
+    latência de cada vínculo nas mesmas posições de `tipos` e `latencias`.
+
+    Todas as análises (ciclos, órfãs, caminho crítico) são lineares no número de
+    tarefas e vínculos.
+
+    Args:
+        tarefas: As tarefas do cronograma. As referências são resolvidas pelo `Id`.
+    """
+    def __init__(self, tarefas: list[dict]):
+        self.tarefas = tarefas
+        self.ids = [tarefa.get("Id") for tarefa in tarefas]
+        self.posicao_por_id = {}
+        for posicao, id_tarefa in enumerate(self.ids):
+            self.posicao_por_id.setdefault(_converter_id(id_tarefa), posicao)
+        self.duracoes = array("d", (_duracao_em_dias(tarefa.get("Duração")) for tarefa in tarefas))
+
+        self.referencias_pendentes: list[tuple] = []
+        self.vinculos_invalidos: list[tuple] = []
+        arestas: list[tuple[int, int, int, float]] = []
+        for posicao, tarefa in enumerate(tarefas):
+            for vinculo in interpretar_predecessoras(tarefa.get("Predecessoras")):
+                if not vinculo.valido:
+                    self.vinculos_invalidos.append((self.ids[posicao], vinculo.texto))
+                origem = self.posicao_por_id.get(vinculo.id_predecessora)
+                if origem is None:
+                    self.referencias_pendentes.append((self.ids[posicao], vinculo.id_predecessora))
+                    continue
+                latencia = vinculo.latencia
+                if vinculo.percentual:
+                    latencia = self.duracoes[origem] * vinculo.latencia / 100
+                arestas.append((origem, posicao, _CODIGO_TIPO.get(vinculo.tipo, TI), latencia))
+
+        n = len(tarefas)
+        contagem = [0] * (n + 1)
+        for origem, _, _, _ in arestas:
+            contagem[origem + 1] += 1
+        for posicao in range(n):
+            contagem[posicao + 1] += contagem[posicao]
+        self.inicio_sucessores = array("l", contagem)
+
+        proxima = contagem[:-1]
+        sucessores, tipos, latencias = [0] * len(arestas), [0] * len(arestas), [0.0] * len(arestas)
+        for origem, destino, tipo, latencia in arestas:
+            indice = proxima[origem]
+            sucessores[indice], tipos[indice], latencias[indice] = destino, tipo, latencia
+            proxima[origem] += 1
+        self.sucessores = array("l", sucessores)
+        self.tipos = array("b", tipos)
+        self.latencias = array("d", latencias)
+
+        self.quantidade_predecessoras = array("l", [0] * n)
+        for destino in self.sucessores:
+            self.quantidade_predecessoras[destino] += 1
+
+    def posicao(self, id_tarefa) -> int | None:
+        """Posição da tarefa com o `Id` informado, ou None se não existir."""
+        return self.posicao_por_id.get(_converter_id(id_tarefa))
+
+    @property
+    def total_vinculos(self) -> int:
+        return len(self.sucessores)
+
+    def _arestas_de(self, posicao: int) -> range:
+        return range(self.inicio_sucessores[posicao], self.inicio_sucessores[posicao + 1])
+
+    def ciclos(self) -> list[list[int]]:
+        """
+        Encontra os ciclos de dependência (componentes fortemente conexas de
+        Tarjan, em versão iterativa), incluindo tarefas que dependem de si mesmas.
+
+        Returns:
+            As posições das tarefas de cada ciclo.
+        """
+        n = len(self.tarefas)
+        indice = [-1] * n
+        menor = [0] * n
+        na_pilha = [False] * n
+        pilha: list[int] = []
+        componentes: list[list[int]] = []
+        contador = 0
+
+        for raiz in range(n):
+            if indice[raiz] != -1:
+                continue
+            chamadas = [(raiz, self.inicio_sucessores[raiz])]
+            indice[raiz] = menor[raiz] = contador
+            contador += 1
+            pilha.append(raiz)
+            na_pilha[raiz] = True
+
+            while chamadas:
+                no, aresta = chamadas[-1]
+                if aresta < self.inicio_sucessores[no + 1]:
+                    chamadas[-1] = (no, aresta + 1)
+                    vizinho = self.sucessores[aresta]
+                    if indice[vizinho] == -1:
+                        indice[vizinho] = menor[vizinho] = contador
+                        contador += 1
+                        pilha.append(vizinho)
+                        na_pilha[vizinho] = True
+                        chamadas.append((vizinho, self.inicio_sucessores[vizinho]))
+                    elif na_pilha[vizinho]:
+                        menor[no] = min(menor[no], indice[vizinho])
+                    continue
+
+                chamadas.pop()
+                if chamadas:
+                    pai = chamadas[-1][0]
+                    menor[pai] = min(menor[pai], menor[no])
+                if menor[no] == indice[no]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha[membro] = False
+                        componente.append(membro)
+                        if membro == no:
+                            break
+                    if len(componente) > 1 or no in (self.sucessores[a] for a in self._arestas_de(no)):
+                        componentes.append(sorted(componente))
+        return componentes
+
+    def ordem_topologica(self) -> list[int]:
+        """
+        Ordena as tarefas de modo que cada uma venha depois de suas predecessoras
+        (algoritmo de Kahn). Tarefas em ciclos, ou que dependem delas, ficam de fora.
+        """
+        grau = array("l", self.quantidade_predecessoras)
+        ordem = [posicao for posicao in range(len(self.tarefas)) if grau[posicao] == 0]
+        for no in ordem:
+            for aresta in self._arestas_de(no):
+                vizinho = self.sucessores[aresta]
+                grau[vizinho] -= 1
+                if grau[vizinho] == 0:
+                    ordem.append(vizinho)
+        return ordem
+
+    def caminho_critico(self, tolerancia: float = 1e-6) -> dict:
+        """
+        Calcula datas cedo/tarde e folga total pelo método do caminho crítico (CPM).
+
+        As datas são relativas ao início do projeto (dia 0), em dias de trabalho,
+        considerando o tipo e a latência de cada vínculo. Tarefas em ciclos (ou
+        dependentes delas) não têm datas calculáveis e ficam de fora.
+
+        Returns:
+            {"ordem": posições em ordem topológica, "inicio_cedo", "termino_cedo",
+            "inicio_tarde", "termino_tarde", "folga_total": arrays por posição
+            (NaN para as tarefas fora da ordem), "duracao_projeto": float,
+            "criticas": posições com folga total zero, ordenadas pelo início cedo}.
+        """
+        n = len(self.tarefas)
+        ordem = self.ordem_topologica()
+        d = self.duracoes
+        inicio_cedo = array("d", [0.0] * n)
+
+        for no in ordem:
+            termino = inicio_cedo[no] + d[no]
+            for aresta in self._arestas_de(no):
+                vizinho, tipo, latencia = self.sucessores[aresta], self.tipos[aresta], self.latencias[aresta]
+                if tipo == TI:
+                    candidato = termino + latencia
+                elif tipo == II:
+                    candidato = inicio_cedo[no] + latencia
+                elif tipo == TT:
+                    candidato = termino + latencia - d[vizinho]
+                else:
+                    candidato = inicio_cedo[no] + latencia - d[vizinho]
+                if candidato > inicio_cedo[vizinho]:
+                    inicio_cedo[vizinho] = candidato
+
+        duracao_projeto = max((inicio_cedo[no] + d[no] for no in ordem), default=0.0)
+        termino_tarde = array("d", [duracao_projeto] * n)
+
+        for no in reversed(ordem):
+            for aresta in self._arestas_de(no):
+                vizinho, tipo, latencia = self.sucessores[aresta], self.tipos[aresta], self.latencias[aresta]
+                inicio_tarde_vizinho = termino_tarde[vizinho] - d[vizinho]
+                if tipo == TI:
+                    candidato = inicio_tarde_vizinho - latencia
+                elif tipo == II:
+                    candidato = inicio_tarde_vizinho - latencia + d[no]
+                elif tipo == TT:
+                    candidato = termino_tarde[vizinho] - latencia
+                else:
+                    candidato = termino_tarde[vizinho] - latencia + d[no]
+                if candidato < termino_tarde[no]:
+                    termino_tarde[no] = candidato
+
+        nan = float("nan")
+        calculadas = set(ordem)
+        termino_cedo = array("d", (inicio_cedo[i] + d[i] if i in calculadas else nan for i in range(n)))
+        inicio_tarde = array("d", (termino_tarde[i] - d[i] if i in calculadas else nan for i in range(n)))
+        folga_total = array("d", (inicio_tarde[i] - inicio_cedo[i] if i in calculadas else nan for i in range(n)))
+        for i in range(n):
+            if i not in calculadas:
+                inicio_cedo[i] = termino_tarde[i] = nan
+
+        criticas = sorted((no for no in ordem if folga_total[no] <= tolerancia), key=lambda no: (inicio_cedo[no], no))
+        return {
+            "ordem": ordem,
+            "inicio_cedo": inicio_cedo,
+            "termino_cedo": termino_cedo,
+            "inicio_tarde": inicio_tarde,
+            "termino_tarde": termino_tarde,
+            "folga_total": folga_total,
+            "duracao_projeto": duracao_projeto,
+            "criticas": criticas,
+        }
+
+    def propagar_atrasos(self, atrasos: dict[int, int], inicios: list[int | None],
+                         terminos: list[int | None]) -> tuple[dict[int, tuple[int, int]], list[int]]:
+        """
+        Propaga atrasos pelos vínculos, reprogramando apenas o que está a jusante.
+
+        Só as tarefas alcançáveis a partir das atrasadas são visitadas, em ordem
+        topológica restrita a esse subgrafo (Kahn). Uma tarefa só se move se algum
+        vínculo deixar de ser atendido; a folga existente entre as datas atuais
+        absorve o atraso. As durações são mantidas.
+
+        As datas são índices de dia (inclusivos), no calendário escolhido pelo
+        chamador; latências fracionárias são arredondadas para cima.
+
+        Args:
+            atrasos: {posição da tarefa: dias de atraso no início}.
+            inicios: Dia de início de cada tarefa (None se não tiver data).
+            terminos: Dia de término de cada tarefa (None se não tiver data).
+
+        Returns:
+            A tupla ({posição: (novo início, novo término)} das tarefas que se
+            moveram, posições alcançadas que não puderam ser reprogramadas por
+            estarem em um ciclo ou depois dele).
+        """
+        alcancadas = set(atrasos)
+        pilha = list(atrasos)
+        while pilha:
+            no = pilha.pop()
+            for aresta in self._arestas_de(no):
+                vizinho = self.sucessores[aresta]
+                if vizinho not in alcancadas:
+                    alcancadas.add(vizinho)
+                    pilha.append(vizinho)
+
+        grau = dict.fromkeys(alcancadas, 0)
+        for no in alcancadas:
+            for aresta in self._arestas_de(no):
+                grau[self.sucessores[aresta]] += 1
+
+        inicio_exigido = {no: inicios[no] + dias for no, dias in atrasos.items() if inicios[no] is not None}
+        movidas: dict[int, tuple[int, int]] = {}
+        fila = [no for no, quantidade in grau.items() if quantidade == 0]
+        for no in fila:
+            inicio, termino = inicios[no], terminos[no]
+            if inicio is not None and termino is not None and inicio_exigido.get(no, inicio) > inicio:
+                deslocamento = inicio_exigido[no] - inicio
+                inicio, termino = inicio + deslocamento, termino + deslocamento
+                movidas[no] = (inicio, termino)
+
+            for aresta in self._arestas_de(no):
+                vizinho = self.sucessores[aresta]
+                grau[vizinho] -= 1
+                if grau[vizinho] == 0:
+                    fila.append(vizinho)
+                if no not in movidas or inicios[vizinho] is None or terminos[vizinho] is None:
+                    continue
+                tipo, latencia = self.tipos[aresta], math.ceil(self.latencias[aresta] - 1e-9)
+                duracao_vizinho = terminos[vizinho] - inicios[vizinho]
+                if tipo == TI:
+                    exigido = termino + 1 + latencia
+                elif tipo == II:
+                    exigido = inicio + latencia
+                elif tipo == TT:
+                    exigido = termino + latencia - duracao_vizinho
+                else:
+                    exigido = inicio + latencia - 1 - duracao_vizinho
+                if exigido > inicio_exigido.get(vizinho, inicios[vizinho]):
+                    inicio_exigido[vizinho] = exigido
+
+        processadas = set(fila)
+        return movidas, sorted(no for no in alcancadas if no not in processadas)
+
+    def analisar(self) -> dict:
+        """
+        Executa todas as análises da rede e retorna um resumo serializável, com as
+        tarefas identificadas pelo `Id`.
+        """
+        ids = self.ids
+        possui_sucessora = [self.inicio_sucessores[i + 1] > self.inicio_sucessores[i] for i in range(len(ids))]
+        cpm = self.caminho_critico()
+
+        def arredondar(valor: float):
+            return None if math.isnan(valor) else round(valor, 4)
+
+        return {
+            "total_tarefas": len(ids),
+            "total_vinculos": self.total_vinculos,
+            "ciclos": [[ids[posicao] for posicao in ciclo] for ciclo in self.ciclos()],
+            "referencias_pendentes": [{"Id": id_tarefa, "Predecessora": ref} for id_tarefa, ref in self.referencias_pendentes],
+            "vinculos_invalidos": [{"Id": id_tarefa, "Vinculo": texto} for id_tarefa, texto in self.vinculos_invalidos],
+            "sem_predecessoras": [ids[i] for i in range(len(ids)) if not self.quantidade_predecessoras[i]],
+            "sem_sucessoras": [ids[i] for i in range(len(ids)) if not possui_sucessora[i]],
+            "orfas": [ids[i] for i in range(len(ids)) if not self.quantidade_predecessoras[i] and not possui_sucessora[i]],
+            "duracao_projeto": round(cpm["duracao_projeto"], 4),
+            "caminho_critico": [ids[posicao] for posicao in cpm["criticas"]],
+            "folgas": [
+                {
+                    "Id": ids[posicao],
+                    "Início_cedo": arredondar(cpm["inicio_cedo"][posicao]),
+                    "Término_cedo": arredondar(cpm["termino_cedo"][posicao]),
+                    "Início_tarde": arredondar(cpm["inicio_tarde"][posicao]),
+                    "Término_tarde": arredondar(cpm["termino_tarde"][posicao]),
+                    "Folga_total": arredondar(cpm["folga_total"][posicao]),
+                }
+                for posicao in range(len(ids))
+            ],
+        }
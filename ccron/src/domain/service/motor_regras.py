@@ -0,0 +1,264 @@
+from ccron.src.domain.ports.motor_regras_interface import MotorRegrasInterface
+from ccron.src.domain.service.casador_palavras import CasadorPalavras
+from ccron.src.domain.service.grafo_predecessoras import interpretar_predecessoras
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterable
+
+
+@lru_cache(maxsize=8192)
+def converter_data(valor: str) -> datetime:
+    return datetime.strptime(valor, r"%d/%m/%Y")
+
+
+def _preenchido(valor) -> bool:
+    return bool(valor) and str(valor).lower() != "nan"
+
+
+def tem_predecessora(valor) -> bool:
+    """
+    Indica se a coluna `Predecessoras` traz algum vínculo.
+
+    O texto passa pelo mesmo interpretador do grafo de predecessoras, então
+    valores só com espaços ou separadores (ex: " ; ") não contam como vínculo.
+    Vínculos mal formados contam: a tarefa tem predecessora, só que inválida.
+    """
+    if isinstance(valor, str):
+        return bool(interpretar_predecessoras(valor))
+    return _preenchido(valor)
+
+
+class LinhaAvaliada:
+    """
+    Sub-condições compartilhadas entre as regras, calculadas uma única vez por linha.
+
+    As regras por linha recebem esta estrutura em vez do dicionário da tarefa,
+    evitando repetir em cada regra os mesmos testes de `Ativo`, `Resumo`,
+    recursos e predecessoras.
+    """
+    __slots__ = ("item", "hoje", "ativo", "inativo", "resumo", "nao_resumo", "tem_recurso", "tem_predecessora")
+
+    def __init__(self, item: dict, hoje: datetime):
+        self.item = item
+        self.hoje = hoje
+        ativo = item.get("Ativo")
+        resumo = item.get("Resumo")
+        self.ativo = ativo == "Sim"
+        self.inativo = ativo == "Não"
+        self.resumo = resumo == "Sim"
+        self.nao_resumo = resumo == "Não"
+        self.tem_recurso = _preenchido(item.get("Nomes_dos_recursos"))
+        self.tem_predecessora = tem_predecessora(item.get("Predecessoras"))
+
+
+@dataclass(frozen=True)
+class RegraLinha:
+    """
+    Regra de validação que depende apenas do conteúdo de uma linha.
+
+    Attributes:
+        nome: Identificador curto da regra.
+        chave: Chave da regra no relatório (`dic_error`).
+        predicado: Função que recebe a `LinhaAvaliada` e indica se a linha viola a regra.
+        requer: Sub-condições de `LinhaAvaliada` que precisam ser verdadeiras para
+                a regra se aplicar. O motor as testa uma única vez para todas as
+                regras que compartilham o mesmo conjunto.
+    """
+    nome: str
+    chave: str
+    predicado: Callable[[LinhaAvaliada], bool]
+    requer: tuple[str, ...] = ()
+
+
+def _atrasada(linha: LinhaAvaliada) -> bool:
+    item = linha.item
+    return (
+        _preenchido(item.get("Término"))
+        and not _preenchido(item.get("Término_real"))
+        and converter_data(item.get("Término")) <= linha.hoje
+    )
+
+
+def _inicio_real_futuro(linha: LinhaAvaliada) -> bool:
+    inicio_real = linha.item.get("Início_real")
+    return _preenchido(inicio_real) and converter_data(inicio_real) > linha.hoje
+
+
+def _termino_real_futuro(linha: LinhaAvaliada) -> bool:
+    termino_real = linha.item.get("Término_real")
+    return _preenchido(termino_real) and converter_data(termino_real) > linha.hoje
+
+
+def _trabalho_incorreto(linha: LinhaAvaliada) -> bool:
+    duracao = linha.item.get("Duração")
+    trabalho = linha.item.get("Trabalho")
+    if not duracao >= 0:
+        return False
+    trabalho_int = int(trabalho) if trabalho is not None else 0
+    duracao_int = int(duracao) if duracao is not None else 0
+    return duracao_int > 0 and (trabalho_int / 8) != duracao_int
+
+
+def _nome_em_branco(linha: LinhaAvaliada) -> bool:
+    return not _preenchido(linha.item.get("Nome")) and linha.item.get("Id") != 0
+
+
+TAREFAS_AMP = ["ANDAM JUNTO", "MÃO DE OBRA RATEIO", "HABITE-SE"]
+
+PALAVRAS_EXCLUIDAS_PESO_ZERO = {
+    "leg ", "iptu", "itbi", "escritura", "inc ",
+    "projeto", "custo material pp - obra"
+}
+
+# Mesma semântica da verificação original: substring do nome em minúsculas, com acentos.
+CASADOR_PESO_ZERO = CasadorPalavras(sorted(PALAVRAS_EXCLUIDAS_PESO_ZERO))
+
+
+def nome_amp(nome) -> bool:
+    """Indica se o nome é de uma tarefa AMP (MO rateio, andam junto, habite-se)."""
+    return nome in str(TAREFAS_AMP).upper()
+
+
+def nome_excluido_peso_zero(nome) -> bool:
+    """Indica se o nome contém alguma palavra que dispensa a regra de peso zero."""
+    return CASADOR_PESO_ZERO.contem_alguma(nome)
+
+
+def _peso_zero(linha: LinhaAvaliada) -> bool:
+    if linha.item.get("Peso") != 0:
+        return False
+    return not nome_excluido_peso_zero(linha.item.get("Nome", ""))
+
+
+# A ordem do registro é a ordem das chaves no relatório.
+REGRAS_LINHA: list[RegraLinha] = [
+    RegraLinha("sem_predecessoras", "ID tarefas sem predecessoras",
+               lambda l: not l.tem_predecessora, ("nao_resumo", "ativo")), #1
+    RegraLinha("inativas_com_predecessoras", "ID tarefas inativas com predecessoras",
+               lambda l: l.tem_predecessora, ("nao_resumo", "inativo")), #2
+    RegraLinha("atrasadas", "ID tarefas atrasadas", _atrasada, ("ativo",)), #3
+    RegraLinha("inicio_real_futuro", "ID tarefas com início real no futuro", _inicio_real_futuro), #4
+    RegraLinha("termino_real_futuro", "ID tarefas com término real no futuro", _termino_real_futuro), #5
+    RegraLinha("tipo_duracao_invalido", "ID tarefas com tipo de duração inválido",
+               lambda l: l.item.get("Tipo") != "Trabalho fixo", ("nao_resumo", "ativo")), #6
+    RegraLinha("agendamento_manual", "ID tarefas com agendamento manual",
+               lambda l: l.item.get("Modo_da_Tarefa") != "Agendada Automaticamente"), #7
+    RegraLinha("restricao", "ID tarefas com restrição",
+               lambda l: l.item.get("Tipo_de_restrição") != "O Mais Breve Possível", ("ativo",)), #8
+    RegraLinha("sem_recurso", "ID tarefas sem Recurso",
+               lambda l: l.item.get("Duração", 0) > 0 and not l.tem_recurso, ("nao_resumo", "ativo")), #9
+    RegraLinha("trabalho_incorreto", "ID tarefas com trabalho incorreto", _trabalho_incorreto, ("nao_resumo", "ativo")), #10
+    RegraLinha("recurso_indevido", "ID tarefas inativas/resumo com recurso",
+               lambda l: l.tem_recurso and (l.resumo or l.inativo)), #11
+    RegraLinha("custo_zero", "ID tarefas ativas com custo zero",
+               lambda l: l.item.get("Custo") == 0, ("ativo",)), #12
+    RegraLinha("duracao_zero", "ID tarefas com duração zero",
+               lambda l: l.item.get("Duração") == 0), #13
+    RegraLinha("nome_em_branco", "ID tarefas com nome em branco", _nome_em_branco, ("ativo",)), #14
+    RegraLinha("usuario_generico", "ID tarefas com usuario generico",
+               lambda l: l.item.get("Nomes_dos_recursos") == "Usuário Genérico"), #15
+    RegraLinha("duracao_maior_21_dias", "ID tarefas com duração maior que 21 dias",
+               lambda l: l.item.get("Duração", 0) > 21.0, ("nao_resumo",)), #16
+    RegraLinha("amp_ativas", "MO RATEIO, ANDAM JUNTO OU HABITE-SE estão ativas?",
+               lambda l: nome_amp(l.item.get("Nome")), ("ativo",)), #17
+    RegraLinha("peso_zero", "ID com Peso 0", _peso_zero, ("nao_resumo", "ativo")), #20
+]
+
+REGRAS_POR_NOME: dict[str, RegraLinha] = {regra.nome: regra for regra in REGRAS_LINHA}
+
+
+def filtrar_por_regra(nome: str, dados: list[dict], hoje: datetime | None = None) -> list:
+    """
+    Aplica uma única regra por linha e retorna os IDs das tarefas que a violam.
+
+    Args:
+        nome: O identificador da regra no registro.
+        dados: A lista de tarefas.
+        hoje: A data de referência, para as regras que comparam datas.
+    """
+    regra = REGRAS_POR_NOME[nome]
+    resultado = []
+    for item in dados:
+        linha = LinhaAvaliada(item, hoje)
+        if all(getattr(linha, condicao) for condicao in regra.requer) and regra.predicado(linha):
+            resultado.append(item.get("Id"))
+    return resultado
+
+
+class MotorRegras(MotorRegrasInterface):
+    """
+    Avalia todas as regras por linha em uma única passada sobre as tarefas.
+
+    As regras do registro são compiladas em grupos pelo conjunto de sub-condições
+    que exigem (ex: ativa e não-resumo). Para cada linha, as sub-condições são
+    calculadas uma vez e cada grupo é testado uma vez, de modo que as regras de um
+    grupo que não se aplica à linha nem chegam a ser avaliadas.
+    """
+    def __init__(self, regras: Iterable[RegraLinha] = REGRAS_LINHA):
+        self.regras = list(regras)
+        self._grupos = self._compilar(range(len(self.regras)))
+
+    def _compilar(self, indices: Iterable[int]) -> list[tuple[tuple[str, ...], list[tuple[int, Callable]]]]:
+        grupos: dict[tuple[str, ...], list[tuple[int, Callable]]] = {}
+        for indice in indices:
+            regra = self.regras[indice]
+            grupos.setdefault(regra.requer, []).append((indice, regra.predicado))
+        return list(grupos.items())
+
+    def _selecionar(self, regras: Iterable[str] | None) -> tuple[list[int], list]:
+        if regras is None:
+            return list(range(len(self.regras))), self._grupos
+        nomes = set(regras)
+        indices = [indice for indice, regra in enumerate(self.regras) if regra.nome in nomes]
+        return indices, self._compilar(indices)
+
+    def _varrer(self, dados: list[dict], hoje: datetime, grupos: list, registrar: Callable[[int, dict], None]):
+        for item in dados:
+            linha = LinhaAvaliada(item, hoje)
+            for requer, regras in grupos:
+                if requer and not all(getattr(linha, condicao) for condicao in requer):
+                    continue
+                for indice, predicado in regras:
+                    if predicado(linha):
+                        registrar(indice, item)
+
+    def avaliar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, list]:
+        """
+        Executa as regras por linha sobre todas as tarefas.
+
+        Args:
+            dados: A lista de tarefas.
+            hoje: A data de referência.
+            regras: Nomes das regras a executar. Por padrão, todas as do registro.
+
+        Returns:
+            Um dicionário {chave do relatório: lista de IDs}, na ordem do registro,
+            com os IDs na ordem em que as tarefas aparecem em `dados`.
+        """
+        indices, grupos = self._selecionar(regras)
+        resultados = [[] for _ in self.regras]
+        self._varrer(dados, hoje, grupos, lambda indice, item: resultados[indice].append(item.get("Id")))
+        return {self.regras[indice].chave: resultados[indice] for indice in indices}
+
+    def contar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, int]:
+        """Como `avaliar`, mas retorna apenas a quantidade de tarefas que violam cada regra."""
+        indices, grupos = self._selecionar(regras)
+        contagens = [0] * len(self.regras)
+
+        def registrar(indice, item):
+            contagens[indice] += 1
+
+        self._varrer(dados, hoje, grupos, registrar)
+        return {self.regras[indice].chave: contagens[indice] for indice in indices}
+
+    def avaliar_linha(self, item: dict, hoje: datetime) -> tuple[str, ...]:
+        """Retorna as chaves das regras por linha que a tarefa viola."""
+        linha = LinhaAvaliada(item, hoje)
+        violadas = []
+        for requer, regras in self._grupos:
+            if requer and not all(getattr(linha, condicao) for condicao in requer):
+                continue
+            violadas.extend(indice for indice, predicado in regras if predicado(linha))
+        return tuple(self.regras[indice].chave for indice in sorted(violadas))
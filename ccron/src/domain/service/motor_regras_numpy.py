@@ -0,0 +1,306 @@
+from ccron.src.domain.ports.motor_regras_interface import MotorRegrasInterface
+from ccron.src.domain.service.motor_regras import (
+    REGRAS_LINHA, RegraLinha, LinhaAvaliada, MotorRegras, converter_data, _preenchido,
+    nome_amp, tem_predecessora, nome_excluido_peso_zero,
+)
+from ccron.src.domain.service.regras_validacao import RegrasValidacao, cortar_estrutura
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+
+from datetime import datetime
+from typing import Callable, Iterable
+import numbers
+
+import numpy as np
+
+
+class ColunasTarefas:
+    """
+    Representação colunar das tarefas transformadas, montada uma única vez por análise.
+
+    - Máscaras booleanas para `Ativo`/`Resumo` e para os campos preenchidos.
+    - Arrays float para os campos numéricos. Valores não numéricos viram NaN e
+      ficam marcados em `nao_numerico`, para que as regras que dependem deles
+      possam recorrer à implementação por linha.
+    - Ordinais de data (dias) para os campos de data, com -1 para vazio ou inválido.
+    - Códigos de categoria para os campos de texto com poucos valores distintos.
+
+    Com uma `TabelaTarefas`, as colunas são lidas diretamente da tabela e os
+    códigos das colunas já codificadas por dicionário são reaproveitados.
+    """
+    CAMPOS_NUMERICOS = ("Duração", "Trabalho", "Custo", "Peso")
+    CAMPOS_DATA = ("Término", "Término_real", "Início_real")
+    CAMPOS_CATEGORIA = ("Tipo", "Modo_da_Tarefa", "Tipo_de_restrição", "Nomes_dos_recursos", "Nome")
+
+    def __init__(self, dados: list[dict]):
+        self.dados = dados
+        self.tamanho = len(dados)
+        self.ids = self._valores("Id")
+
+        ativo = self._valores("Ativo")
+        resumo = self._valores("Resumo")
+        self.ativo = self._mascara(valor == "Sim" for valor in ativo)
+        self.inativo = self._mascara(valor == "Não" for valor in ativo)
+        self.resumo = self._mascara(valor == "Sim" for valor in resumo)
+        self.nao_resumo = self._mascara(valor == "Não" for valor in resumo)
+        self.tem_recurso = self._mascara(_preenchido(valor) for valor in self._valores("Nomes_dos_recursos"))
+        self.tem_predecessora = self._mascara(tem_predecessora(valor) for valor in self._valores("Predecessoras"))
+        self.id_diferente_zero = self._mascara(valor != 0 for valor in self.ids)
+
+        self.numericos: dict[str, np.ndarray] = {}
+        self.nao_numerico: dict[str, np.ndarray] = {}
+        for campo in self.CAMPOS_NUMERICOS:
+            self.numericos[campo], self.nao_numerico[campo] = self._numerico(campo)
+
+        self.datas: dict[str, np.ndarray] = {}
+        self.data_invalida: dict[str, np.ndarray] = {}
+        for campo in self.CAMPOS_DATA:
+            self.datas[campo], self.data_invalida[campo] = self._ordinais(campo)
+
+        self.codigos: dict[str, np.ndarray] = {}
+        self.categorias: dict[str, list] = {}
+        for campo in self.CAMPOS_CATEGORIA:
+            self.codigos[campo], self.categorias[campo] = self._categorizar(campo)
+
+    def _valores(self, campo: str) -> list:
+        if isinstance(self.dados, TabelaTarefas):
+            return self.dados.coluna(campo)
+        return [item.get(campo) for item in self.dados]
+
+    def _mascara(self, valores: Iterable[bool]) -> np.ndarray:
+        return np.fromiter(valores, dtype=bool, count=self.tamanho)
+
+    def _numerico(self, campo: str) -> tuple[np.ndarray, np.ndarray]:
+        valores = np.full(self.tamanho, np.nan)
+        nao_numerico = np.zeros(self.tamanho, dtype=bool)
+        for posicao, valor in enumerate(self._valores(campo)):
+            # numbers.Real cobre int, float, bool e os escalares do NumPy (np.integer, np.floating).
+            if isinstance(valor, (numbers.Real, np.integer)):
+                valores[posicao] = valor
+            else:
+                nao_numerico[posicao] = True
+        return valores, nao_numerico
+
+    def _ordinais(self, campo: str) -> tuple[np.ndarray, np.ndarray]:
+        ordinais = np.full(self.tamanho, -1, dtype=np.int64)
+        invalida = np.zeros(self.tamanho, dtype=bool)
+        for posicao, valor in enumerate(self._valores(campo)):
+            if not _preenchido(valor):
+                continue
+            try:
+                ordinais[posicao] = converter_data(valor).toordinal()
+            except (ValueError, TypeError):
+                invalida[posicao] = True
+        return ordinais, invalida
+
+    def _categorizar(self, campo: str) -> tuple[np.ndarray, list]:
+        if isinstance(self.dados, TabelaTarefas):
+            codificada = self.dados.categorias(campo)
+            if codificada is not None and len(set(codificada[1])) == len(codificada[1]):
+                return np.frombuffer(codificada[0], dtype=np.uint16).astype(np.int64), codificada[1]
+
+        codigos_por_valor: dict = {}
+        categorias: list = []
+        codigos = np.empty(self.tamanho, dtype=np.int64)
+        for posicao, valor in enumerate(self._valores(campo)):
+            try:
+                codigo = codigos_por_valor.get(valor)
+            except TypeError:  # valor não hashable
+                codigo = None
+                valor = None
+            if codigo is None:
+                codigo = len(categorias)
+                codigos_por_valor[valor] = codigo
+                categorias.append(valor)
+            codigos[posicao] = codigo
+        return codigos, categorias
+
+    def igual_a(self, campo: str, valor) -> np.ndarray:
+        """Máscara das linhas cujo campo de categoria é igual a `valor`."""
+        try:
+            codigo = self.categorias[campo].index(valor)
+        except ValueError:
+            return np.zeros(self.tamanho, dtype=bool)
+        return self.codigos[campo] == codigo
+
+    def por_categoria(self, campo: str, mascara: np.ndarray, predicado: Callable) -> np.ndarray:
+        """
+        Avalia `predicado` uma única vez por valor distinto do campo, entre as
+        linhas selecionadas pela máscara, e espalha o resultado para as linhas.
+        """
+        codigos = self.codigos[campo]
+        categorias = self.categorias[campo]
+        resultado_por_codigo = np.zeros(len(categorias), dtype=bool)
+        for codigo in np.unique(codigos[mascara]):
+            resultado_por_codigo[codigo] = predicado(categorias[codigo])
+        return mascara & resultado_por_codigo[codigos]
+
+
+def _aplicavel(colunas: ColunasTarefas, regra: RegraLinha) -> np.ndarray:
+    mascara = np.ones(colunas.tamanho, dtype=bool)
+    for condicao in regra.requer:
+        mascara &= getattr(colunas, condicao)
+    return mascara
+
+
+def _data_futura(campo: str):
+    def regra(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+        if (mascara & colunas.data_invalida[campo]).any():
+            return None
+        return mascara & (colunas.datas[campo] > hoje.toordinal())
+    return regra
+
+
+def _atrasadas(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+    termino_preenchido = (colunas.datas["Término"] != -1) | colunas.data_invalida["Término"]
+    termino_real_vazio = (colunas.datas["Término_real"] == -1) & ~colunas.data_invalida["Término_real"]
+    mascara = mascara & termino_preenchido & termino_real_vazio
+    if (mascara & colunas.data_invalida["Término"]).any():
+        return None
+    return mascara & (colunas.datas["Término"] <= hoje.toordinal())
+
+
+def _sem_recurso(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+    if (mascara & colunas.nao_numerico["Duração"]).any():
+        return None
+    return mascara & (colunas.numericos["Duração"] > 0) & ~colunas.tem_recurso
+
+
+def _trabalho_incorreto(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+    duracao = colunas.numericos["Duração"]
+    trabalho = colunas.numericos["Trabalho"]
+    if (mascara & colunas.nao_numerico["Duração"]).any():
+        return None
+    mascara = mascara & (duracao >= 0)
+    # int() de um trabalho não numérico ou NaN lança erro na regra por linha.
+    if (mascara & ~np.isfinite(trabalho)).any():
+        return None
+    with np.errstate(invalid="ignore"):
+        duracao_int = np.trunc(duracao)
+        return mascara & (duracao_int > 0) & (np.trunc(trabalho) / 8 != duracao_int)
+
+
+def _duracao_maior_21_dias(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+    if (mascara & colunas.nao_numerico["Duração"]).any():
+        return None
+    return mascara & (colunas.numericos["Duração"] > 21.0)
+
+
+def _peso_zero(colunas: ColunasTarefas, mascara: np.ndarray, hoje: datetime) -> np.ndarray | None:
+    mascara = mascara & (colunas.numericos["Peso"] == 0)
+    return colunas.por_categoria("Nome", mascara, lambda nome: not nome_excluido_peso_zero(nome))
+
+# Cada regra vetorizada recebe as colunas, a máscara das linhas em que a regra se
+# aplica e a data de referência. Retorna None quando encontra um valor que a versão
+# vetorizada não reproduz com segurança; nesse caso a regra é avaliada por linha.
+REGRAS_VETORIZADAS: dict[str, Callable[[ColunasTarefas, np.ndarray, datetime], np.ndarray | None]] = {
+    "sem_predecessoras": lambda c, m, h: m & ~c.tem_predecessora,
+    "inativas_com_predecessoras": lambda c, m, h: m & c.tem_predecessora,
+    "atrasadas": _atrasadas,
+    "inicio_real_futuro": _data_futura("Início_real"),
+    "termino_real_futuro": _data_futura("Término_real"),
+    "tipo_duracao_invalido": lambda c, m, h: m & ~c.igual_a("Tipo", "Trabalho fixo"),
+    "agendamento_manual": lambda c, m, h: m & ~c.igual_a("Modo_da_Tarefa", "Agendada Automaticamente"),
+    "restricao": lambda c, m, h: m & ~c.igual_a("Tipo_de_restrição", "O Mais Breve Possível"),
+    "sem_recurso": _sem_recurso,
+    "trabalho_incorreto": _trabalho_incorreto,
+    "recurso_indevido": lambda c, m, h: m & c.tem_recurso & (c.resumo | c.inativo),
+    "custo_zero": lambda c, m, h: m & (c.numericos["Custo"] == 0),
+    "duracao_zero": lambda c, m, h: m & (c.numericos["Duração"] == 0),
+    "nome_em_branco": lambda c, m, h: m & c.por_categoria("Nome", m, lambda nome: not _preenchido(nome)) & c.id_diferente_zero,
+    "usuario_generico": lambda c, m, h: m & c.igual_a("Nomes_dos_recursos", "Usuário Genérico"),
+    "duracao_maior_21_dias": _duracao_maior_21_dias,
+    "amp_ativas": lambda c, m, h: c.por_categoria("Nome", m, nome_amp),
+    "peso_zero": _peso_zero,
+}
+
+
+class MotorRegrasNumpy(MotorRegrasInterface):
+    """
+    Avalia as regras por linha como expressões vetorizadas sobre arrays NumPy.
+
+    As tarefas são convertidas em colunas uma única vez e cada regra vira uma
+    combinação de máscaras. Regras sem versão vetorizada, ou linhas com valores
+    que a versão vetorizada não reproduz (ex: data em formato inválido), caem na
+    avaliação por linha do `MotorRegras`, preservando o mesmo resultado.
+    """
+    def __init__(self, regras: Iterable[RegraLinha] = REGRAS_LINHA):
+        self.regras = list(regras)
+        self.motor_linha = MotorRegras(self.regras)
+
+    def _mascaras(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None):
+        colunas = ColunasTarefas(dados)
+        nomes = set(regras) if regras is not None else None
+        for regra in self.regras:
+            if nomes is not None and regra.nome not in nomes:
+                continue
+            aplicavel = _aplicavel(colunas, regra)
+            vetorizada = REGRAS_VETORIZADAS.get(regra.nome)
+            mascara = vetorizada(colunas, aplicavel, hoje) if vetorizada else None
+            if mascara is None:
+                mascara = self._avaliar_por_linha(regra, dados, aplicavel, hoje)
+            yield colunas, regra, mascara
+
+    def avaliar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, list]:
+        return {
+            regra.chave: [colunas.ids[posicao] for posicao in np.flatnonzero(mascara)]
+            for colunas, regra, mascara in self._mascaras(dados, hoje, regras)
+        }
+
+    def contar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, int]:
+        return {regra.chave: int(mascara.sum()) for _, regra, mascara in self._mascaras(dados, hoje, regras)}
+
+    def _avaliar_por_linha(self, regra: RegraLinha, dados: list[dict], aplicavel: np.ndarray, hoje: datetime) -> np.ndarray:
+        mascara = np.zeros(len(dados), dtype=bool)
+        for posicao in np.flatnonzero(aplicavel):
+            mascara[posicao] = regra.predicado(LinhaAvaliada(dados[posicao], hoje))
+        return mascara
+
+    def avaliar_linha(self, item: dict, hoje: datetime) -> tuple[str, ...]:
+        # Para uma linha isolada a conversão em colunas não compensa.
+        return self.motor_linha.avaliar_linha(item, hoje)
+
+
+class RegrasValidacaoNumpy(RegrasValidacao):
+    """
+    `RegrasValidacao` com o somatório de pesos por grupo feito com `np.bincount`.
+    """
+    def validar_peso(self, dados: list[dict]) -> list:
+        codigos_por_chave: dict[tuple, int] = {}
+        chaves: list[tuple] = []
+        id_primeira: list = []
+        codigos, pesos = [], []
+
+        for item in dados:
+            aux = cortar_estrutura(item.get("Número_da_estrutura_de_tópicos"))
+            chave = (aux, item.get('SAP_Tarefa'), item.get('ID_Bloco'))
+            if not all(chave):
+                continue
+
+            codigo = codigos_por_chave.get(chave)
+            if codigo is None:
+                codigo = codigos_por_chave[chave] = len(chaves)
+                chaves.append(chave)
+                id_primeira.append(item.get('Id'))
+
+            try:
+                peso = float(item.get('Peso', 0.0))
+            except (ValueError, TypeError):
+                continue  # Ignora pesos não numéricos
+            codigos.append(codigo)
+            pesos.append(peso)
+
+        # bincount soma na ordem das linhas, o mesmo arredondamento da soma acumulada.
+        somas = np.bincount(np.asarray(codigos, dtype=np.int64), weights=np.asarray(pesos, dtype=float),
+                            minlength=len(chaves))
+
+        return [
+            {
+                "Aux": chave[0],
+                "SAP_Tarefa": chave[1],
+                "ID_Bloco": chave[2],
+                "Peso": float(soma),
+                "IdTarefa": id_primeira[codigo],
+            }
+            for codigo, (chave, soma) in enumerate(zip(chaves, somas))
+            if soma != 100 and soma != 0
+        ]
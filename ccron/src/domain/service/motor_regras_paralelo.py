@@ -0,0 +1,117 @@
+from ccron.src.domain.ports.motor_regras_interface import MotorRegrasInterface
+from ccron.src.domain.service.motor_regras import MotorRegras
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Iterable
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Únicas colunas lidas pelas regras por linha. Só elas são enviadas aos processos.
+COLUNAS_REGRAS_LINHA = (
+    "Id", "Ativo", "Resumo", "Predecessoras", "Nomes_dos_recursos",
+    "Término", "Término_real", "Início_real", "Tipo", "Modo_da_Tarefa",
+    "Tipo_de_restrição", "Duração", "Trabalho", "Custo", "Nome", "Peso",
+)
+
+_motor_processo: MotorRegras | None = None
+
+
+def _avaliar_fatia(linhas: list[tuple], hoje: datetime, regras: list[str] | None, contar: bool) -> dict:
+    """Executada no processo filho: avalia uma fatia de linhas projetadas."""
+    global _motor_processo
+    if _motor_processo is None:
+        _motor_processo = MotorRegras()
+    dados = [dict(zip(COLUNAS_REGRAS_LINHA, linha)) for linha in linhas]
+    if contar:
+        return _motor_processo.contar(dados, hoje, regras)
+    return _motor_processo.avaliar(dados, hoje, regras)
+
+
+class MotorRegrasParalelo(MotorRegrasInterface):
+    """
+    Avalia as regras por linha em um pool de processos, dividindo as tarefas em fatias.
+
+    Cada fatia leva apenas as colunas usadas pelas regras, como tuplas, para
+    reduzir o custo de serialização: as fatias são copiadas (pickle) para os
+    processos, sem memória compartilhada. Os resultados das fatias são concatenados na
+    ordem original, então as listas de IDs são as mesmas da execução em um só
+    processo. Cronogramas menores que `min_linhas` são avaliados no próprio
+    processo, onde o custo de enviar as fatias não compensa.
+
+    As regras que dependem de várias linhas (`validar_peso`, `verificar_condicoes`,
+    `verificar_modulo`) não passam por este motor e continuam no processo principal.
+    Se o pool falhar ou alguma fatia não puder ser serializada, as regras são
+    avaliadas no próprio processo.
+
+    Args:
+        processos: Tamanho do pool. Padrão: CCRON_PROCESSOS_REGRAS ou a quantidade de CPUs.
+        min_linhas: Tamanho mínimo para paralelizar. Padrão: CCRON_MIN_LINHAS_PARALELO ou 20000.
+    """
+    def __init__(self, processos: int | None = None, min_linhas: int | None = None):
+        self.processos = processos or int(os.getenv("CCRON_PROCESSOS_REGRAS", "0")) or os.cpu_count() or 1
+        self.min_linhas = min_linhas if min_linhas is not None else int(os.getenv("CCRON_MIN_LINHAS_PARALELO", "20000"))
+        self.motor_local = MotorRegras()
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn" evita herdar threads e sockets do servidor web no fork.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processos, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _descartar_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _fatias(self, dados: list[dict]) -> list[list[tuple]]:
+        tamanho = -(-len(dados) // self.processos)
+        return [
+            [tuple(item.get(coluna) for coluna in COLUNAS_REGRAS_LINHA) for item in dados[inicio:inicio + tamanho]]
+            for inicio in range(0, len(dados), tamanho)
+        ]
+
+    def _executar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None, contar: bool) -> dict:
+        regras = list(regras) if regras is not None else None
+        local = self.motor_local.contar if contar else self.motor_local.avaliar
+        if self.processos < 2 or len(dados) < self.min_linhas:
+            return local(dados, hoje, regras)
+
+        try:
+            pool = self._obter_pool()
+            futuros = [pool.submit(_avaliar_fatia, fatia, hoje, regras, contar) for fatia in self._fatias(dados)]
+            parciais = [futuro.result() for futuro in futuros]
+        except BrokenProcessPool as e:
+            logger.warning("Pool de processos das regras falhou, avaliando no processo principal: %s", e)
+            self._descartar_pool()
+            return local(dados, hoje, regras)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # Valor que não pode ser enviado ao processo filho; o pool continua válido.
+            logger.warning("Fatia das regras não serializável, avaliando no processo principal: %s", e)
+            return local(dados, hoje, regras)
+
+        resultado = parciais[0]
+        for parcial in parciais[1:]:
+            for chave, valor in parcial.items():
+                resultado[chave] += valor
+        return resultado
+
+    def avaliar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, list]:
+        return self._executar(dados, hoje, regras, contar=False)
+
+    def contar(self, dados: list[dict], hoje: datetime, regras: Iterable[str] | None = None) -> dict[str, int]:
+        return self._executar(dados, hoje, regras, contar=True)
+
+    def avaliar_linha(self, item: dict, hoje: datetime) -> tuple[str, ...]:
+        return self.motor_local.avaliar_linha(item, hoje)
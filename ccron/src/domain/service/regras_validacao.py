@@ -1,6 +1,53 @@
 from ccron.src.domain.ports.regras_validacao_interface import RegrasValidacaoInterface
+from ccron.src.domain.service.arvore_estrutura import ArvoreEstrutura
+from ccron.src.domain.service.motor_regras import filtrar_por_regra
+from ccron.src.domain.service.grafo_predecessoras import interpretar_predecessoras
+from ccron.src.domain.service.visoes_analise import VisoesAnalise
 from datetime import datetime
-import re
+
+def cortar_estrutura(numero: str | None) -> str:
+    """Retorna o número de estrutura do tópico pai, sem os pontos (ex: "1.2.3" -> "12")."""
+    if not numero: return ""
+    chave = ArvoreEstrutura.converter_numero(numero)
+    if chave is not None:
+        return "".join(str(parte) for parte in chave[:-1])
+    partes = str(numero).split(".")
+    return "".join(partes[:-1])
+
+
+# Tipos de preenchimento verificados por `verificar_preenchimento`, na ordem do relatório.
+TIPOS_PREENCHIMENTO = ("ID Bloco", "SAP Elemento PEP", "SAP Diagrama de Rede", "SAP Tarefa")
+_AGRUPAMENTOS_SEM_SAP = ("pré projeto", "habite-se", "mão de obra rateio")
+_AGRUPAMENTOS_SEM_BLOCO = _AGRUPAMENTOS_SEM_SAP + ("pré projeto módulo",)
+NOME_PRE_PROJETO = "pré projeto - pp"
+
+
+def pendencias_preenchimento(t: dict) -> tuple[str, ...]:
+    """Os tipos de `TIPOS_PREENCHIMENTO` que a tarefa deveria ter preenchido e não tem."""
+    nivel = t.get("Nível_da_estrutura_de_tópicos", 0)
+    agrupamento = str(t.get("Agrupamento")).lower()
+    pendencias = []
+    if nivel >= 3 and t.get("ID_Bloco") is None and agrupamento not in _AGRUPAMENTOS_SEM_BLOCO:
+        pendencias.append("ID Bloco")
+    if nivel >= 3 and t.get("SAP_Elemento_PEP") is None and agrupamento not in _AGRUPAMENTOS_SEM_SAP:
+        pendencias.append("SAP Elemento PEP")
+    if nivel >= 6 and t.get("SAP_Diagrama_de_Rede") is None:
+        pendencias.append("SAP Diagrama de Rede")
+    if nivel >= 5 and t.get("SAP_Tarefa") is None and agrupamento not in _AGRUPAMENTOS_SEM_SAP:
+        pendencias.append("SAP Tarefa")
+    return tuple(pendencias)
+
+
+def posicao_pre_projeto(nomes_normalizados: list[str]) -> int | None:
+    """Posição da tarefa-resumo do Pré-Projeto (a primeira com esse nome), raiz da sua subárvore."""
+    return next((p for p, nome in enumerate(nomes_normalizados) if nome == NOME_PRE_PROJETO), None)
+
+
+def posicao_modulo_02(tasks: list[dict]) -> int | None:
+    """Posição da primeira tarefa "MÓDULO 02" não inativa; sem ela, o MÓDULO_ASC não é exigido."""
+    return next((p for p, t in enumerate(tasks)
+                 if t.get("Ativo") != "Não" and str(t.get("Nome", "")).upper() == 'MÓDULO 02'), None)
+
 
 class RegrasValidacao(RegrasValidacaoInterface):
     def verificar_predecessoras(self, dados: list[dict]) -> list:
@@ -12,23 +59,11 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que não têm predecessoras.
         """
-        return [
-            item.get("Id")
-            for item in dados
-            if (item.get("Resumo") == "Não")
-            and (item.get("Ativo") == "Sim")
-            and (item.get("Predecessoras") == "nan" or (not item.get("Predecessoras")))
-        ]
-        
+        return filtrar_por_regra("sem_predecessoras", dados)
+
     def verificar_id_inativo_com_predecessoras(self, dados: list[dict]) -> list:
-        return [
-            item.get("Id")
-            for item in dados
-            if (item.get("Resumo") == "Não")
-            and (item.get("Ativo") == "Não")
-            and item.get("Predecessoras") and item.get("Predecessoras") != "nan"
-        ]
-    
+        return filtrar_por_regra("inativas_com_predecessoras", dados)
+
     def validar_peso(self, dados: list[dict]) -> list:
         """
         Valida se o somatório de pesos de tarefas filhas é 100% para um serviço ou pavimento.
@@ -50,11 +85,6 @@ class RegrasValidacao(RegrasValidacaoInterface):
         """
         grupos = {}
 
-        def cortar_estrutura(numero: str | None) -> str:
-            if not numero: return ""
-            partes = str(numero).split(".")
-            return "".join(partes[:-1])
-
         for item in dados:
             aux = cortar_estrutura(item.get("Número_da_estrutura_de_tópicos"))
             chave = (aux, item.get('SAP_Tarefa'), item.get('ID_Bloco'))
@@ -99,15 +129,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
         Returns:
             list: Uma lista de IDs das tarefas atrasadas.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if (item.get("Término") and str(item.get("Término")).lower() != "nan") 
-            and (item.get("Ativo") == "Sim")
-            and (not item.get("Término_real") or str(item.get("Término_real")).lower() == "nan")
-            and (datetime.strptime(item.get("Término"), r"%d/%m/%Y") <= hoje)
-        ]
-        
+        return filtrar_por_regra("atrasadas", dados, hoje)
+
     def verificar_inicio_real_futuro(self, dados: list[dict], hoje: datetime) -> list:
         """
         Verifica tarefas que possuem uma data de início real no futuro.
@@ -125,13 +148,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
         Returns:
             list: Uma lista de IDs das tarefas que se encaixam na condição.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if (item.get("Início_real") and str(item.get("Início_real")).lower() != "nan")  
-            and datetime.strptime(item.get("Início_real"), r"%d/%m/%Y") > hoje
-        ]
-    
+        return filtrar_por_regra("inicio_real_futuro", dados, hoje)
+
     def verificar_tarefas_com_agendamento_manual(self, dados: list[dict]) -> list:
         """
         Identifica tarefas que não estão configuradas com "Agendamento Automático".
@@ -142,12 +160,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que possuem agendamento manual.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Modo_da_Tarefa") != "Agendada Automaticamente"
-        ]
-    
+        return filtrar_por_regra("agendamento_manual", dados)
+
     def verificar_termino_real_futuro(self, dados: list[dict], hoje: datetime) -> list:
         """
         Verifica tarefas que possuem uma data de término real no futuro.
@@ -165,12 +179,7 @@ class RegrasValidacao(RegrasValidacaoInterface):
         Returns:
             list: Uma lista de IDs das tarefas que se encaixam na condição.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if (item.get("Término_real") and str(item.get("Término_real")).lower() != "nan")
-            and datetime.strptime(item.get("Término_real"), r"%d/%m/%Y") > hoje
-        ]
+        return filtrar_por_regra("termino_real_futuro", dados, hoje)
 
     def verificar_tipo_de_tarefas(self, dados: list[dict]) -> list:
         """
@@ -181,14 +190,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Tipo") != "Trabalho fixo"
-            and item.get("Resumo") == "Não"
-            and item.get("Ativo") == "Sim"
-        ]
-        
+        return filtrar_por_regra("tipo_duracao_invalido", dados)
+
     def tarefas_com_restricao(self, dados: list[dict]) -> list:
         """
         Verifica tarefas ativas com restrições de data, ou seja, aquelas que
@@ -200,14 +203,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Tipo_de_restrição") != "O Mais Breve Possível"
-            and item.get("Ativo") == "Sim"
-        ]
-        
-        
+        return filtrar_por_regra("restricao", dados)
+
     def verificar_tarefas_com_duracao_e_sem_recurso(self, dados: list[dict]) -> list:
         """
         Verifica tarefas ativas, não-resumo e com duração maior que zero, mas que
@@ -218,15 +215,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Duração", 0) > 0
-            and item.get("Resumo") == "Não"
-            and item.get("Ativo") == "Sim"
-            and ((not item.get("Nomes_dos_recursos")) or str(item.get("Nomes_dos_recursos")).lower() == "nan")
-        ]
-        
+        return filtrar_por_regra("sem_recurso", dados)
+
     def verificar_duracao_por_dia(self, dados: list[dict]) -> list:
         """
         Verifica se a coluna 'Trabalho' está preenchida incorretamente.
@@ -242,19 +232,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
             list: Uma lista de IDs das tarefas que se encaixam na condição de
             terem o trabalho incorreto.
         """
-        ids_invalidos = []
-        for item in dados:
-            duracao = item.get("Duração")
-            trabalho = item.get("Trabalho")
-
-            if (duracao is not None or str(duracao).lower() != "nan") and duracao >= 0 and item.get("Resumo") == "Não" and item.get("Ativo") == "Sim":
-                trabalho_int = int(trabalho) if trabalho is not None else 0
-                duracao_int = int(duracao) if duracao is not None else 0
+        return filtrar_por_regra("trabalho_incorreto", dados)
 
-                if duracao_int > 0 and (trabalho_int / 8) != duracao_int:
-                    ids_invalidos.append(item["Id"])
-        return ids_invalidos
-    
     def nao_deve_ter_recurso(self, dados: list[dict]) -> list:
         """
         Verifica tarefas que não deveriam ter recursos alocados, mas que os possuem.
@@ -264,13 +243,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        ids_invalidos = []
-        for item in dados:
-            if item.get("Nomes_dos_recursos") and str(item.get("Nomes_dos_recursos")).lower() != "nan":
-                if item.get("Resumo") == "Sim" or item.get("Ativo") == "Não":
-                    ids_invalidos.append(item["Id"])
-        return ids_invalidos
-    
+        return filtrar_por_regra("recurso_indevido", dados)
+
     def tarefas_ativas_com_custo_zero(self, dados: list[dict]) -> list:
         """
         Verifica tarefas ativas com custo zero.
@@ -280,8 +254,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas ativas que não possuem custo.
         """
-        return [item["Id"] for item in dados if item.get("Ativo") == "Sim" and item.get("Custo") == 0]
-    
+        return filtrar_por_regra("custo_zero", dados)
+
     def tarefas_com_duracao_zero(self, dados: list[dict]) -> list:
         """
         Verifica tarefas com duração igual a zero.
@@ -291,8 +265,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
         
         Retorna uma lista de IDs das tarefas com duração zero.
         """
-        return [item["Id"] for item in dados if item.get("Duração") == 0]
-    
+        return filtrar_por_regra("duracao_zero", dados)
+
     def tarefas_com_nome_em_branco(self, dados: list[dict]) -> list:
         """
         Verifica tarefas ativas com ID diferente de 0 que não têm nome.
@@ -304,14 +278,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if (not item.get("Nome") or str(item.get("Nome")).lower() == "nan")
-            and item.get("Id") != 0
-            and item.get("Ativo") == "Sim"
-        ]
-        
+        return filtrar_por_regra("nome_em_branco", dados)
+
     def tarefas_com_recurso_usuario_generico(self, dados: list[dict]) -> list:
         """
         Verifica se o recurso 'Usuário Genérico' foi alocado para alguma tarefa.
@@ -321,7 +289,7 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessa condição.
         """
-        return [item["Id"] for item in dados if item.get("Nomes_dos_recursos") == "Usuário Genérico"]
+        return filtrar_por_regra("usuario_generico", dados)
 
     def tarefas_com_duracao_maior_que_21_dias(self, dados: list[dict]) -> list:
         """
@@ -335,12 +303,8 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Duração", 0) > 21.0 and item.get("Resumo") == "Não"
-        ]
-    
+        return filtrar_por_regra("duracao_maior_21_dias", dados)
+
     def verificar_tarefas_amp(self, dados: list[dict]) -> list:
         """
         Verifica se tarefas com nomes específicos estão ativas.
@@ -351,16 +315,13 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas ativas que se encaixam nessa condição.
         """
-        tarefas_alvo = ["ANDAM JUNTO", "MÃO DE OBRA RATEIO", "HABITE-SE"]
-        return [
-            item["Id"]
-            for item in dados
-            if item.get("Nome") in str(tarefas_alvo).upper() and item.get("Ativo") == "Sim"
-        ]
-        
+        return filtrar_por_regra("amp_ativas", dados)
+
     def tarefas_com_latencia(self, dados: list[dict]) -> list:
         """
         Encontra tarefas com latência de predecessora maior que 5 dias.
+
+        A latência é convertida para dias pela unidade do vínculo (ex: "+48 hrs").
         
         Args:
             tasks: Uma lista de dicionários, onde cada dicionário é uma tarefa.
@@ -368,15 +329,11 @@ class RegrasValidacao(RegrasValidacaoInterface):
         Returns:
             Uma lista com os IDs das tarefas que atendem ao critério.
         """
-        result = []
-        for item in dados:
-            try:
-                latencia = re.search(r'.*\s?(\+|-)\s?(\d*)', item.get("Predecessoras"))
-                if latencia and int(latencia.group(2)) > 5:
-                    result.append(item.get("Id"))                
-            except Exception:
-                pass
-        return result
+        return [
+            item.get("Id") for item in dados
+            if any(abs(vinculo.latencia) > 5 for vinculo in interpretar_predecessoras(item.get("Predecessoras"))
+                   if not vinculo.percentual)
+        ]
     
     def tarefas_com_nivel_maior_que_7(self, dados: list[dict]) -> list:
         """
@@ -405,21 +362,10 @@ class RegrasValidacao(RegrasValidacaoInterface):
         Returns:
             list[str]: Uma lista de IDs das tarefas que se encaixam na condição.
         """
-        palavras_excluidas = {
-            "leg ", "iptu", "itbi", "escritura", "inc ", 
-            "projeto", "custo material pp - obra"
-        }
-        return [
-            item["Id"]
-            for item in dados
-            if (item.get("Peso") == 0 and
-                item.get("Resumo") == "Não" and
-                item.get("Ativo") == "Sim" and
-                # A linha abaixo executa a verificação das palavras excluídas
-                not any(palavra in str(item.get("Nome", "")).lower() for palavra in palavras_excluidas))
-        ]
-    
-    def verificar_condicoes(self, tasks: list[dict]) -> list:
+        return filtrar_por_regra("peso_zero", dados)
+
+    def verificar_condicoes(self, tasks: list[dict], arvore: ArvoreEstrutura | None = None,
+                            visoes: VisoesAnalise | None = None) -> list:
         """
         Identifica tarefas com agrupamentos inconsistentes, ou seja, preenchidos
         de maneira diferente do padrão estabelecido.
@@ -429,81 +375,71 @@ class RegrasValidacao(RegrasValidacaoInterface):
         (Blocos ASC, Pré-Projeto e outros). A lógica da função é dividida para
         tratar cada cenário de forma específica.
 
+        As seleções por ramo da estrutura (Bloco ASC, Pré-Projeto) são feitas
+        sobre a árvore de tópicos, em vez de varrer todas as tarefas comparando
+        prefixos de string.
+
+        Args:
+            tasks (list[dict]): A lista de tarefas a ser verificada.
+            arvore: Índice da estrutura de tópicos já construído para `tasks`.
+                    Se omitido, é construído aqui.
+            visoes: Visões de `tasks` da análise em andamento, de onde vêm a
+                    árvore e os nomes e agrupamentos já normalizados.
+
         Returns:
             list: Uma lista de IDs das tarefas que se encaixam na condição de
             terem agrupamentos inconsistentes.
         """
-        def _verificar_condicoes_helper(lista_tarefas: list[dict], niveis: list, agrupamento_incorreto: str) -> list:
+        visoes = visoes or VisoesAnalise(tasks)
+        arvore = arvore or visoes.arvore
+        nomes = visoes.nomes_normalizados
+        agrupamentos = visoes.agrupamentos_normalizados
+
+        def _verificar_condicoes_helper(posicoes: list[int], niveis: list, agrupamento_incorreto: str) -> list:
             return [
-                t["Id"]
-                for t in lista_tarefas
-                if t.get("Nível_da_estrutura_de_tópicos") in niveis
-                and t.get("Agrupamento") != agrupamento_incorreto
+                tasks[p]["Id"]
+                for p in posicoes
+                if tasks[p].get("Nível_da_estrutura_de_tópicos") in niveis
+                and agrupamentos[p] != agrupamento_incorreto
             ]
 
-        def _obter_numero_estrutura_helper(lista_tarefas: list[dict], nome_tarefa: str) -> str | None:
-            for t in lista_tarefas:
-                if t.get("Nome") == nome_tarefa:
-                    return t.get("Número_da_estrutura_de_tópicos")
-            return None
-
-        def _verificar_agrupamento_helper(lista_tarefas: list[dict], nome_tarefa: str, agrupamento_esperado: str) -> list:
+        def _verificar_agrupamento_helper(nome_tarefa: str, agrupamento_esperado: str) -> list:
             return [
-                t["Id"]
-                for t in lista_tarefas
-                if t.get("Nome") == nome_tarefa
-                and t.get("Agrupamento") != agrupamento_esperado
+                tasks[p]["Id"]
+                for p in range(len(tasks))
+                if nomes[p] == nome_tarefa
+                and agrupamentos[p] != agrupamento_esperado
             ]
-            
-        tarefas_processadas = []
-        for t in tasks:
-            copia_task = t.copy()
-            copia_task["Nome"] = str(t.get("Nome", "")).strip().lower()
-            copia_task["Agrupamento"] = str(t.get("Agrupamento", "")).strip().lower()
-            tarefas_processadas.append(copia_task)
 
         condicoes_invalidas = {}
 
-        lista_asc = [
-            t
-            for t in tarefas_processadas
-            if str(t.get("Número_da_estrutura_de_tópicos", "")).startswith("1.1.1.")
-        ]
+        asc = (1, 1, 1)
+        lista_asc = arvore.posicoes_subarvore(asc, incluir_raiz=False)
         condicoes_invalidas["ASC Nível 3"] = _verificar_condicoes_helper(lista_asc, [3], "bloco asc")
         condicoes_invalidas["ASC Nível 4"] = _verificar_condicoes_helper(lista_asc, [4], "diagrama de rede")
         condicoes_invalidas["ASC Nível 5"] = _verificar_condicoes_helper(lista_asc, [5], "asc")
         condicoes_invalidas["ASC Nível 6"] = _verificar_condicoes_helper(lista_asc, [6], "servico")
 
-        numero_pp = _obter_numero_estrutura_helper(tarefas_processadas, "pré projeto - pp")
-        if numero_pp:
-            lista_pp = [
-                t
-                for t in tarefas_processadas
-                if str(t.get("Número_da_estrutura_de_tópicos", "")).startswith(numero_pp)
-            ]
+        posicao_pp = posicao_pre_projeto(nomes)
+        chave_pp = arvore.chaves_por_posicao[posicao_pp] if posicao_pp is not None else None
+        if chave_pp:
+            lista_pp = arvore.posicoes_subarvore(chave_pp)
             condicoes_invalidas["PP Níveis 3-6"] = _verificar_condicoes_helper(lista_pp, [3, 4, 5, 6], "pré projeto")
             condicoes_invalidas["PP Nível 7"] = _verificar_condicoes_helper(lista_pp, [7], "pré projeto módulo")
 
-        condicoes_invalidas["Agrup. Habite-se"] = _verificar_agrupamento_helper(tarefas_processadas, "habite-se", "habite-se")
-        condicoes_invalidas["Agrup. Mão de Obra"] = _verificar_agrupamento_helper(tarefas_processadas, "mão de obra rateio", "mão de obra rateio")
-        
-        todos_numeros_estrutura = {t.get("Número_da_estrutura_de_tópicos") for t in tarefas_processadas if t.get("Número_da_estrutura_de_tópicos")}
-        
-        numeros_estrutura_outros = {
-            num
-            for num in todos_numeros_estrutura
-            if len(num) >= 5
-            and not num.startswith("1.1.1.")
-            and not (numero_pp and num.startswith(numero_pp))
-        }
-        
+        condicoes_invalidas["Agrup. Habite-se"] = _verificar_agrupamento_helper("habite-se", "habite-se")
+        condicoes_invalidas["Agrup. Mão de Obra"] = _verificar_agrupamento_helper("mão de obra rateio", "mão de obra rateio")
+
+        posicoes_excluidas = arvore.posicoes_nas_subarvores([(asc, False), (chave_pp, True)])
         lista_outros = [
-            t
-            for t in tarefas_processadas
-            if t.get("Número_da_estrutura_de_tópicos") in numeros_estrutura_outros
-            and t.get("Nome") not in ["habite-se", "mão de obra rateio"]
+            p
+            for p, t in enumerate(tasks)
+            if p not in posicoes_excluidas
+            and t.get("Número_da_estrutura_de_tópicos")
+            and len(str(t.get("Número_da_estrutura_de_tópicos"))) >= 5
+            and nomes[p] not in ["habite-se", "mão de obra rateio"]
         ]
-        
+
         condicoes_invalidas["Outros Nível 3"] = _verificar_condicoes_helper(lista_outros, [3], "bloco")
         condicoes_invalidas["Outros Nível 4"] = _verificar_condicoes_helper(lista_outros, [4], "diagrama de rede")
         condicoes_invalidas["Outros Nível 5"] = _verificar_condicoes_helper(lista_outros, [5], "bloco (infra/supra)")
@@ -517,7 +453,7 @@ class RegrasValidacao(RegrasValidacaoInterface):
                 
         return list(ids_finais)
     
-    def verificar_modulo(self, tasks: list[dict]) -> list:
+    def verificar_modulo(self, tasks: list[dict], arvore: ArvoreEstrutura | None = None) -> list:
         """
         Verifica o preenchimento do campo MÓDULO_ASC em empreendimentos
         que possuem mais de um módulo.
@@ -527,20 +463,17 @@ class RegrasValidacao(RegrasValidacaoInterface):
 
         Retorna uma lista de IDs das tarefas que se encaixam nessas condições.
         """
-        tarefas_ativas = [t for t in tasks if t.get("Ativo") != "Não"]
-
-        nomes_ativos = [str(t.get("Nome", "")).upper() for t in tarefas_ativas]
-        if 'MÓDULO 02' not in nomes_ativos:
+        if posicao_modulo_02(tasks) is None:
             return []
 
-        ids_invalidos = []
-        for t in tarefas_ativas:
-            num_estrutura = t.get("Número_da_estrutura_de_tópicos", "")
-            nivel = t.get("Nível_da_estrutura_de_tópicos")
-            if num_estrutura.startswith('1.1.1.') and nivel == 6:
-                if t.get("MÓDULO_ASC") is None:
-                    ids_invalidos.append(t["Id"])
-        return ids_invalidos
+        arvore = arvore or ArvoreEstrutura(tasks)
+        return [
+            t["Id"]
+            for t in arvore.subarvore((1, 1, 1), incluir_raiz=False)
+            if t.get("Ativo") != "Não"
+            and t.get("Nível_da_estrutura_de_tópicos") == 6
+            and t.get("MÓDULO_ASC") is None
+        ]
     
     def verificar_preenchimento(self, tasks: list[dict]) -> list:
         """
@@ -561,36 +494,19 @@ class RegrasValidacao(RegrasValidacaoInterface):
             list: Uma lista de listas, onde cada lista interna contém o nome da categoria
             (e.g., "ID Bloco") e uma lista de IDs das tarefas com falhas de preenchimento.
         """
-        agrupamentos_excluidos = ["pré projeto", "habite-se", "mão de obra rateio", "pré projeto módulo"]
-        
-        ids_id_bloco = [
-            t["Id"] for t in tasks
-            if t.get("Nível_da_estrutura_de_tópicos", 0) >= 3
-            and t.get("ID_Bloco") is None
-            and str(t.get("Agrupamento")).lower() not in agrupamentos_excluidos
-        ]
-        ids_pep = [
-            t["Id"] for t in tasks
-            if t.get("Nível_da_estrutura_de_tópicos", 0) >= 3
-            and t.get("SAP_Elemento_PEP") is None
-            and str(t.get("Agrupamento")).lower() not in ["pré projeto", "habite-se", "mão de obra rateio"]
-        ]
-        ids_diagrama_rede = [
-            t["Id"] for t in tasks
-            if t.get("Nível_da_estrutura_de_tópicos", 0) >= 6
-            and t.get("SAP_Diagrama_de_Rede") is None
-        ]
-        ids_tarefa = [
-            t["Id"] for t in tasks
-            if t.get("Nível_da_estrutura_de_tópicos", 0) >= 5
-            and t.get("SAP_Tarefa") is None
-            and str(t.get("Agrupamento")).lower() not in ["pré projeto", "habite-se", "mão de obra rateio"]
-        ]
-        
-        return [
-            ["ID Bloco", ids_id_bloco],
-            ["SAP Elemento PEP", ids_pep],
-            ["SAP Diagrama de Rede", ids_diagrama_rede],
-            ["SAP Tarefa", ids_tarefa]
-        ]
+        ids_por_tipo = {tipo: [] for tipo in TIPOS_PREENCHIMENTO}
+        for t in tasks:
+            for tipo in pendencias_preenchimento(t):
+                ids_por_tipo[tipo].append(t["Id"])
+
+        return [[tipo, ids_por_tipo[tipo]] for tipo in TIPOS_PREENCHIMENTO]
+
+    def contar_preenchimento(self, tasks: list[dict]) -> list:
+        """Como `verificar_preenchimento`, mas com a quantidade de tarefas de cada categoria no lugar dos IDs."""
+        quantidade_por_tipo = dict.fromkeys(TIPOS_PREENCHIMENTO, 0)
+        for t in tasks:
+            for tipo in pendencias_preenchimento(t):
+                quantidade_por_tipo[tipo] += 1
+
+        return [[tipo, quantidade_por_tipo[tipo]] for tipo in TIPOS_PREENCHIMENTO]
         
\ No newline at end of file
@@ -0,0 +1,179 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Iterable, Iterator
+
+# Colunas de texto com poucos valores distintos, guardadas como códigos + categorias.
+COLUNAS_CATEGORICAS = (
+    "Ativo", "Resumo", "Tipo", "Agrupamento", "Modo_da_Tarefa", "Tipo_de_restrição",
+    "Tipo_Servico", "Servicos",
+)
+
+# Marca, dentro de uma coluna, as linhas em que a chave não existia no dicionário original.
+_AUSENTE = object()
+
+
+class _ColunaCategorica:
+    """
+    Coluna codificada por dicionário: um código de 2 bytes por linha e a lista de
+    valores distintos. Indexar a coluna devolve o valor original.
+    """
+    __slots__ = ("codigos", "categorias")
+
+    def __init__(self, codigos: array, categorias: list):
+        self.codigos = codigos
+        self.categorias = categorias
+
+    @classmethod
+    def codificar(cls, valores: list) -> "_ColunaCategorica | None":
+        """Codifica os valores, ou retorna None se não forem adequados (não hashable ou distintos demais)."""
+        codigo_por_valor: dict = {}
+        categorias: list = []
+        codigos = array("H")
+        try:
+            for valor in valores:
+                # O tipo entra na chave para que 1, 1.0 e True não virem a mesma categoria.
+                chave = (valor.__class__, valor)
+                codigo = codigo_por_valor.get(chave)
+                if codigo is None:
+                    codigo = codigo_por_valor[chave] = len(categorias)
+                    categorias.append(valor)
+                codigos.append(codigo)
+        except (TypeError, OverflowError):
+            return None
+        return cls(codigos, categorias)
+
+    def __getitem__(self, posicao: int):
+        return self.categorias[self.codigos[posicao]]
+
+    def __len__(self) -> int:
+        return len(self.codigos)
+
+
+class LinhaTarefa(Mapping):
+    """
+    Visão somente leitura de uma linha da `TabelaTarefas`, com a interface de um dict
+    (`get`, `[]`, `in`, `keys`, `items`...).
+
+    Não guarda os valores: só a tabela e a posição. As chaves aparecem na ordem
+    das colunas da tabela, que é a do dicionário original quando as linhas têm as
+    chaves na mesma ordem (como na saída da transformação); `dict(linha)` reproduz
+    a tarefa.
+    """
+    __slots__ = ("_colunas", "_posicao", "_tamanho")
+
+    def __init__(self, colunas: dict, posicao: int, tamanho: int):
+        self._colunas = colunas
+        self._posicao = posicao
+        self._tamanho = tamanho
+
+    def __getitem__(self, chave):
+        coluna = self._colunas.get(chave)
+        if coluna is not None:
+            valor = coluna[self._posicao]
+            if valor is not _AUSENTE:
+                return valor
+        raise KeyError(chave)
+
+    def get(self, chave, padrao=None):
+        coluna = self._colunas.get(chave)
+        if coluna is None:
+            return padrao
+        valor = coluna[self._posicao]
+        return padrao if valor is _AUSENTE else valor
+
+    def __contains__(self, chave) -> bool:
+        coluna = self._colunas.get(chave)
+        return coluna is not None and coluna[self._posicao] is not _AUSENTE
+
+    def __iter__(self) -> Iterator[str]:
+        posicao = self._posicao
+        return (nome for nome, coluna in self._colunas.items() if coluna[posicao] is not _AUSENTE)
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def copy(self) -> dict:
+        """Cópia mutável da linha, como `dict.copy`."""
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"LinhaTarefa({dict(self)!r})"
+
+
+class TabelaTarefas(Sequence):
+    """
+    Tarefas transformadas em formato colunar.
+
+    Cada coluna é uma lista com um valor por tarefa, em vez de um dicionário com
+    dezenas de chaves por tarefa. As colunas de `COLUNAS_CATEGORICAS` são
+    codificadas por dicionário (um código de 2 bytes por linha). A tabela é uma
+    sequência de `LinhaTarefa`, então pode ser usada onde o pipeline espera a
+    lista de tarefas; as linhas são criadas uma vez e mantêm a identidade entre
+    acessos.
+
+    A conversão de volta para dicionários (`para_dicts`) só deve ser feita na
+    fronteira da API.
+    """
+    def __init__(self, colunas: dict[str, list | _ColunaCategorica], chaves_por_linha: list[int]):
+        self._colunas = colunas
+        self._tamanho = len(chaves_por_linha)
+        self._linhas = [LinhaTarefa(colunas, posicao, chaves) for posicao, chaves in enumerate(chaves_por_linha)]
+
+    @classmethod
+    def de_dicts(cls, linhas: list[dict]) -> "TabelaTarefas":
+        """
+        Monta a tabela a partir das tarefas em dicionários.
+
+        As colunas seguem a ordem em que as chaves aparecem nas linhas; linhas sem
+        alguma chave continuam sem ela nas visões.
+        """
+        nomes: dict[str, None] = {}
+        for linha in linhas:
+            if len(linha) != len(nomes) or linha.keys() != nomes.keys():
+                nomes.update(dict.fromkeys(linha))
+
+        colunas: dict[str, list | _ColunaCategorica] = {}
+        for nome in nomes:
+            valores = [linha.get(nome, _AUSENTE) for linha in linhas]
+            if nome in COLUNAS_CATEGORICAS:
+                valores = _ColunaCategorica.codificar(valores) or valores
+            colunas[nome] = valores
+        return cls(colunas, [len(linha) for linha in linhas])
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __getitem__(self, posicao):
+        return self._linhas[posicao]
+
+    def __iter__(self) -> Iterator[LinhaTarefa]:
+        return iter(self._linhas)
+
+    @property
+    def colunas(self) -> list[str]:
+        return list(self._colunas)
+
+    def coluna(self, nome: str, padrao=None) -> list:
+        """Valores de uma coluna, por posição. Linhas sem a chave recebem `padrao`."""
+        coluna = self._colunas.get(nome)
+        if coluna is None:
+            return [padrao] * self._tamanho
+        if isinstance(coluna, _ColunaCategorica):
+            categorias = [padrao if valor is _AUSENTE else valor for valor in coluna.categorias]
+            return [categorias[codigo] for codigo in coluna.codigos]
+        return [padrao if valor is _AUSENTE else valor for valor in coluna]
+
+    def categorias(self, nome: str) -> tuple[array, list] | None:
+        """
+        Códigos e categorias de uma coluna codificada por dicionário, ou None se a
+        coluna não for categórica. Linhas sem a chave têm a categoria None.
+        """
+        coluna = self._colunas.get(nome)
+        if not isinstance(coluna, _ColunaCategorica):
+            return None
+        return coluna.codigos, [None if valor is _AUSENTE else valor for valor in coluna.categorias]
+
+    @staticmethod
+    def para_dicts(linhas: Iterable[Mapping]) -> list[dict]:
+        """Converte linhas (visões ou dicionários) em dicionários, para a resposta da API."""
+        return [dict(linha) for linha in linhas]
@@ -0,0 +1,86 @@
+from ccron.src.domain.service.arvore_estrutura import ArvoreEstrutura
+
+from functools import cached_property
+
+
+def eh_ativa(tarefa: dict) -> bool:
+    return str(tarefa.get("Ativo") or "").strip().lower() == "sim"
+
+
+def eh_tarefa_critica(tarefa: dict) -> bool:
+    """
+    Tarefas consideradas na análise de sobreposições e gaps: infraestrutura no
+    nível 6, SUPRA e ASC no nível 7.
+    """
+    return (
+        (tarefa.get("ÉInfra") and tarefa.get("Nível_da_estrutura_de_tópicos") == 6) or
+        (tarefa.get("Tipo_Servico") == "SUPRA") or
+        (tarefa.get("Tipo_Servico") == "ASC" and tarefa.get("Nível_da_estrutura_de_tópicos") == 7)
+    )
+
+
+def _normalizar(valor) -> str:
+    return str(valor if valor is not None else "").strip().lower()
+
+
+class VisoesAnalise:
+    """
+    Projeções das tarefas transformadas usadas por várias etapas de uma análise.
+
+    Cada visão é calculada na primeira vez em que é pedida e reaproveitada pelas
+    etapas seguintes (filtro de ativas, tarefas críticas, índices por `Id`, nomes
+    normalizados, grupos por serviço e a árvore de tópicos). As visões nunca
+    copiam as tarefas: as listas e índices apontam para os mesmos dicionários.
+
+    Uma instância vale para uma única lista de tarefas e não deve ser mantida
+    depois que essa lista for alterada.
+
+    Args:
+        tarefas: As tarefas transformadas do cronograma.
+    """
+    def __init__(self, tarefas: list[dict]):
+        self.tarefas = tarefas
+
+    @cached_property
+    def ativas(self) -> list[dict]:
+        return [tarefa for tarefa in self.tarefas if eh_ativa(tarefa)]
+
+    @cached_property
+    def criticas(self) -> list[dict]:
+        return [tarefa for tarefa in self.tarefas if eh_tarefa_critica(tarefa)]
+
+    @cached_property
+    def criticas_ativas(self) -> list[dict]:
+        return [tarefa for tarefa in self.ativas if eh_tarefa_critica(tarefa)]
+
+    @cached_property
+    def por_id(self) -> dict:
+        """{Id: tarefa}. Com Ids repetidos, vale a última ocorrência."""
+        return {tarefa.get("Id"): tarefa for tarefa in self.tarefas}
+
+    @cached_property
+    def criticas_por_id(self) -> dict:
+        return {tarefa.get("Id"): tarefa for tarefa in self.criticas}
+
+    @cached_property
+    def nomes_normalizados(self) -> list[str]:
+        """`Nome` de cada tarefa sem espaços nas pontas e em minúsculas, por posição."""
+        return [_normalizar(tarefa.get("Nome")) for tarefa in self.tarefas]
+
+    @cached_property
+    def agrupamentos_normalizados(self) -> list[str]:
+        return [_normalizar(tarefa.get("Agrupamento")) for tarefa in self.tarefas]
+
+    @cached_property
+    def servicos_criticos(self) -> dict[str, list[dict]]:
+        """Tarefas críticas ativas agrupadas por 'Servicos', na ordem do cronograma."""
+        grupos: dict[str, list[dict]] = {}
+        for tarefa in self.criticas_ativas:
+            servico = tarefa.get("Servicos")
+            if servico:
+                grupos.setdefault(servico, []).append(tarefa)
+        return grupos
+
+    @cached_property
+    def arvore(self) -> ArvoreEstrutura:
+        return ArvoreEstrutura(self.tarefas)
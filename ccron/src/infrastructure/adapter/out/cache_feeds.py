@@ -0,0 +1,225 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PaginaEmCache:
+    """
+    Última resposta de uma página de feed, com os validadores para a próxima requisição.
+
+    Attributes:
+        conteudo: Corpo da resposta.
+        etag: Cabeçalho ETag recebido, usado em If-None-Match.
+        ultima_modificacao: Cabeçalho Last-Modified recebido, usado em If-Modified-Since.
+    """
+    conteudo: bytes
+    etag: str | None = None
+    ultima_modificacao: str | None = None
+
+
+@dataclass
+class ResultadoEmCache:
+    """
+    Resultado já interpretado de um feed.
+
+    Attributes:
+        assinatura: Assinatura das páginas que geraram o resultado.
+        valor: O resultado interpretado.
+        validado_em: Momento (time.time) da última validação com o servidor.
+    """
+    assinatura: bytes
+    valor: Any
+    validado_em: float
+
+
+def assinar_paginas(paginas: Iterable[bytes]) -> bytes:
+    """Assinatura do conteúdo de um feed, página a página."""
+    assinatura = hashlib.blake2b(digest_size=16)
+    for pagina in paginas:
+        assinatura.update(len(pagina).to_bytes(8, "little"))
+        assinatura.update(pagina)
+    return assinatura.digest()
+
+
+class CacheFeeds:
+    """
+    Cache local dos feeds do Project, em memória (LRU) e, opcionalmente, em disco.
+
+    Guarda dois tipos de entrada:
+    - Páginas, por URL e cabeçalho Accept, com ETag/Last-Modified. O cliente
+      OData as revalida com If-None-Match/If-Modified-Since e, num 304, reaproveita
+      o corpo guardado.
+    - Resultados interpretados, por (endpoint, projeto). Dentro do TTL são
+      servidos sem consultar o servidor; depois dele, o feed é revalidado e o
+      resultado só é interpretado de novo se a assinatura das páginas mudar. Os
+      resultados são devolvidos como cópias, para que quem os altera não mude o
+      que está guardado.
+
+    Os limites vêm de `CCRON_CACHE_FEEDS_MAX` (entradas em memória, padrão: 256)
+    e `CCRON_CACHE_FEEDS_TTL` (segundos, padrão: 300). Com `CCRON_CACHE_FEEDS_DIR`,
+    as páginas também são gravadas nesse diretório e sobrevivem a reinícios: o
+    corpo em um arquivo `.bin` e a chave e os validadores em um `.json`, sem
+    nada que execute código ao ser lido. O diretório guarda no máximo
+    `max_entradas` páginas, descartando as menos usadas. Os resultados ficam só
+    em memória; depois de um reinício são interpretados de novo a partir das
+    páginas guardadas.
+
+    Args:
+        max_entradas: Quantidade máxima de páginas e de resultados mantidos.
+        ttl: Segundos em que um resultado é servido sem revalidação. 0 revalida sempre.
+        diretorio: Diretório do cache em disco. None mantém o cache só em memória.
+    """
+    def __init__(self, max_entradas: int | None = None, ttl: float | None = None, diretorio: str | None = None):
+        self.max_entradas = max_entradas or int(os.getenv("CCRON_CACHE_FEEDS_MAX", "256"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("CCRON_CACHE_FEEDS_TTL", "300"))
+        self.diretorio = diretorio or os.getenv("CCRON_CACHE_FEEDS_DIR") or None
+        self._paginas: OrderedDict[Hashable, PaginaEmCache] = OrderedDict()
+        self._resultados: OrderedDict[Hashable, ResultadoEmCache] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.diretorio:
+            os.makedirs(os.path.join(self.diretorio, "paginas"), exist_ok=True)
+
+    # --- Páginas ---
+
+    def pagina(self, url: str, accept: str | None) -> PaginaEmCache | None:
+        chave = (url, accept)
+        with self._lock:
+            pagina = self._paginas.get(chave)
+            if pagina is not None:
+                self._paginas.move_to_end(chave)
+                return pagina
+        if not self.diretorio:
+            return None
+        pagina = self._ler_pagina(url, accept)
+        if pagina is not None:
+            self._guardar_memoria(self._paginas, chave, pagina)
+        return pagina
+
+    def guardar_pagina(self, url: str, accept: str | None, pagina: PaginaEmCache):
+        self._guardar_memoria(self._paginas, (url, accept), pagina)
+        if self.diretorio:
+            self._gravar_pagina(url, accept, pagina)
+
+    # --- Resultados interpretados ---
+
+    def resultado_fresco(self, chave: Hashable) -> Any | None:
+        """Uma cópia do resultado guardado, se foi validado há menos de `ttl` segundos."""
+        with self._lock:
+            entrada = self._resultados.get(chave)
+            if entrada is None or time.time() - entrada.validado_em >= self.ttl:
+                return None
+            self._resultados.move_to_end(chave)
+        return copy.deepcopy(entrada.valor)
+
+    def resultado(self, chave: Hashable, assinatura: bytes) -> Any | None:
+        """
+        Uma cópia do resultado guardado, se as páginas não mudaram. Nesse caso o
+        resultado passa a contar como validado agora.
+        """
+        with self._lock:
+            entrada = self._resultados.get(chave)
+            if entrada is None or entrada.assinatura != assinatura:
+                return None
+            entrada.validado_em = time.time()
+            self._resultados.move_to_end(chave)
+        return copy.deepcopy(entrada.valor)
+
+    def guardar_resultado(self, chave: Hashable, assinatura: bytes, valor: Any):
+        self._guardar_memoria(self._resultados, chave, ResultadoEmCache(assinatura, copy.deepcopy(valor), time.time()))
+
+    def limpar(self):
+        with self._lock:
+            self._paginas.clear()
+            self._resultados.clear()
+        if self.diretorio:
+            pasta = os.path.join(self.diretorio, "paginas")
+            for nome in os.listdir(pasta):
+                self._remover(os.path.join(pasta, nome))
+
+    # --- Armazenamento ---
+
+    def _caminho(self, url: str, accept: str | None) -> str:
+        nome = hashlib.sha1(json.dumps([url, accept]).encode("utf-8")).hexdigest()
+        return os.path.join(self.diretorio, "paginas", nome)
+
+    def _ler_pagina(self, url: str, accept: str | None) -> PaginaEmCache | None:
+        caminho = self._caminho(url, accept)
+        try:
+            with open(caminho + ".json", "r", encoding="utf-8") as arquivo:
+                metadados = json.load(arquivo)
+            if metadados.get("chave") != [url, accept]:
+                return None
+            with open(caminho + ".bin", "rb") as arquivo:
+                conteudo = arquivo.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Erro ao ler o cache de feeds (%s): %s", caminho, e)
+            self._remover(caminho + ".json")
+            self._remover(caminho + ".bin")
+            return None
+        if assinar_paginas([conteudo]).hex() != metadados.get("assinatura"):
+            # Corpo de outra gravação (interrompida ou concorrente): descarta.
+            return None
+        return PaginaEmCache(conteudo, metadados.get("etag"), metadados.get("ultima_modificacao"))
+
+    def _gravar_pagina(self, url: str, accept: str | None, pagina: PaginaEmCache):
+        caminho = self._caminho(url, accept)
+        sufixo = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        metadados = {
+            "chave": [url, accept],
+            "etag": pagina.etag,
+            "ultima_modificacao": pagina.ultima_modificacao,
+            "assinatura": assinar_paginas([pagina.conteudo]).hex(),
+        }
+        try:
+            # O .json é gravado por último: é ele que torna a página visível.
+            with open(caminho + ".bin" + sufixo, "wb") as arquivo:
+                arquivo.write(pagina.conteudo)
+            os.replace(caminho + ".bin" + sufixo, caminho + ".bin")
+            with open(caminho + ".json" + sufixo, "w", encoding="utf-8") as arquivo:
+                json.dump(metadados, arquivo)
+            os.replace(caminho + ".json" + sufixo, caminho + ".json")
+        except OSError as e:
+            logger.warning("Erro ao gravar o cache de feeds (%s): %s", caminho, e)
+            self._remover(caminho + ".bin" + sufixo)
+            self._remover(caminho + ".json" + sufixo)
+            return
+        self._podar_disco()
+
+    def _guardar_memoria(self, memoria: OrderedDict, chave: Hashable, entrada):
+        with self._lock:
+            memoria[chave] = entrada
+            memoria.move_to_end(chave)
+            while len(memoria) > self.max_entradas:
+                memoria.popitem(last=False)
+
+    def _podar_disco(self):
+        pasta = os.path.join(self.diretorio, "paginas")
+        try:
+            arquivos = [entrada for entrada in os.scandir(pasta) if entrada.name.endswith(".json")]
+        except OSError:
+            return
+        if len(arquivos) <= self.max_entradas:
+            return
+        arquivos.sort(key=lambda entrada: entrada.stat().st_mtime)
+        for entrada in arquivos[:len(arquivos) - self.max_entradas]:
+            self._remover(entrada.path)
+            self._remover(entrada.path[:-len(".json")] + ".bin")
+
+    @staticmethod
+    def _remover(caminho: str):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
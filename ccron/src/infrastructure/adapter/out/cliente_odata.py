@@ -0,0 +1,254 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+from urllib.parse import urljoin
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ccron.src.infrastructure.adapter.out.cache_feeds import CacheFeeds, PaginaEmCache
+from ccron.src.infrastructure.adapter.out.leitor_atom import metadados_pagina
+
+class CredenciaisAusentesError(RuntimeError):
+    """As credenciais do SharePoint não estão configuradas no ambiente."""
+
+
+class FeedIncompletoError(requests.RequestException):
+    """As páginas lidas não somam o total de entradas informado pelo servidor em `m:count`."""
+
+
+class CredenciaisProject:
+    """
+    Fornece os cookies de autenticação do SharePoint, guardados em memória por `ttl` segundos.
+
+    Os cookies vêm apenas do ambiente (CCRON_PROJECT_FEDAUTH / CCRON_PROJECT_RTFA).
+    Após um 401/403 o cliente chama `invalidar()`, e a próxima requisição relê
+    as credenciais.
+    """
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self._cookie: str | None = None
+        self._validade = 0.0
+        self._lock = threading.Lock()
+
+    def cookie(self) -> str:
+        """
+        Raises:
+            CredenciaisAusentesError: Se alguma das variáveis não estiver definida.
+        """
+        with self._lock:
+            if self._cookie is None or time.monotonic() >= self._validade:
+                fed_auth = os.getenv("CCRON_PROJECT_FEDAUTH")
+                rt_fa = os.getenv("CCRON_PROJECT_RTFA")
+                if not fed_auth or not rt_fa:
+                    raise CredenciaisAusentesError(
+                        "Credenciais do Project Server não configuradas: defina CCRON_PROJECT_FEDAUTH e CCRON_PROJECT_RTFA.")
+                self._cookie = f'FedAuth={fed_auth}; rtFa={rt_fa}'
+                self._validade = time.monotonic() + self.ttl
+            return self._cookie
+
+    def invalidar(self):
+        with self._lock:
+            self._cookie = None
+
+
+class ClienteOData:
+    """
+    Cliente HTTP compartilhado para as APIs OData do Project (ProjectServer e ProjectData).
+
+    - Uma `requests.Session` com pool de conexões keep-alive, reaproveitada entre requisições.
+    - Timeout de conexão e de leitura em todas as chamadas.
+    - Novas tentativas com backoff exponencial para falhas de conexão e respostas
+      429/5xx (respeitando o Retry-After).
+    - Paginação: com `tamanho_pagina`, pede `$top`/`$skip` e, se o total vier na
+      resposta (`$inlinecount`), busca as páginas restantes em paralelo; senão,
+      segue os links "next" do feed.
+    - `em_paralelo` executa chamadas independentes (ex: dois feeds) ao mesmo tempo.
+    - Com um `CacheFeeds`, cada página é revalidada com If-None-Match /
+      If-Modified-Since e, num 304, o corpo guardado é reaproveitado.
+
+    A URL base vem de CCRON_PROJECT_URL_BASE, o que permite apontar o cliente para
+    um servidor local nos testes.
+
+    Args:
+        url_base: URL do site do SharePoint. Caminhos relativos são resolvidos a partir dela.
+        credenciais: Provedor dos cookies de autenticação.
+        timeout: (conexão, leitura) em segundos. Padrão: CCRON_ODATA_TIMEOUT ou 10s/60s.
+        tentativas: Quantidade máxima de novas tentativas por requisição.
+        backoff: Fator do backoff exponencial entre tentativas, em segundos.
+        max_conexoes: Tamanho do pool de conexões por host.
+        max_paralelo: Requisições simultâneas em `em_paralelo` e na paginação.
+        cache: Cache das páginas e dos resultados interpretados. None desativa o cache.
+    """
+    def __init__(self, url_base: str | None = None, credenciais: CredenciaisProject | None = None,
+                 timeout: tuple[float, float] | None = None, tentativas: int = 3, backoff: float = 0.5,
+                 max_conexoes: int = 10, max_paralelo: int = 4, cache: CacheFeeds | None = None):
+        self.url_base = (url_base or os.getenv(
+            "CCRON_PROJECT_URL_BASE", "https://mrvengenhariasa.sharepoint.com/sites/planejamento2023")).rstrip("/") + "/"
+        self.credenciais = credenciais or CredenciaisProject()
+        if timeout is None:
+            leitura = float(os.getenv("CCRON_ODATA_TIMEOUT", "60"))
+            timeout = (min(10.0, leitura), leitura)
+        self.timeout = timeout
+        self.cache = cache
+
+        retry = Retry(
+            total=tentativas, connect=tentativas, read=tentativas, status=tentativas,
+            backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}), respect_retry_after_header=True, raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes, max_retries=retry)
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Edge/120.0.0.0'
+
+        # Executores separados: uma chamada de `em_paralelo` pode paginar e esperar
+        # pelas páginas sem ocupar os workers que as buscam.
+        self._executor_chamadas = ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="odata-chamada")
+        self._executor_paginas = ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="odata-pagina")
+
+    def url(self, caminho: str) -> str:
+        return urljoin(self.url_base, caminho.lstrip("/")) if "://" not in caminho else caminho
+
+    def get(self, caminho: str, headers: dict | None = None) -> requests.Response:
+        """
+        GET autenticado. Em 401/403 as credenciais são relidas e a requisição é
+        repetida uma vez. Não levanta exceção para status de erro; use `raise_for_status`.
+        """
+        for tentativa in range(2):
+            cabecalhos = {'Cookie': self.credenciais.cookie(), **(headers or {})}
+            resposta = self.sessao.get(self.url(caminho), headers=cabecalhos, timeout=self.timeout)
+            if resposta.status_code not in (401, 403) or tentativa:
+                return resposta
+            self.credenciais.invalidar()
+        return resposta
+
+    def em_paralelo(self, *chamadas: Callable) -> list:
+        """Executa as chamadas ao mesmo tempo e retorna os resultados (ou as exceções) na ordem."""
+        futuros = [self._executor_chamadas.submit(chamada) for chamada in chamadas]
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append(e)
+        return resultados
+
+    @staticmethod
+    def _com_parametros(url: str, **parametros) -> str:
+        separador = "&" if "?" in url else "?"
+        return url + separador + "&".join(f"${nome}={valor}" for nome, valor in parametros.items())
+
+    def _buscar(self, url: str, headers: dict | None) -> bytes:
+        if self.cache is None:
+            resposta = self.get(url, headers)
+            resposta.raise_for_status()
+            return resposta.content
+
+        accept = (headers or {}).get('Accept')
+        anterior = self.cache.pagina(url, accept)
+        condicionais = {}
+        if anterior is not None:
+            if anterior.etag:
+                condicionais['If-None-Match'] = anterior.etag
+            if anterior.ultima_modificacao:
+                condicionais['If-Modified-Since'] = anterior.ultima_modificacao
+
+        resposta = self.get(url, {**(headers or {}), **condicionais})
+        if resposta.status_code == 304 and anterior is not None:
+            return anterior.conteudo
+        resposta.raise_for_status()
+
+        etag = resposta.headers.get('ETag')
+        ultima_modificacao = resposta.headers.get('Last-Modified')
+        if etag or ultima_modificacao:
+            self.cache.guardar_pagina(url, accept, PaginaEmCache(resposta.content, etag, ultima_modificacao))
+        return resposta.content
+
+    def paginas(self, caminho: str, headers: dict | None = None, tamanho_pagina: int | None = None) -> list[bytes]:
+        """
+        Busca todas as páginas de um feed Atom.
+
+        Args:
+            caminho: URL (ou caminho relativo à base) do feed, com os filtros já aplicados.
+            headers: Cabeçalhos adicionais (ex: Accept).
+            tamanho_pagina: Tamanho de página pedido com `$top`. Sem ele, só os
+                            links "next" do servidor são seguidos.
+
+        Returns:
+            O conteúdo de cada página, na ordem.
+
+        Raises:
+            FeedIncompletoError: Se o servidor informar o total (`m:count`) e as
+                                 páginas lidas não somarem esse total.
+        """
+        url = self.url(caminho)
+        if not tamanho_pagina:
+            primeira_url = url
+        else:
+            primeira_url = self._com_parametros(url, top=tamanho_pagina, skip=0, inlinecount="allpages")
+        conteudo = self._buscar(primeira_url, headers)
+        entradas, total, proxima = metadados_pagina(conteudo)
+        paginas = [conteudo]
+
+        if tamanho_pagina and total is not None and entradas:
+            # O servidor pode limitar a página abaixo do $top (o ProjectData limita):
+            # os saltos seguem a quantidade de entradas que a primeira página trouxe.
+            passo = min(entradas, tamanho_pagina)
+            saltos = range(passo, total, passo)
+            paginas.extend(self._executor_paginas.map(
+                lambda salto: self._buscar(self._com_parametros(url, top=passo, skip=salto), headers), saltos))
+            lidas = entradas + sum(metadados_pagina(pagina)[0] for pagina in paginas[1:])
+            # Páginas repetidas (servidor que ignora o $skip) também não trazem o feed inteiro.
+            if lidas != total or len(set(paginas)) != len(paginas):
+                raise FeedIncompletoError(
+                    f"Feed incompleto em {url}: {lidas} entradas lidas em {len(paginas)} páginas, "
+                    f"{total} informadas pelo servidor.")
+            return paginas
+
+        salto = lidas = entradas
+        while proxima or (tamanho_pagina and entradas == tamanho_pagina):
+            if proxima:
+                conteudo = self._buscar(urljoin(url, proxima), headers)
+            else:
+                conteudo = self._buscar(self._com_parametros(url, top=tamanho_pagina, skip=salto), headers)
+            entradas, _, proxima = metadados_pagina(conteudo)
+            # Página vazia, ou repetida por um servidor que ignora o $skip.
+            if not entradas or conteudo == paginas[-1]:
+                break
+            salto += entradas
+            lidas += entradas
+            paginas.append(conteudo)
+        if total is not None and lidas != total:
+            raise FeedIncompletoError(f"Feed incompleto em {url}: {lidas} entradas lidas, {total} informadas pelo servidor.")
+        return paginas
+
+    def fechar(self):
+        self._executor_chamadas.shutdown(wait=False)
+        self._executor_paginas.shutdown(wait=False)
+        self.sessao.close()
+
+
+def juntar_entradas(feeds: Iterable[dict]) -> dict:
+    """
+    Junta feeds já convertidos por `xmltodict` em um só, com as entradas de todas
+    as páginas no primeiro.
+    """
+    feeds = list(feeds)
+    if not feeds:
+        return {}
+    base = feeds[0]
+    feed = base.get('feed')
+    if not isinstance(feed, dict):
+        return base
+    entradas: list = []
+    for outro in feeds:
+        atual = (outro.get('feed') or {}).get('entry', [])
+        entradas.extend([atual] if isinstance(atual, dict) else atual)
+    if entradas:
+        feed['entry'] = entradas
+    return base
@@ -0,0 +1,177 @@
+from ccron.src.domain.ports.historico_analises_interface import HistoricoAnalisesInterface
+
+from contextlib import closing
+from datetime import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS analises (
+    analise_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL,
+    analisado_em TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    referencia TEXT,
+    versao_referencia TEXT,
+    tarefas_ativas INTEGER,
+    total_apontamentos INTEGER,
+    sobreposicoes INTEGER,
+    gaps INTEGER,
+    total_erros_macrofluxo INTEGER,
+    erros_macrofluxo TEXT,
+    resultado BLOB
+);
+CREATE INDEX IF NOT EXISTS analises_projeto_data ON analises (project_id, analisado_em, analise_id);
+CREATE TABLE IF NOT EXISTS contagens_regras (
+    analise_id INTEGER NOT NULL,
+    project_id TEXT NOT NULL,
+    regra TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (analise_id, regra)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS contagens_projeto_analise ON contagens_regras (project_id, analise_id, regra, quantidade);
+"""
+
+# Colunas do resumo; o resultado completo (BLOB) só é lido por `resultado`.
+_COLUNAS = (
+    "analise_id", "analisado_em", "origem", "referencia", "versao_referencia", "tarefas_ativas",
+    "total_apontamentos", "sobreposicoes", "gaps", "total_erros_macrofluxo", "erros_macrofluxo",
+)
+_SELECT = f"SELECT {', '.join(_COLUNAS)}, resultado IS NOT NULL FROM analises"
+
+
+class HistoricoAnalises(HistoricoAnalisesInterface):
+    """
+    Histórico (SQLite) dos resumos das análises de cada projeto.
+
+    Cada análise registrada guarda os totais do resumo (tarefas ativas,
+    apontamentos, sobreposições, hiatos e erros do macrofluxo) em colunas, a
+    quantidade de tarefas por regra em `contagens_regras` e, opcionalmente, o
+    resultado completo comprimido. As consultas de tendência e comparação leem
+    só os índices por projeto e data, sem recalcular nada. O banco usa WAL,
+    como a cópia local das tarefas, e pode ser compartilhado pelos workers.
+
+    Args:
+        caminho: Arquivo do banco. Padrão: CCRON_HISTORICO_DB ou "ccron_historico.db"
+                 no diretório temporário.
+    """
+    def __init__(self, caminho: str | None = None):
+        self.caminho = caminho or os.getenv("CCRON_HISTORICO_DB") or os.path.join(tempfile.gettempdir(), "ccron_historico.db")
+        self._lock = threading.Lock()
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.executescript(_ESQUEMA)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    @staticmethod
+    def _linha_para_dict(linha: tuple) -> dict:
+        registro = dict(zip(_COLUNAS, linha))
+        registro["erros_macrofluxo"] = json.loads(registro["erros_macrofluxo"]) if registro["erros_macrofluxo"] else None
+        registro["com_resultado"] = bool(linha[-1])
+        return registro
+
+    def registrar(self, project_id: str, resumo: dict, origem: str, versao_referencia: str | None = None,
+                  referencia: str | None = None, resultado: dict | None = None) -> int:
+        """
+        Registra o resumo de uma análise.
+
+        Args:
+            project_id: Projeto analisado.
+            resumo: O resumo da análise (ver `historico.resumir_analise`).
+            origem: Rota ou processo que fez a análise (ex: "completa", "portfolio").
+            versao_referencia: Versão das bases de referência usadas na análise.
+            referencia: Identificador externo da análise (ex: o `execucao_id` do portfólio).
+            resultado: O resultado completo, já serializável em JSON, guardado comprimido.
+
+        Returns:
+            O `analise_id` do registro.
+        """
+        agora = datetime.now().isoformat(timespec="seconds")
+        erros_macrofluxo = resumo.get("erros_macrofluxo")
+        comprimido = None
+        if resultado is not None:
+            comprimido = zlib.compress(json.dumps(resultado, ensure_ascii=False, default=str).encode("utf-8"), 6)
+        with self._lock, closing(self._conectar()) as conexao, conexao:
+            cursor = conexao.execute(
+                "INSERT INTO analises (project_id, analisado_em, origem, referencia, versao_referencia, tarefas_ativas, "
+                "total_apontamentos, sobreposicoes, gaps, total_erros_macrofluxo, erros_macrofluxo, resultado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (project_id, agora, origem, referencia, versao_referencia, resumo.get("tarefas_ativas"),
+                 resumo.get("total_apontamentos"), resumo.get("sobreposicoes"), resumo.get("gaps"),
+                 resumo.get("total_erros_macrofluxo"),
+                 json.dumps(erros_macrofluxo, ensure_ascii=False) if erros_macrofluxo is not None else None,
+                 comprimido))
+            analise_id = cursor.lastrowid
+            conexao.executemany(
+                "INSERT INTO contagens_regras (analise_id, project_id, regra, quantidade) VALUES (?, ?, ?, ?)",
+                [(analise_id, project_id, regra, quantidade) for regra, quantidade in (resumo.get("regras") or {}).items()])
+        return analise_id
+
+    def listar(self, project_id: str, desde: str | None = None, ate: str | None = None,
+               limite: int | None = None, antes_de: int | None = None) -> list[dict]:
+        """
+        As análises do projeto, da mais antiga para a mais recente.
+
+        Args:
+            desde: Data/hora ISO mínima (ex: "2025-01-01").
+            ate: Data/hora ISO máxima; uma data sozinha inclui o dia inteiro.
+            limite: Quantidade máxima, ficando com as mais recentes.
+            antes_de: Só as análises registradas antes deste `analise_id`.
+        """
+        condicoes, parametros = ["project_id = ?"], [project_id]
+        if desde:
+            condicoes.append("analisado_em >= ?")
+            parametros.append(desde)
+        if ate:
+            condicoes.append("analisado_em <= ?")
+            parametros.append(ate if "T" in ate else f"{ate}T23:59:59")
+        if antes_de is not None:
+            condicoes.append("analise_id < ?")
+            parametros.append(antes_de)
+        consulta = f"{_SELECT} WHERE {' AND '.join(condicoes)} ORDER BY analisado_em DESC, analise_id DESC"
+        if limite:
+            consulta += " LIMIT ?"
+            parametros.append(int(limite))
+        with closing(self._conectar()) as conexao:
+            linhas = conexao.execute(consulta, parametros).fetchall()
+        return [self._linha_para_dict(linha) for linha in reversed(linhas)]
+
+    def contagens(self, project_id: str, primeira: int, ultima: int) -> dict[int, dict[str, int]]:
+        """{analise_id: {regra: quantidade}} das análises do projeto entre os dois ids (inclusive)."""
+        with closing(self._conectar()) as conexao:
+            linhas = conexao.execute(
+                "SELECT analise_id, regra, quantidade FROM contagens_regras "
+                "WHERE project_id = ? AND analise_id BETWEEN ? AND ?",
+                (project_id, primeira, ultima)).fetchall()
+        contagens: dict[int, dict[str, int]] = {}
+        for analise_id, regra, quantidade in linhas:
+            contagens.setdefault(analise_id, {})[regra] = quantidade
+        return contagens
+
+    def analise(self, project_id: str, analise_id: int) -> dict | None:
+        """O resumo de uma análise do projeto, com a quantidade de tarefas por regra."""
+        with closing(self._conectar()) as conexao:
+            linha = conexao.execute(f"{_SELECT} WHERE analise_id = ? AND project_id = ?",
+                                    (analise_id, project_id)).fetchone()
+        if linha is None:
+            return None
+        registro = self._linha_para_dict(linha)
+        registro["regras"] = self.contagens(project_id, analise_id, analise_id).get(analise_id, {})
+        return registro
+
+    def resultado(self, project_id: str, analise_id: int) -> dict | None:
+        """O resultado completo guardado com a análise, ou None se não foi guardado."""
+        with closing(self._conectar()) as conexao:
+            linha = conexao.execute("SELECT resultado FROM analises WHERE analise_id = ? AND project_id = ?",
+                                    (analise_id, project_id)).fetchone()
+        if linha is None or linha[0] is None:
+            return None
+        return json.loads(zlib.decompress(linha[0]).decode("utf-8"))
@@ -1,171 +1,359 @@
 from ccron.src.domain.ports.integracao_project_adapter import IntegracaoProjectAdapterInterface
-import xml.etree.ElementTree as ET
-from typing import Dict, Any
+from ccron.src.infrastructure.adapter.out.cache_feeds import CacheFeeds, assinar_paginas
+from ccron.src.infrastructure.adapter.out.cliente_odata import (
+    ClienteOData, CredenciaisProject, FeedIncompletoError, juntar_entradas,
+)
+from ccron.src.infrastructure.adapter.out.leitor_atom import ler_entradas, metadados_pagina
+from ccron.src.infrastructure.adapter.out.snapshot_tarefas import EstadoSnapshot, SnapshotTarefas
+from ccron.src.infrastructure.adapter.out.tarefas_project_data import COLUNAS_ESTRUTURA, campos_project_data, converter_tarefa
+from datetime import datetime
+from typing import Callable, Dict, Any
 import xmltodict
 import requests
+import os
 import re
+import uuid
+
+_ID_TAREFA = re.compile(r"Tasks\('([^']+)'\)")
+
+_cliente_padrao: ClienteOData | None = None
+
+
+class ProjectIdInvalidoError(ValueError):
+    """O id do projeto não é um GUID."""
+
+
+def guid_projeto(project_id) -> str:
+    """
+    O id do projeto na forma canônica de GUID, a única aceita nas URLs OData.
+
+    Raises:
+        ProjectIdInvalidoError: Se o id não for um GUID.
+    """
+    try:
+        return str(uuid.UUID(str(project_id)))
+    except ValueError:
+        raise ProjectIdInvalidoError(f"Id de projeto inválido, esperado um GUID: {project_id!r}") from None
+
+
+def cliente_odata_padrao() -> ClienteOData:
+    """Cliente compartilhado pelo processo, para que o pool de conexões seja reaproveitado."""
+    global _cliente_padrao
+    if _cliente_padrao is None:
+        _cliente_padrao = ClienteOData(credenciais=CredenciaisProject(), cache=CacheFeeds())
+    return _cliente_padrao
+
 
 class IntegracaoProjectAdapter(IntegracaoProjectAdapterInterface):
+    """
+    Acesso às APIs ProjectServer e ProjectData do SharePoint, pelo `ClienteOData`
+    compartilhado (pool de conexões, timeouts, novas tentativas e paginação).
+
+    Os resultados de cada feed ficam no cache do cliente, por endpoint e projeto,
+    e são revalidados com o servidor por requisições condicionais. As tarefas
+    usadas na análise ficam em uma cópia local sincronizada por diferença.
+
+    Args:
+        cliente: Cliente OData a usar. Padrão: o cliente compartilhado do processo.
+        tamanho_pagina: Tamanho de página dos feeds. Padrão: CCRON_ODATA_PAGINA ou 500.
+        snapshot: Cópia local das tarefas usada pela análise. Padrão: `SnapshotTarefas()`.
+    """
+    def __init__(self, cliente: ClienteOData | None = None, tamanho_pagina: int | None = None,
+                 snapshot: SnapshotTarefas | None = None):
+        self.cliente = cliente or cliente_odata_padrao()
+        self.snapshot = snapshot or SnapshotTarefas()
+        self.tamanho_pagina = tamanho_pagina or int(os.getenv("CCRON_ODATA_PAGINA", "500"))
+        # Um CCRON_CAMPOS_PROJECT_DATA mal formado impede a inicialização, em vez de falhar a cada sincronização.
+        campos_project_data()
+
+    @staticmethod
+    def _url_server(project_id: str) -> str:
+        return f"_api/ProjectServer/Projects('{guid_projeto(project_id)}')/Tasks"
+
+    @staticmethod
+    def _url_data(project_id: str) -> str:
+        return f"_api/ProjectData/[en-US]/Tasks?$filter=ProjectId eq guid'{guid_projeto(project_id)}'"
+
+    def _em_cache(self, endpoint: str, project_id: str, buscar: Callable[[], list[bytes]],
+                  interpretar: Callable[[list[bytes]], Any]):
+        """
+        Resultado de um feed, passando pelo cache quando o cliente tiver um.
+
+        Dentro do TTL o resultado guardado é devolvido sem consultar o servidor.
+        Depois dele, as páginas são buscadas (com requisições condicionais) e só
+        são interpretadas de novo se o conteúdo tiver mudado.
+
+        Args:
+            endpoint: Nome do feed, parte da chave do cache.
+            project_id: Projeto, parte da chave do cache.
+            buscar: Busca as páginas do feed.
+            interpretar: Converte as páginas no resultado.
+        """
+        cache = self.cliente.cache
+        if cache is None:
+            return interpretar(buscar())
+
+        chave = (endpoint, project_id)
+        valor = cache.resultado_fresco(chave)
+        if valor is not None:
+            return valor
+        paginas = buscar()
+        assinatura = assinar_paginas(paginas)
+        valor = cache.resultado(chave, assinatura)
+        if valor is None:
+            valor = interpretar(paginas)
+            cache.guardar_resultado(chave, assinatura, valor)
+        return valor
+
     def pegar_projeto_mrv(self, project_id: str):
-        url = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectServer/Projects('{project_id}')/Tasks?$select=Id,Name"
-    
-        fed_auth = "77u/PD94bWwgdmVyc2lvbj0iMS4wIiBlbmNvZGluZz0idXRmLTgiPz48U1A+VjE0LDBoLmZ8bWVtYmVyc2hpcHwxMDAzMjAwMjhiMDI4ZTgyQGxpdmUuY29tLDAjLmZ8bWVtYmVyc2hpcHxvYnJhMzYwQG1ydi5jb20uYnIsMTM0MTI2OTY3MzQwMDAwMDAwLDEzMzI0NjU5NTI3MDAwMDAwMCwxMzQxMjc4MzEzNDkzNjIyNTIsMTc5LjEwNy45OC4zNCwyLGI4NDk1OTA3LTRiZGMtNDg3OC1hODI4LWE5MDIxOWNhZDM2ZiwsMDAxMTFlZWEtNWI5Yy1hMDE2LTU3ZDgtYzkyNTIyYzFmMTFhLGNhNDdlY2ExLTgwY2MtYTAwMC1lN2NjLTg4ODk3NGU1NDJiMSxjYTQ3ZWNhMS04MGNjLWEwMDAtZTdjYy04ODg5NzRlNTQyYjEsLDAsMTM0MTI3ODMxMzQ5MjA1OTY2LDEzNDEyOTU1OTM0OTIwNTk2NiwsLGV5SjRiWE5mWTJNaU9pSmJYQ0pEVURGY0lsMGlMQ0o0YlhOZmMzTnRJam9pTVNJc0luQnlaV1psY25KbFpGOTFjMlZ5Ym1GdFpTSTZJbTlpY21Fek5qQkFiWEoyTG1OdmJTNWljaUlzSW5WMGFTSTZJa0pvZVZaMk1IbFRRVlZIVEVSNVJsSmZUR05mUVVFaUxDSmhkWFJvWDNScGJXVWlPaUl4TXpReE1qWTVOamN6TkRBd01EQXdNREFpZlE9PSwyNjUwNDY3NzQzOTk5OTk5OTk5LDEzNDEyNjk2NzM0MDAwMDAwMCwyMjNmNjY3OS1hZWE0LTQwNDUtOTUwNC0yNDgxNzIwNWFhY2MsLCwsLCwxMTUyOTIxNTA0NjA2ODQ2OTc2LCwxOTI5MjQsNFg5ckFYdWNibHBvbERFdERjbDUtNnVrcDFFLCxHQXhVSnNTbTk3WFppMVNlVlE0Uis3SEs2Z01lTDQxK3Z0dGo0YjBXaEVuaWZqbzF1V3BqMmwrU0lQSVUvaTdOVzg1R014SVpqMXpwWTZJbVJHaTlrL1M3d2p3c0FwYU1jZ0pEaEdkTWh1U1A5K003dDdHUGdtUWl0ck1WaVVhZWQrYlJqTHVQbFJnNkhUSVZaWUovYkRYS01ZYm96WlFyN0pmVnhSdWhmdThXdVJIckU1UTY5NS9BNGdjMW00eElDV2gzT01Cd0IxcHlUZWNmdTlHazRGYW02SlZWd1hFeUFHV2xqT2NzbW5tMWN3Njd3eG9wUzIydEVFdU9uNnlMdjhyMTQ4b0VYYW04OTlwNHNOQitTVWlLV0RZSXlWWG5JUS9MUVVZdzFTbGtjNjhFMkwyWjh1ZlV5RHBoV3Y4TjUzZHFaZFpkeHN4STgrQkJKSS9zeHc9PTwvU1A+" 
-        rt_fa = "N+h/QRFzy95y9O/72B3MaUC70V3ZtRZ/oez69yY1az8mYjg0OTU5MDctNGJkYy00ODc4LWE4MjgtYTkwMjE5Y2FkMzZmIzEzNDEyNjk2NzM0OTUxODUwMiNjYTQ3ZWNhMS04MGNiLWEwMDAtZTdjYy04YzEyYjRjOWM2NTgjb2JyYTM2MCU0MG1ydi5jb20uYnIjMTkyOTI0I2FiRFJmQzhpOXg0d2JRLTFDNG4yZkt2M0VBayNhYkRSZkM4aTl4NHdiUS0xQzRuMmZLdjNFQWu2syssQSLoj6eD1XyhPFVeJ8Cw91Md8Cv1qBLei+ViglcEjOJgLRe9s/G5Zin0xYzK9GtUAAqKK4vPmWq2HPHBOQs5YMuTsdLLfPEdAHQovvrnISw0nu8CHWU6Fx5g/ZM2ghOTeymRcMYY5zDTEn8zc5sQIF9/lE+/Q/Oo3rXtgsZpkk1Z6JDt2jmUZkPADAZceh3q87iu66eY0nq10LbeB5sP2Xr2mvMwt6quRjTo7N8+xV2pM0NMKvmsAqh1Y/jjUTO65TAuv10WAYX8hTbOz13L3t28ItqwUAYoy20Y75uMSJjJvu1upCZHXfDZ6THrWl993nGKG7jSdDunHYuc0QAAAA=="
-
-        headers = {
-            'Accept': 'application/xml',
-            'Cookie': f'FedAuth={fed_auth}; rtFa={rt_fa}'
-        }
+        url = self._url_server(project_id) + "?$select=Id,Name"
 
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            xml_data = response.content
-
-            namespaces = {
-                'atom': 'http://www.w3.org/2005/Atom',
-                'd': 'http://schemas.microsoft.com/ado/2007/08/dataservices'
-            }
-
-            root = ET.fromstring(xml_data)
-            entries = root.findall('atom:entry', namespaces)
-            
-            # Dicionário para armazenar {id: nome}
-            tarefas_dict = {}
-            total_tarefas = len(entries)
-
-            for entry in entries:
-                # 1. Extrair o ID bruto (é uma URL)
-                id_bruto = entry.find('atom:id', namespaces).text
-                
-                # 2. Usar Regex para pegar apenas o que está dentro de Tasks('...')
-                # Ex: de ".../Tasks('4f5775bd...')" extrai "4f5775bd..."
-                match = re.search(r"Tasks\('([^']+)'\)", id_bruto)
-                task_id = match.group(1) if match else id_bruto
-                
-                # 3. Extrair o Nome
-                name_el = entry.find('.//d:Name', namespaces)
-                task_name = name_el.text.strip() if name_el is not None and name_el.text else "Sem nome"
-
-                # 4. Adicionar ao dicionário
-                tarefas_dict[task_id] = task_name
-
-            return tarefas_dict, total_tarefas
-
+            return self._em_cache(
+                "server_nomes", project_id,
+                lambda: self.cliente.paginas(url, {'Accept': 'application/xml'}, self.tamanho_pagina),
+                _interpretar_nomes_server)
         except Exception as e:
             print(f"Erro: {e}")
             return {}, 0
-     
-    def _get_common_headers(self):
-        # Cookies atualizados conforme seu código
-        fed_auth = "77u/PD94bWwgdmVyc2lvbj0iMS4wIiBlbmNvZGluZz0idXRmLTgiPz48U1A+VjE0LDBoLmZ8bWVtYmVyc2hpcHwxMDAzMjAwMjhiMDI4ZTgyQGxpdmUuY29tLDAjLmZ8bWVtYmVyc2hpcHxvYnJhMzYwQG1ydi5jb20uYnIsMTM0MTI2OTY3MzQwMDAwMDAwLDEzMzI0NjU5NTI3MDAwMDAwMCwxMzQxMjc4MzEzNDkzNjIyNTIsMTc5LjEwNy45OC4zNCwyLGI4NDk1OTA3LTRiZGMtNDg3OC1hODI4LWE5MDIxOWNhZDM2ZiwsMDAxMTFlZWEtNWI5Yy1hMDE2LTU3ZDgtYzkyNTIyYzFmMTFhLGNhNDdlY2ExLTgwY2MtYTAwMC1lN2NjLTg4ODk3NGU1NDJiMSxjYTQ3ZWNhMS04MGNjLWEwMDAtZTdjYy04ODg5NzRlNTQyYjEsLDAsMTM0MTI3ODMxMzQ5MjA1OTY2LDEzNDEyOTU1OTM0OTIwNTk2NiwsLGV5SjRiWE5mWTJNaU9pSmJYQ0pEVURGY0lsMGlMQ0o0YlhOZmMzTnRJam9pTVNJc0luQnlaV1psY25KbFpGOTFjMlZ5Ym1GdFpTSTZJbTlpY21Fek5qQkFiWEoyTG1OdmJTNWljaUlzSW5WMGFTSTZJa0pvZVZaMk1IbFRRVlZIVEVSNVJsSmZUR05mUVVFaUxDSmhkWFJvWDNScGJXVWlPaUl4TXpReE1qWTVOamN6TkRBd01EQXdNREFpZlE9PSwyNjUwNDY3NzQzOTk5OTk5OTk5LDEzNDEyNjk2NzM0MDAwMDAwMCwyMjNmNjY3OS1hZWE0LTQwNDUtOTUwNC0yNDgxNzIwNWFhY2MsLCwsLCwxMTUyOTIxNTA0NjA2ODQ2OTc2LCwxOTI5MjQsNFg5ckFYdWNibHBvbERFdERjbDUtNnVrcDFFLCxHQXhVSnNTbTk3WFppMVNlVlE0Uis3SEs2Z01lTDQxK3Z0dGo0YjBXaEVuaWZqbzF1V3BqMmwrU0lQSVUvaTdOVzg1R014SVpqMXpwWTZJbVJHaTlrL1M3d2p3c0FwYU1jZ0pEaEdkTWh1U1A5K003dDdHUGdtUWl0ck1WaVVhZWQrYlJqTHVQbFJnNkhUSVZaWUovYkRYS01ZYm96WlFyN0pmVnhSdWhmdThXdVJIckU1UTY5NS9BNGdjMW00eElDV2gzT01Cd0IxcHlUZWNmdTlHazRGYW02SlZWd1hFeUFHV2xqT2NzbW5tMWN3Njd3eG9wUzIydEVFdU9uNnlMdjhyMTQ4b0VYYW04OTlwNHNOQitTVWlLV0RZSXlWWG5JUS9MUVVZdzFTbGtjNjhFMkwyWjh1ZlV5RHBoV3Y4TjUzZHFaZFpkeHN4STgrQkJKSS9zeHc9PTwvU1A+" 
-        rt_fa = "N+h/QRFzy95y9O/72B3MaUC70V3ZtRZ/oez69yY1az8mYjg0OTU5MDctNGJkYy00ODc4LWE4MjgtYTkwMjE5Y2FkMzZmIzEzNDEyNjk2NzM0OTUxODUwMiNjYTQ3ZWNhMS04MGNiLWEwMDAtZTdjYy04YzEyYjRjOWM2NTgjb2JyYTM2MCU0MG1ydi5jb20uYnIjMTkyOTI0I2FiRFJmQzhpOXg0d2JRLTFDNG4yZkt2M0VBayNhYkRSZkM4aTl4NHdiUS0xQzRuMmZLdjNFQWu2syssQSLoj6eD1XyhPFVeJ8Cw91Md8Cv1qBLei+ViglcEjOJgLRe9s/G5Zin0xYzK9GtUAAqKK4vPmWq2HPHBOQs5YMuTsdLLfPEdAHQovvrnISw0nu8CHWU6Fx5g/ZM2ghOTeymRcMYY5zDTEn8zc5sQIF9/lE+/Q/Oo3rXtgsZpkk1Z6JDt2jmUZkPADAZceh3q87iu66eY0nq10LbeB5sP2Xr2mvMwt6quRjTo7N8+xV2pM0NMKvmsAqh1Y/jjUTO65TAuv10WAYX8hTbOz13L3t28ItqwUAYoy20Y75uMSJjJvu1upCZHXfDZ6THrWl993nGKG7jSdDunHYuc0QAAAA=="
 
-        return {
-            'Cookie': f'FedAuth={fed_auth}; rtFa={rt_fa}',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Edge/120.0.0.0'
-        }
-    
     def pegar_tarefas_project_data(self, project_id: str):
-        url = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectData/[en-US]/Tasks?$filter=ProjectId eq guid'{project_id}'"
-        
         try:
-            response = requests.get(url, headers=self._get_common_headers())
-            response.raise_for_status()
-            
-            dados = xmltodict.parse(response.content)
-            entries = dados.get('feed', {}).get('entry', [])
-            if isinstance(entries, dict): entries = [entries]
-
-            tarefas_limpas = {}
-            for entry in entries:
-                propriedades = entry.get('content', {}).get('m:properties', {})
-                
-                # Pega o ID e o Nome
-                raw_id = propriedades.get('d:TaskId')
-                raw_nome = propriedades.get('d:TaskName')
-
-                # FUNÇÃO DE LIMPEZA: Se for dicionário (ex: com xml:space), pega só o #text
-                def limpar_valor(valor):
-                    if isinstance(valor, dict):
-                        return valor.get('#text', '')
-                    return valor if valor else ""
-
-                t_id = limpar_valor(raw_id)
-                t_nome = limpar_valor(raw_nome)
-                
-                if t_id:
-                    tarefas_limpas[t_id] = t_nome
-
-            return tarefas_limpas, len(tarefas_limpas)
+            return self._em_cache(
+                "data_nomes", project_id,
+                lambda: self.cliente.paginas(self._url_data(project_id), tamanho_pagina=self.tamanho_pagina),
+                _interpretar_nomes_data)
         except Exception as e:
             print(f"Erro Project Data: {e}")
             return {}, 0
 
-    def buscar_dados_brutos_projeto(self, project_id: str) -> Dict[str, Any]:
-        """Pega o dump bruto de ambas as APIs e converte para JSON"""
-        url_server = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectServer/Projects('{project_id}')/Tasks"
-        url_data = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectData/[en-US]/Tasks?$filter=ProjectId eq guid'{project_id}'"
-        
-        resultado = {"server_raw": {}, "data_raw": {}, "erros": []}
+    def pegar_tarefas_para_analise(self, project_id: str) -> list[dict]:
+        """
+        Tarefas do projeto já no formato das linhas do relatório CSV, prontas
+        para a `TransformData`, na ordem do cronograma.
+
+        As tarefas vêm da cópia local (`SnapshotTarefas`), atualizada antes com
+        as mudanças do ProjectData (ver `sincronizar_projeto`). Se o Project
+        Server não responder, a última cópia é usada.
 
-        # Request Server
+        Raises:
+            requests.RequestException: Se o ProjectData não puder ser consultado
+                                       e ainda não houver cópia local do projeto.
+        """
         try:
-            headers = self._get_common_headers()
-            headers['Accept'] = 'application/xml'
-            res = requests.get(url_server, headers=headers)
-            resultado["server_raw"] = xmltodict.parse(res.content)
-        except Exception as e:
-            resultado["erros"].append(f"Server Error: {str(e)}")
+            self.sincronizar_projeto(project_id)
+        except requests.RequestException as e:
+            if self.snapshot.estado(project_id) is None:
+                raise
+            print(f"Project Server indisponível, usando a cópia local do projeto {project_id}: {e}")
+        return self.snapshot.linhas(project_id)
+
+    def sincronizar_projeto(self, project_id: str) -> dict:
+        """
+        Atualiza a cópia local das tarefas do projeto com o que mudou no ProjectData.
+
+        1. Se o `ProjectModifiedDate` do projeto não mudou, nada é lido.
+        2. A estrutura de todas as tarefas (TaskId, posição, tópicos e
+           predecessoras) é lida com poucas colunas: inserir uma tarefa renumera
+           as seguintes sem alterar o `TaskModifiedDate` delas, e as tarefas que
+           sumiram viram tombstones.
+        3. Só as tarefas com `TaskModifiedDate` a partir da última marca são
+           lidas com todas as colunas (`$filter`).
+
+        Na primeira sincronização, ou se as colunas mapeadas mudarem, o projeto
+        é lido inteiro.
+
+        Returns:
+            O resumo da sincronização (tarefas lidas, gravadas e excluídas).
 
-        # Request Data
+        Raises:
+            FeedIncompletoError: Se alguma leitura não trouxer todas as tarefas
+                                 informadas pelo servidor; nada é gravado nem excluído.
+        """
+        campos = campos_project_data()
+        propriedades = tuple(dict.fromkeys(("TaskId", "TaskModifiedDate") + tuple(p for p, _ in campos.values())))
+        assinatura = ",".join(propriedades)
+        anterior = self.snapshot.estado(project_id)
+        completa = anterior is None or anterior.campos != assinatura or not anterior.marca_tarefas
+
+        modificado_projeto = self._data_modificacao_projeto(project_id)
+        if not completa and modificado_projeto is not None and modificado_projeto == anterior.modificado_em:
+            return {"project_id": project_id, "alterado": False}
+
+        guardadas = {}
+        if completa:
+            inteiras = estrutura = self._ler_tarefas(project_id, propriedades, campos)
+        else:
+            campos_estrutura = {coluna: campos[coluna] for coluna in COLUNAS_ESTRUTURA if coluna in campos}
+            estrutura = self._ler_tarefas(
+                project_id, ("TaskId", "TaskModifiedDate") + tuple(p for p, _ in campos_estrutura.values()),
+                campos_estrutura)
+            guardadas = self.snapshot.tarefas_atuais(project_id)
+            inteiras = self._ler_tarefas(
+                project_id, propriedades, campos, f"TaskModifiedDate ge datetime'{anterior.marca_tarefas}'")
+            if set(estrutura) - set(guardadas) - set(inteiras):
+                # Tarefa nova sem TaskModifiedDate recente: relê o projeto inteiro.
+                completa, guardadas = True, {}
+                inteiras = estrutura = self._ler_tarefas(project_id, propriedades, campos)
+
+        gravar = []
+        for task_id, (modificado, parcial) in estrutura.items():
+            if task_id in inteiras:
+                modificado, linha = inteiras[task_id]
+                atual = {**linha, **parcial}
+            else:
+                linha = guardadas[task_id][1]
+                atual = {**linha, **parcial}
+                if atual == linha:
+                    continue
+            posicao = atual.get("Id") if isinstance(atual.get("Id"), int) else len(estrutura) + len(gravar)
+            gravar.append((task_id, posicao, modificado, atual))
+        excluir = [task_id for task_id in guardadas if task_id not in estrutura]
+
+        marcas = [modificado for modificado, _ in estrutura.values() if modificado]
+        estado = EstadoSnapshot(
+            campos=assinatura, modificado_em=modificado_projeto,
+            marca_tarefas=max(marcas) if marcas else None,
+            sincronizado_em=datetime.now().isoformat(timespec="seconds"))
+        self.snapshot.aplicar(project_id, estado, gravar, excluir, recomecar=completa)
+        return {
+            "project_id": project_id,
+            "alterado": True,
+            "leitura_completa": completa,
+            "tarefas": len(estrutura),
+            "lidas_inteiras": len(inteiras),
+            "gravadas": len(gravar),
+            "excluidas": len(excluir),
+        }
+
+    def _data_modificacao_projeto(self, project_id: str) -> str | None:
+        url = (f"_api/ProjectData/[en-US]/Projects?$filter=ProjectId eq guid'{guid_projeto(project_id)}'"
+               f"&$select=ProjectId,ProjectModifiedDate")
         try:
-            # Sem Accept fixo para evitar o erro de 'Unsupported media type'
-            res = requests.get(url_data, headers=self._get_common_headers())
-            resultado["data_raw"] = xmltodict.parse(res.content)
-        except Exception as e:
-            resultado["erros"].append(f"Data Error: {str(e)}")
+            paginas = self.cliente.paginas(url, {'Accept': 'application/xml'})
+        except requests.HTTPError as e:
+            # Sem acesso ao feed de projetos: a sincronização segue pelas tarefas.
+            if e.response is not None and 400 <= e.response.status_code < 500:
+                return None
+            raise
+        for pagina in paginas:
+            for entrada in ler_entradas(pagina, ("ProjectModifiedDate",)):
+                return entrada["ProjectModifiedDate"]
+        return None
 
-        return resultado
+    def _ler_tarefas(self, project_id: str, propriedades: tuple[str, ...], campos: dict,
+                     filtro: str | None = None) -> dict[str, tuple[str | None, dict]]:
+        """
+        {TaskId: (TaskModifiedDate, linha)}, sem a tarefa de resumo do projeto (nível 0).
+
+        Raises:
+            FeedIncompletoError: Se as entradas lidas não somarem o `m:count` do feed.
+                                 A sincronização é interrompida antes de gravar, para
+                                 que tarefas não lidas não virem tombstones.
+        """
+        propriedades = tuple(dict.fromkeys(propriedades))
+        url = self._url_data(project_id) + (f" and {filtro}" if filtro else "")
+        url += f"&$select={','.join(propriedades)}&$orderby=TaskIndex"
+        paginas = self.cliente.paginas(url, {'Accept': 'application/xml'}, self.tamanho_pagina)
+        total = metadados_pagina(paginas[0])[1] if paginas else None
+        tarefas, lidas = {}, 0
+        for pagina in paginas:
+            for entrada in ler_entradas(pagina, propriedades):
+                lidas += 1
+                task_id = (entrada["TaskId"] or "").strip()
+                linha = converter_tarefa(entrada, campos)
+                if task_id and linha.get("Nível_da_estrutura_de_tópicos") != 0:
+                    tarefas[task_id] = (entrada["TaskModifiedDate"], linha)
+        if total is not None and lidas != total:
+            raise FeedIncompletoError(
+                f"Leitura incompleta das tarefas do projeto {project_id}: {lidas} de {total} entradas.")
+        return tarefas
+
+    def _feed_server(self, project_id: str) -> dict:
+        # Project Server geralmente aceita XML/Atom
+        headers = {'Accept': 'application/atom+xml,application/xml'}
+        return self._em_cache(
+            "server_bruto", project_id,
+            lambda: self.cliente.paginas(self._url_server(project_id), headers, self.tamanho_pagina),
+            _interpretar_feed_bruto)
+
+    def _feed_data(self, project_id: str) -> dict:
+        url = self._url_data(project_id)
+
+        def buscar():
+            try:
+                return self.cliente.paginas(url, {'Accept': 'application/xml'}, self.tamanho_pagina)
+            except requests.HTTPError as e:
+                # Se der erro de "Unsupported media type", tentamos sem o header Accept
+                if e.response is None or e.response.status_code != 415:
+                    raise
+                return self.cliente.paginas(url, {}, self.tamanho_pagina)
+
+        return self._em_cache("data_bruto", project_id, buscar, _interpretar_feed_bruto)
 
     def buscar_dados_brutos_projeto(self, project_id: str) -> Dict[str, Any]:
-        url_server = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectServer/Projects('{project_id}')/Tasks"
-        url_data = f"https://mrvengenhariasa.sharepoint.com/sites/planejamento2023/_api/ProjectData/[en-US]/Tasks?$filter=ProjectId eq guid'{project_id}'"
-        
+        """
+        Pega o dump bruto das duas APIs, em paralelo, e converte para JSON.
+
+        Retorna o feed do Project Data, com as entradas de todas as páginas.
+        """
         resultado_final = {
             "project_server_json": {},
             "project_data_json": {},
             "erros": []
         }
 
-        # 1. Requisição Project Server (Geralmente aceita XML/Atom)
-        try:
-            headers_server = self._get_common_headers()
-            headers_server['Accept'] = 'application/atom+xml,application/xml' # Especifico para Server
-            
-            res_server = requests.get(url_server, headers=headers_server)
-            res_server.raise_for_status()
-            resultado_final["project_server_json"] = xmltodict.parse(res_server.content)
-        except Exception as e:
-            resultado_final["erros"].append(f"Erro no Project Server: {str(e)}")
+        server, data = self.cliente.em_paralelo(
+            lambda: self._feed_server(project_id), lambda: self._feed_data(project_id))
+
+        if isinstance(server, Exception):
+            resultado_final["erros"].append(f"Erro no Project Server: {str(server)}")
+        else:
+            resultado_final["project_server_json"] = server
+        if isinstance(data, Exception):
+            resultado_final["erros"].append(f"Erro no Project Data: {str(data)}")
+        else:
+            resultado_final["project_data_json"] = data
+
+        for erro in resultado_final["erros"]:
+            print(erro)
+
+        # Retorna o feed do Project Data, como antes
+        return resultado_final['project_data_json']
+
+
+def _interpretar_nomes_server(paginas: list[bytes]) -> tuple[dict, int]:
+    # Dicionário para armazenar {id: nome}
+    tarefas_dict = {}
+    total_tarefas = 0
+
+    for pagina in paginas:
+        for entrada in ler_entradas(pagina, ("Id", "Name")):
+            total_tarefas += 1
+            # O Id vem na propriedade; o atom:id (".../Tasks('4f5775bd...')") só é usado se ela faltar
+            task_id = entrada["Id"] or _extrair_id(entrada["id"])
+            nome = entrada["Name"]
+            tarefas_dict[task_id] = nome.strip() if nome else "Sem nome"
+
+    return tarefas_dict, total_tarefas
+
+
+def _extrair_id(id_bruto: str | None) -> str | None:
+    match = _ID_TAREFA.search(id_bruto or "")
+    return match.group(1) if match else id_bruto
+
+
+def _interpretar_nomes_data(paginas: list[bytes]) -> tuple[dict, int]:
+    tarefas_limpas = {}
+    for pagina in paginas:
+        for entrada in ler_entradas(pagina, ("TaskId", "TaskName")):
+            # Como no xmltodict, o texto vem sem espaços nas pontas e vazio quando ausente
+            t_id = (entrada["TaskId"] or "").strip()
+            if t_id:
+                tarefas_limpas[t_id] = (entrada["TaskName"] or "").strip()
+
+    return tarefas_limpas, len(tarefas_limpas)
 
-        # 2. Requisição Project Data (OData - Tentaremos pegar o XML que ele gera)
-        try:
-            headers_data = self._get_common_headers()
-            # Removemos o Accept fixo para deixar o servidor decidir ou forçamos o padrão OData
-            headers_data['Accept'] = 'application/xml' 
-            
-            res_data = requests.get(url_data, headers=headers_data)
-            
-            # Se der erro de "Unsupported media type", tentamos sem o header Accept
-            if res_data.status_code == 415 or "Unsupported media type" in res_data.text:
-                del headers_data['Accept']
-                res_data = requests.get(url_data, headers=headers_data)
-
-            res_data.raise_for_status()
-            resultado_final["project_data_json"] = xmltodict.parse(res_data.content)
-        except Exception as e:
-            resultado_final["erros"].append(f"Erro no Project Data: {str(e)}")
 
-        # Retorna o dicionário completo com as duas fontes
-        return resultado_final['project_data_json']
\ No newline at end of file
+def _interpretar_feed_bruto(paginas: list[bytes]) -> dict:
+    return juntar_entradas(xmltodict.parse(pagina) for pagina in paginas)
@@ -0,0 +1,112 @@
+from typing import Iterable, Iterator
+import xml.etree.ElementTree as ET
+
+# Nomes qualificados ({namespace}tag) usados pelo parser, montados uma vez.
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_D = '{http://schemas.microsoft.com/ado/2007/08/dataservices}'
+_M = '{http://schemas.microsoft.com/ado/2007/08/dataservices/metadata}'
+
+TAG_ENTRADA = _ATOM + 'entry'
+TAG_ID = _ATOM + 'id'
+TAG_LINK = _ATOM + 'link'
+TAG_PROPRIEDADES = _M + 'properties'
+TAG_CONTAGEM = _M + 'count'
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _blocos(pagina: bytes, tamanho: int) -> Iterator[bytes]:
+    visao = memoryview(pagina)
+    for inicio in range(0, len(visao), tamanho):
+        yield visao[inicio:inicio + tamanho]
+
+
+def _eventos(fonte: bytes | Iterable[bytes], tamanho_bloco: int) -> Iterator[tuple[str, ET.Element]]:
+    """Eventos de início e fim de elemento, alimentando o parser bloco a bloco."""
+    parser = ET.XMLPullParser(events=("start", "end"))
+    blocos = _blocos(fonte, tamanho_bloco) if isinstance(fonte, (bytes, bytearray)) else fonte
+    for bloco in blocos:
+        parser.feed(bloco)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def ler_entradas(fonte: bytes | Iterable[bytes], campos: Iterable[str],
+                 tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[dict[str, str | None]]:
+    """
+    Lê as entradas de um feed Atom do Project de forma incremental.
+
+    Cada entrada é liberada assim que lida, então a memória usada não cresce com
+    o tamanho do feed, ao contrário de montar a árvore inteira.
+
+    Args:
+        fonte: Conteúdo do feed, inteiro ou em blocos (ex: `iter_content`).
+        campos: Propriedades (sem o prefixo "d:") a extrair de `m:properties`.
+        tamanho_bloco: Tamanho dos blocos em que um conteúdo inteiro é entregue ao parser.
+
+    Returns:
+        Um dicionário por entrada com os campos pedidos (None se ausentes) e o
+        `atom:id` da entrada na chave "id".
+    """
+    tags = {_D + campo: campo for campo in campos}
+    raiz = None
+    entrada: dict | None = None
+    em_propriedades = False
+    for evento, elemento in _eventos(fonte, tamanho_bloco):
+        tag = elemento.tag
+        if evento == "start":
+            if raiz is None:
+                raiz = elemento
+            elif tag == TAG_ENTRADA:
+                entrada = dict.fromkeys(tags.values())
+                entrada["id"] = None
+            elif tag == TAG_PROPRIEDADES:
+                em_propriedades = True
+            continue
+
+        if entrada is None:
+            continue
+        if em_propriedades and tag in tags:
+            entrada[tags[tag]] = elemento.text
+        elif tag == TAG_PROPRIEDADES:
+            em_propriedades = False
+        elif tag == TAG_ID:
+            entrada["id"] = elemento.text
+        elif tag == TAG_ENTRADA:
+            yield entrada
+            entrada = None
+            # A entrada já foi consumida: descarta os elementos acumulados na raiz.
+            raiz.clear()
+
+
+def metadados_pagina(fonte: bytes | Iterable[bytes],
+                     tamanho_bloco: int = TAMANHO_BLOCO) -> tuple[int, int | None, str | None]:
+    """
+    (entradas na página, total informado pelo servidor em `m:count`, link da
+    próxima página), lidos de forma incremental.
+    """
+    entradas = 0
+    total = None
+    proxima = None
+    profundidade = 0
+    raiz = None
+    for evento, elemento in _eventos(fonte, tamanho_bloco):
+        if evento == "start":
+            profundidade += 1
+            if raiz is None:
+                raiz = elemento
+            continue
+
+        profundidade -= 1
+        if profundidade != 1:
+            continue
+        tag = elemento.tag
+        if tag == TAG_ENTRADA:
+            entradas += 1
+            raiz.clear()
+        elif tag == TAG_CONTAGEM and elemento.text:
+            total = int(elemento.text)
+        elif tag == TAG_LINK and elemento.get('rel') == 'next':
+            proxima = elemento.get('href')
+    return entradas, total, proxima
@@ -0,0 +1,131 @@
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS projetos (
+    project_id TEXT PRIMARY KEY,
+    campos TEXT NOT NULL,
+    modificado_em TEXT,
+    marca_tarefas TEXT,
+    sincronizado_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tarefas (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    modificado_em TEXT,
+    linha TEXT NOT NULL,
+    excluida_em TEXT,
+    PRIMARY KEY (project_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS tarefas_ativas ON tarefas (project_id, excluida_em, posicao);
+"""
+
+
+@dataclass
+class EstadoSnapshot:
+    """
+    Situação da última sincronização de um projeto.
+
+    Attributes:
+        campos: Assinatura das colunas pedidas ao ProjectData; se mudar, o projeto é lido inteiro de novo.
+        modificado_em: `ProjectModifiedDate` do projeto na última sincronização.
+        marca_tarefas: Maior `TaskModifiedDate` já lido; as próximas leituras partem dela.
+        sincronizado_em: Momento da última sincronização.
+    """
+    campos: str
+    modificado_em: str | None
+    marca_tarefas: str | None
+    sincronizado_em: str
+
+
+class SnapshotTarefas:
+    """
+    Cópia local (SQLite) das tarefas de cada projeto, já no formato das linhas
+    do relatório, indexada por projeto e `TaskId`.
+
+    Tarefas que deixam de existir no servidor não são apagadas: ficam marcadas
+    com `excluida_em` (tombstone) e saem da leitura. O banco usa WAL, então
+    vários processos (workers do servidor, pool do portfólio) podem ler e
+    gravar o mesmo arquivo.
+
+    Args:
+        caminho: Arquivo do banco. Padrão: CCRON_SNAPSHOT_DB ou "ccron_snapshot.db"
+                 no diretório temporário.
+    """
+    def __init__(self, caminho: str | None = None):
+        self.caminho = caminho or os.getenv("CCRON_SNAPSHOT_DB") or os.path.join(tempfile.gettempdir(), "ccron_snapshot.db")
+        self._lock = threading.Lock()
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.executescript(_ESQUEMA)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    def estado(self, project_id: str) -> EstadoSnapshot | None:
+        with closing(self._conectar()) as conexao:
+            linha = conexao.execute(
+                "SELECT campos, modificado_em, marca_tarefas, sincronizado_em FROM projetos WHERE project_id = ?",
+                (project_id,)).fetchone()
+        return EstadoSnapshot(*linha) if linha else None
+
+    def tarefas_atuais(self, project_id: str) -> dict[str, tuple[str | None, dict]]:
+        """{TaskId: (TaskModifiedDate, linha)} das tarefas não excluídas."""
+        with closing(self._conectar()) as conexao:
+            registros = conexao.execute(
+                "SELECT task_id, modificado_em, linha FROM tarefas WHERE project_id = ? AND excluida_em IS NULL",
+                (project_id,)).fetchall()
+        return {task_id: (modificado, json.loads(linha)) for task_id, modificado, linha in registros}
+
+    def linhas(self, project_id: str) -> list[dict]:
+        """As tarefas não excluídas do projeto, na ordem do cronograma."""
+        with closing(self._conectar()) as conexao:
+            registros = conexao.execute(
+                "SELECT linha FROM tarefas WHERE project_id = ? AND excluida_em IS NULL ORDER BY posicao",
+                (project_id,)).fetchall()
+        return [json.loads(linha) for (linha,) in registros]
+
+    def aplicar(self, project_id: str, estado: EstadoSnapshot,
+                gravar: Iterable[tuple[str, int, str | None, dict]], excluir: Iterable[str],
+                recomecar: bool = False) -> None:
+        """
+        Aplica uma sincronização em uma única transação.
+
+        Args:
+            project_id: Projeto sincronizado.
+            estado: Novo estado da sincronização.
+            gravar: (TaskId, posição, TaskModifiedDate, linha) das tarefas novas ou alteradas.
+            excluir: TaskIds que deixaram de existir no servidor.
+            recomecar: Descarta as tarefas guardadas antes de gravar (leitura completa).
+        """
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._lock, closing(self._conectar()) as conexao, conexao:
+            if recomecar:
+                conexao.execute("DELETE FROM tarefas WHERE project_id = ?", (project_id,))
+            conexao.executemany(
+                "INSERT INTO tarefas (project_id, task_id, posicao, modificado_em, linha, excluida_em) "
+                "VALUES (?, ?, ?, ?, ?, NULL) "
+                "ON CONFLICT (project_id, task_id) DO UPDATE SET posicao = excluded.posicao, "
+                "modificado_em = excluded.modificado_em, linha = excluded.linha, excluida_em = NULL",
+                [(project_id, task_id, posicao, modificado, json.dumps(linha, ensure_ascii=False))
+                 for task_id, posicao, modificado, linha in gravar])
+            conexao.executemany(
+                "UPDATE tarefas SET excluida_em = ? WHERE project_id = ? AND task_id = ? AND excluida_em IS NULL",
+                [(agora, project_id, task_id) for task_id in excluir])
+            conexao.execute(
+                "INSERT INTO projetos (project_id, campos, modificado_em, marca_tarefas, sincronizado_em) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (project_id) DO UPDATE SET campos = excluded.campos, "
+                "modificado_em = excluded.modificado_em, marca_tarefas = excluded.marca_tarefas, "
+                "sincronizado_em = excluded.sincronizado_em",
+                (project_id, estado.campos, estado.modificado_em, estado.marca_tarefas, estado.sincronizado_em))
@@ -0,0 +1,160 @@
+from datetime import datetime
+from typing import Callable
+import json
+import os
+import re
+
+# Valor das células vazias no relatório CSV depois do `fillna` do conversor.
+VAZIO = "nan"
+
+_RESTRICOES = (
+    "O Mais Breve Possível", "O Mais Tarde Possível", "Deve Iniciar Em", "Deve Terminar Em",
+    "Não Iniciar Antes De", "Não Iniciar Depois De", "Não Terminar Antes De", "Não Terminar Depois De",
+)
+_TIPOS_TAREFA = ("Unidades fixas", "Duração fixa", "Trabalho fixo")
+
+
+def _texto(valor: str) -> str:
+    return valor.strip()
+
+
+def _inteiro(valor: str) -> int:
+    return int(float(valor))
+
+
+def _decimal(valor: str) -> float:
+    return float(valor)
+
+
+def _sim_nao(valor: str) -> str:
+    return "Sim" if valor.strip().lower() == "true" else "Não"
+
+
+def _data(valor: str) -> str:
+    # "2025-01-06T08:00:00" -> "06/01/2025", o formato do relatório exportado.
+    return datetime.fromisoformat(valor.strip()[:19]).strftime("%d/%m/%Y")
+
+
+def _numero_br(valor: float) -> str:
+    # A transformação trata "." como separador de milhar, então o decimal vai com ",".
+    return f"{valor:g}".replace(".", ",")
+
+
+def _duracao(valor: str) -> str:
+    return f"{_numero_br(float(valor))} dias"
+
+
+def _trabalho(valor: str) -> str:
+    return f"{_numero_br(float(valor))} hrs"
+
+
+def _modo(valor: str) -> str:
+    return "Agendada Manualmente" if valor.strip().lower() == "true" else "Agendada Automaticamente"
+
+
+def _enumerado(rotulos: tuple[str, ...]) -> Callable[[str], str]:
+    def converter(valor: str) -> str:
+        valor = valor.strip()
+        return rotulos[int(valor)] if valor.isdigit() and int(valor) < len(rotulos) else valor
+    return converter
+
+
+def _predecessoras(valor: str) -> str:
+    # Em [en-US] a lista vem separada por ","; o relatório em português usa ";".
+    return ";".join(parte.strip() for parte in valor.split(",") if parte.strip())
+
+
+# Coluna do relatório do MS Project -> (propriedade do ProjectData, conversão do texto).
+CAMPOS_PROJECT_DATA: dict[str, tuple[str, Callable[[str], object]]] = {
+    "Id": ("TaskIndex", _inteiro),
+    "Ativo": ("TaskIsActive", _sim_nao),
+    "Nome": ("TaskName", _texto),
+    "Duração": ("TaskDuration", _duracao),
+    "Trabalho": ("TaskWork", _trabalho),
+    "Início": ("TaskStartDate", _data),
+    "Término": ("TaskFinishDate", _data),
+    "Início_real": ("TaskActualStartDate", _data),
+    "Término_real": ("TaskActualFinishDate", _data),
+    "Predecessoras": ("TaskPredecessors", _predecessoras),
+    "Nível_da_estrutura_de_tópicos": ("TaskOutlineLevel", _inteiro),
+    "Número_da_estrutura_de_tópicos": ("TaskOutlineNumber", _texto),
+    "Resumo": ("TaskIsSummary", _sim_nao),
+    "Tipo": ("TaskType", _enumerado(_TIPOS_TAREFA)),
+    "Modo_da_Tarefa": ("TaskIsManuallyScheduled", _modo),
+    "Tipo_de_restrição": ("TaskConstraintType", _enumerado(_RESTRICOES)),
+    "Nomes_dos_recursos": ("TaskResourceNames", _texto),
+    "Custo": ("TaskCost", _decimal),
+    # Campos personalizados da empresa: o nome da propriedade depende da instância do PWA.
+    "Peso": ("Peso", _decimal),
+    "SAP_Tarefa": ("SAP_Tarefa", _texto),
+    "ID_Bloco": ("ID_Bloco", _texto),
+    "SAP_Elemento_PEP": ("SAP_Elemento_PEP", _texto),
+    "SAP_Diagrama_de_Rede": ("SAP_Diagrama_de_Rede", _texto),
+    "Agrupamento": ("Agrupamento", _texto),
+    "MÓDULO_ASC": ("MODULO_ASC", _texto),
+}
+
+
+# Nome de propriedade OData: vai direto para o $select das consultas.
+_PROPRIEDADE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Colunas que mudam quando o cronograma é renumerado, sem alterar o TaskModifiedDate das tarefas.
+COLUNAS_ESTRUTURA = ("Id", "Nível_da_estrutura_de_tópicos", "Número_da_estrutura_de_tópicos", "Predecessoras")
+
+
+def campos_project_data() -> dict[str, tuple[str, Callable[[str], object]]]:
+    """
+    Mapeamento das colunas, com os ajustes de `CCRON_CAMPOS_PROJECT_DATA`.
+
+    A variável é um objeto JSON {coluna: propriedade}; uma propriedade null
+    remove a coluna da consulta (a coluna chega vazia na análise). Ex:
+    {"Peso": "PesoTarefa", "Tipo": null}.
+
+    Raises:
+        ValueError: Se a variável não for um objeto JSON, ou se alguma propriedade
+                    não for um nome de propriedade OData válido.
+    """
+    campos = dict(CAMPOS_PROJECT_DATA)
+    ajustes = os.getenv("CCRON_CAMPOS_PROJECT_DATA")
+    if not ajustes:
+        return campos
+    try:
+        ajustes = json.loads(ajustes)
+    except ValueError as e:
+        raise ValueError(f"CCRON_CAMPOS_PROJECT_DATA não é um JSON válido: {e}") from None
+    if not isinstance(ajustes, dict):
+        raise ValueError("CCRON_CAMPOS_PROJECT_DATA deve ser um objeto JSON {coluna: propriedade}.")
+    for coluna, propriedade in ajustes.items():
+        if propriedade is None:
+            campos.pop(coluna, None)
+        elif isinstance(propriedade, str) and _PROPRIEDADE.fullmatch(propriedade):
+            campos[coluna] = (propriedade, campos.get(coluna, (None, _texto))[1])
+        else:
+            raise ValueError(f"CCRON_CAMPOS_PROJECT_DATA: propriedade inválida para a coluna {coluna!r}: {propriedade!r}.")
+    return campos
+
+
+def converter_tarefa(propriedades: dict[str, str | None],
+                     campos: dict[str, tuple[str, Callable[[str], object]]]) -> dict:
+    """
+    Converte uma tarefa do ProjectData em uma linha no formato do relatório CSV,
+    como a `TransformData.transformar_dados` espera.
+
+    Propriedades ausentes, nulas ou que não puderem ser convertidas viram "nan",
+    assim como as células vazias do CSV.
+
+    Args:
+        propriedades: {propriedade: texto} de uma entrada do feed.
+        campos: Mapeamento das colunas (ver `campos_project_data`).
+    """
+    linha = {}
+    for coluna, (propriedade, converter) in campos.items():
+        valor = propriedades.get(propriedade)
+        if valor is None or not valor.strip():
+            linha[coluna] = VAZIO
+            continue
+        try:
+            linha[coluna] = converter(valor)
+        except (ValueError, TypeError):
+            linha[coluna] = VAZIO
+    return linha
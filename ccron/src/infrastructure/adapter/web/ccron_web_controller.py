@@ -1,19 +1,38 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, logger 
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Header
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
+import json
+import logging
+import requests
+import os
+import secrets
 import traceback
 from ccron.src.domain.ports.conversor_csv_interface import ConversorArquivoCsvInterface
 from ccron.src.infrastructure.adapter.out.conversor_arquivo_csv import ConversorArquivoCsv
 from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+from ccron.src.application.service.perfilador import Perfilador, PerfilEmAndamentoError
+from ccron.src.application.service.portfolio import PortfolioService
+from ccron.src.application.service.historico import HistoricoService, json_valido
 from ccron.src.domain.ports.analise_service_interface import AnaliseServiceInterface
-from ccron.src.infrastructure.adapter.out.integracao_project_adapter import IntegracaoProjectAdapter
+from ccron.src.domain.service.diff_cronogramas import VersaoCronograma
+from ccron.src.infrastructure.adapter.out.integracao_project_adapter import (
+    IntegracaoProjectAdapter, ProjectIdInvalidoError, guid_projeto,
+)
+from ccron.src.infrastructure.adapter.out.cliente_odata import CredenciaisAusentesError
+from ccron.src.infrastructure.adapter.out.historico_analises import HistoricoAnalises
 from ccron.src.domain.ports.integracao_project_adapter import IntegracaoProjectAdapterInterface
 
+logger = logging.getLogger(__name__)
+
 analise_service: AnaliseServiceInterface = AnaliseService()
 conversor: ConversorArquivoCsvInterface = ConversorArquivoCsv()
 project_dados: IntegracaoProjectAdapterInterface = IntegracaoProjectAdapter()
+historico_service = HistoricoService(HistoricoAnalises(), analise_service.versao_referencia())
+portfolio_service = PortfolioService(project_dados, historico=historico_service)
 
 app = FastAPI(
     title="API Conferidor de Cronogramas",
@@ -21,32 +40,410 @@ app = FastAPI(
     version="2.0.0",
 )
 
+@app.exception_handler(CredenciaisAusentesError)
+async def credenciais_ausentes(request, exc: CredenciaisAusentesError):
+    """Rotas que consultam o Project Server sem as credenciais configuradas."""
+    logger.error(str(exc))
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+@app.exception_handler(ProjectIdInvalidoError)
+async def project_id_invalido(request, exc: ProjectIdInvalidoError):
+    """Ids de projeto que não são GUID, em qualquer rota que consulta o Project Server."""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+def resposta_analise(conteudo, status_code: int = 200) -> JSONResponse:
+    """Resposta com o resultado de uma análise; NaN e infinito (ex: `Peso` vazio no CSV) vão como null."""
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(json_valido(conteudo)))
+
+def eh_admin(token: Optional[str]) -> bool:
+    """Valida o token de administrador contra a variável de ambiente CCRON_TOKEN_ADMIN."""
+    token_admin = os.getenv("CCRON_TOKEN_ADMIN")
+    return bool(token_admin and token) and secrets.compare_digest(token, token_admin)
+
 @app.post("/ccron/analise/completa", tags=["Análise"])
-async def analisar_cronograma(file: UploadFile = File(..., description="Relatório exportado do MS Project.")):
+async def analisar_cronograma(
+    file: UploadFile = File(..., description="Relatório exportado do MS Project."),
+    project_id: Optional[str] = Query(None, description="Id do projeto. Quando informado, reaproveita a análise anterior do mesmo projeto."),
+    regras: Optional[str] = Query(None, description="Regras a executar, separadas por vírgula (ex: atrasadas,peso_zero,hiato). Padrão: todas."),
+    secoes: Optional[str] = Query(None, description="Seções da resposta, separadas por vírgula (ex: dados_regras_validacao,tabela_gap). Padrão: todas."),
+    somente_contagens: bool = Query(False, description="Retorna apenas a quantidade de tarefas por regra, sem as listas de IDs."),
+    profile: bool = Query(False, description="Inclui o relatório de perfil de execução em \"perfil\". Apenas administradores."),
+    x_ccron_token: Optional[str] = Header(None, description="Token de administrador, exigido com profile=1."),
+    hiato: Optional[str] = Form(None, description='Configuração de hiatos em JSON, ex: {"dias_uteis": "1111100", "feriados": ["25/12/2025"], "gap_threshold": 5, "limites_servico": {"ALVENARIA": 10}}. Padrão: dias corridos e limite de 5 dias.'),
+):
     """
     Rota principal: recebe um cronograma, executa a análise e validação,
     e retorna um JSON com todos os resultados.
+
+    Com `project_id`, apenas as linhas alteradas desde a última análise do projeto
+    são reprocessadas, e a resposta inclui o resumo em "reaproveitamento". Isso
+    vale para a análise de todas as regras; com `regras` ou `somente_contagens`,
+    a análise é feita do zero.
+
+    `regras` e `secoes` limitam o que é calculado; `somente_contagens` retorna os
+    totais por regra (e, sem `secoes`, apenas a seção "dados_regras_validacao").
+
+    `profile=1` (com o header X-CCron-Token de administrador) inclui em "perfil" o
+    tempo por etapa e por regra, as funções mais custosas e o uso de memória. Só
+    um perfil roda por vez: com outro em andamento, a rota responde 409.
+
+    `hiato` (campo do formulário) define o calendário de trabalho (dias úteis e
+    feriados) e os limites de hiato, geral e por serviço.
     """
     if not file.filename.lower().endswith('.csv'):
         raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas .csv é aceito.")
+    try:
+        opcoes = OpcoesAnalise.de_parametros(regras, secoes, somente_contagens, json.loads(hiato) if hiato else None)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if profile and not eh_admin(x_ccron_token):
+        raise HTTPException(status_code=403, detail="O perfil de execução é restrito a administradores.")
     try:
         conteudo_bytes = await file.read()
         dados_brutos = conversor.csv_de_memoria_para_lista_dict(conteudo_bytes)
         if not dados_brutos:
             raise HTTPException(status_code=400, detail="Arquivo CSV vazio ou mal formatado.")
 
-        resultado_final = analise_service.analisar_cronograma(dados_brutos)
-        conteudo_serializavel = jsonable_encoder(resultado_final)
-        return JSONResponse(status_code=200, content=conteudo_serializavel)
+        # A análise é síncrona e longa: roda no pool de threads para não bloquear o event loop.
+        resultado_final = await run_in_threadpool(
+            analise_service.analisar_cronograma,
+            dados_brutos, project_id=project_id, opcoes=opcoes, perfilador=Perfilador() if profile else None)
+        resposta = resposta_analise(resultado_final)
+        # Só entra no histórico a análise cuja resposta pôde ser montada.
+        if project_id:
+            await run_in_threadpool(historico_service.registrar, project_id, resultado_final, "completa")
+        return resposta
+    except PerfilEmAndamentoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Erro inesperado na rota /analise/completa: {e}", exc_info=True)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erro interno no servidor: {str(e)}")
     
 
+@app.post("/ccron/analise/projeto/{project_id}", tags=["Análise"])
+async def analisar_projeto(
+    project_id: str,
+    regras: Optional[str] = Query(None, description="Regras a executar, separadas por vírgula (ex: atrasadas,peso_zero,hiato). Padrão: todas."),
+    secoes: Optional[str] = Query(None, description="Seções da resposta, separadas por vírgula (ex: dados_regras_validacao,tabela_gap). Padrão: todas."),
+    somente_contagens: bool = Query(False, description="Retorna apenas a quantidade de tarefas por regra, sem as listas de IDs."),
+    profile: bool = Query(False, description="Inclui o relatório de perfil de execução em \"perfil\". Apenas administradores."),
+    x_ccron_token: Optional[str] = Header(None, description="Token de administrador, exigido com profile=1."),
+    hiato: Optional[str] = Form(None, description='Configuração de hiatos em JSON, como em /ccron/analise/completa.'),
+):
+    """
+    Analisa o cronograma direto do Project Server, sem exportar e enviar o CSV.
+
+    As tarefas do projeto são lidas do ProjectData (apenas as colunas usadas pela
+    análise) e passam pelo mesmo pipeline de /ccron/analise/completa, com os
+    mesmos parâmetros. A análise anterior do projeto é reaproveitada, como com
+    `project_id` naquela rota.
+    """
+    try:
+        guid_projeto(project_id)
+    except ProjectIdInvalidoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        opcoes = OpcoesAnalise.de_parametros(regras, secoes, somente_contagens, json.loads(hiato) if hiato else None)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if profile and not eh_admin(x_ccron_token):
+        raise HTTPException(status_code=403, detail="O perfil de execução é restrito a administradores.")
+    try:
+        dados_brutos = await run_in_threadpool(project_dados.pegar_tarefas_para_analise, project_id)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar o Project Server: {str(e)}")
+    if not dados_brutos:
+        raise HTTPException(status_code=404, detail=f"Nenhuma tarefa encontrada para o projeto {project_id}.")
+    try:
+        resultado_final = await run_in_threadpool(
+            analise_service.analisar_cronograma,
+            dados_brutos, project_id=project_id, opcoes=opcoes, perfilador=Perfilador() if profile else None)
+        resposta = resposta_analise(resultado_final)
+        await run_in_threadpool(historico_service.registrar, project_id, resultado_final, "projeto")
+        return resposta
+    except PerfilEmAndamentoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro inesperado na rota /analise/projeto: {e}", exc_info=True)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro interno no servidor: {str(e)}")
+
+
+@app.post("/ccron/analise/rede", tags=["Análise"])
+async def analisar_rede(
+    file: UploadFile = File(..., description="Relatório exportado do MS Project."),
+):
+    """
+    Analisa a rede de predecessoras das tarefas ativas: ciclos, referências a
+    tarefas inexistentes, tarefas sem vínculos e o caminho crítico (CPM), com as
+    datas cedo/tarde e a folga total de cada tarefa, em dias a partir do início.
+
+    Equivale a /ccron/analise/completa com secoes=rede.
+    """
+    if not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas .csv é aceito.")
+    try:
+        conteudo_bytes = await file.read()
+        dados_brutos = conversor.csv_de_memoria_para_lista_dict(conteudo_bytes)
+        if not dados_brutos:
+            raise HTTPException(status_code=400, detail="Arquivo CSV vazio ou mal formatado.")
+
+        resultado = await run_in_threadpool(
+            analise_service.analisar_cronograma, dados_brutos, opcoes=OpcoesAnalise.de_parametros(secoes="rede"))
+        return resposta_analise(resultado["rede"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro inesperado na rota /analise/rede: {e}", exc_info=True)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro interno no servidor: {str(e)}")
+
+
+@app.post("/ccron/analise/simulacao", tags=["Análise"])
+async def simular_atrasos(
+    file: UploadFile = File(..., description="Relatório exportado do MS Project."),
+    atrasos: str = Form(..., description='Atrasos em dias por Id de tarefa, em JSON. Ex: {"120": 10, "245": 3}.'),
+    hiato: Optional[str] = Form(None, description='Calendário e limites de hiato, no mesmo formato de /ccron/analise/completa.'),
+):
+    """
+    Simulação "e se": atrasa as tarefas informadas e propaga as novas datas pelas
+    predecessoras (com tipo de vínculo e latência).
+
+    Retorna as tarefas que se movem, com as datas antigas e novas, os serviços e
+    pavimentos afetados e as sobreposições e hiatos que passariam a ser apontados
+    (ou deixariam de ser). Com `hiato.dias_uteis`, os atrasos contam dias úteis.
+    """
+    if not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas .csv é aceito.")
+    try:
+        atrasos_dict = json.loads(atrasos)
+        if not isinstance(atrasos_dict, dict) or not atrasos_dict:
+            raise ValueError('Informe os atrasos como um objeto JSON {"Id": dias}.')
+        opcoes = OpcoesAnalise.de_parametros(hiato=json.loads(hiato) if hiato else None)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        conteudo_bytes = await file.read()
+        dados_brutos = conversor.csv_de_memoria_para_lista_dict(conteudo_bytes)
+        if not dados_brutos:
+            raise HTTPException(status_code=400, detail="Arquivo CSV vazio ou mal formatado.")
+
+        resultado = await run_in_threadpool(analise_service.simular_atrasos, dados_brutos, atrasos_dict, opcoes)
+        return resposta_analise(resultado)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro inesperado na rota /analise/simulacao: {e}", exc_info=True)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro interno no servidor: {str(e)}")
+
+
+async def _versao_para_diff(nome: str, arquivo: Optional[UploadFile], analise: Optional[str],
+                            opcoes: OpcoesAnalise) -> VersaoCronograma:
+    """Versão do cronograma a partir do CSV enviado ou de uma análise guardada ("execucao_id/project_id")."""
+    if (arquivo is None) == (analise is None):
+        raise HTTPException(status_code=400, detail=f"Informe a versão {nome} como arquivo ou como análise guardada, não ambos.")
+    if analise is not None:
+        execucao_id, _, project_id = analise.strip().partition("/")
+        if not execucao_id or not project_id:
+            raise HTTPException(status_code=400, detail=f"Análise {nome} inválida. Use o formato execucao_id/project_id.")
+        resultado = await run_in_threadpool(portfolio_service.registro.resultado, execucao_id, project_id)
+        if resultado is None:
+            raise HTTPException(status_code=404, detail=f"Análise {nome} não encontrada: {analise}.")
+        return VersaoCronograma.de_resultado(resultado)
+
+    if not arquivo.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas .csv é aceito.")
+    dados_brutos = conversor.csv_de_memoria_para_lista_dict(await arquivo.read())
+    if not dados_brutos:
+        raise HTTPException(status_code=400, detail=f"Arquivo CSV da versão {nome} vazio ou mal formatado.")
+    # A análise da versão é tão longa quanto a completa: fora do event loop.
+    return await run_in_threadpool(analise_service.versao_cronograma, dados_brutos, opcoes)
+
+
+@app.post("/ccron/analise/diff", tags=["Análise"])
+async def comparar_cronogramas(
+    anterior: Optional[UploadFile] = File(None, description="Relatório da versão anterior."),
+    atual: Optional[UploadFile] = File(None, description="Relatório da versão atual."),
+    analise_anterior: Optional[str] = Form(None, description="Versão anterior guardada no portfólio, como execucao_id/project_id."),
+    analise_atual: Optional[str] = Form(None, description="Versão atual guardada no portfólio, como execucao_id/project_id."),
+    regras: Optional[str] = Query(None, description="Regras a comparar, separadas por vírgula. Padrão: todas."),
+    hiato: Optional[str] = Form(None, description='Configuração de hiatos em JSON, como em /ccron/analise/completa.'),
+):
+    """
+    Compara duas versões de um cronograma: tarefas incluídas e excluídas, datas
+    deslocadas, mudanças de duração, de recursos e de predecessoras, e os
+    apontamentos de regras novos e resolvidos.
+
+    Cada versão vem de um CSV (`anterior`, `atual`) ou de uma análise guardada
+    do portfólio (`analise_anterior`, `analise_atual`). As tarefas são juntadas
+    pelo `Id` e, quando o cronograma foi renumerado, por `ID_` + `Servicos`.
+    As análises guardadas trazem apenas as tarefas ativas; nesse caso as
+    inativas também ficam fora da comparação.
+    """
+    try:
+        opcoes = OpcoesAnalise.de_parametros(regras, hiato=json.loads(hiato) if hiato else None)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        versao_anterior = await _versao_para_diff("anterior", anterior, analise_anterior, opcoes)
+        versao_atual = await _versao_para_diff("atual", atual, analise_atual, opcoes)
+        resultado = await run_in_threadpool(analise_service.comparar_cronogramas, versao_anterior, versao_atual)
+        return resposta_analise(resultado)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro inesperado na rota /analise/diff: {e}", exc_info=True)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro interno no servidor: {str(e)}")
+
+
+def _com_links(resumo: dict) -> dict:
+    """Acrescenta ao resumo do portfólio os links para o andamento e para os resultados completos."""
+    execucao_id = resumo["execucao_id"]
+    resumo["andamento"] = f"/ccron/portfolio/{execucao_id}"
+    for project_id, projeto in resumo["projetos"].items():
+        if projeto.get("estado") == "concluido":
+            projeto["resultado"] = f"/ccron/portfolio/{execucao_id}/projetos/{project_id}"
+    return resumo
+
+
+@app.post("/ccron/portfolio", tags=["Portfólio"], status_code=202)
+async def iniciar_portfolio(
+    projetos: str = Form(..., description='Ids dos projetos, em uma lista JSON (["id1", "id2"]) ou separados por vírgula.'),
+    regras: Optional[str] = Query(None, description="Regras a executar, separadas por vírgula. Padrão: todas."),
+    hiato: Optional[str] = Form(None, description='Configuração de hiatos em JSON, como em /ccron/analise/completa.'),
+):
+    """
+    Analisa vários projetos do Project Server em segundo plano (ex: a verificação
+    noturna de todas as obras ativas).
+
+    As tarefas são buscadas em paralelo, com limite de consultas simultâneas, e
+    as análises rodam em um pool de processos. Retorna imediatamente o
+    `execucao_id`; o andamento e o resumo por projeto (apontamentos por regra,
+    sobreposições, hiatos e erros do macrofluxo) ficam em `andamento`, com o
+    link para o resultado completo de cada projeto concluído.
+    """
+    try:
+        lista = json.loads(projetos) if projetos.strip().startswith("[") else projetos.split(",")
+        if not isinstance(lista, list):
+            raise ValueError("Informe os projetos como uma lista.")
+        lista = [guid_projeto(str(project_id).strip()) for project_id in lista if str(project_id).strip()]
+        if not lista:
+            raise ValueError("Informe ao menos um projeto.")
+        opcoes = OpcoesAnalise.de_parametros(regras, hiato=json.loads(hiato) if hiato else None)
+        resumo = await run_in_threadpool(portfolio_service.iniciar, lista, opcoes)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(status_code=202, content=jsonable_encoder(_com_links(resumo)))
+
+
+@app.get("/ccron/portfolio/{execucao_id}", tags=["Portfólio"])
+async def andamento_portfolio(execucao_id: str):
+    """Estado de uma execução de portfólio e o resumo de cada projeto já analisado."""
+    resumo = await run_in_threadpool(portfolio_service.registro.resumo, execucao_id)
+    if resumo is None:
+        raise HTTPException(status_code=404, detail="Execução de portfólio não encontrada.")
+    return JSONResponse(status_code=200, content=jsonable_encoder(_com_links(resumo)))
+
+
+@app.get("/ccron/portfolio/{execucao_id}/projetos/{project_id}", tags=["Portfólio"])
+async def resultado_portfolio(execucao_id: str, project_id: str):
+    """Resultado completo da análise de um projeto em uma execução de portfólio."""
+    resultado = await run_in_threadpool(portfolio_service.registro.resultado, execucao_id, project_id)
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Resultado não encontrado para este projeto nesta execução.")
+    return JSONResponse(status_code=200, content=jsonable_encoder(resultado))
+
+
+@app.post("/ccron/projeto/{project_id}/sincronizar", tags=["Portfólio"])
+async def sincronizar_projeto(project_id: str):
+    """
+    Atualiza a cópia local das tarefas do projeto com as mudanças do ProjectData
+    (tarefas alteradas desde a última sincronização e tarefas excluídas).
+    As análises por `project_id` leem essa cópia.
+    """
+    try:
+        resumo = await run_in_threadpool(project_dados.sincronizar_projeto, project_id)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar o Project Server: {str(e)}")
+    return JSONResponse(status_code=200, content=jsonable_encoder(resumo))
+
+
+@app.get("/ccron/historico/{project_id}", tags=["Histórico"])
+async def listar_historico(
+    project_id: str,
+    desde: Optional[str] = Query(None, description="Data/hora ISO inicial (ex: 2025-01-01)."),
+    ate: Optional[str] = Query(None, description="Data/hora ISO final; uma data inclui o dia inteiro."),
+    limite: int = Query(100, ge=1, le=5000, description="Quantidade máxima de análises (as mais recentes)."),
+):
+    """
+    Análises do projeto guardadas no histórico, da mais antiga para a mais
+    recente, com os totais do resumo de cada uma.
+
+    Toda análise com `project_id` (/ccron/analise/completa, /ccron/analise/projeto
+    e o portfólio) entra no histórico.
+    """
+    analises = await run_in_threadpool(historico_service.listar, project_id, desde, ate, limite)
+    return JSONResponse(status_code=200, content=jsonable_encoder({"project_id": project_id, "analises": analises}))
+
+
+@app.get("/ccron/historico/{project_id}/tendencia", tags=["Histórico"])
+async def tendencia_historico(
+    project_id: str,
+    regras: Optional[str] = Query(None, description="Regras a incluir, separadas por vírgula (ex: atrasadas,hiato). Padrão: todas."),
+    desde: Optional[str] = Query(None, description="Data/hora ISO inicial (ex: 2025-01-01)."),
+    ate: Optional[str] = Query(None, description="Data/hora ISO final; uma data inclui o dia inteiro."),
+    limite: int = Query(100, ge=1, le=5000, description="Quantidade máxima de análises (as mais recentes)."),
+):
+    """
+    Evolução do projeto ao longo das análises guardadas: totais de apontamentos,
+    sobreposições, hiatos e erros do macrofluxo, e a quantidade de tarefas por
+    regra, com a variação entre a primeira e a última análise do período.
+    Nada é recalculado.
+    """
+    try:
+        tendencia = await run_in_threadpool(historico_service.tendencia, project_id, regras, desde, ate, limite)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(status_code=200, content=jsonable_encoder(tendencia))
+
+
+@app.get("/ccron/historico/{project_id}/comparar", tags=["Histórico"])
+async def comparar_historico(
+    project_id: str,
+    de: Optional[int] = Query(None, description="analise_id de referência. Padrão: a análise anterior a `para`."),
+    para: Optional[int] = Query(None, description="analise_id comparado. Padrão: a análise mais recente."),
+):
+    """
+    Compara duas análises guardadas do projeto (por padrão, as duas últimas):
+    totais, quantidade de tarefas por regra e erros do macrofluxo por tipo.
+    `mesma_referencia` indica se as bases de referência eram as mesmas.
+    """
+    comparacao = await run_in_threadpool(historico_service.comparar, project_id, de, para)
+    if comparacao is None:
+        raise HTTPException(status_code=404, detail="Análises não encontradas no histórico deste projeto.")
+    return JSONResponse(status_code=200, content=jsonable_encoder(comparacao))
+
+
+@app.get("/ccron/historico/{project_id}/analises/{analise_id}/resultado", tags=["Histórico"])
+async def resultado_historico(project_id: str, analise_id: int):
+    """
+    Resultado completo de uma análise do histórico. Só é guardado com
+    CCRON_HISTORICO_RESULTADOS=1.
+    """
+    resultado = await run_in_threadpool(historico_service.resultado, project_id, analise_id)
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Resultado completo não guardado para esta análise.")
+    return JSONResponse(status_code=200, content=jsonable_encoder(resultado))
+
+
 @app.get("/ccron/dados")
 async def pegar_tarefas(id: Optional[str] = "82dd99e7-67f6-ee11-8174-00155d806241"):
-    dicionario, total = project_dados.pegar_projeto_mrv(id)
+    dicionario, total = await run_in_threadpool(project_dados.pegar_projeto_mrv, id)
     return {
         "total_tarefas": total,
         "tarefas": dicionario  # Retornará no formato {"id": "nome", "id2": "nome2"}
@@ -54,10 +451,10 @@ async def pegar_tarefas(id: Optional[str] = "82dd99e7-67f6-ee11-8174-00155d80624
 
 @app.get("/ccron/dump-dados")
 async def dump_dados(id: Optional[str] = "82dd99e7-67f6-ee11-8174-00155d806241"):
-    dados = project_dados.buscar_dados_brutos_projeto(id)
+    dados = await run_in_threadpool(project_dados.buscar_dados_brutos_projeto, id)
     return dados
 
 @app.get("/ccron/dados-data")
 async def dump_dados(id: Optional[str] = "82dd99e7-67f6-ee11-8174-00155d806241"):
-    dados = project_dados.pegar_tarefas_project_data(id)
+    dados = await run_in_threadpool(project_dados.pegar_tarefas_project_data, id)
     return dados
\ No newline at end of file
@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# Os módulos são importados como `ccron.src...`, a partir da raiz do repositório.
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.infrastructure.adapter.out.conversor_arquivo_csv import ConversorArquivoCsv
+
+
+def gerar_dados(linhas: int = 1500, semente: int = 1, **opcoes) -> list[dict]:
+    """Cronograma sintético lido do CSV, como chega às rotas de análise."""
+    gerador = GeradorCronograma(semente=semente, inicio=date.today() - timedelta(days=180), **opcoes)
+    return ConversorArquivoCsv().csv_de_memoria_para_lista_dict(para_csv(gerador.gerar(linhas)))
+
+
+def normalizar(valor):
+    """Resultado comparável: listas ordenadas (algumas regras devolvem conjuntos) e NaN como texto."""
+    if isinstance(valor, dict):
+        return {chave: normalizar(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        itens = [normalizar(item) for item in valor]
+        return sorted(itens, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    if isinstance(valor, float) and valor != valor:
+        return "NaN"
+    return valor
+
+
+@pytest.fixture(scope="session")
+def dados_cronograma() -> list[dict]:
+    return gerar_dados()
+
+
+@pytest.fixture
+def analise_service() -> AnaliseService:
+    return AnaliseService()
+
+
+@pytest.fixture(scope="session")
+def controller(tmp_path_factory):
+    """O módulo da API, com o histórico em um banco temporário."""
+    os.environ["CCRON_HISTORICO_DB"] = str(tmp_path_factory.mktemp("historico") / "historico.db")
+    from ccron.src.infrastructure.adapter.web import ccron_web_controller
+    return ccron_web_controller
+
+
+@pytest.fixture
+def cliente(controller):
+    from fastapi.testclient import TestClient
+    return TestClient(controller.app, raise_server_exceptions=False)
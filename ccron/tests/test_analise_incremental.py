@@ -0,0 +1,159 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import gerar_dados, normalizar
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+
+
+def _sem_reaproveitamento(resultado: dict) -> dict:
+    resultado = dict(resultado)
+    resultado.pop("reaproveitamento", None)
+    return normalizar(resultado)
+
+
+def _posicao(dados: list[dict], nome: str) -> int:
+    return next(p for p, tarefa in enumerate(dados) if tarefa["Nome"] == nome)
+
+
+def _topico(dados: list[dict], numero: str) -> int:
+    return next(p for p, tarefa in enumerate(dados) if tarefa["Número_da_estrutura_de_tópicos"] == numero)
+
+
+def _alterar(dados: list[dict], alteracoes: list[tuple[int, str, object]]) -> list[dict]:
+    dados = copy.deepcopy(dados)
+    for posicao, coluna, valor in alteracoes:
+        dados[posicao][coluna] = valor
+    return dados
+
+
+def _editar_linha_de_bloco(dados):
+    posicao = _topico(dados, "1.2.3") + 12
+    return _alterar(dados, [(posicao, "Término", "30/12/2030"), (posicao, "Peso", 7)])
+
+
+def _editar_asc(dados):
+    # Serviço do Bloco ASC (1.1.1) sem Módulo ASC; o "MÓDULO 02" que exige o campo está em outra subárvore.
+    posicao = _topico(dados, "1.1.1.1.1") + 1
+    return _alterar(dados, [(posicao, "MÓDULO_ASC", None), (posicao + 1, "Agrupamento", "Servico")])
+
+
+def _renomear_modulo_02(dados):
+    return _alterar(dados, [(_topico(dados, "1.3"), "Nome", "MÓDULO 2B")])
+
+
+def _mover_pre_projeto(dados):
+    # O Pré-Projeto passa a ser o primeiro tópico com esse nome, em outra subárvore.
+    return _alterar(dados, [(_topico(dados, "1.2"), "Nome", "Pré Projeto - PP")])
+
+
+def _pre_projeto_na_raiz(dados):
+    # Com o Pré-Projeto na raiz, a subárvore dele cobre todas as outras: editar um
+    # bloco exige o contexto de fora da subárvore alterada.
+    dados = _alterar(dados, [(_topico(dados, "1"), "Nome", "Pré Projeto - PP")])
+    return dados, _editar_linha_de_bloco(dados)
+
+
+def _remover_e_inserir(dados):
+    dados = copy.deepcopy(dados)
+    removida = dados.pop(_topico(dados, "1.2.2") + 20)
+    dados.insert(_topico(dados, "1.3.1") + 3, dict(removida, Id=len(dados) + 100))
+    return dados
+
+
+@pytest.mark.parametrize("editar", [
+    _editar_linha_de_bloco, _editar_asc, _renomear_modulo_02, _mover_pre_projeto, _remover_e_inserir,
+])
+def test_incremental_igual_a_analise_completa(dados_cronograma, editar):
+    servico = AnaliseService()
+    servico.analisar_cronograma(copy.deepcopy(dados_cronograma), project_id="obra")
+    editados = editar(dados_cronograma)
+
+    incremental = servico.analisar_cronograma(copy.deepcopy(editados), project_id="obra")
+    completa = AnaliseService().analisar_cronograma(copy.deepcopy(editados))
+
+    assert _sem_reaproveitamento(incremental) == _sem_reaproveitamento(completa)
+
+
+def test_incremental_com_contexto_fora_da_subarvore_alterada(dados_cronograma):
+    original, editados = _pre_projeto_na_raiz(dados_cronograma)
+    servico = AnaliseService()
+    servico.analisar_cronograma(copy.deepcopy(original), project_id="obra")
+
+    incremental = servico.analisar_cronograma(copy.deepcopy(editados), project_id="obra")
+    completa = AnaliseService().analisar_cronograma(copy.deepcopy(editados))
+
+    assert incremental["reaproveitamento"]["estrutura"]["subarvores"]["recalculadas"] == 1
+    assert _sem_reaproveitamento(incremental) == _sem_reaproveitamento(completa)
+
+
+def test_reaproveita_por_subarvore_grupo_e_linha(dados_cronograma):
+    servico = AnaliseService()
+    primeira = servico.analisar_cronograma(copy.deepcopy(dados_cronograma), project_id="obra")
+    assert primeira["reaproveitamento"]["estrutura"]["subarvores"]["reaproveitadas"] == 0
+
+    segunda = servico.analisar_cronograma(_editar_linha_de_bloco(dados_cronograma), project_id="obra")
+    estrutura = segunda["reaproveitamento"]["estrutura"]
+    assert estrutura["subarvores"]["recalculadas"] == 1
+    assert estrutura["subarvores"]["reaproveitadas"] > 1
+    assert estrutura["grupos_peso"]["recalculados"] == 1
+    assert estrutura["linhas_preenchimento"]["recalculadas"] == 1
+    assert segunda["reaproveitamento"]["regras_linha"]["recalculadas"] == 1
+    assert segunda["reaproveitamento"]["macrofluxo_reaproveitado"] is False
+
+    terceira = servico.analisar_cronograma(_editar_linha_de_bloco(dados_cronograma), project_id="obra")
+    estrutura = terceira["reaproveitamento"]["estrutura"]
+    assert estrutura["subarvores"]["recalculadas"] == 0
+    assert estrutura["grupos_peso"]["recalculados"] == 0
+    assert terceira["reaproveitamento"]["macrofluxo_reaproveitado"] is True
+
+
+def test_mudanca_de_contexto_recalcula_todas_as_subarvores(dados_cronograma):
+    servico = AnaliseService()
+    servico.analisar_cronograma(copy.deepcopy(dados_cronograma), project_id="obra")
+    resultado = servico.analisar_cronograma(_renomear_modulo_02(dados_cronograma), project_id="obra")
+    assert resultado["reaproveitamento"]["estrutura"]["subarvores"]["reaproveitadas"] == 0
+
+
+@pytest.mark.parametrize("opcoes", [
+    OpcoesAnalise(somente_contagens=True),
+    OpcoesAnalise(regras=frozenset({"atrasadas"})),
+    OpcoesAnalise(secoes=frozenset({"macrofluxo"})),
+], ids=["contagens", "uma_regra", "uma_secao"])
+def test_selecao_menor_nao_passa_pelo_incremental(dados_cronograma, opcoes, monkeypatch):
+    servico = AnaliseService()
+    servico.analisar_cronograma(copy.deepcopy(dados_cronograma), project_id="obra")
+    guardado = servico.cache_analises.obter("obra")
+
+    def nao_chamar(*args, **kwargs):
+        raise AssertionError("a seleção menor não deveria recalcular o snapshot")
+
+    for metodo in ("_servicos_simultaneos_incremental", "_regras_estrutura_incremental", "_regras_linha_incremental"):
+        monkeypatch.setattr(servico, metodo, nao_chamar)
+    resultado = servico.analisar_cronograma(_editar_linha_de_bloco(dados_cronograma), project_id="obra", opcoes=opcoes)
+    esperado = AnaliseService().analisar_cronograma(_editar_linha_de_bloco(dados_cronograma), opcoes=opcoes)
+    assert normalizar(resultado) == normalizar(esperado)
+    assert servico.cache_analises.obter("obra") is guardado
+
+
+def test_analises_simultaneas_nao_compartilham_estado():
+    servico = AnaliseService()
+    cronogramas = [gerar_dados(900, semente=semente) for semente in (1, 2, 3)]
+    esperados = [normalizar(AnaliseService().analisar_cronograma(copy.deepcopy(dados))) for dados in cronogramas]
+
+    def analisar(indice: int):
+        dados = copy.deepcopy(cronogramas[indice % 3])
+        return indice % 3, normalizar(servico.analisar_cronograma(dados))
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        for indice, resultado in executor.map(analisar, range(12)):
+            assert resultado == esperados[indice]
+
+
+def test_versao_cronograma_usa_a_propria_analise(dados_cronograma):
+    servico = AnaliseService()
+    versao = servico.versao_cronograma(copy.deepcopy(dados_cronograma))
+    servico.analisar_cronograma(gerar_dados(900, semente=2))
+    assert len(versao.tarefas) == len(AnaliseService().versao_cronograma(copy.deepcopy(dados_cronograma)).tarefas)
@@ -0,0 +1,62 @@
+import pytest
+
+from ccron.src.application.transform.transform_data import TransformData
+from ccron.src.domain.service.arvore_estrutura import ArvoreEstrutura
+from ccron.src.domain.service.regras_validacao import cortar_estrutura
+
+NUMEROS = ["1", "1.1", "1.1.1", "1.1.1.1", "1.2", "1.10", "1.10.1", "1.2.1", "x", None, "1.1.2"]
+
+
+@pytest.fixture
+def arvore() -> ArvoreEstrutura:
+    return ArvoreEstrutura([{"Id": i, "Número_da_estrutura_de_tópicos": n} for i, n in enumerate(NUMEROS)])
+
+
+def _ids(tarefas):
+    return [tarefa["Id"] for tarefa in tarefas]
+
+
+@pytest.mark.parametrize("numero, esperado", [
+    ("1.2.3", (1, 2, 3)), (" 1.02 ", (1, 2)), ("1", (1,)), ("1..2", None), ("1.a", None), ("", None), (None, None),
+])
+def test_converter_numero(numero, esperado):
+    assert ArvoreEstrutura.converter_numero(numero) == esperado
+
+
+def test_subarvore_na_ordem_do_cronograma(arvore):
+    assert _ids(arvore.subarvore("1.1")) == [1, 2, 3, 10]
+    assert _ids(arvore.subarvore((1, 1), incluir_raiz=False)) == [2, 3, 10]
+    # 1.10 não faz parte da subárvore de 1.1, como faria num teste de prefixo de string.
+    assert _ids(arvore.subarvore("1.10")) == [5, 6]
+    assert arvore.posicoes_subarvore("1.9") == []
+
+
+def test_subarvore_igual_a_varredura(arvore):
+    for prefixo in {c for c in arvore.chaves_por_posicao if c}:
+        esperado = [p for p, c in enumerate(arvore.chaves_por_posicao) if c and c[:len(prefixo)] == prefixo]
+        assert arvore.posicoes_subarvore(prefixo) == esperado
+
+
+def test_buscar_pai_e_filhos(arvore):
+    assert arvore.buscar("1.2.1")["Id"] == 7
+    assert arvore.buscar("1.3") is None
+    assert arvore.pai("1.1.1")["Id"] == 1
+    assert arvore.pai("1") is None
+    assert _ids(arvore.filhos("1")) == [1, 4, 5]
+    assert _ids(arvore.filhos("1.1")) == [2, 10]
+
+
+def test_posicoes_nas_subarvores(arvore):
+    assert arvore.posicoes_nas_subarvores([((1, 1), False), ((1, 2), True), (None, True)]) == {2, 3, 10, 4, 7}
+
+
+@pytest.mark.parametrize("numero, esperado", [("1.2.3", "12"), ("1.11", "1"), ("1", ""), (None, ""), ("1.a.3", "1a")])
+def test_cortar_estrutura(numero, esperado):
+    assert cortar_estrutura(numero) == esperado
+
+
+@pytest.mark.parametrize("numero, modulo_asc, esperado", [
+    ("1.2.3", None, "M.02"), ("1.02", "", "M.02"), ("1.002", None, "M.002"), ("1", None, None), ("1.5", "3", "M.03"),
+])
+def test_get_modulo(numero, modulo_asc, esperado):
+    assert TransformData.get_modulo(None, numero, modulo_asc) == esperado
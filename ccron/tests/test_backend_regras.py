@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import gerar_dados, normalizar
+from ccron.src.application.service.backend_regras import MotorRegrasConferencia, criar_backend_regras
+from ccron.src.application.transform.transform_data import TransformData
+from ccron.src.domain.service.motor_regras import REGRAS_LINHA, MotorRegras
+from ccron.src.domain.service.motor_regras_numpy import MotorRegrasNumpy, RegrasValidacaoNumpy
+from ccron.src.domain.service.motor_regras_paralelo import MotorRegrasParalelo
+from ccron.src.domain.service.regras_validacao import RegrasValidacao
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+
+HOJE = datetime.today()
+
+
+@pytest.fixture(scope="module")
+def transform_data() -> TransformData:
+    return TransformData()
+
+
+@pytest.fixture(scope="module", params=[(1, 0.05), (2, 0.3), (3, 0.8)], ids=lambda p: f"semente{p[0]}-violacoes{p[1]}")
+def tratados(request, transform_data) -> list[dict]:
+    semente, taxa = request.param
+    return transform_data.transformar_dados(gerar_dados(1200, semente=semente, taxa_violacoes=taxa))
+
+
+@pytest.mark.parametrize("colunar", [False, True], ids=["dicts", "tabela"])
+def test_numpy_igual_ao_motor_por_linha(tratados, colunar):
+    dados = TabelaTarefas.de_dicts(tratados) if colunar else tratados
+    esperado = MotorRegras().avaliar(tratados, HOJE)
+    assert MotorRegrasNumpy().avaliar(dados, HOJE) == esperado
+    assert MotorRegrasNumpy().contar(dados, HOJE) == {chave: len(ids) for chave, ids in esperado.items()}
+
+
+def test_numpy_igual_ao_motor_por_linha_com_regras_selecionadas(tratados):
+    regras = ["custo_zero", "peso_zero", "trabalho_incorreto", "atrasadas"]
+    assert MotorRegrasNumpy().avaliar(tratados, HOJE, regras) == MotorRegras().avaliar(tratados, HOJE, regras)
+
+
+@pytest.fixture(scope="module")
+def motor_paralelo():
+    motor = MotorRegrasParalelo(processos=2, min_linhas=0)
+    yield motor
+    motor._descartar_pool()
+
+
+def test_paralelo_igual_ao_motor_por_linha(tratados, motor_paralelo):
+    esperado = MotorRegras().avaliar(tratados, HOJE)
+    assert motor_paralelo.avaliar(tratados, HOJE) == esperado
+    assert motor_paralelo.contar(tratados, HOJE) == {chave: len(ids) for chave, ids in esperado.items()}
+
+
+def test_paralelo_avalia_localmente_fatias_nao_serializaveis(tratados, motor_paralelo, caplog):
+    # Um valor que não passa pelo pickle não pode derrubar a análise.
+    dados = [dict(item) for item in tratados]
+    dados[0]["Custo"] = (lambda: None)
+    esperado = MotorRegras().avaliar(dados, HOJE)
+    with caplog.at_level(logging.WARNING, logger="ccron.src.domain.service.motor_regras_paralelo"):
+        assert motor_paralelo.avaliar(dados, HOJE) == esperado
+    assert "não serializável" in caplog.text
+    assert motor_paralelo.avaliar(tratados, HOJE) == MotorRegras().avaliar(tratados, HOJE)
+
+
+def test_validar_peso_numpy_igual_ao_por_linha(tratados):
+    # Normalizado para comparar os somatórios NaN (pesos vazios) entre si.
+    assert normalizar(RegrasValidacaoNumpy().validar_peso(tratados)) == normalizar(RegrasValidacao().validar_peso(tratados))
+
+
+def test_escalares_numpy_sao_numericos():
+    linhas = [
+        {"Id": 1, "Ativo": "Sim", "Resumo": "Não", "Custo": np.int64(0), "Duração": np.float32(25.0), "Peso": np.int32(0),
+         "Nome": "Alvenaria", "Trabalho": np.int64(200), "Nomes_dos_recursos": "Pedreiro", "Predecessoras": "2"},
+        {"Id": 2, "Ativo": "Sim", "Resumo": "Não", "Custo": True, "Duração": 0, "Peso": 1.5,
+         "Nome": "Reboco", "Trabalho": 0, "Nomes_dos_recursos": "Pedreiro", "Predecessoras": "1"},
+    ]
+    esperado = MotorRegras().avaliar(linhas, HOJE)
+    assert MotorRegrasNumpy().avaliar(linhas, HOJE) == esperado
+    chaves = {regra.nome: regra.chave for regra in REGRAS_LINHA}
+    assert esperado[chaves["custo_zero"]] == [1]
+    assert esperado[chaves["duracao_maior_21_dias"]] == [1]
+
+
+def test_conferencia_registra_divergencias_no_log(tratados, caplog):
+    class MotorDivergente(MotorRegras):
+        def avaliar(self, dados, hoje, regras=None):
+            resultado = super().avaliar(dados, hoje, regras)
+            chave = next(iter(resultado))
+            resultado[chave] = resultado[chave] + [-1]
+            return resultado
+
+    motor = MotorRegrasConferencia(MotorRegras(), MotorDivergente())
+    with caplog.at_level(logging.WARNING, logger="ccron.src.application.service.backend_regras"):
+        resultado = motor.avaliar(tratados, HOJE)
+    assert resultado == MotorRegras().avaliar(tratados, HOJE)
+    assert len(motor.divergencias) == 1
+    assert "Divergência no backend de regras" in caplog.text
+
+
+def test_criar_backend_regras_rejeita_backend_desconhecido():
+    with pytest.raises(ValueError):
+        criar_backend_regras("fortran")
+    regras, motor = criar_backend_regras("numpy")
+    assert isinstance(regras, RegrasValidacaoNumpy) and isinstance(motor, MotorRegrasNumpy)
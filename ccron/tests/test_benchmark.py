@@ -0,0 +1,16 @@
+import copy
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from ccron.benchmarks.benchmark import _serializar
+
+
+def test_gerador_nao_produz_nan(analise_service, dados_cronograma):
+    resultado = analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma))
+    json.dumps(jsonable_encoder(resultado), allow_nan=False)
+
+
+def test_serializacao_como_na_rota():
+    corpo = _serializar({"dados_ativos": [{"Id": 1, "Peso": float("nan"), "Custo": float("inf")}]})
+    assert json.loads(corpo) == {"dados_ativos": [{"Id": 1, "Peso": None, "Custo": None}]}
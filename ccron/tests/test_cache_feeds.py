@@ -0,0 +1,62 @@
+import json
+import os
+
+from ccron.src.infrastructure.adapter.out.cache_feeds import CacheFeeds, PaginaEmCache
+
+
+def _arquivos(diretorio) -> list[str]:
+    return sorted(os.listdir(os.path.join(diretorio, "paginas")))
+
+
+def test_paginas_sobrevivem_a_reinicio_sem_pickle(tmp_path):
+    CacheFeeds(diretorio=str(tmp_path)).guardar_pagina("https://p/Tasks", "application/xml", PaginaEmCache(b"<feed/>", '"v1"', "ontem"))
+
+    arquivos = _arquivos(tmp_path)
+    assert [os.path.splitext(nome)[1] for nome in arquivos] == [".bin", ".json"]
+    with open(os.path.join(tmp_path, "paginas", arquivos[1]), encoding="utf-8") as arquivo:
+        assert json.load(arquivo)["chave"] == ["https://p/Tasks", "application/xml"]
+
+    pagina = CacheFeeds(diretorio=str(tmp_path)).pagina("https://p/Tasks", "application/xml")
+    assert pagina == PaginaEmCache(b"<feed/>", '"v1"', "ontem")
+    assert CacheFeeds(diretorio=str(tmp_path)).pagina("https://p/Tasks", None) is None
+
+
+def test_pagina_corrompida_e_ignorada(tmp_path):
+    CacheFeeds(diretorio=str(tmp_path)).guardar_pagina("https://p/Tasks", None, PaginaEmCache(b"<feed/>", '"v1"'))
+    binario = next(nome for nome in _arquivos(tmp_path) if nome.endswith(".bin"))
+    with open(os.path.join(tmp_path, "paginas", binario), "wb") as arquivo:
+        arquivo.write(b"<outro/>")
+    assert CacheFeeds(diretorio=str(tmp_path)).pagina("https://p/Tasks", None) is None
+
+    metadados = next(nome for nome in _arquivos(tmp_path) if nome.endswith(".json"))
+    with open(os.path.join(tmp_path, "paginas", metadados), "w", encoding="utf-8") as arquivo:
+        arquivo.write("{não é json")
+    assert CacheFeeds(diretorio=str(tmp_path)).pagina("https://p/Tasks", None) is None
+    assert _arquivos(tmp_path) == []
+
+
+def test_disco_guarda_no_maximo_max_entradas(tmp_path):
+    cache = CacheFeeds(max_entradas=3, diretorio=str(tmp_path))
+    for indice in range(5):
+        cache.guardar_pagina(f"https://p/Tasks?pagina={indice}", None, PaginaEmCache(b"x" * indice, str(indice)))
+    assert len(_arquivos(tmp_path)) == 6
+
+
+def test_resultados_sao_copias(tmp_path):
+    cache = CacheFeeds(ttl=60)
+    valor = {"tarefas": [{"Id": 1}]}
+    cache.guardar_resultado(("data", "p"), b"a", valor)
+    valor["tarefas"].append({"Id": 2})
+
+    fresco = cache.resultado_fresco(("data", "p"))
+    assert fresco == {"tarefas": [{"Id": 1}]}
+    fresco["tarefas"].clear()
+    assert cache.resultado(("data", "p"), b"a") == {"tarefas": [{"Id": 1}]}
+    assert cache.resultado(("data", "p"), b"b") is None
+
+
+def test_resultado_expira_pelo_ttl():
+    cache = CacheFeeds(ttl=0)
+    cache.guardar_resultado(("data", "p"), b"a", [1])
+    assert cache.resultado_fresco(("data", "p")) is None
+    assert cache.resultado(("data", "p"), b"a") == [1]
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from ccron.src.domain.service.casador_palavras import CasadorPalavras
+from ccron.src.domain.service.motor_regras import PALAVRAS_EXCLUIDAS_PESO_ZERO, nome_amp, nome_excluido_peso_zero
+
+
+def _nome_aleatorio(aleatorio: random.Random) -> str:
+    pedacos = ["LEG ", "Iptu", "ITBÍ", "escritura", "inc", "inc ", "Projéto", "PROJETO", "custo material pp - obra",
+               "bloco", "Alvenaria", " ", "-", "x", "pré", "obra"]
+    return "".join(aleatorio.choice(pedacos) for _ in range(aleatorio.randint(0, 6)))
+
+
+def test_peso_zero_igual_a_busca_por_substring():
+    aleatorio = random.Random(7)
+    for _ in range(3000):
+        nome = _nome_aleatorio(aleatorio)
+        esperado = any(palavra in nome.lower() for palavra in PALAVRAS_EXCLUIDAS_PESO_ZERO)
+        assert nome_excluido_peso_zero(nome) == esperado, nome
+
+
+def test_casador_igual_a_busca_ingenua():
+    aleatorio = random.Random(3)
+    palavras = ["ab", "b", "bAb", "abc", "c a", "ã"]
+    casador = CasadorPalavras(palavras)
+    for _ in range(3000):
+        texto = "".join(aleatorio.choice("abcABã ") for _ in range(aleatorio.randint(0, 12)))
+        assert casador.encontrar(texto) == {palavra for palavra in palavras if palavra.lower() in texto.lower()}, texto
+    assert not CasadorPalavras(["mao"]).contem_alguma("MÃO")
+
+
+@pytest.mark.parametrize("nome, esperado", [
+    ("HABITE-SE", True),
+    ("MÃO DE OBRA RATEIO", True),
+    ("ANDAM JUNTO", True),
+    # A verificação é feita contra o texto da lista (nome exato ou trecho dele).
+    ("RATEIO", True),
+    ("Habite-se", False),
+    ("HABITE-SE BLOCO 1", False),
+    ("BLOCO 1", False),
+])
+def test_nome_amp(nome, esperado):
+    assert nome_amp(nome) is esperado
+
+
+@pytest.mark.parametrize("nome, descartada", [
+    ("Loja 01", True),
+    ("LOJA", True),
+    ("Acabamento loja térreo", True),
+    ("Loja-01", False),
+    ("Lojas", False),
+    ("Bloco A", False),
+])
+def test_descarte_de_lojas(analise_service, dados_cronograma, nome, descartada):
+    linha = dict(dados_cronograma[10], Nome=nome)
+    assert (analise_service.transform_data._processar_linha(linha) is None) is descartada
@@ -0,0 +1,155 @@
+import re
+
+import pytest
+
+from ccron.src.infrastructure.adapter.out.cache_feeds import CacheFeeds
+from ccron.src.infrastructure.adapter.out.cliente_odata import (
+    ClienteOData, CredenciaisAusentesError, CredenciaisProject, FeedIncompletoError,
+)
+from ccron.src.infrastructure.adapter.out.leitor_atom import ler_entradas, metadados_pagina
+
+
+def feed(ids: list[int], total: int | None = None, proxima: str | None = None) -> bytes:
+    contagem = f"<m:count>{total}</m:count>" if total is not None else ""
+    link = f'<link rel="next" href="{proxima}"/>' if proxima else ""
+    entradas = "".join(
+        f"<entry><id>Tasks('{i}')</id><content><m:properties><d:TaskName>Tarefa {i}</d:TaskName>"
+        f"</m:properties></content></entry>"
+        for i in ids)
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices" '
+        'xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">'
+        f"{contagem}{entradas}{link}</feed>"
+    ).encode()
+
+
+class Resposta:
+    def __init__(self, status_code: int = 200, content: bytes = b"", headers: dict | None = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class SessaoFalsa:
+    """Responde às URLs com `responder(url, headers)` e registra as requisições."""
+    def __init__(self, responder):
+        self.responder = responder
+        self.requisicoes: list[tuple[str, dict]] = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requisicoes.append((url, headers or {}))
+        return self.responder(url, headers or {})
+
+
+@pytest.fixture
+def credenciais(monkeypatch):
+    monkeypatch.setenv("CCRON_PROJECT_FEDAUTH", "fed")
+    monkeypatch.setenv("CCRON_PROJECT_RTFA", "rt")
+    return CredenciaisProject()
+
+
+def _cliente(credenciais, responder, cache=None) -> tuple[ClienteOData, SessaoFalsa]:
+    cliente = ClienteOData(url_base="https://project.test/site", credenciais=credenciais, cache=cache)
+    sessao = SessaoFalsa(responder)
+    cliente.sessao = sessao
+    return cliente, sessao
+
+
+def _ids(paginas: list[bytes]) -> list[str]:
+    return [entrada["TaskName"] for pagina in paginas for entrada in ler_entradas(pagina, ["TaskName"])]
+
+
+def test_credenciais_vem_apenas_do_ambiente(monkeypatch):
+    monkeypatch.delenv("CCRON_PROJECT_FEDAUTH", raising=False)
+    monkeypatch.setenv("CCRON_PROJECT_RTFA", "rt")
+    with pytest.raises(CredenciaisAusentesError, match="CCRON_PROJECT_FEDAUTH"):
+        CredenciaisProject().cookie()
+
+    monkeypatch.setenv("CCRON_PROJECT_FEDAUTH", "fed")
+    assert CredenciaisProject().cookie() == "FedAuth=fed; rtFa=rt"
+
+
+def test_paginacao_pelo_total(credenciais):
+    def responder(url, headers):
+        salto = int(re.search(r"\$skip=(\d+)", url).group(1))
+        return Resposta(content=feed(list(range(salto, min(salto + 10, 25))), total=25 if salto == 0 else None))
+
+    cliente, sessao = _cliente(credenciais, responder)
+    paginas = cliente.paginas("_api/ProjectData/Tasks", tamanho_pagina=10)
+    assert _ids(paginas) == [f"Tarefa {i}" for i in range(25)]
+    assert len(sessao.requisicoes) == 3
+    assert all(headers["Cookie"] == "FedAuth=fed; rtFa=rt" for _, headers in sessao.requisicoes)
+
+
+def _servidor_limitado(total: int, limite: int, perdidas: frozenset = frozenset()):
+    """Servidor que devolve no máximo `limite` entradas por página, ignorando um $top maior."""
+    def responder(url, headers):
+        salto = int(re.search(r"\$skip=(\d+)", url).group(1))
+        topo = int(re.search(r"\$top=(\d+)", url).group(1))
+        ids = [i for i in range(salto, min(salto + min(topo, limite), total)) if i not in perdidas]
+        return Resposta(content=feed(ids, total=total if salto == 0 else None))
+    return responder
+
+
+def test_paginacao_com_servidor_que_limita_a_pagina(credenciais):
+    cliente, sessao = _cliente(credenciais, _servidor_limitado(total=10, limite=4))
+    paginas = cliente.paginas("_api/ProjectData/Tasks", tamanho_pagina=5)
+    assert _ids(paginas) == [f"Tarefa {i}" for i in range(10)]
+    assert len(sessao.requisicoes) == 3
+
+
+def test_entradas_faltando_falham_a_leitura(credenciais):
+    cliente, _ = _cliente(credenciais, _servidor_limitado(total=10, limite=5, perdidas=frozenset({7})))
+    with pytest.raises(FeedIncompletoError, match="9 entradas lidas"):
+        cliente.paginas("_api/ProjectData/Tasks", tamanho_pagina=5)
+
+
+def test_servidor_que_ignora_o_skip_com_total(credenciais):
+    cliente, _ = _cliente(credenciais, lambda url, headers: Resposta(content=feed(list(range(5)), total=10)))
+    with pytest.raises(FeedIncompletoError):
+        cliente.paginas("_api/Tasks", tamanho_pagina=5)
+
+
+def test_paginacao_pelos_links_next(credenciais):
+    paginas_servidor = {
+        "https://project.test/site/_api/Tasks": feed([0, 1], proxima="Tasks?pagina=2"),
+        "https://project.test/site/_api/Tasks?pagina=2": feed([2, 3], proxima="Tasks?pagina=3"),
+        "https://project.test/site/_api/Tasks?pagina=3": feed([4]),
+    }
+    cliente, _ = _cliente(credenciais, lambda url, headers: Resposta(content=paginas_servidor[url]))
+    assert _ids(cliente.paginas("_api/Tasks")) == [f"Tarefa {i}" for i in range(5)]
+
+
+def test_servidor_que_ignora_o_skip_nao_gera_laco(credenciais):
+    cliente, sessao = _cliente(credenciais, lambda url, headers: Resposta(content=feed(list(range(10)))))
+    paginas = cliente.paginas("_api/Tasks", tamanho_pagina=10)
+    assert len(paginas) == 1
+    assert len(sessao.requisicoes) == 2
+
+
+def test_requisicao_condicional_reaproveita_a_pagina(credenciais, tmp_path):
+    conteudo = feed([1, 2])
+
+    def responder(url, headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return Resposta(304)
+        return Resposta(content=conteudo, headers={"ETag": '"v1"'})
+
+    cliente, sessao = _cliente(credenciais, responder, cache=CacheFeeds(diretorio=str(tmp_path)))
+    assert cliente.paginas("_api/Tasks") == [conteudo]
+    assert cliente.paginas("_api/Tasks") == [conteudo]
+    assert sessao.requisicoes[1][1]["If-None-Match"] == '"v1"'
+
+
+def test_401_rele_as_credenciais_e_repete(credenciais, monkeypatch):
+    respostas = iter([Resposta(401), Resposta(content=feed([1]))])
+    cliente, sessao = _cliente(credenciais, lambda url, headers: next(respostas))
+    credenciais.cookie()
+    monkeypatch.setenv("CCRON_PROJECT_FEDAUTH", "novo")
+    assert metadados_pagina(cliente.paginas("_api/Tasks")[0])[0] == 1
+    assert [headers["Cookie"] for _, headers in sessao.requisicoes] == ["FedAuth=fed; rtFa=rt", "FedAuth=novo; rtFa=rt"]
@@ -0,0 +1,97 @@
+import datetime
+import random
+from itertools import combinations
+
+import pytest
+
+from ccron.src.domain.service.calendario_trabalho import CalendarioTrabalho
+
+
+def _data(texto):
+    return datetime.datetime.strptime(texto, "%d/%m/%Y")
+
+
+def _sobreposicoes_quadratica(tarefas: list[dict]) -> set:
+    """A comparação de todos os pares, como era feita antes da varredura."""
+    pares = set()
+    for p1, p2 in combinations(tarefas, 2):
+        try:
+            inicio1, termino1 = _data(p1.get("Início")), _data(p1.get("Término"))
+            inicio2, termino2 = _data(p2.get("Início")), _data(p2.get("Término"))
+        except (ValueError, TypeError):
+            continue
+        if inicio1 < termino2 and inicio2 < termino1:
+            pares.add(tuple(sorted([p1.get("Id"), p2.get("Id")])))
+    return pares
+
+
+def _gaps_originais(tarefas: list[dict], gap_threshold: int) -> list | bool:
+    """Os hiatos em dias corridos, como eram calculados antes do calendário."""
+    validas = []
+    for tarefa in tarefas:
+        try:
+            validas.append((_data(tarefa.get("Término")), _data(tarefa.get("Início")), tarefa.get("Id")))
+        except (ValueError, TypeError):
+            continue
+    validas.sort(key=lambda tarefa: tarefa[0])
+    gaps, acumulado = [], 0
+    for (termino, _, id_atual), (_, inicio_seguinte, id_seguinte) in zip(validas, validas[1:]):
+        dias = max(0, (inicio_seguinte - termino).days - 1)
+        if dias > gap_threshold:
+            acumulado += dias
+            gaps.append([id_atual, id_seguinte, dias, acumulado])
+    return gaps or False
+
+
+def _tarefas_aleatorias(aleatorio: random.Random, quantidade: int) -> list[dict]:
+    base = datetime.date(2025, 1, 1)
+    tarefas = []
+    for posicao in range(quantidade):
+        inicio = base + datetime.timedelta(days=aleatorio.randint(0, 120))
+        # Intervalos de duração zero e invertidos entram de propósito.
+        termino = inicio + datetime.timedelta(days=aleatorio.randint(-3, 25))
+        tarefa = {
+            # Ids repetidos também aparecem nos cronogramas reais.
+            "Id": aleatorio.randint(1, quantidade) if aleatorio.random() < 0.1 else posicao + 1,
+            "Servicos": "Alvenaria",
+            "Início": inicio.strftime("%d/%m/%Y"),
+            "Término": termino.strftime("%d/%m/%Y"),
+        }
+        if aleatorio.random() < 0.05:
+            tarefa[aleatorio.choice(["Início", "Término"])] = aleatorio.choice([None, "nan", "31/02/2025"])
+        tarefas.append(tarefa)
+    return tarefas
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_varredura_igual_a_comparacao_de_todos_os_pares(analise_service, semente):
+    aleatorio = random.Random(semente)
+    tarefas = _tarefas_aleatorias(aleatorio, aleatorio.randint(0, 60))
+    esperado = _sobreposicoes_quadratica(tarefas)
+
+    resultado = analise_service.conferidor.encontrar_sobreposicoes(tarefas, "Alvenaria")
+
+    if not esperado:
+        assert resultado is False
+    else:
+        assert {(id1, id2) for id1, id2, _ in resultado} == esperado
+        assert len(resultado) == len(esperado)
+        assert all(total == len(esperado) for _, _, total in resultado)
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_gaps_em_dias_corridos_iguais_aos_originais(analise_service, semente):
+    aleatorio = random.Random(100 + semente)
+    tarefas = _tarefas_aleatorias(aleatorio, aleatorio.randint(0, 30))
+    esperado = _gaps_originais(tarefas, gap_threshold=2)
+    assert analise_service.conferidor.encontrar_gaps(tarefas, "Alvenaria", 2) == esperado
+
+
+def test_gaps_contam_apenas_dias_uteis(analise_service):
+    tarefas = [
+        {"Id": 1, "Servicos": "Pintura", "Início": "01/09/2025", "Término": "05/09/2025"},  # segunda a sexta
+        {"Id": 2, "Servicos": "Pintura", "Início": "22/09/2025", "Término": "26/09/2025"},
+    ]
+    calendario = CalendarioTrabalho(dias_uteis="1111100", feriados=["08/09/2025"])
+    # Entre 05/09 e 22/09: 10 dias úteis, menos o feriado.
+    assert analise_service.conferidor.encontrar_gaps(tarefas, "Pintura", 5, calendario) == [[1, 2, 9, 9]]
@@ -0,0 +1,60 @@
+import logging
+
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+from ccron.src.application.service.perfilador import Perfilador
+
+
+def _csv(linhas: int = 300) -> bytes:
+    return para_csv(GeradorCronograma(semente=1).gerar(linhas))
+
+
+def test_erro_inesperado_e_registrado_no_log(cliente, controller, monkeypatch, caplog):
+    def falhar(*args, **kwargs):
+        raise RuntimeError("falha na análise")
+
+    monkeypatch.setattr(controller.analise_service, "analisar_cronograma", falhar)
+    with caplog.at_level(logging.ERROR, logger=controller.__name__):
+        resposta = cliente.post("/ccron/analise/completa", files={"file": ("cronograma.csv", _csv())})
+    assert resposta.status_code == 500
+    assert "falha na análise" in resposta.json()["detail"]
+    assert any(registro.exc_info for registro in caplog.records)
+
+
+def test_project_server_sem_credenciais(cliente, monkeypatch):
+    monkeypatch.delenv("CCRON_PROJECT_FEDAUTH", raising=False)
+    monkeypatch.delenv("CCRON_PROJECT_RTFA", raising=False)
+    resposta = cliente.post("/ccron/projeto/3f2504e0-4f89-11d3-9a0c-0305e82c3301/sincronizar")
+    assert resposta.status_code == 503
+    assert "CCRON_PROJECT_FEDAUTH" in resposta.json()["detail"]
+
+
+def test_analise_de_projeto_com_id_invalido(cliente):
+    resposta = cliente.post("/ccron/analise/projeto/obra' or 1 eq 1")
+    assert resposta.status_code == 400
+    assert "GUID" in resposta.json()["detail"]
+
+
+def test_peso_vazio_nao_quebra_a_resposta(cliente):
+    tarefas = GeradorCronograma(semente=1).gerar(300)
+    for tarefa in tarefas[::7]:
+        tarefa["Peso"] = ""
+    resposta = cliente.post("/ccron/analise/completa", files={"file": ("cronograma.csv", para_csv(tarefas))})
+    assert resposta.status_code == 200
+    assert any(linha["Peso"] is None for linha in resposta.json()["dados_ativos"])
+
+
+def test_perfil_em_andamento_responde_409(cliente, monkeypatch):
+    monkeypatch.setenv("CCRON_TOKEN_ADMIN", "segredo")
+    em_andamento = Perfilador()
+    em_andamento.iniciar()
+    try:
+        resposta = cliente.post("/ccron/analise/completa", params={"profile": 1}, headers={"X-CCron-Token": "segredo"},
+                                files={"file": ("cronograma.csv", _csv())})
+    finally:
+        em_andamento.parar()
+    assert resposta.status_code == 409
+
+    resposta = cliente.post("/ccron/analise/completa", params={"profile": 1}, headers={"X-CCron-Token": "segredo"},
+                            files={"file": ("cronograma.csv", _csv())})
+    assert resposta.status_code == 200
+    assert resposta.json()["perfil"]["cprofile"]
@@ -0,0 +1,104 @@
+import asyncio
+import copy
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+from ccron.src.domain.service.diff_cronogramas import VersaoCronograma, comparar_cronogramas
+
+
+def _tarefa(id_tarefa: int, servico: str, predecessoras: str = "", inicio: str = "01/09/2025", **colunas) -> dict:
+    return {"Id": id_tarefa, "Nome": servico, "ID_": "B01.P01", "Servicos": servico, "Ativo": "Sim",
+            "Início": inicio, "Término": inicio, "Predecessoras": predecessoras, **colunas}
+
+
+def _anterior() -> list[dict]:
+    return [_tarefa(1, "Forma"), _tarefa(2, "Armação", "1"), _tarefa(3, "Concretagem", "2")]
+
+
+def test_versoes_iguais():
+    resultado = comparar_cronogramas(VersaoCronograma(_anterior()), VersaoCronograma(_anterior()))
+    assert resultado["resumo"]["inalteradas"] == 3
+    assert resultado["novas"] == resultado["removidas"] == resultado["alteradas"] == []
+
+
+def test_renumeracao_nao_e_alteracao():
+    # Uma tarefa incluída no início renumera as demais e as predecessoras.
+    atual = [_tarefa(1, "Gabarito"), _tarefa(2, "Forma", "1"), _tarefa(3, "Armação", "2"), _tarefa(4, "Concretagem", "3")]
+    atual[1]["Predecessoras"] = ""
+    resultado = comparar_cronogramas(VersaoCronograma(_anterior()), VersaoCronograma(atual))
+    assert resultado["resumo"]["renumeradas"] == 3
+    assert resultado["resumo"]["pareadas_por_chave"] == 3
+    assert [tarefa["Id"] for tarefa in resultado["novas"]] == [1]
+    assert resultado["alteradas"] == []
+
+
+def test_alteracoes_por_categoria():
+    atual = _anterior()
+    atual[1]["Início"] = "05/09/2025"
+    atual[2]["Predecessoras"] = "1"
+    del atual[0]
+    resultado = comparar_cronogramas(VersaoCronograma(_anterior()), VersaoCronograma(atual))
+    assert [tarefa["Id"] for tarefa in resultado["removidas"]] == [1]
+    alteradas = {tarefa["Id"]: tarefa for tarefa in resultado["alteradas"]}
+    assert alteradas[2]["campos"]["Início"] == {"anterior": "01/09/2025", "atual": "05/09/2025", "dias": 4}
+    # A predecessora 1 foi removida e a tarefa 3 passou a depender dela.
+    assert alteradas[2]["categorias"] == ["datas", "predecessoras"]
+    assert alteradas[3]["campos"]["Predecessoras"]["vinculos_incluidos"] == 1
+    assert resultado["resumo"]["alteradas_por_categoria"]["predecessoras"] == 2
+
+
+def test_apontamentos_novos_e_resolvidos_com_renumeracao():
+    atual = [_tarefa(1, "Gabarito")] + [dict(tarefa, Id=tarefa["Id"] + 1, Predecessoras="") for tarefa in _anterior()]
+    regras_anterior = {"ID tarefas sem predecessoras": [1, 2], "ID tarefas com Hiato": [[2, 3, 7, 7]]}
+    regras_atual = {"ID tarefas sem predecessoras": [1, 2, 3, 4], "ID tarefas com Hiato": []}
+    resultado = comparar_cronogramas(VersaoCronograma(_anterior(), regras_anterior), VersaoCronograma(atual, regras_atual))
+    violacoes = resultado["violacoes"]
+    assert violacoes["ID tarefas sem predecessoras"] == {"novas": [1, 4], "resolvidas": []}
+    assert violacoes["ID tarefas com Hiato"] == {"novas": [], "resolvidas": [[2, 3, 7, 7]]}
+    assert resultado["resumo"]["violacoes_novas"] == 2
+
+
+def test_analise_guardada_igual_a_versao_calculada(analise_service, dados_cronograma):
+    # NaN na versão calculada e null no resultado guardado em JSON são o mesmo vazio.
+    calculada = analise_service.versao_cronograma(copy.deepcopy(dados_cronograma))
+    guardada = json.loads(json.dumps(jsonable_encoder(analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma))),
+                                     default=str).replace("NaN", "null"))
+    resultado = analise_service.comparar_cronogramas(calculada, VersaoCronograma.de_resultado(guardada))
+    assert resultado["resumo"]["alteradas"] == 0
+    assert resultado["resumo"]["novas"] == resultado["resumo"]["removidas"] == 0
+    assert resultado["resumo"]["violacoes_novas"] == resultado["resumo"]["violacoes_resolvidas"] == 0
+
+
+def test_rota_diff(cliente):
+    tarefas = GeradorCronograma(semente=1).gerar(300)
+    alterado = copy.deepcopy(tarefas)
+    alterado[40]["Término"] = "31/12/2030"
+    resposta = cliente.post("/ccron/analise/diff", files={
+        "anterior": ("anterior.csv", para_csv(tarefas)), "atual": ("atual.csv", para_csv(alterado))})
+    assert resposta.status_code == 200
+    assert resposta.json()["resumo"]["alteradas"] >= 1
+
+    resposta = cliente.post("/ccron/analise/diff", files={"anterior": ("anterior.csv", para_csv(tarefas))})
+    assert resposta.status_code == 400
+
+
+def test_versoes_sao_analisadas_fora_do_event_loop(cliente, controller, monkeypatch):
+    original = controller.analise_service.versao_cronograma
+    chamadas = []
+
+    def versao_cronograma(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            chamadas.append("event loop")
+        except RuntimeError:
+            chamadas.append("thread")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(controller.analise_service, "versao_cronograma", versao_cronograma)
+    conteudo = para_csv(GeradorCronograma(semente=1).gerar(300))
+    resposta = cliente.post("/ccron/analise/diff", files={
+        "anterior": ("anterior.csv", conteudo), "atual": ("atual.csv", conteudo)})
+    assert resposta.status_code == 200
+    assert chamadas == ["thread", "thread"]
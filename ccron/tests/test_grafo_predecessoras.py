@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from ccron.src.domain.service.grafo_predecessoras import GrafoPredecessoras, Vinculo, interpretar_predecessoras
+from ccron.src.domain.service.motor_regras import tem_predecessora
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("12", (Vinculo(12, "TI", 0.0, False, "12"),)),
+    ("12;15II", (Vinculo(12, "TI", 0.0, False, "12"), Vinculo(15, "II", 0.0, False, "15II"))),
+    ("7FS+2 dias", (Vinculo(7, "TI", 2.0, False, "7FS+2 dias"),)),
+    ("8TT-4h", (Vinculo(8, "TT", -0.5, False, "8TT-4h"),)),
+    ("9IT+1 sem", (Vinculo(9, "IT", 5.0, False, "9IT+1 sem"),)),
+    ("3TI+50%", (Vinculo(3, "TI", 50.0, True, "3TI+50%"),)),
+    ("4TI+1,5d", (Vinculo(4, "TI", 1.5, False, "4TI+1,5d"),)),
+    ("5XX", (Vinculo(5, "XX", 0.0, False, "5XX", False),)),
+    ("6TI+2 quinzenas", (Vinculo(6, "TI", 2.0, False, "6TI+2 quinzenas", False),)),
+    ("abc", (Vinculo(0, "TI", 0.0, False, "abc", False),)),
+    ("", ()),
+    ("nan", ()),
+    (" ; ", ()),
+    (None, ()),
+])
+def test_interpretar_predecessoras(texto, esperado):
+    assert interpretar_predecessoras(texto) == esperado
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("12", True), ("12;15II", True), ("abc", True), (12, True),
+    ("", False), ("nan", False), (" ; ", False), (None, False), (float("nan"), False),
+])
+def test_tem_predecessora(valor, esperado):
+    assert tem_predecessora(valor) is esperado
+
+
+def _tarefas(arestas: dict[int, list[int]], n: int, duracoes=None) -> list[dict]:
+    return [
+        {
+            "Id": i + 1,
+            "Predecessoras": ";".join(str(origem + 1) for origem in arestas.get(i, [])),
+            "Duração": duracoes[i] if duracoes else 1,
+        }
+        for i in range(n)
+    ]
+
+
+def _alcancaveis(sucessores: dict[int, set[int]], origem: int) -> set[int]:
+    vistos, pilha = set(), [origem]
+    while pilha:
+        for vizinho in sucessores.get(pilha.pop(), ()):
+            if vizinho not in vistos:
+                vistos.add(vizinho)
+                pilha.append(vizinho)
+    return vistos
+
+
+@pytest.mark.parametrize("semente", range(25))
+def test_ciclos_iguais_aos_da_alcancabilidade(semente):
+    aleatorio = random.Random(semente)
+    n = aleatorio.randint(1, 25)
+    predecessoras = {i: aleatorio.sample(range(n), aleatorio.randint(0, min(3, n))) for i in range(n)}
+    sucessores: dict[int, set[int]] = {}
+    for destino, origens in predecessoras.items():
+        for origem in origens:
+            sucessores.setdefault(origem, set()).add(destino)
+
+    alcance = {i: _alcancaveis(sucessores, i) for i in range(n)}
+    esperado = set()
+    for i in range(n):
+        if i in alcance[i]:
+            esperado.add(tuple(sorted(j for j in range(n) if j in alcance[i] and i in alcance[j])))
+
+    grafo = GrafoPredecessoras(_tarefas(predecessoras, n))
+    assert {tuple(ciclo) for ciclo in grafo.ciclos()} == esperado
+
+    ordem = grafo.ordem_topologica()
+    posicao_na_ordem = {no: indice for indice, no in enumerate(ordem)}
+    em_ciclo = {no for ciclo in esperado for no in ciclo}
+    # Fica de fora exatamente quem está em um ciclo ou depende de um.
+    assert set(ordem) == {i for i in range(n) if i not in em_ciclo and not any(i in alcance[c] for c in em_ciclo)}
+    for origem, destinos in sucessores.items():
+        for destino in destinos:
+            if origem in posicao_na_ordem and destino in posicao_na_ordem:
+                assert posicao_na_ordem[origem] < posicao_na_ordem[destino]
+
+
+def test_caminho_critico():
+    # 1 -> 2 -> 4 e 1 -> 3 -> 4; o ramo de 3 tem 2 dias de folga.
+    tarefas = [
+        {"Id": 1, "Predecessoras": "", "Duração": 2},
+        {"Id": 2, "Predecessoras": "1", "Duração": 5},
+        {"Id": 3, "Predecessoras": "1", "Duração": 3},
+        {"Id": 4, "Predecessoras": "2;3", "Duração": 1},
+        {"Id": 5, "Predecessoras": "4II+1", "Duração": 1},
+    ]
+    rede = GrafoPredecessoras(tarefas).analisar()
+    assert rede["duracao_projeto"] == 9
+    assert rede["caminho_critico"] == [1, 2, 4, 5]
+    folgas = {folga["Id"]: folga["Folga_total"] for folga in rede["folgas"]}
+    assert folgas == {1: 0, 2: 0, 3: 2, 4: 0, 5: 0}
+    assert rede["sem_predecessoras"] == [1]
+    assert rede["sem_sucessoras"] == [5]
+
+
+def test_referencias_pendentes_e_vinculos_invalidos():
+    tarefas = [
+        {"Id": 1, "Predecessoras": "99", "Duração": 1},
+        {"Id": 2, "Predecessoras": "1XX", "Duração": 1},
+    ]
+    rede = GrafoPredecessoras(tarefas).analisar()
+    assert rede["referencias_pendentes"] == [{"Id": 1, "Predecessora": 99}]
+    assert rede["vinculos_invalidos"] == [{"Id": 2, "Vinculo": "1XX"}]
+    assert rede["ciclos"] == []
+
+
+def test_propagar_atrasos_respeita_a_folga():
+    # 1 -> 2 (com 3 dias de folga) e 1 -> 3 (sem folga).
+    tarefas = [
+        {"Id": 1, "Predecessoras": "", "Duração": 2},
+        {"Id": 2, "Predecessoras": "1", "Duração": 2},
+        {"Id": 3, "Predecessoras": "1", "Duração": 2},
+    ]
+    grafo = GrafoPredecessoras(tarefas)
+    movidas, pendentes = grafo.propagar_atrasos({0: 2}, inicios=[0, 5, 2], terminos=[1, 6, 3])
+    assert movidas == {0: (2, 3), 2: (4, 5)}
+    assert pendentes == []
@@ -0,0 +1,112 @@
+import copy
+import logging
+
+import pytest
+
+from ccron.benchmarks.gerador_cronograma import GeradorCronograma, para_csv
+from ccron.src.application.service.historico import HistoricoService, resumir_analise
+from ccron.src.infrastructure.adapter.out.historico_analises import HistoricoAnalises
+
+PROJETO = "3f2504e0-4f89-11d3-9a0c-0305e82c3301"
+PREENCHIMENTO = "ID tarefas com Ponto de Atenção no Preenchimento"
+
+
+def _resumo(atrasadas: int, gaps: int = 0, **regras) -> dict:
+    return {"tarefas_ativas": 100, "regras": {"ID tarefas atrasadas": atrasadas, **regras},
+            "total_apontamentos": atrasadas + sum(regras.values()), "sobreposicoes": 0, "gaps": gaps,
+            "erros_macrofluxo": {"Ordem": 1}, "total_erros_macrofluxo": 1}
+
+
+@pytest.fixture
+def historico(tmp_path) -> HistoricoAnalises:
+    return HistoricoAnalises(str(tmp_path / "historico.db"))
+
+
+def test_registrar_e_consultar(historico):
+    ids = [historico.registrar(PROJETO, _resumo(quantidade), "completa", "v1") for quantidade in (3, 5, 2)]
+    historico.registrar("outro", _resumo(9), "completa")
+
+    analises = historico.listar(PROJETO)
+    assert [analise["analise_id"] for analise in analises] == ids
+    assert analises[0]["erros_macrofluxo"] == {"Ordem": 1} and not analises[0]["com_resultado"]
+    assert [analise["analise_id"] for analise in historico.listar(PROJETO, limite=2)] == ids[1:]
+    assert [analise["analise_id"] for analise in historico.listar(PROJETO, antes_de=ids[2])] == ids[:2]
+    assert historico.contagens(PROJETO, ids[0], ids[1]) == {
+        ids[0]: {"ID tarefas atrasadas": 3}, ids[1]: {"ID tarefas atrasadas": 5}}
+    assert historico.analise(PROJETO, ids[2])["regras"] == {"ID tarefas atrasadas": 2}
+    assert historico.analise("outro", ids[2]) is None
+
+
+def test_resultado_comprimido(historico):
+    analise_id = historico.registrar(PROJETO, _resumo(1), "projeto", resultado={"dados_ativos": [{"Id": 1}]})
+    assert historico.listar(PROJETO)[0]["com_resultado"]
+    assert historico.resultado(PROJETO, analise_id) == {"dados_ativos": [{"Id": 1}]}
+    assert historico.resultado("outro", analise_id) is None
+
+
+def test_servico_registra_o_resumo_da_analise(historico, analise_service, dados_cronograma):
+    resultado = analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma))
+    servico = HistoricoService(historico, "v1", ativo=True, guardar_resultados=True)
+    analise_id = servico.registrar(PROJETO, resultado, "completa")
+
+    resumo = resumir_analise(resultado)
+    analise = historico.analise(PROJETO, analise_id)
+    assert analise["regras"] == resumo["regras"]
+    assert analise["total_apontamentos"] == resumo["total_apontamentos"]
+    assert len(servico.resultado(PROJETO, analise_id)["dados_ativos"]) == resumo["tarefas_ativas"]
+
+
+def test_falha_ao_gravar_vai_para_o_log(caplog):
+    class HistoricoQuebrado:
+        def registrar(self, *args, **kwargs):
+            raise OSError("disco cheio")
+
+    servico = HistoricoService(HistoricoQuebrado(), ativo=True)
+    with caplog.at_level(logging.ERROR, logger="ccron.src.application.service.historico"):
+        assert servico.registrar(PROJETO, {"dados_regras_validacao": {}}, "completa") is None
+    assert "disco cheio" in caplog.text
+
+
+def test_tendencia_filtra_pelas_chaves_exatas(historico):
+    for quantidade in (4, 1):
+        historico.registrar(PROJETO, _resumo(
+            quantidade, **{"ID tarefas atrasadas há mais de 30 dias": 7, f"{PREENCHIMENTO} Peso": quantidade,
+                           f"{PREENCHIMENTO} SAP": 2, "ID tarefas sem predecessoras": 3}), "completa")
+    servico = HistoricoService(historico)
+
+    tendencia = servico.tendencia(PROJETO, regras="atrasadas,preenchimento")
+    assert tendencia["pontos"][0]["regras"] == {
+        "ID tarefas atrasadas": 4, f"{PREENCHIMENTO} Peso": 4, f"{PREENCHIMENTO} SAP": 2}
+    assert tendencia["variacao"]["regras"] == {
+        "ID tarefas atrasadas": -3, f"{PREENCHIMENTO} Peso": -3, f"{PREENCHIMENTO} SAP": 0}
+    assert len(servico.tendencia(PROJETO)["pontos"][1]["regras"]) == 5
+    with pytest.raises(ValueError, match="Regra desconhecida"):
+        servico.tendencia(PROJETO, regras="inexistente")
+
+
+def test_comparar_as_duas_ultimas(historico):
+    historico.registrar(PROJETO, _resumo(4, gaps=2), "completa", "v1")
+    historico.registrar(PROJETO, _resumo(1, gaps=5), "completa", "v2")
+    comparacao = HistoricoService(historico).comparar(PROJETO)
+    assert comparacao["totais"]["gaps"] == {"de": 2, "para": 5, "variacao": 3}
+    assert comparacao["regras"]["ID tarefas atrasadas"]["variacao"] == -3
+    assert comparacao["mesma_referencia"] is False
+    assert HistoricoService(historico).comparar("outro") is None
+
+
+def test_rota_so_registra_depois_de_montar_a_resposta(cliente, controller, monkeypatch):
+    def falhar(conteudo):
+        raise ValueError("Out of range float values are not JSON compliant")
+
+    conteudo = para_csv(GeradorCronograma(semente=1).gerar(300))
+    monkeypatch.setattr(controller, "resposta_analise", falhar)
+    resposta = cliente.post("/ccron/analise/completa", params={"project_id": "rota-falha"},
+                            files={"file": ("cronograma.csv", conteudo)})
+    assert resposta.status_code == 500
+    assert controller.historico_service.listar("rota-falha") == []
+
+    monkeypatch.undo()
+    resposta = cliente.post("/ccron/analise/completa", params={"project_id": "rota-falha"},
+                            files={"file": ("cronograma.csv", conteudo)})
+    assert resposta.status_code == 200
+    assert len(controller.historico_service.listar("rota-falha")) == 1
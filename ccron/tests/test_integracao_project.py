@@ -0,0 +1,159 @@
+import re
+from xml.sax.saxutils import escape
+
+import pytest
+
+from ccron.src.infrastructure.adapter.out.cliente_odata import FeedIncompletoError
+from ccron.src.infrastructure.adapter.out.integracao_project_adapter import (
+    IntegracaoProjectAdapter, ProjectIdInvalidoError, guid_projeto,
+)
+from ccron.src.infrastructure.adapter.out.snapshot_tarefas import SnapshotTarefas
+from ccron.src.infrastructure.adapter.out.tarefas_project_data import (
+    CAMPOS_PROJECT_DATA, campos_project_data, converter_tarefa,
+)
+
+GUID = "3f2504e0-4f89-11d3-9a0c-0305e82c3301"
+
+
+@pytest.mark.parametrize("project_id", [GUID, GUID.upper(), "{" + GUID + "}", GUID.replace("-", "")])
+def test_guid_projeto_canonico(project_id):
+    assert guid_projeto(project_id) == GUID
+
+
+@pytest.mark.parametrize("project_id", ["", "obra", GUID + "' or 1 eq 1 or ProjectId eq guid'" + GUID, GUID[:-1], None])
+def test_guid_projeto_invalido(project_id):
+    with pytest.raises(ProjectIdInvalidoError):
+        guid_projeto(project_id)
+
+
+def test_urls_usam_o_guid_validado():
+    assert IntegracaoProjectAdapter._url_data(GUID.upper()).endswith(f"guid'{GUID}'")
+    assert IntegracaoProjectAdapter._url_server(GUID) == f"_api/ProjectServer/Projects('{GUID}')/Tasks"
+    with pytest.raises(ProjectIdInvalidoError):
+        IntegracaoProjectAdapter._url_data("x')/Tasks?$select=*&a=('")
+
+
+def test_campos_project_data_com_ajustes(monkeypatch):
+    monkeypatch.setenv("CCRON_CAMPOS_PROJECT_DATA", '{"Peso": "PesoTarefa", "Tipo": null}')
+    campos = campos_project_data()
+    assert campos["Peso"] == ("PesoTarefa", CAMPOS_PROJECT_DATA["Peso"][1])
+    assert "Tipo" not in campos
+
+
+@pytest.mark.parametrize("valor, mensagem", [
+    ("{Peso: PesoTarefa}", "não é um JSON válido"),
+    ('["Peso"]', "objeto JSON"),
+    ('{"Peso": "Peso,TaskName&$filter=1"}', "propriedade inválida"),
+    ('{"Peso": 3}', "propriedade inválida"),
+])
+def test_campos_project_data_invalido_falha_na_inicializacao(monkeypatch, tmp_path, valor, mensagem):
+    monkeypatch.setenv("CCRON_CAMPOS_PROJECT_DATA", valor)
+    with pytest.raises(ValueError, match=mensagem):
+        campos_project_data()
+    with pytest.raises(ValueError, match=mensagem):
+        IntegracaoProjectAdapter(cliente=object(), snapshot=object())
+
+
+class ClienteFalso:
+    """Serve um projeto em memória, respeitando o `$select` e o filtro por `TaskModifiedDate`."""
+    def __init__(self):
+        self.tarefas: list[dict] = []
+        self.modificado_em = "2025-01-01T00:00:00"
+        self.urls: list[str] = []
+        self.perdidas = 0
+
+    def paginas(self, caminho, headers=None, tamanho_pagina=None) -> list[bytes]:
+        self.urls.append(caminho)
+        selecao = re.search(r"\$select=([^&]+)", caminho).group(1).split(",")
+        if "/Projects?" in caminho:
+            linhas = [{"ProjectId": GUID, "ProjectModifiedDate": self.modificado_em}]
+        else:
+            marca = re.search(r"TaskModifiedDate ge datetime'([^']+)'", caminho)
+            linhas = [t for t in self.tarefas if not marca or t["TaskModifiedDate"] >= marca.group(1)]
+        total = len(linhas)
+        if "/Tasks?" in caminho:
+            linhas = linhas[:total - self.perdidas]
+        entradas = "".join(
+            "<entry><content><m:properties>" + "".join(
+                f"<d:{p} m:null='true'/>" if linha.get(p) is None else f"<d:{p}>{escape(str(linha[p]))}</d:{p}>"
+                for p in selecao) + "</m:properties></content></entry>"
+            for linha in linhas)
+        return [(
+            "<feed xmlns='http://www.w3.org/2005/Atom' "
+            "xmlns:d='http://schemas.microsoft.com/ado/2007/08/dataservices' "
+            "xmlns:m='http://schemas.microsoft.com/ado/2007/08/dataservices/metadata'>"
+            f"<m:count>{total}</m:count>{entradas}</feed>").encode()]
+
+    def alterar(self, momento: str):
+        self.modificado_em = momento
+        for indice, tarefa in enumerate(self.tarefas, start=1):
+            tarefa.update(TaskIndex=indice, TaskOutlineNumber=f"1.{indice}", TaskPredecessors=str(indice - 1) if indice > 1 else None)
+
+
+def _tarefa(numero: int, momento: str) -> dict:
+    return {"TaskId": f"t{numero}", "TaskName": f"Tarefa {numero}", "TaskOutlineLevel": 2,
+            "TaskModifiedDate": momento, "TaskIsActive": "true", "TaskDuration": "3"}
+
+
+@pytest.fixture
+def projeto(tmp_path):
+    cliente = ClienteFalso()
+    cliente.tarefas = [_tarefa(numero, f"2025-01-01T00:00:{numero:02d}") for numero in range(1, 21)]
+    cliente.alterar("2025-01-01T00:00:00")
+    return cliente, IntegracaoProjectAdapter(cliente, 50, SnapshotTarefas(str(tmp_path / "snapshot.db")))
+
+
+def _esperado(cliente: ClienteFalso) -> list[dict]:
+    campos = campos_project_data()
+    return [converter_tarefa({k: None if v is None else str(v) for k, v in t.items()}, campos) for t in cliente.tarefas]
+
+
+def test_sincronizacao_incremental(projeto):
+    cliente, adapter = projeto
+    assert adapter.sincronizar_projeto(GUID)["leitura_completa"] is True
+    assert adapter.snapshot.linhas(GUID) == _esperado(cliente)
+
+    cliente.urls.clear()
+    assert adapter.sincronizar_projeto(GUID) == {"project_id": GUID, "alterado": False}
+    assert len(cliente.urls) == 1
+
+    cliente.tarefas[3]["TaskName"] = "Renomeada"
+    cliente.tarefas[3]["TaskModifiedDate"] = "2025-02-01T00:00:00"
+    cliente.tarefas.insert(5, _tarefa(99, "2025-02-01T00:00:00"))
+    del cliente.tarefas[10]
+    cliente.alterar("2025-02-01T00:00:00")
+    resumo = adapter.sincronizar_projeto(GUID)
+    # Só as duas tarefas alteradas e a da última marca (inclusiva) são lidas inteiras.
+    assert (resumo["leitura_completa"], resumo["excluidas"], resumo["lidas_inteiras"]) == (False, 1, 3)
+    assert adapter.snapshot.linhas(GUID) == _esperado(cliente)
+    assert len(adapter.snapshot.tarefas_atuais(GUID)) == 20
+
+
+def test_sincronizacao_valida_o_id_antes_de_consultar(projeto):
+    cliente, adapter = projeto
+    with pytest.raises(ProjectIdInvalidoError):
+        adapter.sincronizar_projeto(GUID + "' or ProjectId ne guid'" + GUID)
+    assert cliente.urls == []
+
+    adapter.sincronizar_projeto(GUID.upper())
+    assert f"guid'{GUID}'" in cliente.urls[0]
+
+
+def test_leitura_incompleta_nao_exclui_tarefas(projeto):
+    cliente, adapter = projeto
+    adapter.sincronizar_projeto(GUID)
+    anteriores = adapter.snapshot.linhas(GUID)
+
+    cliente.tarefas[2]["TaskModifiedDate"] = "2025-02-01T00:00:00"
+    cliente.alterar("2025-02-01T00:00:00")
+    cliente.perdidas = 2
+    with pytest.raises(FeedIncompletoError):
+        adapter.sincronizar_projeto(GUID)
+    # Nada foi gravado: as tarefas que faltaram na leitura não viram tombstones.
+    assert adapter.snapshot.linhas(GUID) == anteriores
+    assert len(adapter.snapshot.tarefas_atuais(GUID)) == 20
+    assert adapter.pegar_tarefas_para_analise(GUID) == anteriores
+
+    cliente.perdidas = 0
+    assert adapter.sincronizar_projeto(GUID)["excluidas"] == 0
+    assert adapter.snapshot.linhas(GUID) == _esperado(cliente)
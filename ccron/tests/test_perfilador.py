@@ -0,0 +1,73 @@
+import copy
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ccron.src.application.service.perfilador import Perfilador, PerfilEmAndamentoError
+
+
+def test_analise_com_perfil(analise_service, dados_cronograma):
+    resultado = analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma), perfilador=Perfilador())
+    perfil = resultado["perfil"]
+    assert {etapa["etapa"] for etapa in perfil["etapas"]} >= {"transformacao", "macrofluxo"}
+    assert perfil["memoria"]["pico_bytes"] > 0
+    assert sys.getprofile() is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_falha_na_analise_encerra_o_perfil(analise_service, dados_cronograma, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise ValueError("cronograma inválido")
+
+    monkeypatch.setattr(analise_service.transform_data, "transformar_dados", falhar)
+    with pytest.raises(ValueError):
+        analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma), perfilador=Perfilador())
+    assert sys.getprofile() is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_um_perfil_por_vez(analise_service, dados_cronograma):
+    # No Python 3.12+ o cProfile usa o sys.monitoring, que aceita um único perfilador.
+    em_andamento = Perfilador()
+    em_andamento.iniciar()
+    try:
+        with pytest.raises(PerfilEmAndamentoError):
+            analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma[:600]), perfilador=Perfilador())
+    finally:
+        em_andamento.parar()
+    assert not tracemalloc.is_tracing()
+
+    resultado = analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma[:600]), perfilador=Perfilador())
+    assert resultado["perfil"]["cprofile"]
+
+
+def test_perfis_simultaneos(analise_service, dados_cronograma):
+    def analisar(_):
+        try:
+            return analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma[:600]), perfilador=Perfilador())
+        except PerfilEmAndamentoError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        resultados = list(executor.map(analisar, range(8)))
+    assert any(resultados)
+    assert all(resultado["perfil"]["cprofile"] for resultado in resultados if resultado)
+    assert sys.getprofile() is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_falha_ao_ligar_o_cprofile_libera_o_perfil(analise_service, dados_cronograma):
+    class ProfileOcupado:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    perfilador = Perfilador()
+    perfilador._profiler = ProfileOcupado()
+    with pytest.raises(PerfilEmAndamentoError, match="Another profiling tool"):
+        analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma[:600]), perfilador=perfilador)
+    assert not tracemalloc.is_tracing()
+
+    resultado = analise_service.analisar_cronograma(copy.deepcopy(dados_cronograma[:600]), perfilador=Perfilador())
+    assert resultado["perfil"]["memoria"]["pico_bytes"] > 0
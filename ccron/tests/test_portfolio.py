@@ -0,0 +1,58 @@
+import copy
+import logging
+import pickle
+
+import pytest
+
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+from ccron.src.application.service.portfolio import PortfolioService, RegistroPortfolio
+from ccron.src.domain.service.calendario_trabalho import CalendarioTrabalho
+
+PROJETOS = ["3f2504e0-4f89-11d3-9a0c-0305e82c3301", "6fa459ea-ee8a-3ca4-894e-db77e160355e"]
+
+
+class ProjetosFalsos:
+    def __init__(self, dados: list[dict]):
+        self.dados = dados
+
+    def pegar_tarefas_para_analise(self, project_id: str) -> list[dict]:
+        return copy.deepcopy(self.dados)
+
+
+def test_calendario_sobrevive_ao_pickle():
+    calendario = CalendarioTrabalho(dias_uteis="1111100", feriados=["08/09/2025"])
+    copia = pickle.loads(pickle.dumps(OpcoesAnalise(calendario=calendario))).calendario
+    assert copia.chave == calendario.chave
+    assert (copia.para_dias_uteis([739500, 739510]) == calendario.para_dias_uteis([739500, 739510])).all()
+
+
+def test_portfolio_com_calendario_no_pool_de_processos(analise_service, dados_cronograma, tmp_path, caplog):
+    dados = dados_cronograma[:300]
+    opcoes = OpcoesAnalise.de_parametros(hiato={"dias_uteis": "1111100", "feriados": ["25/12/2025"], "gap_threshold": 2})
+    portfolio = PortfolioService(ProjetosFalsos(dados), RegistroPortfolio(str(tmp_path)), processos=2)
+    try:
+        resumo = portfolio.registro.criar(PROJETOS)
+        with caplog.at_level(logging.WARNING):
+            resumo = portfolio.executar(resumo, PROJETOS, opcoes)
+        assert portfolio._pool is not None
+        # Sem recair na análise local: o calendário chegou ao processo filho.
+        assert not caplog.records
+    finally:
+        portfolio._descartar_pool()
+
+    assert resumo["concluidos"] == 2 and resumo["com_erro"] == 0
+    esperado = analise_service.analisar_cronograma(copy.deepcopy(dados), project_id=PROJETOS[0], opcoes=opcoes)
+    resultado = portfolio.registro.resultado(resumo["execucao_id"], PROJETOS[0])
+    assert resultado["lista_gap"] == esperado["lista_gap"]
+
+
+def test_limite_de_projetos(tmp_path):
+    portfolio = PortfolioService(ProjetosFalsos([]), RegistroPortfolio(str(tmp_path)), processos=1, max_projetos=1)
+    with pytest.raises(ValueError, match="No máximo 1"):
+        portfolio.iniciar(PROJETOS)
+
+
+def test_rota_recusa_ids_que_nao_sao_guid(cliente):
+    resposta = cliente.post("/ccron/portfolio", data={"projetos": f"{PROJETOS[0]},obra' or 1 eq 1"})
+    assert resposta.status_code == 400
+    assert "GUID" in resposta.json()["detail"]
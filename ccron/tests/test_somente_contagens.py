@@ -0,0 +1,31 @@
+import copy
+
+import pytest
+
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.application.service.opcoes_analise import OpcoesAnalise
+
+
+def _contagens_esperadas(dados: list[dict]) -> dict[str, int]:
+    completo = AnaliseService().analisar_cronograma(copy.deepcopy(dados))["dados_regras_validacao"]
+    return {chave: len(ids) for chave, ids in completo.items()}
+
+
+@pytest.mark.parametrize("project_id", [None, "obra"])
+def test_contagens_iguais_ao_tamanho_das_listas(dados_cronograma, project_id):
+    servico = AnaliseService()
+    opcoes = OpcoesAnalise(somente_contagens=True)
+    esperado = _contagens_esperadas(dados_cronograma)
+
+    # Com project_id, o modo de contagens não passa pelo incremental: as duas análises são completas.
+    for _ in range(2 if project_id else 1):
+        resultado = servico.analisar_cronograma(copy.deepcopy(dados_cronograma), project_id=project_id, opcoes=opcoes)
+        assert resultado["dados_regras_validacao"] == esperado
+        assert all(isinstance(valor, int) for valor in resultado["dados_regras_validacao"].values())
+
+
+def test_contar_preenchimento_igual_a_verificar(analise_service, dados_cronograma):
+    tarefas = analise_service.transform_data.transformar_dados(copy.deepcopy(dados_cronograma))
+    regras = analise_service.regras
+    esperado = [[tipo, len(ids)] for tipo, ids in regras.verificar_preenchimento(tarefas)]
+    assert regras.contar_preenchimento(tarefas) == esperado
@@ -0,0 +1,42 @@
+import copy
+import math
+
+import pytest
+
+from conftest import normalizar
+from ccron.src.application.service.analise_service import AnaliseService
+from ccron.src.domain.service.tabela_tarefas import TabelaTarefas
+
+
+def test_linhas_reproduzem_os_dicionarios():
+    linhas = [
+        {"Id": 1, "Ativo": "Sim", "Servicos": "Forma", "Peso": 10.0},
+        {"Id": 2, "Ativo": "Não", "Peso": math.nan, "Extra": [1, 2]},
+        {"Id": 3, "Ativo": True, "Servicos": {"não": "hashable"}},
+        {},
+    ]
+    tabela = TabelaTarefas.de_dicts(linhas)
+    assert len(tabela) == 4
+    assert [list(linha) for linha in tabela] == [list(linha) for linha in linhas]
+    assert normalizar(TabelaTarefas.para_dicts(tabela)) == normalizar(linhas)
+    assert tabela[1].get("Servicos", "-") == "-" and "Servicos" not in tabela[1]
+    with pytest.raises(KeyError):
+        tabela[3]["Id"]
+    assert tabela[0] is tabela[0]
+    assert tabela.coluna("Servicos", "") == ["Forma", "", {"não": "hashable"}, ""]
+
+    codigos, categorias = tabela.categorias("Ativo")
+    # True e "Sim" não se confundem, e a linha sem a chave vira None.
+    assert [categorias[codigo] for codigo in codigos] == ["Sim", "Não", True, None]
+    assert tabela.categorias("Servicos") is None
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_analise_igual_com_dicionarios(monkeypatch, dados_cronograma, backend):
+    monkeypatch.setenv("CCRON_BACKEND_REGRAS", backend)
+    colunar = AnaliseService().analisar_cronograma(copy.deepcopy(dados_cronograma))
+
+    # A mesma análise com as tarefas transformadas em dicionários, como antes da tabela.
+    monkeypatch.setattr(TabelaTarefas, "de_dicts", classmethod(lambda cls, linhas: list(linhas)))
+    por_dicionarios = AnaliseService().analisar_cronograma(copy.deepcopy(dados_cronograma))
+    assert normalizar(colunar) == normalizar(por_dicionarios)